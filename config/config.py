@@ -15,6 +15,20 @@ _MSEED_SUBDIR = 'mseed'
 _CATALOG_SUBDIR = 'catalog'
 _HDF5_SUBDIR = 'hdf5'
 _EQT_SUBDIR = 'eqt'
+_PYRAMID_SUBDIR = 'pyramid'
+_DETECTIONS_SUBDIR = 'detections'
+_SPECTRAL_SUBDIR = 'spectral_cache'
+_RESIDUALS_SUBDIR = 'residuals'
+_PICK_STORE_SUBDIR = 'pick_store'
+_SCHEDULER_SUBDIR = 'scheduler'
+_EVENT_CUTS_SUBDIR = 'event_cuts'
+_EVENT_MATCH_SUBDIR = 'event_match'
+_RESULTS_SUBDIR = 'results'
+_REPORTS_SUBDIR = 'reports'
+_RESPONSE_SUBDIR = 'response'
+_QC_SUBDIR = 'qc'
+_PANEL_CACHE_SUBDIR = 'panel_cache'
+_RESULTS_HDF5_FILENAME = "products.h5"
 
 _PHASE_CATALOG_FILENAME = "2023_12_04_fazcalismasi.txt" # Katalog dosyanızın adı
 _STATION_DATA_FILENAME = "station_data.txt"           # İstasyon veri dosyanızın adı
@@ -43,6 +57,11 @@ CONFIG = {
             "ORLT", "ISK", "ENEZ", "SILV"
             # Not: Bu liste data/station_names.py'deki ile aynı veya farklı olabilir.
         ],
+        # Asenkron indirme (utils/async_download_utils.py): istasyon-saat başına bir fdsnws/dataselect isteği
+        'async_download': False,                # True: çok sayıda istek için asyncio istemcisi kullanılır
+        'chunk_hours': 1,                       # İstek başına saat sayısı (dosya adı parçanın başlangıç saatini taşır)
+        'max_concurrency': 8,                   # Host başına eşzamanlı bağlantı sayısı
+        'requests_per_second': 5.0,             # Host başına istek/saniye sınırı (0: sınırsız)
     },
     # === Kod1: Sismik Veri İşleme Parametreleri ===
     'seismic_data': {
@@ -59,12 +78,46 @@ CONFIG = {
         'phase_component': "HHZ",                # Kullanılacak faz bileşeni (örn. "HHZ", "EHZ")
     },
 
+    # === Alet Tepkisi Giderme (utils/response_utils.py) ===
+    # Yerel StationXML dosyalarıyla count -> yer hareketi dönüşümü (sismik grafik, sunucu, event kesme).
+    'response_settings': {
+        'enable': False,                         # True: tepki filtreden önce giderilir
+        # StationXML dosyalarının klasörü (*.xml; otomatik olarak input_data/response belirlendi)
+        'stationxml_folder': os.path.join(INPUT_DATA_DIR, _RESPONSE_SUBDIR),
+        'output': "VEL",                         # "DISP" (m), "VEL" (m/s) veya "ACC" (m/s²)
+        'water_level': 60.0,                     # Ters çevirmede su seviyesi (dB); None: yok
+        'pre_filt': [0.02, 0.05, 35.0, 45.0],    # Frekans alanı ön filtre köşeleri (Hz); None: yok
+        'taper_fraction': 0.05,                  # Zaman alanı kosinüs konisi oranı
+        'max_cached_spectra': 256,               # Önbellekte tutulan ters tepki spektrumu sayısı
+    },
+
+    # === Kalite Kontrol Metrikleri (utils/qc_utils.py, --qc) ===
+    # Kanal-saat başına tamlık, boşluk, RMS, yüzdelikler, kırpılma, sıçrama ve ölü kanal; SQLite tablosunda.
+    'qc_settings': {
+        # Metrik veritabanı (qc_hourly tablosu; otomatik olarak input_data/qc belirlendi)
+        'db_path': os.path.join(INPUT_DATA_DIR, _QC_SUBDIR, "qc_metrics.sqlite"),
+        'channel': None,                         # Sadece bu kanal (None: klasördeki tüm kanallar)
+        'workers': None,                         # Dosya işçi süreç sayısı (None: CPU sayısı)
+        'clip_counts': 8388607,                  # Bu mutlak değere ulaşan örnekler kırpılmış sayılır (24-bit tam ölçek); None: düz tepe sezgisi
+        'spike_mad': 50.0,                       # Sıçrama eşiği: medyandan sapma / (1.4826 * MAD)
+        'dead_range_counts': 0,                  # Saat içi max-min bu değeri aşmıyorsa kanal ölü
+        'dead_flat_fraction': 0.95,              # Ardışık eşit örnek oranı bunu aşarsa kanal ölü
+        # Grafik öncesi dışlama (sunucudaki istasyon listesi)
+        'exclude_bad': False,                    # True: eşikleri geçemeyen istasyonlar çizilmez
+        'min_completeness': 0.9,                 # Pencere tamlığı alt sınırı (0-1)
+        'max_clip_fraction': 0.001,              # Kırpılmış örnek oranı üst sınırı; None: kontrol yok
+        'max_spikes_per_hour': 10,               # Saatlik sıçrama sayısı üst sınırı; None: kontrol yok
+    },
+
     # === Kod2: Deprem Katalog Verisi Parametreleri ===
     'catalog_data': {
         # Katalog dosyasının tam yolu (otomatik olarak input_data/catalog/dosya_adı belirlendi)
+        # Klasör (içindeki *.txt) veya glob deseni de verilebilir, örn: os.path.join(INPUT_DATA_DIR, _CATALOG_SUBDIR, "2023_12_*_fazcalismasi.txt")
         'catalog_file_path': os.path.join(INPUT_DATA_DIR, _CATALOG_SUBDIR, _PHASE_CATALOG_FILENAME),
         # İstasyon bilgilerini içeren dosya yolu (otomatik olarak input_data/catalog/dosya_adı belirlendi)
         'station_data_path': os.path.join(INPUT_DATA_DIR, _CATALOG_SUBDIR, _STATION_DATA_FILENAME),
+        'workers': None,                         # Birden çok bülten/parça için ayrıştırma süreç sayısı (None = CPU sayısı)
+        'split_mb': 16,                          # Bu boyuttan büyük bültenler EVENT sınırlarından parçalanır (MB, None = bölme)
     },
 
     # === Kod3: HDF5 Deprem Pick Verisi Parametreleri ===
@@ -72,6 +125,15 @@ CONFIG = {
         # HDF5 dosyasının tam yolu (otomatik olarak input_data/hdf5/dosya_adı belirlendi)
         'hdf5_file_path': os.path.join(INPUT_DATA_DIR, _HDF5_SUBDIR, _HDF5_FILENAME),
         # İstasyon isimleri data/station_names.py dosyasından alınacak (bu değişmedi)
+        # Çok günlü mod: günlük HDF5 dosyalarının bulunduğu klasör verilirse (örn. os.path.join(INPUT_DATA_DIR, _HDF5_SUBDIR))
+        # hdf5_file_path yerine klasör tek veri kümesi olarak açılır ve sadece [start, end) ile kesişen dosyalar okunur.
+        'hdf5_folder': None,
+        'start': "2023-12-04T00:00:00",          # Çok günlü mod başlangıcı (UTC)
+        'end': "2023-12-05T00:00:00",            # Çok günlü mod bitişi (UTC, dahil değil)
+        'max_open_files': 8,                     # Aynı anda açık tutulacak en fazla HDF5 dosyası
+        # Bu sayıdan fazla pick tek tek işaretlenmez, zaman x boylam yoğunluk haritası çizilir (None: her zaman işaretle)
+        'max_markers': 5000,
+        'density_bins': [360, 40],               # Yoğunluk haritası [zaman bin, boylam bin] sayıları
     },
 
     # === Kod4: EQTransformer Pick Verisi Parametreleri ===
@@ -87,6 +149,189 @@ CONFIG = {
     'plot_settings': {
         'figure_height': 1500,                   # Toplam figür yüksekliği (piksel)
         'figure_title': "Veri Karşılaştırma Grafikleri", # Ana başlık
+    },
+
+    # === Etkileşimli Sunucu Ayarları (python main.py --serve) ===
+    'server_settings': {
+        'host': "127.0.0.1",                     # Sadece yerel adresler kabul edilir (127.0.0.1, localhost, ::1)
+        'port': 8050,                            # Sunucu portu
+        'stations': ["GELI", "KAVV", "MRMT", "SILT"], # Waveform panelinde gösterilecek istasyonlar (boşsa selected_station)
+        'max_points': 4000,                      # İstasyon başına gönderilecek en fazla bin (piksel) sayısı
+        'trace_cache_size': 128,                 # Bellekte tutulacak okunmuş mseed dosyası sayısı
+        'use_pyramid': True,                     # Geniş pencerelerde önceden hesaplanmış min/max piramidini kullan
+        'max_view_picks': 2000,                  # Görünen aralıkta panel başına bundan fazla pick varsa yoğunluk haritası gönder
+        'density_bins': [300, 40],               # Sunucu yoğunluk haritası [zaman bin (en fazla), y bin] sayıları
+    },
+
+    # === Waveform Piramidi (Çok Çözünürlüklü Min/Max Zarfları, python main.py --build-pyramid) ===
+    'pyramid_settings': {
+        # Piramit dosyalarının yazılacağı klasör (otomatik olarak input_data/pyramid belirlendi)
+        'pyramid_folder': os.path.join(INPUT_DATA_DIR, _PYRAMID_SUBDIR),
+        'levels': [10, 100, 1000],               # İndirgeme faktörleri (her biri bir öncekine tam bölünmeli)
+    },
+
+    # === STA/LTA Dedektörü (python main.py --detect) ===
+    'detector_settings': {
+        'method': "classic",                     # "classic" (kümülatif toplam) veya "recursive"
+        'channel': "HHZ",                        # İşlenecek kanal (None ise tüm mseed dosyaları)
+        'sta_seconds': 0.5,                      # Kısa pencere (s)
+        'lta_seconds': 10.0,                     # Uzun pencere (s)
+        'thr_on': 4.0,                           # Tetikleme başlangıç eşiği (STA/LTA)
+        'thr_off': 1.5,                          # Tetikleme bitiş eşiği (STA/LTA)
+        'chunk_seconds': 600,                    # Parça uzunluğu (s) - bellek kullanımını sınırlar
+        'filter_type': "bandpass",               # Ön filtre ("bandpass", "highpass", ... veya None)
+        'freqmin': 2.0,                          # Minimum frekans (Hz)
+        'freqmax': 15.0,                         # Maksimum frekans (Hz)
+        'corners': 4,                            # Filtre derecesi
+        'zerophase': False,                      # Tetikleme zamanlarının kaymaması için nedensel filtre
+        'workers': None,                         # Paralel süreç sayısı (None = CPU sayısı)
+        # Tetiklemelerin yazılacağı dosya (EQT summary.csv biçiminde, eqt_data.summary_csv_path olarak verilebilir)
+        'output_csv': os.path.join(INPUT_DATA_DIR, _DETECTIONS_SUBDIR, "stalta_picks.csv"),
+        # Pickler ve seyreltilmiş zarfların eklendiği HDF5 sonuç dosyası (None = yazılmaz, bkz. hdf5_output_settings)
+        'output_hdf5': os.path.join(INPUT_DATA_DIR, _RESULTS_SUBDIR, _RESULTS_HDF5_FILENAME),
+        'envelope_decimate': 10,                 # Zarf seyreltme katsayısı (blok başına en büyük genlik, 100 Hz -> 10 Hz)
+    },
+
+    # === Eşleştirilmiş Filtre / Şablon Eşleme (python main.py --match-templates) ===
+    'matched_filter_settings': {
+        'date': None,                            # Taranacak gün (None = seismic_data.date)
+        'channel': None,                         # Kanal (None = seismic_data.phase_component)
+        'phases': ["P", "S"],                    # Şablon kanalı olarak kullanılacak katalog pick fazları
+        'template_pre_seconds': 0.5,             # Pick öncesi şablon uzunluğu (s)
+        'template_post_seconds': 2.5,            # Pick sonrası şablon uzunluğu (s)
+        'sampling_rate': 100.0,                  # Farklı örnekleme frekanslı trace'ler atlanır
+        'min_stations': 3,                       # Şablon ve tespit için gereken en az istasyon sayısı
+        'threshold_mad': 8.0,                    # Tespit eşiği: yığılmış korelasyonun MAD katı
+        'min_separation_seconds': 2.0,           # Aynı şablonun iki tespiti arasındaki en kısa süre (s)
+        'max_templates': None,                   # Kullanılacak en fazla şablon (None = tümü)
+        'filter_type': "bandpass",               # Şablon ve sürekli veriye aynı ön filtre
+        'freqmin': 2.0,                          # Minimum frekans (Hz)
+        'freqmax': 15.0,                         # Maksimum frekans (Hz)
+        'corners': 4,                            # Filtre derecesi
+        'zerophase': False,                      # Nedensel filtre (pick zamanları kaymaz)
+        'workers': None,                         # Şablonları işleyen süreç sayısı (None = CPU sayısı)
+        # Tespitlerin yazılacağı dosya (pick tablosu biçiminde, eqt_data.summary_csv_path olarak verilebilir)
+        'output_csv': os.path.join(INPUT_DATA_DIR, _DETECTIONS_SUBDIR, "matched_filter_picks.csv"),
+    },
+
+    # === Spektral Panel (Spektrogram / Gürültü Seviyeleri) ===
+    'spectral_settings': {
+        'enable': False,                         # True ise ana figüre 5. panel olarak eklenir
+        'panel': "spectrogram",                  # "spectrogram" (seçili istasyon) veya "noise" (tüm istasyonlar, PSD yüzdeliği)
+        'nperseg': 1024,                         # FFT çerçeve uzunluğu (örnek)
+        'noverlap': None,                        # Çerçeve çakışması (None = nperseg // 2)
+        'noise_percentile': 50,                  # "noise" panelinde çizilecek PSD yüzdeliği
+        # Kanal-saat spektrogram önbelleği (otomatik olarak input_data/spectral_cache belirlendi)
+        'cache_folder': os.path.join(INPUT_DATA_DIR, _SPECTRAL_SUBDIR),
+    },
+
+    # === Seyahat Süresi Rezidüelleri (python main.py --residuals) ===
+    'traveltime_settings': {
+        # 1-B hız modeli: [tabaka üst derinliği (km), Vp (km/s), Vs (km/s)]; son tabaka yarı sonsuz
+        # (Varsayılan model örnek katalogdaki Pg/Sg varışlarına kabaca uydurulmuştur)
+        'velocity_model': [
+            [0.0, 4.80, 2.77],
+            [3.0, 5.70, 3.29],
+            [12.0, 6.10, 3.53],
+            [25.0, 6.60, 3.82],
+            [35.0, 8.00, 4.62],
+        ],
+        'max_distance_km': 300.0,                # Tablo mesafe aralığı (km)
+        'distance_step_km': 1.0,                 # Tablo mesafe adımı (km)
+        'max_depth_km': 40.0,                    # Tablo derinlik aralığı (km)
+        'depth_step_km': 1.0,                    # Tablo derinlik adımı (km)
+        'default_depth_km': 10.0,                # Derinliği olmayan katalog event'leri ve model eğrileri için
+        'sources': ["catalog", "hdf5"],          # Rezidüel hesaplanacak kaynaklar
+        'reduction_velocity': 6.0,               # İndirgenmiş zaman grafiği için hız (km/s)
+        # Rezidüel tablosunun yazılacağı dosya (otomatik olarak input_data/residuals belirlendi)
+        'output_csv': os.path.join(INPUT_DATA_DIR, _RESIDUALS_SUBDIR, "travel_time_residuals.csv"),
+        # Rezidüel tablosunun ayrıca yazılacağı HDF5 sonuç dosyası (None = yazılmaz)
+        'output_hdf5': os.path.join(INPUT_DATA_DIR, _RESULTS_SUBDIR, _RESULTS_HDF5_FILENAME),
+    },
+
+    # === HDF5 Sonuç Dosyası (detector_settings / traveltime_settings 'output_hdf5') ===
+    'hdf5_output_settings': {
+        'compression': "auto",                   # "auto" (hdf5plugin varsa blosc-lz4, yoksa gzip), "blosc-lz4", "gzip", "lzf", None
+        'compression_level': 4,                  # gzip 1-9, blosc 0-9
+        'chunk_seconds': 300,                    # Trace parça süresi (s) - zaman penceresi okumalarında açılan en küçük birim
+        'table_chunk_rows': 16384,               # Tablo (pick, rezidüel) parça satır sayısı
+    },
+
+    # === Sütun Bazlı Pick Deposu (python main.py --ingest) ===
+    'pick_store_settings': {
+        # Depo klasörü (otomatik olarak input_data/pick_store belirlendi)
+        'store_folder': os.path.join(INPUT_DATA_DIR, _PICK_STORE_SUBDIR),
+        'sources': ["catalog", "hdf5", "eqt"],   # Aktarılacak kaynaklar
+        'with_residuals': True,                  # traveltime_settings modeliyle rezidüel sütununu doldur
+    },
+
+    # === Toplu İşler (config_loader.derive_job_configs) ===
+    # Boş listeler için seismic_data'daki tek tarih/saat/istasyon kullanılır.
+    'job_settings': {
+        'dates': [],                             # Örn: ["2023-12-04", "2023-12-05"]
+        'windows': [],                           # Saat pencereleri, örn: [[6, 8], [8, 10]]
+        'stations': [],                          # Örn: ["GELI", "KAVV"]
+    },
+
+    # === Günlük İşleme Zamanlayıcısı (python main.py --schedule [--from YYYY-MM-DD --to YYYY-MM-DD]) ===
+    'scheduler_settings': {
+        # Görev parmak izlerinin tutulduğu durum dosyası (otomatik olarak input_data/scheduler belirlendi)
+        'state_file': os.path.join(INPUT_DATA_DIR, _SCHEDULER_SUBDIR, "state.json"),
+        # Her iş için oluşturulan HTML grafiklerinin klasörü
+        'report_folder': os.path.join(INPUT_DATA_DIR, _SCHEDULER_SUBDIR, "reports"),
+        'workers': 4,                            # Eşzamanlı çalışan bağımsız görev sayısı
+        'stages': ["download", "eqt", "hdf5", "detect", "pyramid", "residuals", "render"],
+        'eqt_source': "summary",                 # EQT paneli: "summary" (eqt_data, EQTransformer çıktısı) veya "detector" (günlük STA/LTA çıktısı)
+    },
+
+    # === Statik Rapor (python main.py --export-report; zamanlayıcı grafikleri de aynı biçimde yazılır) ===
+    'report_settings': {
+        # Raporların klasörü; plotly.js burada tek kopya olarak tutulur (otomatik olarak input_data/reports belirlendi)
+        'output_folder': os.path.join(INPUT_DATA_DIR, _REPORTS_SUBDIR),
+        'plotlyjs': "local",                     # "local" (klasörde paylaşılan dosya, çevrimdışı açılır) veya "cdn"
+        'min_array_length': 32,                  # Bu uzunluktan kısa diziler JSON listesi olarak kalır
+        'float32': True,                         # Zaman ekseni dışındaki float diziler float32 yazılır (boyut yarıya iner)
+    },
+
+    # === Panel Önbelleği (utils/panel_cache_utils.py) ===
+    # Ana figürün her paneli (trace dizileri + layout) diskte saklanır; anahtar panelin girdi dosyaları
+    # (yol, mtime, boyut) ve yapılandırma bölümüdür. Tek bir ayar değişince sadece etkilenen panel yeniden hesaplanır.
+    'panel_cache_settings': {
+        'enable': True,
+        # Önbellek klasörü (otomatik olarak input_data/panel_cache belirlendi)
+        'cache_folder': os.path.join(INPUT_DATA_DIR, _PANEL_CACHE_SUBDIR),
+        'max_entries': 64,                       # Tutulacak en fazla panel dosyası (en eski kullanılan silinir)
+    },
+
+    # === Günlük (logging) Ayarları ===
+    'logging_settings': {
+        'level': "INFO",                         # utils.* modüllerinin varsayılan seviyesi (DEBUG, INFO, WARNING, ERROR)
+        # Modül bazında seviyeler, "modül=SEVİYE" biçiminde (örn. "utils.hdf5_utils=DEBUG" ilk/son satır dökümlerini açar)
+        'module_levels': [],
+        'format': "%(message)s",                 # logging biçimi (örn. "%(asctime)s %(name)s %(levelname)s %(message)s")
+    },
+
+    # === Katalog-HDF5 Event Eşleme (python main.py --match-events) ===
+    'event_match_settings': {
+        'max_time_diff_seconds': 5.0,            # Origin zamanı toleransı (s)
+        'max_distance_km': 30.0,                 # Episantr mesafesi toleransı (km)
+        'restrict_to_overlap': True,             # Sadece iki listenin ortak zaman aralığını değerlendir
+        # Çiftler, eşlenmeyenler ve hata histogramları (otomatik olarak input_data/event_match belirlendi)
+        'output_folder': os.path.join(INPUT_DATA_DIR, _EVENT_MATCH_SUBDIR),
+    },
+
+    # === Event Merkezli Waveform Kesme (python main.py --cut-events) ===
+    'event_cut_settings': {
+        'sources': ["catalog", "hdf5"],          # Origin zamanlarının alınacağı kaynaklar
+        'pre_seconds': 10.0,                     # Origin öncesi (s)
+        'post_seconds': 60.0,                    # Origin sonrası (s)
+        'channel': None,                         # None: seismic_data.phase_component
+        'sampling_rate': 100.0,                  # Tensörün örnekleme frekansı; farklı trace'ler atlanır
+        'stations': [],                          # İstasyon ekseni; boş: pencerelerde dosyası olan tüm istasyonlar
+        'drop_empty': True,                      # Hiç verisi olmayan event'leri çıkar
+        'workers': None,                         # Dosya işçi süreç sayısı (None: CPU sayısı)
+        # Çıktı tensörü (.h5/.hdf5 veya .npz; otomatik olarak input_data/event_cuts belirlendi)
+        'output_path': os.path.join(INPUT_DATA_DIR, _EVENT_CUTS_SUBDIR, "event_waveforms.h5"),
     }
 }
 
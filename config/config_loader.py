@@ -0,0 +1,537 @@
+# seismic_analysis/config/config_loader.py
+
+import os
+import re
+import copy
+import json
+import itertools
+
+import numpy as np
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:  # pragma: no cover
+    tomllib = None
+
+from config.config import CONFIG
+from utils.log_utils import LEVELS, parse_module_levels
+
+# Katmanlı yapılandırma: config.py'deki CONFIG varsayılanları <- TOML/YAML dosyaları <- ortam
+# değişkenleri <- komut satırı (--set bölüm.anahtar=değer). Sonuç şemaya göre tip dönüşümü ve
+# doğrulamadan geçirilir; hata varsa tüm sorunlar tek seferde ConfigError ile bildirilir.
+# Bu modül veri dosyalarını açmaz, böylece hatalı bir yapılandırma ağır işlerden önce durur.
+
+ENV_PREFIX = "SEISMIC_CFG__"   # Örn: SEISMIC_CFG__SEISMIC_DATA__DATE=2023-12-05
+_DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_DATETIME_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$')
+_FILTER_TYPES = (None, "highpass", "lowpass", "bandpass", "bandstop")
+
+
+class ConfigError(ValueError):
+    """Yapılandırma doğrulama hatası; errors listesinde tüm sorunlar bulunur."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("Yapılandırma hatalı:\n  - " + "\n  - ".join(self.errors))
+
+
+def _field(kind, nullable=False, choices=None, min=None, max=None):
+    return {'kind': kind, 'nullable': nullable, 'choices': choices, 'min': min, 'max': max}
+
+
+# Şema: bölüm -> anahtar -> alan tanımı. kind: str, int, float, bool, date, datetime, list[str], list[int], list[float], hours, model
+SCHEMA = {
+    'download_settings': {
+        'enable_download': _field('bool'), 'client_name': _field('str'), 'date': _field('date'),
+        'start_hour': _field('int', min=0, max=23), 'end_hour': _field('int', min=1, max=24),
+        'channel': _field('str'), 'stations_to_download': _field('list[str]'),
+        'async_download': _field('bool'), 'chunk_hours': _field('int', min=1, max=24),
+        'max_concurrency': _field('int', min=1), 'requests_per_second': _field('float', min=0),
+    },
+    'seismic_data': {
+        'mseed_folder': _field('str'), 'selected_station': _field('str'), 'date': _field('date'),
+        'start_hour': _field('int', min=0, max=23), 'filter_type': _field('str', nullable=True, choices=_FILTER_TYPES),
+        'freqmin': _field('float', nullable=True, min=0), 'freqmax': _field('float', nullable=True, min=0),
+        'corners': _field('int', min=1, max=16), 'zerophase': _field('bool'), 'phase_component': _field('str'),
+    },
+    'response_settings': {
+        'enable': _field('bool'), 'stationxml_folder': _field('str'), 'output': _field('str', choices=("DISP", "VEL", "ACC")),
+        'water_level': _field('float', nullable=True), 'pre_filt': _field('list[float]', nullable=True),
+        'taper_fraction': _field('float', min=0, max=0.5), 'max_cached_spectra': _field('int', min=1),
+    },
+    'qc_settings': {
+        'db_path': _field('str'), 'channel': _field('str', nullable=True), 'workers': _field('int', nullable=True, min=1),
+        'clip_counts': _field('float', nullable=True, min=0), 'spike_mad': _field('float', min=0),
+        'dead_range_counts': _field('float', min=0), 'dead_flat_fraction': _field('float', min=0, max=1),
+        'exclude_bad': _field('bool'), 'min_completeness': _field('float', min=0, max=1),
+        'max_clip_fraction': _field('float', nullable=True, min=0, max=1), 'max_spikes_per_hour': _field('float', nullable=True, min=0),
+    },
+    'catalog_data': {
+        'catalog_file_path': _field('str'), 'station_data_path': _field('str'),
+        'workers': _field('int', nullable=True, min=1), 'split_mb': _field('float', nullable=True, min=0),
+    },
+    'hdf5_data': {
+        'hdf5_file_path': _field('str', nullable=True), 'hdf5_folder': _field('str', nullable=True),
+        'start': _field('datetime'), 'end': _field('datetime'), 'max_open_files': _field('int', min=1),
+        'max_markers': _field('int', nullable=True, min=1), 'density_bins': _field('list[int]'),
+    },
+    'eqt_data': {
+        'summary_csv_path': _field('str'), 'start_hour': _field('int', min=0, max=23),
+        'end_hour': _field('int', min=1, max=24), 'date': _field('date'),
+    },
+    'plot_settings': {'figure_height': _field('int', min=100), 'figure_title': _field('str')},
+    'server_settings': {
+        'host': _field('str', choices=("127.0.0.1", "localhost", "::1")), 'port': _field('int', min=1, max=65535),
+        'stations': _field('list[str]'), 'max_points': _field('int', min=10), 'trace_cache_size': _field('int', min=1),
+        'use_pyramid': _field('bool'), 'max_view_picks': _field('int', nullable=True, min=1),
+        'density_bins': _field('list[int]'),
+    },
+    'pyramid_settings': {'pyramid_folder': _field('str'), 'levels': _field('list[int]')},
+    'detector_settings': {
+        'method': _field('str', choices=("classic", "recursive")), 'channel': _field('str', nullable=True),
+        'sta_seconds': _field('float', min=0), 'lta_seconds': _field('float', min=0),
+        'thr_on': _field('float', min=0), 'thr_off': _field('float', min=0), 'chunk_seconds': _field('int', min=1),
+        'filter_type': _field('str', nullable=True, choices=_FILTER_TYPES),
+        'freqmin': _field('float', nullable=True, min=0), 'freqmax': _field('float', nullable=True, min=0),
+        'corners': _field('int', min=1, max=16), 'zerophase': _field('bool'),
+        'workers': _field('int', nullable=True, min=1), 'output_csv': _field('str'),
+        'output_hdf5': _field('str', nullable=True), 'envelope_decimate': _field('int', nullable=True, min=1),
+    },
+    'matched_filter_settings': {
+        'date': _field('date', nullable=True), 'channel': _field('str', nullable=True), 'phases': _field('list[str]'),
+        'template_pre_seconds': _field('float', min=0), 'template_post_seconds': _field('float', min=0),
+        'sampling_rate': _field('float', min=0), 'min_stations': _field('int', min=1),
+        'threshold_mad': _field('float', min=0), 'min_separation_seconds': _field('float', min=0),
+        'max_templates': _field('int', nullable=True, min=1),
+        'filter_type': _field('str', nullable=True, choices=_FILTER_TYPES),
+        'freqmin': _field('float', nullable=True, min=0), 'freqmax': _field('float', nullable=True, min=0),
+        'corners': _field('int', min=1, max=16), 'zerophase': _field('bool'),
+        'workers': _field('int', nullable=True, min=1), 'output_csv': _field('str', nullable=True),
+    },
+    'spectral_settings': {
+        'enable': _field('bool'), 'panel': _field('str', choices=("spectrogram", "noise")),
+        'nperseg': _field('int', min=16), 'noverlap': _field('int', nullable=True, min=0),
+        'noise_percentile': _field('float', min=0, max=100), 'cache_folder': _field('str', nullable=True),
+    },
+    'traveltime_settings': {
+        'velocity_model': _field('model'), 'max_distance_km': _field('float', min=0), 'distance_step_km': _field('float', min=0),
+        'max_depth_km': _field('float', min=0), 'depth_step_km': _field('float', min=0),
+        'default_depth_km': _field('float', min=0), 'sources': _field('list[str]'),
+        'reduction_velocity': _field('float', min=0), 'output_csv': _field('str', nullable=True),
+        'output_hdf5': _field('str', nullable=True),
+    },
+    'hdf5_output_settings': {
+        'compression': _field('str', nullable=True, choices=(None, "auto", "blosc-lz4", "gzip", "lzf")),
+        'compression_level': _field('int', min=0, max=9), 'chunk_seconds': _field('float', min=0),
+        'table_chunk_rows': _field('int', min=1),
+    },
+    'pick_store_settings': {'store_folder': _field('str'), 'sources': _field('list[str]'), 'with_residuals': _field('bool')},
+    'scheduler_settings': {
+        'state_file': _field('str'), 'report_folder': _field('str'), 'workers': _field('int', min=1),
+        'stages': _field('list[str]'), 'eqt_source': _field('str', choices=("detector", "summary")),
+    },
+    'report_settings': {
+        'output_folder': _field('str'), 'plotlyjs': _field('str', choices=("local", "cdn")),
+        'min_array_length': _field('int', min=1), 'float32': _field('bool'),
+    },
+    'panel_cache_settings': {
+        'enable': _field('bool'), 'cache_folder': _field('str'), 'max_entries': _field('int', min=1),
+    },
+    'logging_settings': {
+        'level': _field('str', choices=LEVELS), 'module_levels': _field('list[str]'), 'format': _field('str'),
+    },
+    'event_match_settings': {
+        'max_time_diff_seconds': _field('float', min=0), 'max_distance_km': _field('float', min=0),
+        'restrict_to_overlap': _field('bool'), 'output_folder': _field('str', nullable=True),
+    },
+    'event_cut_settings': {
+        'sources': _field('list[str]'), 'pre_seconds': _field('float', min=0), 'post_seconds': _field('float', min=0),
+        'channel': _field('str', nullable=True), 'sampling_rate': _field('float', min=0), 'stations': _field('list[str]'),
+        'drop_empty': _field('bool'), 'workers': _field('int', nullable=True, min=1), 'output_path': _field('str', nullable=True),
+    },
+    'job_settings': {
+        'dates': _field('list[str]'), 'windows': _field('hours'), 'stations': _field('list[str]'),
+    },
+}
+
+
+# --- Değer Dönüşümü ---
+def _coerce(value, spec, where):
+    """Tek bir değeri alan tanımına göre dönüştürür; (değer, hata veya None) döndürür."""
+    kind = spec['kind']
+    if isinstance(value, str) and kind not in ('str', 'date', 'datetime'):
+        text = value.strip()
+        if text.lower() in ('none', 'null', ''):
+            value = None
+        elif kind == 'bool':
+            if text.lower() in ('true', '1', 'yes', 'evet', 'on'):
+                value = True
+            elif text.lower() in ('false', '0', 'no', 'hayir', 'hayır', 'off'):
+                value = False
+        elif kind.startswith('list') or kind in ('hours', 'model'):
+            try:
+                value = json.loads(text)
+            except ValueError:
+                value = [v.strip() for v in text.split(',') if v.strip()]
+        else:
+            value = text
+    elif isinstance(value, str) and kind == 'str' and spec['nullable'] and value.strip().lower() in ('none', 'null'):
+        value = None
+
+    if value is None:
+        return (None, None) if spec['nullable'] else (None, f"{where}: boş olamaz")
+
+    try:
+        if kind == 'bool':
+            if not isinstance(value, bool):
+                raise ValueError
+        elif kind == 'int':
+            if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                raise ValueError
+            value = int(value)
+        elif kind == 'float':
+            if isinstance(value, bool):
+                raise ValueError
+            value = float(value)
+        elif kind in ('str', 'date', 'datetime'):
+            if not isinstance(value, str):
+                value = str(value)  # TOML tarih/saat nesneleri
+                if kind == 'datetime':
+                    value = value.replace(' ', 'T')
+            if kind == 'date' and not _DATE_PATTERN.match(value):
+                return value, f"{where}: tarih YYYY-MM-DD biçiminde olmalı ('{value}')"
+            if kind == 'datetime' and not _DATETIME_PATTERN.match(value):
+                return value, f"{where}: zaman YYYY-MM-DDTHH:MM:SS biçiminde olmalı ('{value}')"
+        elif kind == 'list[str]':
+            value = [str(v) for v in value]
+        elif kind == 'list[int]':
+            value = [int(v) for v in value]
+        elif kind == 'list[float]':
+            value = [float(v) for v in value]
+        elif kind == 'hours':
+            value = [[int(x) for x in window] for window in value]
+            if any(len(window) != 2 for window in value):
+                raise ValueError
+        elif kind == 'model':
+            value = [[float(x) for x in layer] for layer in value]
+            if not value or any(len(layer) != 3 for layer in value):
+                raise ValueError
+    except (TypeError, ValueError):
+        return value, f"{where}: '{value}' değeri {kind} türüne uygun değil"
+
+    if spec['choices'] is not None and value not in spec['choices']:
+        return value, f"{where}: '{value}' geçersiz (seçenekler: {[c for c in spec['choices'] if c is not None]})"
+    if kind in ('int', 'float'):
+        if spec['min'] is not None and value < spec['min']:
+            return value, f"{where}: {value} < {spec['min']}"
+        if spec['max'] is not None and value > spec['max']:
+            return value, f"{where}: {value} > {spec['max']}"
+    return value, None
+
+
+def _check_filter(section, cfg, errors):
+    ftype = cfg.get('filter_type'); fmin = cfg.get('freqmin'); fmax = cfg.get('freqmax')
+    if ftype == 'highpass' and fmin is None:
+        errors.append(f"{section}: highpass filtre için freqmin gerekli")
+    if ftype == 'lowpass' and fmax is None:
+        errors.append(f"{section}: lowpass filtre için freqmax gerekli")
+    if ftype in ('bandpass', 'bandstop'):
+        if fmin is None or fmax is None:
+            errors.append(f"{section}: {ftype} filtre için freqmin ve freqmax gerekli")
+        elif fmin >= fmax:
+            errors.append(f"{section}: freqmin ({fmin}) freqmax'tan ({fmax}) küçük olmalı")
+
+
+def _check_cross_fields(config, sections, errors):
+    """Birden çok anahtarı ilgilendiren kurallar."""
+    get = lambda s: config.get(s, {}) if s in sections else {}
+    for section in ('download_settings', 'eqt_data'):
+        cfg = get(section)
+        if cfg and cfg.get('start_hour') is not None and cfg.get('end_hour') is not None and cfg['start_hour'] >= cfg['end_hour']:
+            errors.append(f"{section}: start_hour ({cfg['start_hour']}) end_hour'dan ({cfg['end_hour']}) küçük olmalı")
+    for section in ('seismic_data', 'detector_settings', 'matched_filter_settings'):
+        if get(section):
+            _check_filter(section, get(section), errors)
+    resp = get('response_settings')
+    if resp and resp.get('pre_filt') is not None:
+        pre_filt = resp['pre_filt']
+        if len(pre_filt) != 4 or any(a >= b for a, b in zip(pre_filt, pre_filt[1:])) or pre_filt[0] < 0:
+            errors.append(f"response_settings: pre_filt artan 4 frekans olmalı ({pre_filt})")
+    det = get('detector_settings')
+    if det:
+        if det.get('sta_seconds', 0) >= det.get('lta_seconds', 1):
+            errors.append("detector_settings: sta_seconds lta_seconds'tan küçük olmalı")
+        if det.get('thr_off', 0) >= det.get('thr_on', 1):
+            errors.append("detector_settings: thr_off thr_on'dan küçük olmalı")
+    hdf5 = get('hdf5_data')
+    if hdf5 and hdf5.get('start') and hdf5.get('end') and hdf5['start'] >= hdf5['end']:
+        errors.append("hdf5_data: start end'den önce olmalı")
+    log_cfg = get('logging_settings')
+    if log_cfg and log_cfg.get('module_levels'):
+        try:
+            parse_module_levels(log_cfg['module_levels'])
+        except ValueError as e:
+            errors.append(f"logging_settings.module_levels: {e}")
+    for section in ('hdf5_data', 'server_settings'):
+        bins = get(section).get('density_bins') if get(section) else None
+        if bins is not None and (len(bins) != 2 or min(bins) < 1):
+            errors.append(f"{section}: density_bins iki pozitif sayı olmalı ([zaman, y]): {bins}")
+    levels = get('pyramid_settings').get('levels') if get('pyramid_settings') else None
+    if levels:
+        levels = sorted(levels)
+        if levels[0] < 2 or any(b % a for a, b in zip(levels, levels[1:])):
+            errors.append(f"pyramid_settings: levels >= 2 olmalı ve birbirine tam bölünmeli ({levels})")
+    spec = get('spectral_settings')
+    if spec and spec.get('noverlap') is not None and spec['noverlap'] >= spec.get('nperseg', 0):
+        errors.append("spectral_settings: noverlap nperseg'den küçük olmalı")
+    tt = get('traveltime_settings')
+    if tt and tt.get('velocity_model'):
+        tops = [layer[0] for layer in tt['velocity_model']]
+        if tops[0] != 0.0 or any(b <= a for a, b in zip(tops, tops[1:])):
+            errors.append("traveltime_settings: velocity_model 0 km'den başlamalı, tabaka üstleri artmalı")
+        if any(v <= 0 for layer in tt['velocity_model'] for v in layer[1:]):
+            errors.append("traveltime_settings: velocity_model hızları pozitif olmalı")
+    for section in ('traveltime_settings', 'pick_store_settings', 'event_cut_settings'):
+        cfg = get(section)
+        unknown = [s for s in cfg.get('sources', []) if s not in ('catalog', 'hdf5', 'eqt')] if cfg else []
+        if unknown:
+            errors.append(f"{section}: bilinmeyen kaynak(lar) {unknown}")
+    sched = get('scheduler_settings')
+    unknown = [s for s in sched.get('stages', []) if s not in ("download", "eqt", "hdf5", "detect", "pyramid", "residuals", "render")] if sched else []
+    if unknown:
+        errors.append(f"scheduler_settings: bilinmeyen aşama(lar) {unknown}")
+    jobs = get('job_settings')
+    if jobs:
+        for date in jobs.get('dates', []):
+            if not _DATE_PATTERN.match(date):
+                errors.append(f"job_settings.dates: '{date}' YYYY-MM-DD biçiminde değil")
+        if any(not 0 <= a < b <= 24 for a, b in jobs.get('windows', [])):
+            errors.append("job_settings.windows: [[başlangıç, bitiş], ...] saat çiftleri olmalı (0 <= başlangıç < bitiş <= 24)")
+
+
+def validate_config(config, sections=None):
+    """
+    Yapılandırmayı şemaya göre yerinde dönüştürür ve doğrular.
+
+    Args:
+        config (dict): Yapılandırma sözlüğü (değerler dönüştürülmüş hâlleriyle güncellenir).
+        sections (iterable, optional): Sadece bu bölümleri doğrula (varsayılan: tümü).
+
+    Returns:
+        dict: Aynı config nesnesi.
+
+    Raises:
+        ConfigError: Bilinmeyen bölüm/anahtar, tip, aralık veya tutarlılık hatası varsa.
+    """
+    errors = []
+    sections = set(config) if sections is None else set(sections)
+    for section in sorted(sections):
+        if section not in config:
+            continue
+        if section not in SCHEMA:
+            errors.append(f"Bilinmeyen bölüm: {section}")
+            continue
+        values = config[section]
+        if not isinstance(values, dict):
+            errors.append(f"{section}: bölüm bir tablo/sözlük olmalı")
+            continue
+        for key in values:
+            if key not in SCHEMA[section]:
+                errors.append(f"{section}.{key}: bilinmeyen anahtar")
+        for key, spec in SCHEMA[section].items():
+            if key not in values:
+                continue
+            values[key], error = _coerce(values[key], spec, f"{section}.{key}")
+            if error:
+                errors.append(error)
+    if not errors:
+        _check_cross_fields(config, sections, errors)
+    if errors:
+        raise ConfigError(errors)
+    return config
+
+
+# --- Dosyalar ve Katmanlar ---
+_FILE_CACHE = {}
+
+
+def _read_config_file(path):
+    """TOML/YAML dosyasını okur; dosya değişmediyse önbellekteki ayrıştırılmış içerik döner."""
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        raise ConfigError([f"Yapılandırma dosyası okunamadı: {path} ({e})"])
+    cached = _FILE_CACHE.get(path)
+    if cached and cached[0] == (stat.st_mtime, stat.st_size):
+        return copy.deepcopy(cached[1])
+
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == '.toml':
+            if tomllib is None:
+                raise ConfigError(["TOML dosyaları için Python 3.11+ (tomllib) gerekli."])
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+        elif ext in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ConfigError(["YAML dosyaları için 'pyyaml' paketi gerekli (pip install pyyaml)."])
+            with open(path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f) or {}
+        elif ext == '.json':
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        else:
+            raise ConfigError([f"Desteklenmeyen yapılandırma dosyası uzantısı: {path}"])
+    except ConfigError:
+        raise
+    except Exception as e:
+        raise ConfigError([f"Yapılandırma dosyası ayrıştırılamadı: {path} ({e})"])
+    if not isinstance(data, dict):
+        raise ConfigError([f"Yapılandırma dosyası bölüm tabloları içermeli: {path}"])
+
+    # 'extends' ile üst dosya (göreli yol bu dosyanın klasörüne göre) önce uygulanır
+    parent = data.pop('extends', None)
+    if parent:
+        base = _read_config_file(os.path.join(os.path.dirname(path), parent))
+        data = merge_config(base, data)
+    _FILE_CACHE[path] = ((stat.st_mtime, stat.st_size), data)
+    return copy.deepcopy(data)
+
+
+def merge_config(base, overlay):
+    """İki yapılandırmayı bölüm bazında birleştirir (overlay anahtarları base'i ezer); yeni sözlük döner."""
+    merged = {section: dict(values) if isinstance(values, dict) else values for section, values in base.items()}
+    for section, values in overlay.items():
+        if isinstance(values, dict) and isinstance(merged.get(section), dict):
+            merged[section].update(values)
+        else:
+            merged[section] = copy.deepcopy(values)
+    return merged
+
+
+def parse_overrides(assignments):
+    """['bölüm.anahtar=değer', ...] listesini {bölüm: {anahtar: metin}} sözlüğüne çevirir."""
+    overrides = {}
+    errors = []
+    for item in assignments:
+        key, sep, value = item.partition('=')
+        section, dot, name = key.strip().partition('.')
+        if not sep or not dot or not section or not name:
+            errors.append(f"Geçersiz geçersiz kılma: '{item}' (beklenen: bölüm.anahtar=değer)")
+            continue
+        overrides.setdefault(section, {})[name] = value
+    if errors:
+        raise ConfigError(errors)
+    return overrides
+
+
+def env_overrides(environ=None):
+    """SEISMIC_CFG__BÖLÜM__ANAHTAR=değer ortam değişkenlerini geçersiz kılma sözlüğüne çevirir."""
+    environ = os.environ if environ is None else environ
+    assignments = []
+    for name, value in environ.items():
+        if name.startswith(ENV_PREFIX):
+            section, _, key = name[len(ENV_PREFIX):].lower().partition('__')
+            assignments.append(f"{section}.{key}={value}")
+    return parse_overrides(assignments)
+
+
+def load_config(paths=(), overrides=(), environ=None, base=None):
+    """
+    Katmanları birleştirip doğrulanmış yapılandırmayı döndürür.
+
+    Sıra: base (varsayılan config.py CONFIG) <- paths (sırayla) <- ortam değişkenleri <- overrides.
+
+    Args:
+        paths (list): TOML/YAML/JSON dosya yolları.
+        overrides (list): 'bölüm.anahtar=değer' metinleri (örn. komut satırı --set değerleri).
+        environ (dict, optional): Ortam değişkenleri (varsayılan os.environ).
+        base (dict, optional): Başlangıç yapılandırması.
+
+    Returns:
+        dict: Doğrulanmış CONFIG sözlüğü.
+
+    Raises:
+        ConfigError: Dosya okunamazsa veya doğrulama başarısızsa.
+    """
+    config = copy.deepcopy(CONFIG if base is None else base)
+    for path in paths:
+        config = merge_config(config, _read_config_file(path))
+    config = merge_config(config, env_overrides(environ))
+    config = merge_config(config, parse_overrides(overrides))
+    return validate_config(config)
+
+
+def config_from_argv(argv, environ=None):
+    """
+    Komut satırından '--config dosya' ve '--set bölüm.anahtar=değer' argümanlarını okuyup load_config çağırır.
+
+    Returns:
+        dict: Doğrulanmış CONFIG sözlüğü.
+    """
+    paths = []; overrides = []
+    for flag, value in zip(argv, argv[1:]):
+        if flag == '--config':
+            paths.append(value)
+        elif flag == '--set':
+            overrides.append(value)
+    return load_config(paths, overrides, environ)
+
+
+# --- İş Türetme ---
+def with_section(config, section, **values):
+    """config'in sığ kopyasını döndürür; sadece verilen bölüm kopyalanıp güncellenir."""
+    derived = dict(config)
+    derived[section] = dict(config[section], **values)
+    return derived
+
+
+def derive_job_configs(config, dates=None, windows=None, stations=None):
+    """
+    Her (tarih, saat penceresi, istasyon) için bir çalışma yapılandırması türetir.
+
+    Türetilen yapılandırmalar sığ kopyadır: sadece değişen bölümler (seismic_data, eqt_data,
+    download_settings, hdf5_data) kopyalanır, diğer bölümler paylaşılır ve salt okunur kabul edilir.
+    Boş verilen boyutlar için temel yapılandırmadaki değer kullanılır.
+
+    Args:
+        config (dict): Doğrulanmış temel yapılandırma.
+        dates (list, optional): Tarihler (YYYY-MM-DD); varsayılan job_settings.dates.
+        windows (list, optional): [(başlangıç_saati, bitiş_saati), ...]; varsayılan job_settings.windows.
+        stations (list, optional): İstasyonlar; varsayılan job_settings.stations.
+
+    Returns:
+        list: [(job_id, config), ...] listesi.
+
+    Raises:
+        ConfigError: Türetilen iş değerleri geçersizse (veri okunmadan önce).
+    """
+    jobs_cfg = config.get('job_settings', {})
+    seismic = config['seismic_data']
+    dates = list(dates or jobs_cfg.get('dates') or [seismic['date']])
+    windows = [tuple(w) for w in (windows or jobs_cfg.get('windows') or [(seismic['start_hour'], seismic['start_hour'] + 1)])]
+    stations = list(stations or jobs_cfg.get('stations') or [seismic['selected_station']])
+
+    jobs = []
+    errors = []
+    for date, (start_hour, end_hour), station in itertools.product(dates, windows, stations):
+        job = with_section(config, 'seismic_data', date=date, start_hour=start_hour, selected_station=station)
+        job = with_section(job, 'eqt_data', date=date, start_hour=start_hour, end_hour=end_hour)
+        job = with_section(job, 'download_settings', date=date, start_hour=start_hour, end_hour=end_hour)
+        if 'hdf5_data' in job:
+            day = np.datetime64(date, 's') if _DATE_PATTERN.match(date) else None
+            if day is not None:
+                job = with_section(job, 'hdf5_data', start=str(day + np.timedelta64(start_hour, 'h')),
+                                    end=str(day + np.timedelta64(end_hour, 'h')))
+        try:
+            validate_config(job, sections=('seismic_data', 'eqt_data', 'download_settings', 'hdf5_data'))
+        except ConfigError as e:
+            errors.extend(f"[{date} {start_hour:02d}-{end_hour:02d} {station}] {msg}" for msg in e.errors)
+            continue
+        jobs.append((f"{date}_{start_hour:02d}-{end_hour:02d}_{station}", job))
+    if errors:
+        raise ConfigError(errors)
+    return jobs
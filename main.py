@@ -4,14 +4,21 @@ from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 import os
 import sys
+import glob
 import datetime # Tarih kontrolü için
+from obspy import UTCDateTime
 
 # Yardımcı fonksiyonları ilgili modüllerden import et
 from utils import seismic_utils
 from utils import catalog_utils  # Hem plot hem de parse fonksiyonu için
 from utils import hdf5_utils
+from utils import hdf5_dataset_utils
 from utils import eqt_utils
 from utils import download_utils
+from utils import spectral_utils
+from utils import mseed_index_utils
+from utils import response_utils
+from utils import panel_cache_utils
 
 # Yapılandırma ve veri dosyalarını import et
 try:
@@ -69,9 +76,28 @@ def main():
     except Exception as download_err:
         print(f"\n[HATA] Waveform indirme sırasında beklenmedik bir hata oluştu: {download_err}")
 
+    # === 2-5. Adımlar: Grafikleri Oluştur ===
+    fig = build_figure(CONFIG)
+
+    print("\n--- Grafik Gösteriliyor ---")
+    fig.show()
+    print("\nProgram tamamlandı.")
+    print("="*50)
+
+
+def build_figure(config):
+    """
+    Verilen yapılandırma için birleşik figürü oluşturur (indirme yapmaz, figürü göstermez).
+
+    Args:
+        config (dict): CONFIG sözlüğü veya config_loader ile türetilmiş bir iş yapılandırması.
+
+    Returns:
+        plotly.graph_objects.Figure: Alt grafiklerden oluşan figür.
+    """
     # === 2. Adım: Ortak Verileri Hazırlama (İstasyon Lokasyonları - Katalog için) ===
     print("\nOrtak veriler hazırlanıyor (Katalog için İstasyon Lokasyonları)...")
-    station_data_path = CONFIG.get('catalog_data', {}).get('station_data_path')
+    station_data_path = config.get('catalog_data', {}).get('station_data_path')
     parsed_station_locs = {} # Başlangıçta boş sözlük
     if station_data_path and os.path.exists(station_data_path):
         station_data_content = read_file_content(station_data_path)
@@ -87,16 +113,20 @@ def main():
     print("\nGrafikleme için dosya ve klasör yolları kontrol ediliyor...")
     paths_ok = True
     # Mseed klasörü kontrolü
-    mseed_folder = CONFIG.get('seismic_data', {}).get('mseed_folder')
+    mseed_folder = config.get('seismic_data', {}).get('mseed_folder')
     if not os.path.isdir(mseed_folder):
         print(f"  [HATA] Mseed klasörü bulunamadı/oluşturulamadı: {mseed_folder}")
         paths_ok = False
+    # Katalog tek dosya, klasör veya glob deseni olabilir
+    catalog_path = config.get('catalog_data', {}).get('catalog_file_path')
+    if catalog_path and not catalog_utils.resolve_catalog_paths(catalog_path):
+        print(f"  [HATA] Katalog dosyası bulunamadı: {catalog_path}")
+        paths_ok = False
     # Diğer gerekli dosyalar
     required_files = [
-        CONFIG.get('catalog_data', {}).get('catalog_file_path'),
-        CONFIG.get('catalog_data', {}).get('station_data_path'),
-        CONFIG.get('hdf5_data', {}).get('hdf5_file_path'),
-        CONFIG.get('eqt_data', {}).get('summary_csv_path'),
+        config.get('catalog_data', {}).get('station_data_path'),
+        config.get('hdf5_data', {}).get('hdf5_file_path'),
+        config.get('eqt_data', {}).get('summary_csv_path'),
     ]
     required_files = [f for f in required_files if f is not None] # None değerleri filtrele
     for f in required_files:
@@ -111,31 +141,50 @@ def main():
 
     # === 4. Adım: Alt Grafikleri Oluştur ===
     print("\n--- Grafik Oluşturma İşlemi Başlatılıyor ---")
+    # Panel önbelleği: her panel kendi girdi dosyaları ve yapılandırma bölümüyle anahtarlanır;
+    # değişmeyen paneller dosyalar okunmadan önbellekten gelir (panel_cache_settings).
+    panel_cache = panel_cache_utils.from_config(config.get('panel_cache_settings'))
+    hour_t0_ns = UTCDateTime(f"{config['seismic_data']['date']}T{config['seismic_data']['start_hour']:02d}:00:00").ns
+    hour_window = (hour_t0_ns, hour_t0_ns + 3600 * 10**9)
+    seismic_files = mseed_index_utils.find_files(config['seismic_data']['mseed_folder'], config['seismic_data']['selected_station'],
+                                                 config['seismic_data']['phase_component'], *hour_window)
+    spectral_cfg = config.get('spectral_settings', {})
+    subplot_titles = [
+        "Sismik Veri (Filtreli ve Ham)",
+        "Deprem Katalog Verisi (Zaman-Boylam)",
+        "HDF5 Verisi: Pickler ve Eventler (Zaman-Enlem)", # Başlık güncellendi
+        "EQTransformer Pick Dağılımı (Zaman-İstasyon)"
+    ]
+    if spectral_cfg.get('enable'):
+        subplot_titles.append("Spektrogram" if spectral_cfg.get('panel', 'spectrogram') == 'spectrogram' else "Gürültü Seviyeleri (PSD)")
     fig = make_subplots(
-        rows=4, cols=1,
-        subplot_titles=(
-            "Sismik Veri (Filtreli ve Ham)",
-            "Deprem Katalog Verisi (Zaman-Boylam)",
-            "HDF5 Verisi: Pickler ve Eventler (Zaman-Enlem)", # Başlık güncellendi
-            "EQTransformer Pick Dağılımı (Zaman-İstasyon)"
-        ),
-        vertical_spacing=0.08
+        rows=len(subplot_titles), cols=1,
+        subplot_titles=subplot_titles,
+        vertical_spacing=0.08 if len(subplot_titles) == 4 else 0.06
     )
 
     # 4.1 Sismik Veri Grafiği
     print("1. Sismik veri grafiği oluşturuluyor...")
-    seismic_cfg = CONFIG['seismic_data']
-    fig1 = seismic_utils.plot_seismic_data(
-        output_folder=seismic_cfg['mseed_folder'],
-        selected_station=seismic_cfg['selected_station'],
-        date=seismic_cfg['date'],
-        start_hour=seismic_cfg['start_hour'],
-        filter_type=seismic_cfg['filter_type'],
-        freqmin=seismic_cfg['freqmin'],
-        freqmax=seismic_cfg['freqmax'],
-        corners=seismic_cfg['corners'],
-        zerophase=seismic_cfg['zerophase'],
-        phase_component=seismic_cfg['phase_component']
+    seismic_cfg = config['seismic_data']
+    response_cfg = config.get('response_settings')
+    fig1 = panel_cache_utils.cached_panel(
+        panel_cache, 'seismic',
+        lambda: seismic_utils.plot_seismic_data(
+            output_folder=seismic_cfg['mseed_folder'],
+            selected_station=seismic_cfg['selected_station'],
+            date=seismic_cfg['date'],
+            start_hour=seismic_cfg['start_hour'],
+            filter_type=seismic_cfg['filter_type'],
+            freqmin=seismic_cfg['freqmin'],
+            freqmax=seismic_cfg['freqmax'],
+            corners=seismic_cfg['corners'],
+            zerophase=seismic_cfg['zerophase'],
+            phase_component=seismic_cfg['phase_component'],
+            response_cfg=response_cfg
+        ),
+        inputs=seismic_files + (response_utils.get_cache(response_cfg).files() if response_cfg and response_cfg.get('enable') else []),
+        params={'seismic_data': seismic_cfg, 'response_settings': response_cfg if response_cfg and response_cfg.get('enable') else None},
+        modules=(seismic_utils, response_utils)
     )
     if fig1:
         for trace in fig1.data: fig.add_trace(trace, row=1, col=1)
@@ -149,10 +198,18 @@ def main():
 
     # 4.2 Katalog Grafiği
     print("2. Deprem katalog grafiği oluşturuluyor...")
-    catalog_cfg = CONFIG['catalog_data']
-    fig2 = catalog_utils.plot_catalog_data(
-        catalog_file_path=catalog_cfg['catalog_file_path'],
-        station_data_path=catalog_cfg['station_data_path']
+    catalog_cfg = config['catalog_data']
+    fig2 = panel_cache_utils.cached_panel(
+        panel_cache, 'catalog',
+        lambda: catalog_utils.plot_catalog_data(
+            catalog_file_path=catalog_cfg['catalog_file_path'],
+            station_data_path=catalog_cfg['station_data_path'],
+            workers=catalog_cfg.get('workers'), split_mb=catalog_cfg.get('split_mb')
+        ),
+        inputs=catalog_utils.resolve_catalog_paths(catalog_cfg['catalog_file_path']) + [catalog_cfg['station_data_path']],
+        # workers/split_mb sonucu değiştirmez, anahtara girmez
+        params={k: v for k, v in catalog_cfg.items() if k not in ('workers', 'split_mb')},
+        modules=(catalog_utils,)
     )
     if fig2:
         # Katalog grafiğinin lejantını bu alt grafiğe özel yapalım
@@ -171,18 +228,40 @@ def main():
 
     # 4.3 HDF5 Pick Grafiği
     print("3. HDF5 pick grafiği oluşturuluyor...")
-    hdf5_cfg = CONFIG['hdf5_data']
-    seismic_cfg = CONFIG['seismic_data'] # Tarih bilgisi için
+    hdf5_cfg = config['hdf5_data']
+    seismic_cfg = config['seismic_data'] # Tarih bilgisi için
     analysis_date_for_hdf5 = seismic_cfg.get('date')
     if not analysis_date_for_hdf5:
         print("Uyarı: HDF5 event zamanları için tarih config'de bulunamadı! Bugünün tarihi kullanılacak.")
         analysis_date_for_hdf5 = datetime.date.today().strftime('%Y-%m-%d')
 
-    # Artık station_location_dict gönderilmiyor
-    fig3 = hdf5_utils.plot_hdf5_picks(
-        hdf5_file_path=hdf5_cfg['hdf5_file_path'],
-        station_names=STATION_NAMES,
-        analysis_date_str=analysis_date_for_hdf5
+    if hdf5_cfg.get('hdf5_folder'):
+        # Çok günlü mod: klasördeki günlük dosyalar tek veri kümesi olarak okunur
+        build_hdf5 = lambda: hdf5_dataset_utils.plot_hdf5_dataset_picks(
+            hdf5_folder=hdf5_cfg['hdf5_folder'],
+            station_names=STATION_NAMES,
+            start_str=hdf5_cfg['start'],
+            end_str=hdf5_cfg['end'],
+            max_open_files=hdf5_cfg.get('max_open_files', 8),
+            max_markers=hdf5_cfg.get('max_markers'),
+            density_bins=hdf5_cfg.get('density_bins')
+        )
+        hdf5_inputs = sorted(glob.glob(os.path.join(hdf5_cfg['hdf5_folder'], "*.hdf5")))
+    else:
+        # Artık station_location_dict gönderilmiyor
+        build_hdf5 = lambda: hdf5_utils.plot_hdf5_picks(
+            hdf5_file_path=hdf5_cfg['hdf5_file_path'],
+            station_names=STATION_NAMES,
+            analysis_date_str=analysis_date_for_hdf5,
+            max_markers=hdf5_cfg.get('max_markers'),
+            density_bins=hdf5_cfg.get('density_bins')
+        )
+        hdf5_inputs = [hdf5_cfg['hdf5_file_path']]
+    # seismic_data bölümünden sadece tarih okunur; istasyon/saat değişikliği bu paneli geçersiz kılmaz
+    fig3 = panel_cache_utils.cached_panel(
+        panel_cache, 'hdf5', build_hdf5, inputs=hdf5_inputs,
+        params={'hdf5_data': hdf5_cfg, 'date': analysis_date_for_hdf5, 'stations': STATION_NAMES},
+        modules=(hdf5_utils, hdf5_dataset_utils)
     )
     if fig3:
         # HDF5 grafiğinin lejantını bu alt grafiğe özel yapalım
@@ -203,12 +282,16 @@ def main():
 
     # 4.4 EQTransformer Pick Grafiği
     print("4. EQTransformer pick grafiği oluşturuluyor...")
-    eqt_cfg = CONFIG['eqt_data']
-    fig4 = eqt_utils.plot_eqtransformer_picks(
-        csv_file_path=eqt_cfg['summary_csv_path'],
-        eqt_start_hour=eqt_cfg['start_hour'],
-        eqt_end_hour=eqt_cfg['end_hour'],
-        eqt_date=eqt_cfg['date']
+    eqt_cfg = config['eqt_data']
+    fig4 = panel_cache_utils.cached_panel(
+        panel_cache, 'eqt',
+        lambda: eqt_utils.plot_eqtransformer_picks(
+            csv_file_path=eqt_cfg['summary_csv_path'],
+            eqt_start_hour=eqt_cfg['start_hour'],
+            eqt_end_hour=eqt_cfg['end_hour'],
+            eqt_date=eqt_cfg['date']
+        ),
+        inputs=[eqt_cfg['summary_csv_path']], params=eqt_cfg, modules=(eqt_utils,)
     )
     if fig4:
         # EQT grafiğinin lejantını bu alt grafiğe özel yapalım
@@ -223,10 +306,52 @@ def main():
         fig.add_annotation(text="EQTransformer Verisi Yüklenemedi", row=4, col=1, showarrow=False)
 
 
+    # 4.5 Spektral Panel (isteğe bağlı)
+    if spectral_cfg.get('enable'):
+        print("5. Spektral panel oluşturuluyor...")
+        if spectral_cfg.get('panel', 'spectrogram') == 'spectrogram':
+            build_spectral = lambda: spectral_utils.plot_spectrogram(
+                output_folder=seismic_cfg['mseed_folder'],
+                selected_station=seismic_cfg['selected_station'],
+                date=seismic_cfg['date'],
+                start_hour=seismic_cfg['start_hour'],
+                phase_component=seismic_cfg['phase_component'],
+                nperseg=spectral_cfg.get('nperseg', 1024),
+                noverlap=spectral_cfg.get('noverlap'),
+                cache_folder=spectral_cfg.get('cache_folder')
+            )
+            spectral_inputs = seismic_files
+        else:
+            build_spectral = lambda: spectral_utils.plot_noise_levels(
+                output_folder=seismic_cfg['mseed_folder'],
+                date=seismic_cfg['date'],
+                start_hour=seismic_cfg['start_hour'],
+                phase_component=seismic_cfg['phase_component'],
+                nperseg=spectral_cfg.get('nperseg', 1024),
+                percentile=spectral_cfg.get('noise_percentile', 50)
+            )
+            # Gürültü paneli tüm istasyonları okur; seçili istasyon anahtara girmez
+            spectral_inputs = mseed_index_utils.find_files(seismic_cfg['mseed_folder'], None, seismic_cfg['phase_component'], *hour_window)
+        fig5 = panel_cache_utils.cached_panel(
+            panel_cache, 'spectral', build_spectral, inputs=spectral_inputs,
+            params={'spectral_settings': spectral_cfg, 'seismic_data': seismic_cfg if spectral_cfg.get('panel', 'spectrogram') == 'spectrogram'
+                    else {k: seismic_cfg[k] for k in ('mseed_folder', 'date', 'start_hour', 'phase_component')}},
+            modules=(spectral_utils,)
+        )
+        if fig5:
+            for trace in fig5.data: fig.add_trace(trace, row=5, col=1)
+            fig.update_xaxes(title_text=fig5.layout.xaxis.title.text, type=fig5.layout.xaxis.type, row=5, col=1)
+            fig.update_yaxes(title_text=fig5.layout.yaxis.title.text, type=fig5.layout.yaxis.type, row=5, col=1)
+            print("   Spektral panel eklendi.")
+        else:
+            print("   Uyarı: Spektral panel oluşturulamadı.")
+            fig.add_annotation(text="Spektral Veri Hesaplanamadı", row=5, col=1, showarrow=False)
+
+
     # --- 5. Adım: Genel Figür Ayarları ve Gösterim ---
-    plot_cfg = CONFIG['plot_settings']
+    plot_cfg = config['plot_settings']
     fig.update_layout(
-        height=plot_cfg['figure_height'],
+        height=plot_cfg['figure_height'] * len(subplot_titles) // 4,
         title_text=plot_cfg['figure_title'],
         title_x=0.5, # Başlığı ortala
         # Ana lejantı tamamen kapatmak yerine, her alt grafiğin kendi lejantını yönetmesine izin verdik.
@@ -237,13 +362,88 @@ def main():
     )
     # Alt grafik başlıklarının konumunu ayarlayabiliriz (biraz yukarı)
     for annotation in fig.layout.annotations:
-        annotation.y = annotation.y + 0.01 # Biraz yukarı kaydır
-
-    print("\n--- Grafik Gösteriliyor ---")
-    fig.show()
-    print("\nProgram tamamlandı.")
-    print("="*50)
+        if annotation.y is not None: # "Yüklenemedi" notlarının konumu yok
+            annotation.y = annotation.y + 0.01 # Biraz yukarı kaydır
+    return fig
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Katmanlı yapılandırma: config.py varsayılanları <- --config dosyaları <- SEISMIC_CFG__* ortam
+    # değişkenleri <- --set bölüm.anahtar=değer. Hatalı yapılandırma veri okunmadan önce durdurulur.
+    from config import config_loader
+    try:
+        CONFIG = config_loader.config_from_argv(sys.argv)
+    except config_loader.ConfigError as e:
+        print(e)
+        sys.exit(1)
+    # utils.* modüllerinin tanılama çıktısı (seviye ve modül bazında ayarlar logging_settings'ten)
+    from utils import log_utils
+    log_utils.configure_logging(CONFIG.get('logging_settings'))
+
+    if "--list-jobs" in sys.argv:
+        # job_settings'ten türetilen (tarih, saat penceresi, istasyon) işlerini listele
+        try:
+            jobs = config_loader.derive_job_configs(CONFIG)
+        except config_loader.ConfigError as e:
+            print(e)
+            sys.exit(1)
+        for job_id, _ in jobs:
+            print(job_id)
+        print(f"Toplam {len(jobs)} iş.")
+    elif "--build-pyramid" in sys.argv:
+        # mseed klasöründen min/max zarf piramitlerini oluştur/güncelle
+        from utils import pyramid_utils
+        pyramid_utils.build_pyramids(CONFIG)
+    elif "--detect" in sys.argv:
+        # mseed arşivi üzerinde STA/LTA tetiklemelerini üret (EQT summary.csv biçiminde)
+        from utils import detector_utils
+        detector_utils.run_detector(CONFIG)
+    elif "--match-templates" in sys.argv:
+        # Katalog şablonlarıyla sürekli kayıtta eşleştirilmiş filtre (NCC) taraması
+        from utils import matched_filter_utils
+        matched_filter_utils.run_matched_filter(CONFIG)
+    elif "--residuals" in sys.argv:
+        # Katalog ve HDF5 pickleri için 1-B modelden seyahat süresi rezidüelleri
+        from utils import traveltime_utils
+        traveltime_utils.run_residuals(CONFIG, STATION_NAMES)
+    elif "--ingest" in sys.argv:
+        # Katalog/HDF5/EQT picklerini tarihe göre bölümlenmiş sütun bazlı depoya aktar
+        from utils import pick_store_utils
+        pick_store_utils.ingest_sources(CONFIG, STATION_NAMES, force="--force" in sys.argv)
+    elif "--match-events" in sys.argv:
+        # Katalog ve HDF5 (srcs) event'lerini origin zamanı/konuma göre eşle; kesinlik/duyarlılık raporla
+        from utils import event_match_utils
+        event_match_utils.run_event_matching(CONFIG, STATION_NAMES)
+    elif "--cut-events" in sys.argv:
+        # Katalog/HDF5 event'leri etrafında tüm istasyonlardan waveform parçaları (event x istasyon x örnek)
+        from utils import event_cut_utils
+        event_cut_utils.cut_event_waveforms(CONFIG, STATION_NAMES)
+    elif "--qc" in sys.argv:
+        # Kanal-saat kalite metrikleri (tamlık, boşluk, RMS, kırpılma, sıçrama, ölü kanal) -> SQLite
+        from utils import qc_utils
+        qc_utils.run_qc(CONFIG, force="--force" in sys.argv)
+    elif "--schedule" in sys.argv:
+        # Günlük DAG: indirme -> tespit/piramit -> rezidüel -> grafik; sadece eskimiş görevler çalışır
+        from utils import scheduler_utils
+        argv_value = lambda flag: sys.argv[sys.argv.index(flag) + 1] if flag in sys.argv[:-1] else None
+        start_date, end_date = argv_value("--from"), argv_value("--to")
+        dates = scheduler_utils.date_range(start_date, end_date or start_date) if start_date else None
+        scheduler_utils.run_schedule(CONFIG, STATION_NAMES, dates, render=build_figure,
+                                     force="--force" in sys.argv, dry_run="--dry-run" in sys.argv)
+    elif "--export-report" in sys.argv:
+        # job_settings'teki tüm işlerin figürleri tek HTML rapora (plotly.js ve veriler yan dosyalarda)
+        from utils import report_utils
+        try:
+            jobs = config_loader.derive_job_configs(CONFIG)
+        except config_loader.ConfigError as e:
+            print(e)
+            sys.exit(1)
+        figures = {job_id: build_figure(job) for job_id, job in jobs}
+        report_path = report_utils.export_configured(figures, CONFIG.get('report_settings'))
+        print(f"\nRapor yazıldı: {report_path}")
+    elif "--serve" in sys.argv:
+        # Etkileşimli mod: veriler tarayıcının istediği zaman aralığına göre yerel sunucudan yüklenir
+        from utils import server_utils
+        server_utils.run_server(CONFIG, STATION_NAMES)
+    else:
+        main()
\ No newline at end of file
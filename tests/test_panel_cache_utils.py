@@ -0,0 +1,45 @@
+# seismic_analysis/tests/test_panel_cache_utils.py
+
+import os
+import sys
+import importlib
+
+from utils import panel_cache_utils
+from utils import seismic_utils
+from utils import time_utils
+
+
+def _make_package(root):
+    """tmp klasöründe: panel modülü + içe aktardığı yardımcı modül."""
+    package = root / "panelpkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "helper.py").write_text("def to_seconds(ns):\n    return ns / 1e9\n")
+    (package / "panel.py").write_text("from panelpkg import helper\n\ndef build():\n    return helper.to_seconds(1)\n")
+    return package
+
+
+def test_panel_key_changes_when_helper_module_changes(tmp_path, monkeypatch):
+    package = _make_package(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    panel = importlib.import_module("panelpkg.panel")
+    try:
+        before = panel_cache_utils.panel_key("p", params={'a': 1}, modules=(panel,))
+
+        helper_path = package / "helper.py"
+        helper_path.write_text("def to_seconds(ns):\n    return ns / 1e9 + 0.0\n")
+        stat = os.stat(helper_path)
+        os.utime(helper_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        after = panel_cache_utils.panel_key("p", params={'a': 1}, modules=(panel,))
+        assert before != after
+        # Girdiler değişmedikçe anahtar sabittir
+        assert after == panel_cache_utils.panel_key("p", params={'a': 1}, modules=(panel,))
+    finally:
+        for name in ("panelpkg.panel", "panelpkg.helper", "panelpkg"):
+            sys.modules.pop(name, None)
+
+
+def test_module_files_include_utils_helpers():
+    files = panel_cache_utils._module_files((seismic_utils,))
+    assert seismic_utils.__file__ in files
+    assert time_utils.__file__ in files
@@ -0,0 +1,336 @@
+# seismic_analysis/utils/async_download_utils.py
+
+import os
+import ssl
+import time
+import asyncio
+from urllib.parse import urlsplit, urlencode
+
+from obspy import UTCDateTime
+from obspy.clients.fdsn.header import URL_MAPPINGS
+
+try:
+    import aiohttp  # İsteğe bağlı; yoksa standart kütüphane istemcisi kullanılır
+except ImportError:
+    aiohttp = None
+
+# Çok sayıda istasyon-saat isteği için asyncio tabanlı indirme.
+# Her istek tek bir fdsnws/dataselect sorgusudur; yanıt parça parça (.part dosyasına) diske yazılır,
+# tüm yanıt bellekte tutulmaz. Host başına bağlantı havuzu (eşzamanlı bağlantı sınırı) ve istek/saniye
+# sınırı uygulanır. Dosya adları download_utils ile aynıdır: {station}_{channel}_{net}_{YYYY-MM-DD}_{HHMM}.mseed
+
+_CHUNK_BYTES = 64 * 1024
+_NETWORK_ERRORS = (OSError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) + (
+    (aiohttp.ClientError,) if aiohttp is not None else ())
+_USER_AGENT = "seismic_analysis-async-downloader"
+
+
+def dataselect_url(client_name_or_url):
+    """FDSN istemci adını (örn. "KOERI") veya temel URL'yi dataselect sorgu adresine çevirir."""
+    base = URL_MAPPINGS.get(client_name_or_url.upper(), client_name_or_url).rstrip('/')
+    return f"{base}/fdsnws/dataselect/1/query"
+
+
+def hourly_requests(stations, channel, date, start_hour, end_hour, chunk_hours=1):
+    """
+    İstasyon x zaman parçası istek listesini oluşturur.
+
+    Returns:
+        list: (station, channel, starttime, endtime) demetleri.
+    """
+    day = UTCDateTime(f"{date}T00:00:00")
+    requests = []
+    for station in stations:
+        for hour in range(start_hour, end_hour, chunk_hours):
+            requests.append((station, channel, day + 3600 * hour, day + 3600 * min(hour + chunk_hours, end_hour)))
+    return requests
+
+
+def _mseed_network(header):
+    """MiniSEED sabit başlığından (bayt 18-19) ağ kodunu okur."""
+    return header[18:20].decode('ascii', errors='replace').strip() or "XX"
+
+
+def _output_path(output_folder, station, channel, network, starttime):
+    return os.path.join(output_folder, f"{station}_{channel}_{network}_{starttime.strftime('%Y-%m-%d')}_{starttime.strftime('%H%M')}.mseed")
+
+
+def _existing_files(output_folder):
+    """Klasördeki indirilmiş dosyalar: (station, channel, 'YYYY-MM-DD_HHMM') -> yol (ağ kodundan bağımsız)."""
+    existing = {}
+    for name in os.listdir(output_folder):
+        parts = name[:-len(".mseed")].split('_') if name.endswith(".mseed") else []
+        if len(parts) == 5:
+            existing[(parts[0], parts[1], f"{parts[3]}_{parts[4]}")] = os.path.join(output_folder, name)
+    return existing
+
+
+class _RateLimiter:
+    """Host başına basit istek/saniye sınırlayıcı (istekler 1/rate aralıklarla başlar)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_time = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# --- Standart kütüphane HTTP/1.1 istemcisi (aiohttp yoksa) ---
+class _ConnectionPool:
+    """Tek host için keep-alive bağlantı havuzu; en fazla `limit` eşzamanlı bağlantı."""
+
+    def __init__(self, scheme, host, port, limit):
+        self.scheme, self.host, self.port = scheme, host, port
+        self.semaphore = asyncio.Semaphore(limit)
+        self.idle = []
+
+    async def acquire(self):
+        await self.semaphore.acquire()
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        try:
+            ctx = ssl.create_default_context() if self.scheme == 'https' else None
+            return await asyncio.open_connection(self.host, self.port, ssl=ctx)
+        except BaseException:
+            self.semaphore.release()
+            raise
+
+    def release(self, conn, reusable):
+        if reusable:
+            self.idle.append(conn)
+        else:
+            conn[1].close()
+        self.semaphore.release()
+
+    async def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+async def _read_body(reader, headers):
+    """Yanıt gövdesini parça parça üretir (Content-Length, chunked veya bağlantı kapanana kadar)."""
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip(), 16)
+            if size == 0:
+                await reader.readline()
+                return
+            remaining = size
+            while remaining:
+                chunk = await reader.read(min(remaining, _CHUNK_BYTES))
+                if not chunk:
+                    raise ConnectionError("Chunked yanıt erken kesildi.")
+                remaining -= len(chunk)
+                yield chunk
+            await reader.readline()
+    elif 'content-length' in headers:
+        remaining = int(headers['content-length'])
+        while remaining:
+            chunk = await reader.read(min(remaining, _CHUNK_BYTES))
+            if not chunk:
+                raise ConnectionError("Yanıt erken kesildi.")
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        while True:
+            chunk = await reader.read(_CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def _stdlib_get(pool, target):
+    """GET isteği gönderir; (durum kodu, gövde üreteci, bitiş fonksiyonu) döndürür."""
+    reader, writer = await pool.acquire()
+    try:
+        request = (f"GET {target} HTTP/1.1\r\nHost: {pool.host}\r\nUser-Agent: {_USER_AGENT}\r\n"
+                   f"Accept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n")
+        writer.write(request.encode('ascii'))
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+    except BaseException:
+        pool.release((reader, writer), False)
+        raise
+    lines = head.decode('iso-8859-1').split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    if status == 204 or 100 <= status < 200 or status == 304:
+        headers['content-length'] = '0'  # Gövdesiz yanıtlar
+    reusable = headers.get('connection', '').lower() != 'close' and (
+        'content-length' in headers or headers.get('transfer-encoding', '').lower() == 'chunked')
+
+    def done(completed):
+        pool.release((reader, writer), reusable and completed)
+    return status, _read_body(reader, headers), done
+
+
+# --- İndirme ---
+async def _fetch_one(request, base_url, output_folder, get, limiter, existing, retries):
+    """Tek istasyon-zaman parçasını indirir ve diske akıtır."""
+    station, channel, t0, t1 = request
+    result = {'station': station, 'starttime': str(t0), 'path': None, 'bytes': 0, 'status': 'nodata'}
+    key = (station, channel, f"{t0.strftime('%Y-%m-%d')}_{t0.strftime('%H%M')}")
+    if existing is not None and key in existing:
+        result.update(path=existing[key], status='exists')
+        return result
+
+    query = urlencode({'network': '*', 'station': station, 'location': '*', 'channel': channel,
+                       'starttime': t0.strftime('%Y-%m-%dT%H:%M:%S'), 'endtime': t1.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'nodata': 404})
+    url = f"{base_url}?{query}"
+    part_path = os.path.join(output_folder, f".{station}_{channel}_{t0.strftime('%Y%m%d%H%M')}.part")
+    for attempt in range(retries + 1):
+        await limiter.wait()
+        try:
+            status, body, done = await get(url)
+            completed = False
+            try:
+                if status in (204, 404):
+                    async for _ in body:
+                        pass
+                    completed = True
+                    return result
+                if status != 200:
+                    async for _ in body:
+                        pass
+                    completed = True
+                    raise ConnectionError(f"HTTP {status}")
+                header = b""
+                with open(part_path, 'wb') as f:
+                    async for chunk in body:
+                        if len(header) < 20:
+                            header += chunk[:20]
+                        f.write(chunk)
+                        result['bytes'] += len(chunk)
+                completed = True
+            finally:
+                done(completed)
+            if result['bytes'] == 0:
+                os.remove(part_path)
+                return result
+            path = _output_path(output_folder, station, channel, _mseed_network(header), t0)
+            os.replace(part_path, path)
+            result.update(path=path, status='ok')
+            return result
+        except _NETWORK_ERRORS as e:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            result.update(status='error', error=str(e), bytes=0)
+            if attempt < retries:
+                await asyncio.sleep(2 ** attempt)
+    return result
+
+
+async def download_requests(requests, base_url, output_folder, max_concurrency=8, requests_per_second=5.0,
+                            overwrite=False, retries=2):
+    """
+    İstek listesini eşzamanlı indirir.
+
+    Args:
+        requests (list): hourly_requests çıktısı.
+        base_url (str): dataselect sorgu adresi (bkz. dataselect_url).
+        output_folder (str): mseed klasörü.
+        max_concurrency (int): Host başına eşzamanlı bağlantı sayısı.
+        requests_per_second (float): Host başına istek/saniye sınırı (0 veya None: sınırsız).
+        overwrite (bool): False ise mevcut istasyon-saat dosyaları atlanır.
+        retries (int): Ağ/HTTP hatalarında yeniden deneme sayısı.
+
+    Returns:
+        list: İstek başına sonuç sözlükleri ('station', 'starttime', 'path', 'bytes', 'status').
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    existing = None if overwrite else _existing_files(output_folder)
+    limiter = _RateLimiter(requests_per_second)
+    parts = urlsplit(base_url)
+
+    if aiohttp is not None:
+        connector = aiohttp.TCPConnector(limit_per_host=max_concurrency)
+        session = aiohttp.ClientSession(connector=connector, headers={'User-Agent': _USER_AGENT},
+                                        timeout=aiohttp.ClientTimeout(total=None, sock_read=120))
+
+        async def get(url):
+            response = await session.get(url)
+
+            async def body():
+                async for chunk in response.content.iter_chunked(_CHUNK_BYTES):
+                    yield chunk
+            return response.status, body(), lambda completed: response.release()
+        close = session.close
+    else:
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        pool = _ConnectionPool(parts.scheme, parts.hostname, port, max_concurrency)
+        prefix_len = len(f"{parts.scheme}://{parts.netloc}")
+
+        async def get(url):
+            return await _stdlib_get(pool, url[prefix_len:])
+        close = pool.close
+
+    try:
+        # Görev sayısı bağlantı sayısıyla sınırlı tutulur: binlerce istek için binlerce görev açılmaz
+        queue = asyncio.Queue()
+        for request in requests:
+            queue.put_nowait(request)
+        results = []
+
+        async def worker():
+            while not queue.empty():
+                request = queue.get_nowait()
+                results.append(await _fetch_one(request, base_url, output_folder, get, limiter, existing, retries))
+        await asyncio.gather(*(worker() for _ in range(max(1, min(max_concurrency, len(requests))))))
+    finally:
+        await close()
+    return results
+
+
+def run_async_download(config):
+    """
+    download_settings'e göre istasyon-saat isteklerini asyncio ile indirir (download_utils.run_download'un eşzamanlı karşılığı).
+
+    Args:
+        config (dict): 'config.py' dosyasından okunan CONFIG sözlüğü.
+
+    Returns:
+        list: İstek başına sonuç sözlükleri.
+    """
+    download_cfg = config['download_settings']
+    output_folder = config['seismic_data']['mseed_folder']
+    requests = hourly_requests(download_cfg['stations_to_download'], download_cfg['channel'], download_cfg['date'],
+                               download_cfg['start_hour'], download_cfg['end_hour'], download_cfg.get('chunk_hours', 1))
+    base_url = dataselect_url(download_cfg.get('client_name', 'KOERI'))
+    client = "aiohttp" if aiohttp is not None else "asyncio"
+    print(f"\n--- Asenkron Waveform İndirme ({len(requests)} istek, {client}, {base_url}) ---")
+    wall_start = time.perf_counter()
+    results = asyncio.run(download_requests(
+        requests, base_url, output_folder,
+        max_concurrency=download_cfg.get('max_concurrency', 8),
+        requests_per_second=download_cfg.get('requests_per_second', 5.0),
+    ))
+    wall_seconds = time.perf_counter() - wall_start
+
+    counts = {}
+    for r in results:
+        counts[r['status']] = counts.get(r['status'], 0) + 1
+        if r['status'] == 'error':
+            print(f"  Hata: {r['station']} {r['starttime']} indirilemedi: {r.get('error')}")
+    total_mb = sum(r['bytes'] for r in results) / 1e6
+    summary = ", ".join(f"{k}: {v}" for k, v in sorted(counts.items()))
+    print(f"  {summary}; {total_mb:.1f} MB, {wall_seconds:.1f} s ({total_mb / max(wall_seconds, 1e-9):.2f} MB/s)")
+    print("--- Asenkron Waveform İndirme Tamamlandı ---\n")
+    return results
@@ -1,27 +1,37 @@
 # seismic_analysis/utils/catalog_utils.py
 
 import io
-import datetime
 import plotly.graph_objects as go
 import os
 import re
-import pytz # Zaman dilimi için
+import glob
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from utils import time_utils
+from utils import log_utils
+
+logger = log_utils.get_logger(__name__)
+
+# Büyük bültenler sadece satır başındaki EVENT bloklarından bölünür
+_EVENT_START = re.compile(rb'(?m)^EVENT ')
 
 # --- Yardımcı Fonksiyonlar (parse_station_data, _read_file_content - Aynı kalır) ---
 def _read_file_content(file_path):
-    if not os.path.exists(file_path): print(f"Hata: Dosya bulunamadı: {file_path}"); return None
+    if not os.path.exists(file_path): logger.error("Hata: Dosya bulunamadı: %s", file_path); return None
     try:
         with open(file_path, "r", encoding='utf-8') as file: return file.read()
     except UnicodeDecodeError:
-        print(f"Uyarı: '{file_path}' dosyası utf-8 ile okunamadı, latin-1 deneniyor.")
+        logger.warning("Uyarı: '%s' dosyası utf-8 ile okunamadı, latin-1 deneniyor.", file_path)
         try:
              with open(file_path, "r", encoding='latin-1') as file: return file.read()
-        except Exception as e: print(f"Hata: Dosya okunurken hata ({file_path}) (latin-1 denendi): {e}"); return None
-    except Exception as e: print(f"Hata: Dosya okunurken hata ({file_path}): {e}"); return None
+        except Exception as e: logger.error("Hata: Dosya okunurken hata (%s) (latin-1 denendi): %s", file_path, e); return None
+    except Exception as e: logger.error("Hata: Dosya okunurken hata (%s): %s", file_path, e); return None
 
 def parse_station_data(station_data_str):
     station_locations = {}
-    if not station_data_str: print("Uyarı: İstasyon veri string'i boş."); return station_locations
+    if not station_data_str: logger.warning("Uyarı: İstasyon veri string'i boş."); return station_locations
+    counter = log_utils.StageCounter(logger, "İstasyon dosyası ayrıştırma")
     try:
         for line in io.StringIO(station_data_str):
             line = line.strip();
@@ -29,42 +39,147 @@ def parse_station_data(station_data_str):
             parts = line.split('|')
             if len(parts) >= 4:
                 network = parts[0].strip(); station_name = parts[1].strip()
-                try: latitude = float(parts[2].strip()); longitude = float(parts[3].strip()); station_locations[station_name] = {'lon': longitude, 'lat': latitude, 'network': network}
-                except ValueError: print(f"Uyarı: İstasyon formatı hatalı (lat/lon sayısal değil): {line}")
-            else: print(f"Uyarı: İstasyon formatı eksik (en az 4 sütun bekleniyor): {line}")
-    except Exception as e: print(f"İstasyon verisi ayrıştırılırken hata: {e}")
+                try: latitude = float(parts[2].strip()); longitude = float(parts[3].strip()); station_locations[station_name] = {'lon': longitude, 'lat': latitude, 'network': network}; counter.add()
+                except ValueError: counter.skip("lat/lon sayısal değil"); logger.debug("    İstasyon satırı atlandı (lat/lon): %s", line)
+            else: counter.skip("4'ten az sütun"); logger.debug("    İstasyon satırı atlandı (sütun): %s", line)
+    except Exception as e: logger.error("İstasyon verisi ayrıştırılırken hata: %s", e)
+    if counter.skipped: counter.emit()
     return station_locations
 # --- ---
 
-def plot_catalog_data(catalog_file_path, station_data_path):
+def resolve_catalog_paths(catalog_path):
     """
-    Deprem kataloğu verisini (belirtilen formata göre) okur ve grafikler.
-    Event merkezlerini pembe yıldız ile işaretler.
+    Katalog yolunu dosya listesine çevirir: tek dosya, klasör (içindeki *.txt) veya glob deseni.
+
+    Returns:
+        list: Sıralı dosya yolları (bulunamazsa boş).
+    """
+    if not catalog_path:
+        return []
+    if os.path.isdir(catalog_path):
+        return sorted(glob.glob(os.path.join(catalog_path, "*.txt")))
+    if glob.has_magic(catalog_path):
+        return sorted(p for p in glob.glob(catalog_path) if os.path.isfile(p))
+    return [catalog_path] if os.path.isfile(catalog_path) else []
+
+
+def plan_catalog_chunks(paths, split_bytes):
+    """
+    Dosyaları işçilere dağıtılacak (yol, başlangıç baytı, bitiş baytı) parçalarına böler.
+
+    split_bytes'tan büyük dosyalar yaklaşık split_bytes boyutlu parçalara, her zaman bir satır başındaki
+    'EVENT ' konumundan kesilir; böylece bir event bloğu hiçbir zaman iki parçaya bölünmez.
+    """
+    chunks = []
+    for path in paths:
+        size = os.path.getsize(path)
+        if not split_bytes or size <= split_bytes:
+            chunks.append((path, 0, size))
+            continue
+        with open(path, 'rb') as f:
+            content = f.read()
+        starts = np.fromiter((m.start() for m in _EVENT_START.finditer(content)), dtype=np.int64)
+        cuts = np.unique(starts[np.minimum(np.searchsorted(starts, np.arange(split_bytes, size, split_bytes)), len(starts) - 1)]) if len(starts) else []
+        bounds = [0] + [int(c) for c in cuts if 0 < c < size] + [size]
+        chunks.extend((path, a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a)
+    return chunks
+
+
+def parse_catalog_data(catalog_file_path, station_data_path, workers=None, split_mb=None):
     """
-    print("  Katalog verisi okunuyor...")
+    Deprem kataloğunu (EVENT/Origin/Pick blokları) ve istasyon dosyasını okuyup ayrıştırır.
+
+    catalog_file_path tek bir bülten, bir klasör veya glob deseni olabilir (örn. aylık/yıllık günlük bültenler).
+    Birden çok parça varsa dosyalar (ve split_mb'den büyük dosyalar EVENT sınırlarından) süreç havuzunda
+    paralel ayrıştırılır; sonuçlar zamana göre sıralı tek bir event/pick tablosunda birleştirilir.
+
+    Args:
+        catalog_file_path (str): Bülten dosyası, klasörü veya glob deseni.
+        station_data_path (str): İstasyon dosyası.
+        workers (int, optional): İşçi süreç sayısı (None = CPU sayısı; 1 = ana süreçte).
+        split_mb (float, optional): Bu boyuttan büyük dosyalar parçalanır (None = dosya başına bir parça).
+
+    Returns:
+        dict or None: 'events' ({event_id: {'event_time', 'event_lat', 'event_lon', 'event_depth', 'picks'}},
+        origin zamanına göre sıralı), 'picks' (zamana göre sıralı düz diziler: 'phase', 'phase_name', 'time',
+        'lat', 'lon', 'station', 'event_id'), 'station_locations'. Dosya okunamazsa None.
+    """
+    logger.info("  Katalog verisi okunuyor...")
     station_data_str = _read_file_content(station_data_path)
     if station_data_str is None: return None
     station_locations = parse_station_data(station_data_str)
-    print(f"  {len(station_locations)} adet istasyon lokasyonu yüklendi.")
-    if not station_locations: print("  [ÖNEMLİ UYARI] İstasyon lokasyonları yüklenemedi!")
+    logger.info("  %d adet istasyon lokasyonu yüklendi.", len(station_locations))
+    if not station_locations: logger.warning("  [ÖNEMLİ UYARI] İstasyon lokasyonları yüklenemedi!")
+
+    paths = resolve_catalog_paths(catalog_file_path)
+    if not paths:
+        logger.error("Hata: Katalog dosyası bulunamadı: %s", catalog_file_path)
+        return None
+    chunks = plan_catalog_chunks(paths, int(split_mb * 1024 * 1024) if split_mb else None)
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if len(chunks) > 1:
+        logger.info("  %d dosya, %d parça, %d işçi.", len(paths), len(chunks), workers)
+    args = ([c[0] for c in chunks], [c[1] for c in chunks], [c[2] for c in chunks], [station_locations] * len(chunks))
+    if workers <= 1:
+        results = list(map(_parse_catalog_chunk, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_catalog_chunk, *args))
+    if any(r is None for r in results):
+        return None
+    events, picks, counter, stats = _merge_parsed(results)
+
+    # Pickleri event bazında grupla (event'e göre, sonra zamana göre sıralı diziler)
+    pick_times = picks['time']; pick_event_ids = picks['event_id']
+    order = np.lexsort((pick_times, pick_event_ids))
+    sorted_ids = pick_event_ids[order]
+    boundaries = np.flatnonzero(sorted_ids[1:] != sorted_ids[:-1]) + 1
+    for idx in np.split(order, boundaries) if len(order) else []:
+        eid = pick_event_ids[idx[0]]
+        if eid in events:
+            events[eid]['picks'] = {key: picks[key][idx] for key in ('phase', 'phase_name', 'time', 'lat', 'lon', 'station')}
+
+    # Ayrıştırma Özeti
+    pick_count_parsed = len(pick_times)
+    n_p = int((picks['phase'] == 'P').sum())
+    logger.info("  Ayrıştırma tamamlandı. Satır: %d, EventBlok: %d, OriginSatır: %d", stats['lines'], len(events), stats['origins'])
+    logger.info("  Başarıyla Ayrıştırılan Pick Sayısı: %d (P: %d, S: %d)", pick_count_parsed, n_p, pick_count_parsed - n_p)
+    counter.add(pick_count_parsed)
+    if counter.skipped: counter.emit()
+    valid_event_count = len([e for e in events.values() if e.get('event_time') is not None and e.get('event_lon') is not None])
+    logger.info("  Grafiklenecek Event Merkezi Sayısı: %d", valid_event_count) # Bu sayının artık > 0 olması beklenir
+
+    return {'events': events, 'picks': picks, 'station_locations': station_locations}
+
+
+def load_configured_catalog(catalog_cfg):
+    """'catalog_data' bölümündeki yollar ve paralellik ayarlarıyla parse_catalog_data çağırır."""
+    return parse_catalog_data(catalog_cfg['catalog_file_path'], catalog_cfg['station_data_path'],
+                              workers=catalog_cfg.get('workers'), split_mb=catalog_cfg.get('split_mb'))
+
 
-    event_data_str = _read_file_content(catalog_file_path)
-    if event_data_str is None: return None
-    print("  Katalog dosyası içeriği okundu.")
+def _parse_catalog_text(event_data_str, station_locations, counter):
+    """
+    Katalog metnini (bir dosya veya EVENT sınırında kesilmiş bir parçası) ayrıştırır.
 
-    print("  Katalog verisi ayrıştırılıyor (Format: EVENT/Origin/Picks)...")
-    pick_lons_p = []; pick_times_p = []; pick_stations_p = []
-    pick_lons_s = []; pick_times_s = []; pick_stations_s = []
+    Returns:
+        tuple(dict, dict, dict): Event'ler (zamanlar dönüştürülmüş, pickler henüz gruplanmamış),
+        pick dizileri ve satır/blok sayaçları ('lines', 'origins').
+    """
+    logger.debug("  Katalog verisi ayrıştırılıyor (Format: EVENT/Origin/Picks)...")
+    # Pick alanları satır satır toplanır, zamanlar döngü sonunda tek seferde (vektörel) dönüştürülür
+    pick_phases = []; pick_phase_names = []; pick_time_strs = []; pick_lats = []; pick_lons = []; pick_stations = []; pick_event_ids = []
     events = {}
     current_event_id = None
-    line_count = 0; event_block_count = 0; origin_line_count = 0; pick_count_parsed = 0
+    line_count = 0; origin_line_count = 0
     known_station_prefixes = list(station_locations.keys())
 
     # Regex desenleri
     datetime_pattern = re.compile(r'(\d{4}/\d{2}/\d{2}\s+\d{2}:\d{2}:\d{2}(\.\d{1,})?)')
     phase_pattern = re.compile(r'\b(P[gn]?|S[gn]?)\b', re.IGNORECASE)
-    # <<< DÜZELTME: Lat/Lon pattern daha esnek boşluklar ve N/E sonrası kontrol >>>
-    origin_latlon_pattern = re.compile(r'(\d+\.\d+)\s*N\s+(\d+\.\d+)\s*E') # Örn: 40.5880N  29.1142E
+    # Origin satırı tarih ile başlar: zaman, enlem, boylam (N/E son ekleri isteğe bağlı) ve derinlik (km)
+    # Örn: 2023/12/04 00:57:20.4     40.7075   27.5095      9.5   veya   ... 40.5880N  29.1142E  7.0
+    origin_latlon_pattern = re.compile(r'^\d{4}/\d{2}/\d{2}\s+\d{2}:\d{2}:\d{2}(?:\.\d+)?\s+(-?\d+\.\d+)(?:\s*N)?\s+(-?\d+\.\d+)(?:\s*E)?(?:\s+(-?\d+(?:\.\d+)?))?')
 
     for line in io.StringIO(event_data_str):
         line_count += 1
@@ -75,8 +190,8 @@ def plot_catalog_data(catalog_file_path, station_data_path):
         if line.startswith("EVENT "):
             parts = line.split(); current_event_id = parts[1] if len(parts) > 1 else None
             if current_event_id:
-                 if current_event_id not in events: events[current_event_id] = {'picks': []}; event_block_count += 1
-            else: print(f"    Satır {line_count}: Hatalı EVENT satırı: {line}"); current_event_id = None
+                 if current_event_id not in events: events[current_event_id] = {}
+            else: counter.skip("hatalı EVENT satırı"); logger.debug("    Satır %d: Hatalı EVENT satırı: %s", line_count, line); current_event_id = None
             continue
 
         if current_event_id is None or current_event_id not in events: continue
@@ -91,22 +206,23 @@ def plot_catalog_data(catalog_file_path, station_data_path):
              origin_line_count_before = origin_line_count # Başarıyı kontrol için
              try:
                  event_time_str = dt_match_origin.group(1)
-                 try: event_datetime = datetime.datetime.strptime(event_time_str, "%Y/%m/%d %H:%M:%S.%f")
-                 except ValueError: event_datetime = datetime.datetime.strptime(event_time_str, "%Y/%m/%d %H:%M:%S")
-                 event_datetime = event_datetime.replace(tzinfo=pytz.UTC)
 
-                 # latitude = float(latlon_match.group(1))
+                 event_lat = float(latlon_match.group(1)) # Enlem
                  event_lon = float(latlon_match.group(2)) # Boylam
+                 event_depth = float(latlon_match.group(3)) if latlon_match.group(3) else None # Derinlik (km)
 
-                 # Event kaydını güncelle
-                 events[current_event_id]['event_time'] = event_datetime
+                 # Event kaydını güncelle (zaman metni döngü sonunda dönüştürülür)
+                 events[current_event_id]['event_time_str'] = event_time_str
+                 events[current_event_id]['event_lat'] = event_lat
                  events[current_event_id]['event_lon'] = event_lon
+                 events[current_event_id]['event_depth'] = event_depth
                  origin_line_count += 1 # Başarıyla işlendi, sayacı artır
                  # print(f"      Origin bilgisi {current_event_id} için kaydedildi: Time={event_datetime}, Lon={event_lon}")
 
              except (ValueError, IndexError, AttributeError) as e:
                  # Eğer zaman veya konum ayrıştırılamazsa sayaç artmaz
-                 print(f"    Satır {line_count}: Event Origin satırı (eşleşme bulundu ama) ayrıştırılamadı: {line} - Hata: {e}")
+                 counter.skip("origin satırı ayrıştırılamadı")
+                 logger.debug("    Satır %d: Event Origin satırı (eşleşme bulundu ama) ayrıştırılamadı: %s - Hata: %s", line_count, line, e)
 
              # Bu satır origin ise pick olamaz, sonraki satıra geç
              if origin_line_count > origin_line_count_before: # Eğer origin başarıyla işlendiyse atla
@@ -121,58 +237,133 @@ def plot_catalog_data(catalog_file_path, station_data_path):
             if line.startswith(station_code) and (len(line) == len(station_code) or line[len(station_code)].isspace()):
                 found_station = True; station_name = station_code; break
         if found_station:
-            phase_str = None; pick_datetime = None; pick_lon = None
+            phase_str = None; time_str = None; pick_lon = None
             phase_match = phase_pattern.search(line); datetime_match = datetime_pattern.search(line)
             if phase_match and datetime_match:
                 phase_full = phase_match.group(1).upper(); phase_str = 'P' if phase_full.startswith('P') else 'S'
                 time_str = datetime_match.group(1)
-                try:
-                    pick_datetime = datetime.datetime.strptime(time_str, "%Y/%m/%d %H:%M:%S.%f")
-                except ValueError:
-                     try: pick_datetime = datetime.datetime.strptime(time_str, "%Y/%m/%d %H:%M:%S")
-                     except ValueError as time_err: print(f"      Satır {line_count}: Pick zamanı ayrıştırma hatası ({phase_str}): {time_err}..."); pick_datetime = None
-                if pick_datetime: pick_datetime = pick_datetime.replace(tzinfo=pytz.UTC)
-
-            if phase_str and pick_datetime:
+
+            if phase_str and time_str:
                 if station_name in station_locations: pick_lon = station_locations[station_name]['lon']
                 else: pick_lon = None
                 if pick_lon is not None:
-                    pick_count_parsed += 1
-                    pick_info = {'phase': phase_str,'time': pick_datetime,'lon': pick_lon,'station': station_name}
-                    if phase_str == 'P': pick_lons_p.append(pick_lon); pick_times_p.append(pick_datetime); pick_stations_p.append(station_name)
-                    else: pick_lons_s.append(pick_lon); pick_times_s.append(pick_datetime); pick_stations_s.append(station_name)
-                    if current_event_id in events: events[current_event_id]['picks'].append(pick_info)
+                    pick_phases.append(phase_str); pick_phase_names.append(phase_full); pick_time_strs.append(time_str)
+                    pick_lats.append(station_locations[station_name]['lat']); pick_lons.append(pick_lon)
+                    pick_stations.append(station_name); pick_event_ids.append(current_event_id)
 
 
-    # Ayrıştırma Özeti
-    print(f"  Ayrıştırma tamamlandı. Satır: {line_count}, EventBlok: {event_block_count}, OriginSatır: {origin_line_count}") # Origin sayacını yazdır
-    print(f"  Başarıyla Ayrıştırılan Pick Sayısı: {pick_count_parsed} (P: {len(pick_times_p)}, S: {len(pick_times_s)})")
-    valid_event_count = len([e for e in events.values() if e.get('event_time') and e.get('event_lon') is not None])
-    print(f"  Grafiklenecek Event Merkezi Sayısı: {valid_event_count}") # Bu sayının artık > 0 olması beklenir
+    # Zaman Dönüşümü (tüm pick ve origin zamanları tek seferde)
+    pick_times = time_utils.catalog_strings_to_datetime64(pick_time_strs)
+    picks = {
+        'phase': np.asarray(pick_phases, dtype=str), 'phase_name': np.asarray(pick_phase_names, dtype=str),
+        'time': pick_times, 'lat': np.asarray(pick_lats, dtype=float), 'lon': np.asarray(pick_lons, dtype=float),
+        'station': np.asarray(pick_stations, dtype=str), 'event_id': np.asarray(pick_event_ids, dtype=str),
+    }
+    bad_pick_times = np.isnat(pick_times)
+    if bad_pick_times.any():
+        counter.skip("pick zamanı ayrıştırılamadı", int(bad_pick_times.sum()))
+        picks = {k: v[~bad_pick_times] for k, v in picks.items()}
+
+    origin_ids = [eid for eid, e in events.items() if 'event_time_str' in e]
+    origin_times = time_utils.catalog_strings_to_datetime64([events[eid].pop('event_time_str') for eid in origin_ids])
+    for eid, ev_time in zip(origin_ids, origin_times):
+        if np.isnat(ev_time):
+            counter.skip("origin zamanı ayrıştırılamadı")
+            logger.debug("    Event %s origin zamanı ayrıştırılamadı.", eid)
+            origin_line_count -= 1
+            for key in ('event_lat', 'event_lon', 'event_depth'): events[eid].pop(key, None)
+        else:
+            events[eid]['event_time'] = ev_time
+
+    return events, picks, {'lines': line_count, 'origins': origin_line_count}
+
+
+def _parse_catalog_chunk(path, start, end, station_locations):
+    """
+    Bir dosyanın [start, end) bayt aralığını ayrıştırır (işçi süreçte çalışır).
+
+    Returns:
+        tuple or None: (_parse_catalog_text sonucu, atlama nedenleri sayacı); dosya okunamazsa None.
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(start)
+            raw = f.read(end - start)
+    except OSError as e:
+        logger.error("Hata: Dosya okunurken hata (%s): %s", path, e)
+        return None
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        logger.warning("Uyarı: '%s' dosyası utf-8 ile okunamadı, latin-1 deneniyor.", path)
+        text = raw.decode('latin-1')
+    counter = log_utils.StageCounter(logger, "Katalog ayrıştırma")
+    events, picks, stats = _parse_catalog_text(text, station_locations, counter)
+    return events, picks, stats, dict(counter.skipped)
+
+
+def _merge_parsed(results):
+    """
+    Parça sonuçlarını birleştirir: pickler zamana göre, event'ler origin zamanına göre sıralanır.
+
+    Aynı event kimliği birden çok parçada geçerse (örüşen bültenler) alanlar sonraki parçayla güncellenir,
+    pickleri birleştirilir (tek dosyalı ayrıştırmadaki davranışla aynı).
+    """
+    events = {}
+    counter = log_utils.StageCounter(logger, "Katalog ayrıştırma")
+    stats = {'lines': 0, 'origins': 0}
+    for chunk_events, _, chunk_stats, skipped in results:
+        for eid, event in chunk_events.items():
+            events.setdefault(eid, {}).update(event)
+        for key in stats:
+            stats[key] += chunk_stats[key]
+        for reason, n in skipped.items():
+            counter.skip(reason, n)
+    picks = {key: np.concatenate([r[1][key] for r in results]) for key in results[0][1]}
+    order = np.argsort(picks['time'], kind='stable')
+    picks = {key: values[order] for key, values in picks.items()}
+    no_time = np.datetime64('NaT')
+    events = dict(sorted(events.items(), key=lambda item: (np.isnat(item[1].get('event_time', no_time)),
+                                                          item[1].get('event_time', no_time))))
+    return events, picks, counter, stats
+
+
+def plot_catalog_data(catalog_file_path, station_data_path, workers=None, split_mb=None):
+    """
+    Deprem kataloğu verisini (belirtilen formata göre) okur ve grafikler.
+    Event merkezlerini pembe yıldız ile işaretler. catalog_file_path klasör veya glob deseni olabilir.
+    """
+    parsed = parse_catalog_data(catalog_file_path, station_data_path, workers=workers, split_mb=split_mb)
+    if parsed is None: return None
+    events = parsed['events']; picks = parsed['picks']
+    pick_times = picks['time']; pick_lons = picks['lon']; pick_stations = picks['station']
+    is_p = picks['phase'] == 'P'; is_s = ~is_p
 
     # ---- Grafik Oluşturma ----
     fig = go.Figure()
     has_data_to_plot = False # Grafiklenecek anlamlı veri var mı?
 
+    pick_time_texts = time_utils.format_datetime64(pick_times)
+
     # P Fazları
-    if pick_times_p:
+    if is_p.any():
         has_data_to_plot = True
-        hover_texts_p = [f"Faz: P<br>İstasyon: {st}<br>Zaman: {dt.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}<br>Boylam: {lon:.4f}" for st, dt, lon in zip(pick_stations_p, pick_times_p, pick_lons_p)]
-        fig.add_trace(go.Scatter(x=pick_times_p, y=pick_lons_p, mode='markers', marker=dict(color='blue', size=8, symbol='circle', line=dict(color='black', width=1)), name='P Fazı', hoverinfo='text', text=hover_texts_p, legendgroup="picks"))
+        hover_texts_p = [f"Faz: P<br>İstasyon: {st}<br>Zaman: {t}<br>Boylam: {lon:.4f}" for st, t, lon in zip(pick_stations[is_p], pick_time_texts[is_p], pick_lons[is_p])]
+        fig.add_trace(go.Scatter(x=pick_times[is_p], y=pick_lons[is_p], mode='markers', marker=dict(color='blue', size=8, symbol='circle', line=dict(color='black', width=1)), name='P Fazı', hoverinfo='text', text=hover_texts_p, legendgroup="picks"))
 
     # S Fazları
-    if pick_times_s:
+    if is_s.any():
         has_data_to_plot = True
-        hover_texts_s = [f"Faz: S<br>İstasyon: {st}<br>Zaman: {dt.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}<br>Boylam: {lon:.4f}" for st, dt, lon in zip(pick_stations_s, pick_times_s, pick_lons_s)]
-        fig.add_trace(go.Scatter(x=pick_times_s, y=pick_lons_s, mode='markers', marker=dict(color='red', size=8, symbol='x', line=dict(color='black', width=1)), name='S Fazı', hoverinfo='text', text=hover_texts_s, legendgroup="picks"))
+        hover_texts_s = [f"Faz: S<br>İstasyon: {st}<br>Zaman: {t}<br>Boylam: {lon:.4f}" for st, t, lon in zip(pick_stations[is_s], pick_time_texts[is_s], pick_lons[is_s])]
+        fig.add_trace(go.Scatter(x=pick_times[is_s], y=pick_lons[is_s], mode='markers', marker=dict(color='red', size=8, symbol='x', line=dict(color='black', width=1)), name='S Fazı', hoverinfo='text', text=hover_texts_s, legendgroup="picks"))
 
     # Event Merkezleri (Pembe Yıldız)
     event_times = []; event_lons = []; event_texts = []; processed_events_for_lines = {}
     for eid, edata in events.items():
-        if edata.get('event_time') and edata.get('event_lon') is not None:
+        if edata.get('event_time') is not None and edata.get('event_lon') is not None:
             has_data_to_plot = True
             event_times.append(edata['event_time']); event_lons.append(edata['event_lon'])
-            event_texts.append(f"Katalog Event ID: {eid}<br>Zaman: {edata['event_time'].strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}<br>Boylam: {edata['event_lon']:.4f}")
+            event_texts.append(f"Katalog Event ID: {eid}<br>Zaman: {time_utils.format_datetime64([edata['event_time']])[0]}<br>Boylam: {edata['event_lon']:.4f}")
             processed_events_for_lines[eid] = edata
     if event_times:
         fig.add_trace(go.Scatter(
@@ -185,14 +376,12 @@ def plot_catalog_data(catalog_file_path, station_data_path):
     # Pickleri Event Bazında Birleştiren Çizgiler
     # ... (Çizgi kodu aynı kalır) ...
     for eid, edata in processed_events_for_lines.items(): #...
-        if 'picks' in edata and len(edata['picks']) > 1: #...
-            picks = sorted(edata['picks'], key=lambda x: x['time']); #...
-            pick_times_line = [p['time'] for p in picks]; pick_lons_line = [p['lon'] for p in picks]; #...
-            fig.add_trace(go.Scatter(x=pick_times_line, y=pick_lons_line, mode='lines', line=dict(color='rgba(128,128,128,0.5)', width=1, dash='dot'), showlegend=False, hoverinfo='none')) #...
+        if 'picks' in edata and len(edata['picks']['time']) > 1: # Pickler event içinde zamana göre sıralı
+            fig.add_trace(go.Scatter(x=edata['picks']['time'], y=edata['picks']['lon'], mode='lines', line=dict(color='rgba(128,128,128,0.5)', width=1, dash='dot'), showlegend=False, hoverinfo='none')) #...
 
     # Veri yoksa uyarı
     if not has_data_to_plot:
-        print("  Uyarı: Katalogdan grafiklenecek veri bulunamadı.")
+        logger.warning("  Uyarı: Katalogdan grafiklenecek veri bulunamadı.")
         fig.add_annotation(text="Katalogdan Çizilecek Veri Bulunamadı", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(size=16, color="red"))
 
     # Grafik Düzeni
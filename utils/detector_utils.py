@@ -0,0 +1,309 @@
+# seismic_analysis/utils/detector_utils.py
+
+import os
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from obspy import read
+from scipy.signal import lfilter
+
+from utils import hdf5_writer_utils
+from utils import seismic_utils
+from utils import time_utils
+
+# Tetikleme çıktısı EQT summary.csv ile aynı sütunları kullanır, böylece
+# eqt_utils.plot_eqtransformer_picks dosyayı doğrudan okuyabilir.
+PICK_COLUMNS = ['pick_time', 'station_id', 'phase_type', 'pick_probability', 'snr']
+
+
+# --- Karakteristik Fonksiyonlar ---
+def classic_sta_lta(data, nsta, nlta):
+    """
+    Kümülatif toplam tabanlı klasik STA/LTA oranı.
+
+    Her örnek için enerji (x²) pencere ortalamaları tek bir cumsum farkıyla hesaplanır;
+    pencere başına Python döngüsü yoktur. İlk nlta örnek (LTA dolmadan) 0 döndürülür.
+
+    Args:
+        data (np.ndarray): Örnek dizisi.
+        nsta (int): Kısa pencere uzunluğu (örnek).
+        nlta (int): Uzun pencere uzunluğu (örnek).
+
+    Returns:
+        np.ndarray: float64 STA/LTA dizisi (data ile aynı uzunlukta).
+    """
+    energy = np.asarray(data, dtype=np.float64) ** 2
+    cft = np.zeros(len(energy), dtype=np.float64)
+    if len(energy) <= nlta:
+        return cft
+    csum = np.concatenate(([0.0], np.cumsum(energy)))
+    idx = np.arange(nlta, len(energy))
+    sta = (csum[idx + 1] - csum[idx + 1 - nsta]) / nsta
+    lta = (csum[idx + 1] - csum[idx + 1 - nlta]) / nlta
+    np.divide(sta, lta, out=cft[nlta:], where=lta > 0)
+    return cft
+
+
+def recursive_sta_lta(data, nsta, nlta, zi=None):
+    """
+    Özyinelemeli (üstel ağırlıklı) STA/LTA.
+
+    STA ve LTA birinci dereceden IIR filtreler olduğu için scipy.signal.lfilter ile
+    vektörel hesaplanır. Parça parça (streaming) işleme için filtre durumu döndürülür.
+
+    Args:
+        data (np.ndarray): Örnek dizisi.
+        nsta (int): Kısa pencere uzunluğu (örnek).
+        nlta (int): Uzun pencere uzunluğu (örnek).
+        zi (tuple, optional): Önceki parçadan gelen (sta_zi, lta_zi) filtre durumu.
+
+    Returns:
+        tuple(np.ndarray, tuple): STA/LTA dizisi ve sonraki parça için filtre durumu.
+    """
+    energy = np.asarray(data, dtype=np.float64) ** 2
+    csta = 1.0 / nsta
+    clta = 1.0 / nlta
+    sta_zi, lta_zi = zi if zi is not None else (np.zeros(1), np.zeros(1))
+    sta, sta_zi = lfilter([csta], [1.0, csta - 1.0], energy, zi=sta_zi)
+    lta, lta_zi = lfilter([clta], [1.0, clta - 1.0], energy, zi=lta_zi)
+    cft = np.zeros(len(energy), dtype=np.float64)
+    np.divide(sta, lta, out=cft, where=lta > 0)
+    return cft, (sta_zi, lta_zi)
+
+
+# --- Tetikleme ---
+def trigger_onsets(cft, thr_on, thr_off):
+    """
+    STA/LTA dizisinden tetikleme başlangıç/bitiş indekslerini vektörel olarak bulur.
+
+    Bir tetikleme cft'nin thr_on'u yukarı kestiği yerde başlar ve ilk thr_off altı örnekte biter.
+    Bitmemiş (dizinin sonuna kadar süren) tetiklemenin bitişi -1 olarak döndürülür.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): Başlangıç ve bitiş indeksleri (int64).
+    """
+    above = cft > thr_on
+    rising = np.flatnonzero(above[1:] & ~above[:-1]) + 1
+    if len(above) and above[0]:
+        rising = np.concatenate(([0], rising))
+    if len(rising) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    below = np.flatnonzero(cft < thr_off)
+    pos = np.searchsorted(below, rising)
+    offsets = np.where(pos < len(below), below[np.minimum(pos, len(below) - 1)], -1)
+    # Aynı bitişe düşen ardışık yükselmeler tek tetiklemedir: ilkini tut
+    offsets_key = np.where(offsets < 0, len(cft), offsets)
+    _, first = np.unique(offsets_key, return_index=True)
+    return rising[first].astype(np.int64), offsets[first].astype(np.int64)
+
+
+def _detect_trace(data, sampling_rate, params):
+    """
+    Tek bir trace üzerinde parça parça STA/LTA uygular.
+
+    Klasik yöntemde her parça bir önceki parçanın son nlta örneğiyle başlatılır; özyinelemeli
+    yöntemde filtre durumu taşınır. Parça sınırını aşan tetiklemeler bir sonraki parçada kapatılır.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray, np.ndarray): Başlangıç indeksleri, bitiş indeksleri, tepe oranları.
+    """
+    nsta = max(1, int(round(params['sta_seconds'] * sampling_rate)))
+    nlta = max(nsta + 1, int(round(params['lta_seconds'] * sampling_rate)))
+    chunk = max(nlta, int(round(params.get('chunk_seconds', 600) * sampling_rate)))
+    thr_on = params['thr_on']
+    thr_off = params['thr_off']
+    recursive = params.get('method', 'classic') == 'recursive'
+
+    onsets = []; offsets = []; peaks = []
+    open_onset = None
+    open_peak = 0.0
+    zi = None
+    for start in range(0, len(data), chunk):
+        stop = min(start + chunk, len(data))
+        if recursive:
+            cft, zi = recursive_sta_lta(data[start:stop], nsta, nlta, zi)
+            if start == 0:
+                cft[:nlta] = 0.0  # LTA oturana kadar tetikleme yok
+        else:
+            warm = max(0, start - nlta)
+            cft = classic_sta_lta(data[warm:stop], nsta, nlta)[start - warm:]
+            if start == 0:
+                cft[:nlta] = 0.0
+
+        offset_in_chunk = 0
+        if open_onset is not None:
+            # Önceki parçadan taşan tetiklemeyi kapat
+            below = np.flatnonzero(cft < thr_off)
+            if len(below) == 0:
+                open_peak = max(open_peak, float(cft.max()))
+                continue
+            end = below[0]
+            open_peak = max(open_peak, float(cft[:end + 1].max()))
+            onsets.append(open_onset); offsets.append(start + end); peaks.append(open_peak)
+            open_onset = None
+            offset_in_chunk = end + 1
+
+        on, off = trigger_onsets(cft[offset_in_chunk:], thr_on, thr_off)
+        if len(on) == 0:
+            continue
+        on = on + offset_in_chunk
+        off = np.where(off >= 0, off + offset_in_chunk, -1)
+        closed = off >= 0
+        if closed.any():
+            bounds = np.column_stack((on[closed], off[closed] + 1)).ravel()
+            chunk_peaks = np.maximum.reduceat(cft, bounds[:-1] if bounds[-1] == len(cft) else bounds)[::2]
+            onsets.extend(start + on[closed]); offsets.extend(start + off[closed]); peaks.extend(chunk_peaks)
+        if not closed[-1]:
+            open_onset = start + int(on[-1])
+            open_peak = float(cft[on[-1]:].max())
+
+    if open_onset is not None:
+        onsets.append(open_onset); offsets.append(len(data) - 1); peaks.append(open_peak)
+    return np.asarray(onsets, dtype=np.int64), np.asarray(offsets, dtype=np.int64), np.asarray(peaks, dtype=np.float64)
+
+
+def detect_file(path, params):
+    """
+    Bir mseed dosyasındaki tüm trace'lerde STA/LTA tetiklemelerini bulur (işçi süreçte çalışır).
+
+    'envelope_decimate' verilmişse filtrelenmiş verinin seyreltilmiş zarfı (blok başına en büyük mutlak
+    genlik) da döndürülür.
+
+    Returns:
+        dict: 'station', 'times_ns', 'peaks', 'envelopes' ([(seed_id, başlangıç ns, frekans, dizi)]),
+        'n_samples', 'cpu_seconds' ve hata varsa 'error'.
+    """
+    cpu_start = time.process_time()
+    result = {'path': path, 'station': [], 'times_ns': [], 'end_ns': [], 'peaks': [], 'envelopes': [],
+              'n_samples': 0, 'cpu_seconds': 0.0}
+    envelope_decimate = params.get('envelope_decimate')
+    try:
+        stream = read(path)
+        stream.detrend('demean')
+        seismic_utils.apply_filter(stream, params.get('filter_type'), params.get('freqmin'), params.get('freqmax'),
+                                   params.get('corners', 4), params.get('zerophase', False))
+        for tr in stream:
+            on, off, peaks = _detect_trace(tr.data, tr.stats.sampling_rate, params)
+            times_ns = time_utils.to_ns(time_utils.trace_times_datetime64(tr.stats.starttime, tr.stats.delta, tr.stats.npts))
+            result['station'].extend([tr.stats.station] * len(on))
+            result['times_ns'].append(times_ns[on])
+            result['end_ns'].append(times_ns[off])
+            result['peaks'].append(peaks)
+            result['n_samples'] += tr.stats.npts
+            if envelope_decimate:
+                n_blocks = tr.stats.npts // envelope_decimate
+                envelope = np.abs(tr.data[:n_blocks * envelope_decimate]).reshape(n_blocks, envelope_decimate).max(axis=1)
+                result['envelopes'].append((tr.id, tr.stats.starttime.ns, tr.stats.sampling_rate / envelope_decimate,
+                                            envelope.astype(np.float32)))
+    except Exception as e:
+        result['error'] = str(e)
+    result['cpu_seconds'] = time.process_time() - cpu_start
+    return result
+
+
+def triggers_to_picks(results, thr_on, as_datetime=False):
+    """
+    İşçi sonuçlarını EQT summary.csv biçiminde (PICK_COLUMNS) bir DataFrame'e çevirir.
+
+    as_datetime=True ise 'pick_time' ve 'end_time' metin yerine datetime64[ns] olarak bırakılır (HDF5 çıktısı için).
+    """
+    times_ns = np.concatenate([np.concatenate(r['times_ns']) for r in results if r['times_ns']] or [np.empty(0, np.int64)])
+    end_ns = np.concatenate([np.concatenate(r['end_ns']) for r in results if r['end_ns']] or [np.empty(0, np.int64)])
+    peaks = np.concatenate([np.concatenate(r['peaks']) for r in results if r['peaks']] or [np.empty(0)])
+    stations = np.concatenate([np.asarray(r['station'], dtype=str) for r in results] or [np.empty(0, dtype=str)])
+    order = np.argsort(times_ns, kind='stable')
+    times = times_ns[order].view('datetime64[ns]')
+    end_times = end_ns[order].view('datetime64[ns]')
+    peaks = peaks[order]
+    if not as_datetime:
+        # Sessiz günde (sıfır tetikleme) biçimlendirme atlanır; tablo yine aynı sütunlarla döner ve CSV'ye başlık yazılır
+        times = time_utils.format_datetime64(times) if times.size else times.astype(str)
+        end_times = time_utils.format_datetime64(end_times) if end_times.size else end_times.astype(str)
+    return pd.DataFrame({
+        'pick_time': times,
+        'station_id': stations[order],
+        'phase_type': 'P',  # STA/LTA faz ayırmaz; tetiklemeler P olarak işaretlenir
+        # Eşikte 0, tepe oranı büyüdükçe 1'e yaklaşan güven ölçüsü
+        'pick_probability': np.clip(1.0 - thr_on / np.maximum(peaks, 1e-12), 0.0, 1.0).round(3),
+        'snr': peaks.round(2),  # STA/LTA tepe oranı
+        'end_time': end_times,
+    }, columns=PICK_COLUMNS + ['end_time'])
+
+
+def run_detector(config, paths=None):
+    """
+    mseed arşivindeki tüm dosyalar üzerinde STA/LTA dedektörünü paralel çalıştırır.
+
+    Sonuç EQT summary.csv biçiminde yazılır ve örnek/saniye/çekirdek cinsinden
+    işlem hızı raporlanır. 'output_hdf5' verilmişse her dosyanın pickleri ve seyreltilmiş zarfları
+    işlendikçe HDF5 sonuç dosyasına eklenir ('tables/stalta_picks', 'traces/stalta_envelope').
+
+    Args:
+        config (dict): 'config.py' dosyasından okunan CONFIG sözlüğü.
+        paths (list, optional): İşlenecek mseed dosyaları; verilmezse klasördeki tüm dosyalar.
+
+    Returns:
+        pandas.DataFrame or None: Tetikleme (pick) tablosu.
+    """
+    params = config.get('detector_settings')
+    if not params:
+        print("Yapılandırmada 'detector_settings' bölümü bulunamadı.")
+        return None
+    mseed_folder = config['seismic_data']['mseed_folder']
+    channel = params.get('channel') or '*'
+    if paths is None:
+        paths = sorted(glob.glob(os.path.join(mseed_folder, f"*_{channel}_*.mseed")))
+    if not paths:
+        print(f"Uyarı: Dedektör için mseed dosyası bulunamadı: {mseed_folder}")
+        return None
+
+    workers = params.get('workers') or os.cpu_count() or 1
+    print(f"\n--- STA/LTA Dedektörü Başlatılıyor ({params.get('method', 'classic')}, {len(paths)} dosya, {workers} işçi) ---")
+    output_hdf5 = params.get('output_hdf5')
+    if not output_hdf5:
+        params = dict(params, envelope_decimate=None)  # Zarf sadece HDF5 çıktısına yazılır
+    wall_start = time.perf_counter()
+    writer = hdf5_writer_utils.HDF5ResultWriter.from_config(output_hdf5, config.get('hdf5_output_settings')) if output_hdf5 else None
+    results = []
+    try:
+        if writer:
+            writer.remove("tables/stalta_picks")
+            writer.remove("traces/stalta_envelope")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Sonuçlar dosya sırasıyla geldikçe HDF5'e eklenir; tüm zarflar bellekte biriktirilmez
+            for result in pool.map(detect_file, paths, [params] * len(paths)):
+                if writer:
+                    writer.append_table("stalta_picks", triggers_to_picks([result], params['thr_on'], as_datetime=True),
+                                        time_column='pick_time')
+                    for seed_id, start_ns, fs, envelope in result.pop('envelopes'):
+                        writer.append_trace("stalta_envelope", seed_id, envelope, start_ns, fs)
+                results.append(result)
+    finally:
+        if writer:
+            writer.close()
+    wall_seconds = time.perf_counter() - wall_start
+
+    for r in results:
+        if 'error' in r:
+            print(f"  Uyarı: {os.path.basename(r['path'])} işlenemedi: {r['error']}")
+    picks = triggers_to_picks(results, params['thr_on'])
+
+    output_csv = params.get('output_csv')
+    if output_csv:
+        os.makedirs(os.path.dirname(output_csv), exist_ok=True)
+        picks.to_csv(output_csv, index=False)
+        print(f"  {len(picks)} tetikleme yazıldı: {output_csv}")
+    if output_hdf5:
+        print(f"  Pickler ve zarflar HDF5'e eklendi: {output_hdf5}")
+
+    n_samples = sum(r['n_samples'] for r in results)
+    cpu_seconds = sum(r['cpu_seconds'] for r in results)
+    per_core = n_samples / cpu_seconds if cpu_seconds > 0 else float('nan')
+    print(f"  İşlenen örnek: {n_samples:,}, Duvar saati: {wall_seconds:.2f} s, CPU: {cpu_seconds:.2f} s")
+    print(f"  Hız: {per_core:,.0f} örnek/s/çekirdek ({n_samples / wall_seconds:,.0f} örnek/s toplam)")
+    print("--- STA/LTA Dedektörü Tamamlandı ---\n")
+    return picks
@@ -132,6 +132,12 @@ def run_download(config):
     # Hedef klasörü oluştur/kontrol et
     _create_output_folder(output_folder)
 
+    if download_cfg.get('async_download', False):
+        # Çok sayıda istasyon-saat isteği: asyncio istemcisi (bağlantı havuzu + host başına hız sınırı)
+        from utils import async_download_utils
+        async_download_utils.run_async_download(config)
+        return
+
     # Her istasyon için veriyi indir
     print(f"{len(stations_to_download)} istasyon için indirme başlıyor...")
     for station in stations_to_download:
@@ -4,18 +4,18 @@ import datetime
 import pytz
 import numpy as np
 
-def plot_eqtransformer_picks(csv_file_path, eqt_start_hour, eqt_end_hour, eqt_date):
+from utils import time_utils
+
+def read_eqt_summary(csv_file_path):
     """
-    EQTransformer summary.csv dosyasından pick verilerini okur ve Plotly ile zaman-istasyon grafiği oluşturur.
+    EQTransformer summary.csv dosyasını okur, gerekli sütunları kontrol eder ve tipleri düzeltir.
 
     Args:
         csv_file_path (str): summary.csv dosyasının yolu.
-        eqt_start_hour (int): EQTransformer için başlangıç saat filtresi (UTC).
-        eqt_end_hour (int): EQTransformer için bitiş saat filtresi (UTC).
-        eqt_date (str): EQTransformer için tarih filtresi (YYYY-MM-DD).
 
     Returns:
-        plotly.graph_objects.Figure or None: Oluşturulan Plotly figürü veya hata durumunda None.
+        pd.DataFrame or None: 'pick_time' (UTC), 'station_id', 'phase_type', 'pick_probability', 'snr'
+        sütunlu tablo; dosya okunamazsa veya biçim hatalıysa None.
     """
     try:
         df = pd.read_csv(csv_file_path)
@@ -50,17 +50,35 @@ def plot_eqtransformer_picks(csv_file_path, eqt_start_hour, eqt_end_hour, eqt_da
     except Exception as e:
         print(f"EQT CSV verisi işlenirken hata (tip dönüşümü): {e}")
         return None
+    return df
+
+
+def plot_eqtransformer_picks(csv_file_path, eqt_start_hour, eqt_end_hour, eqt_date):
+    """
+    EQTransformer summary.csv dosyasından pick verilerini okur ve Plotly ile zaman-istasyon grafiği oluşturur.
+
+    Args:
+        csv_file_path (str): summary.csv dosyasının yolu.
+        eqt_start_hour (int): EQTransformer için başlangıç saat filtresi (UTC).
+        eqt_end_hour (int): EQTransformer için bitiş saat filtresi (UTC).
+        eqt_date (str): EQTransformer için tarih filtresi (YYYY-MM-DD).
+
+    Returns:
+        plotly.graph_objects.Figure or None: Oluşturulan Plotly figürü veya hata durumunda None.
+    """
+    df = read_eqt_summary(csv_file_path)
+    if df is None:
+        return None
 
 
     # Zaman aralığına göre filtrele
     try:
-        start_dt_str = f"{eqt_date} {eqt_start_hour:02d}:00:00"
-        end_dt_str = f"{eqt_date} {eqt_end_hour:02d}:00:00"
-        start_time = datetime.datetime.strptime(start_dt_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=pytz.UTC)
-        # Bitiş saati dahil değil (<), bu yüzden bir sonraki saate kadar alıyoruz
-        end_time = datetime.datetime.strptime(end_dt_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=pytz.UTC)
-        # Eğer end_hour 23 ise, bir sonraki günün 00:00'ı olur. Veya aynı gün 23:59:59 alınabilir.
-        # Şimdilik tam saat sınırı kullanıyoruz.
+        day_start = datetime.datetime.strptime(eqt_date, "%Y-%m-%d").replace(tzinfo=pytz.UTC)
+        start_time = day_start + datetime.timedelta(hours=eqt_start_hour)
+        # Bitiş saati dahil değil (<); end_hour=24 bir sonraki günün 00:00'ıdır
+        end_time = day_start + datetime.timedelta(hours=eqt_end_hour)
+        start_dt_str = start_time.strftime("%Y-%m-%d %H:%M:%S")
+        end_dt_str = end_time.strftime("%Y-%m-%d %H:%M:%S")
 
         mask = (df['pick_time'] >= start_time) & (df['pick_time'] < end_time)
         df_filtered = df.loc[mask].copy() # Filtrelenmiş veri üzerinde çalışacağız
@@ -94,13 +112,16 @@ def plot_eqtransformer_picks(csv_file_path, eqt_start_hour, eqt_end_hour, eqt_da
         for phase, group in df_filtered.groupby('phase_type'):
             phase_upper = phase.upper() # 'p'/'s' gelme ihtimaline karşı
             if phase_upper in color_map:
+                # Zaman metinleri toplu üretilir (satır başına strftime/iterrows yok)
+                time_texts = time_utils.format_datetime64(group['pick_time'].dt.tz_localize(None).to_numpy())
                 hover_texts = [
-                    f"İstasyon: {row.station_id}<br>"
-                    f"Zaman: {row.pick_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}<br>"
+                    f"İstasyon: {station_id}<br>"
+                    f"Zaman: {t}<br>"
                     f"Faz: {phase_upper}<br>"
-                    f"Olasılık: {row.pick_probability:.2f}<br>"
-                    f"SNR: {row.snr:.1f}"
-                    for _, row in group.iterrows()
+                    f"Olasılık: {prob:.2f}<br>"
+                    f"SNR: {snr:.1f}"
+                    for station_id, t, prob, snr in zip(group['station_id'].to_numpy(), time_texts,
+                                                        group['pick_probability'].to_numpy(), group['snr'].to_numpy())
                 ]
                 fig.add_trace(go.Scatter(
                     x=group['pick_time'],
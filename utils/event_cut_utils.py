@@ -0,0 +1,240 @@
+# seismic_analysis/utils/event_cut_utils.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import h5py
+import numpy as np
+
+from utils import catalog_utils
+from utils import hdf5_dataset_utils
+from utils import mseed_index_utils
+from utils import response_utils
+from utils import time_utils
+
+# Event merkezli waveform kesme.
+# İstenen (event, istasyon) pencereleri önce kaynak dosyalarına göre gruplanır (mseed dizini sorgusu);
+# her dosya bir kez okunur ve o dosyaya düşen tüm pencereler tek bir NumPy indeksleme işlemiyle
+# (pencere başlangıç indeksi + arange) kesilir. Dosyalar işçi süreçlerde paralel işlenir, sonuç
+# (event x istasyon x örnek) boyutlu tek bir tensör olarak HDF5 veya NPZ dosyasına yazılır.
+# response_settings etkinse her istasyonun tüm event pencereleri tek bir FFT grubunda tepkiden arındırılır.
+
+
+def collect_events(config, station_names, sources=("catalog", "hdf5")):
+    """
+    Katalog event'lerinin ve HDF5 srcs satırlarının kimlik ve origin zamanlarını toplar.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray, np.ndarray): Kimlikler ("catalog:<id>" / "hdf5:<id>"),
+        origin zamanları (int64 ns) ve kaynak isimleri; zamana göre sıralı.
+    """
+    ids, times, labels = [], [], []
+    if 'catalog' in sources:
+        cat_cfg = config['catalog_data']
+        parsed = catalog_utils.load_configured_catalog(cat_cfg)
+        if parsed is not None:
+            for event_id, event in parsed['events'].items():
+                if event.get('event_time') is not None:
+                    ids.append(f"catalog:{event_id}")
+                    times.append(event['event_time'])
+                    labels.append('catalog')
+    if 'hdf5' in sources:
+        results = hdf5_dataset_utils.load_configured_results(config['hdf5_data'], station_names, config['seismic_data']['date'])
+        if results is not None:
+            ids.extend(f"hdf5:{event_id}" for event_id in results['event_ids'])
+            times.extend(results['event_times'])
+            labels.extend(['hdf5'] * len(results['event_ids']))
+
+    times_ns = time_utils.to_ns(np.asarray(times, dtype='datetime64[ns]'))
+    order = np.argsort(times_ns, kind='stable')
+    return np.asarray(ids, dtype=str)[order], times_ns[order], np.asarray(labels, dtype=str)[order]
+
+
+def plan_cuts(mseed_folder, channel, event_times_ns, pre_ns, post_ns, stations=None):
+    """
+    (event, istasyon) pencerelerini kaynak dosyalarına göre gruplar.
+
+    Tek bir dizin sorgusuyla tüm pencereleri kapsayan aralıktaki dosyalar bulunur; her dosya için
+    penceresi dosyayla kesişen event'ler vektörel olarak seçilir.
+
+    Args:
+        mseed_folder (str): mseed klasörü.
+        channel (str): Kanal kodu.
+        event_times_ns (np.ndarray): Artan sıradaki origin zamanları (int64 ns).
+        pre_ns, post_ns (int): Origin öncesi/sonrası pencere uzunlukları (ns).
+        stations (list, optional): İstasyon ekseni; verilmezse dosyası olan tüm istasyonlar.
+
+    Returns:
+        tuple(list, dict): İstasyon ekseni ve yol -> (istasyon indeksi, event indeksleri) sözlüğü.
+    """
+    event_times_ns = np.asarray(event_times_ns, dtype=np.int64)
+    if len(event_times_ns) == 0 or not os.path.isdir(mseed_folder):
+        return list(stations or []), {}
+    window_starts = event_times_ns - pre_ns
+    window_ends = event_times_ns + post_ns
+    index = mseed_index_utils.get_mseed_index(mseed_folder)
+    extents = index.query_extents(None, channel, int(window_starts.min()), int(window_ends.max()))
+
+    if not stations:
+        stations = sorted({station for _, station, _, _ in extents})
+    position = {station: i for i, station in enumerate(stations)}
+    plan = {}
+    for path, station, start_ns, end_ns in extents:
+        if station not in position:
+            continue
+        # Pencereler sıralı ve eşit uzunlukta olduğundan dosyayla kesişen event'ler bitişik bir aralıktır
+        first = np.searchsorted(window_ends, start_ns, side='right')
+        last = np.searchsorted(window_starts, end_ns, side='left')
+        candidates = np.arange(first, last)
+        hits = candidates[(window_starts[candidates] < end_ns) & (window_ends[candidates] > start_ns)]
+        if len(hits):
+            plan[path] = (position[station], hits)
+    return list(stations), plan
+
+
+def cut_file(path, window_starts_ns, n_samples, delta_ns):
+    """
+    Bir mseed dosyasını bir kez okuyup verilen tüm pencereleri keser (işçi süreçte çalışır).
+
+    Pencerenin dosyada olmayan örnekleri NaN'dır; örnekleme aralığı farklı trace'ler atlanır.
+
+    Returns:
+        dict: 'snippets' ((n_pencere, n_samples) float32), 'error' (varsa).
+    """
+    from obspy import read
+    window_starts_ns = np.asarray(window_starts_ns, dtype=np.int64)
+    snippets = np.full((len(window_starts_ns), n_samples), np.nan, dtype=np.float32)
+    result = {'snippets': snippets}
+    try:
+        stream = read(path)
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+    offsets = np.arange(n_samples, dtype=np.int64)
+    for tr in stream:
+        if int(round(tr.stats.delta * 1e9)) != delta_ns:
+            result['error'] = f"örnekleme aralığı {tr.stats.delta} s, beklenen {delta_ns / 1e9} s"
+            continue
+        data = np.asarray(tr.data, dtype=np.float32)
+        npts = len(data)
+        # Tüm pencereler için örnek indeksleri tek (n_pencere, n_samples) dizisi olarak
+        i0 = np.rint((window_starts_ns - tr.stats.starttime.ns) / delta_ns).astype(np.int64)
+        idx = i0[:, np.newaxis] + offsets
+        valid = (idx >= 0) & (idx < npts)
+        values = data[np.clip(idx, 0, max(npts - 1, 0))]
+        fill = valid & np.isnan(snippets)  # Birden çok trace (boşluklu dosya) varsa ilk gelen değer korunur
+        snippets[fill] = values[fill]
+    return result
+
+
+def _remove_station_responses(waveforms, coverage, stations, channel, window_starts_ns, fs, response_cfg):
+    """
+    Tensörün istasyon dilimlerinin tepkisini yerinde giderir (istasyon başına tek toplu FFT).
+
+    Tensör tek birimde kalsın diye tepkisi bulunamayan pencereler sıfırlanır ve kapsamaları 0 yapılır.
+    """
+    missing = []
+    for s, station in enumerate(stations):
+        rows = np.flatnonzero(coverage[:, s] > 0)
+        if not len(rows):
+            continue
+        data, ok = response_utils.remove_response_windows(waveforms[rows, s], station, channel, window_starts_ns[rows], fs, response_cfg)
+        waveforms[rows[ok], s] = data[ok]
+        waveforms[rows[~ok], s] = 0.0
+        coverage[rows[~ok], s] = 0.0
+        if not ok.all():
+            missing.append(f"{station} ({int((~ok).sum())})")
+    if missing:
+        print(f"  Uyarı: Tepkisi bulunamayan pencereler sıfırlandı: {', '.join(missing)}")
+
+
+def _write_output(output_path, arrays, attrs):
+    """Tensörü ve meta verileri uzantıya göre HDF5 (.h5/.hdf5) veya NPZ olarak atomik yazar."""
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    base, ext = os.path.splitext(output_path)
+    tmp_path = f"{base}.tmp{ext}"
+    if ext == '.npz':
+        np.savez(tmp_path, **arrays, **{k: np.asarray(v) for k, v in attrs.items()})
+    else:
+        with h5py.File(tmp_path, 'w') as hf:
+            for name, values in arrays.items():
+                if values.dtype.kind == 'U':
+                    hf.create_dataset(name, data=values.astype('S'))
+                elif name == 'waveforms' and values.size:
+                    # Event başına bir parça: eğitimde tek event okumak tüm tensörü açmayı gerektirmez
+                    hf.create_dataset(name, data=values, chunks=(1,) + values.shape[1:])
+                else:
+                    hf.create_dataset(name, data=values)
+            hf.attrs.update(attrs)
+    os.replace(tmp_path, output_path)
+
+
+def cut_event_waveforms(config, station_names):
+    """
+    Yapılandırmadaki event'ler için tüm istasyonlarda waveform parçalarını keser ve tensör olarak yazar.
+
+    Args:
+        config (dict): 'config.py' dosyasından okunan CONFIG sözlüğü.
+        station_names (list): HDF5 istasyon isimleri.
+
+    Returns:
+        dict or None: 'waveforms' (event x istasyon x örnek), 'coverage', 'event_ids', 'event_times_ns',
+        'sources', 'stations'.
+    """
+    cut_cfg = config.get('event_cut_settings')
+    if not cut_cfg:
+        print("Yapılandırmada 'event_cut_settings' bölümü bulunamadı.")
+        return None
+    fs = float(cut_cfg.get('sampling_rate', 100.0))
+    delta_ns = int(round(time_utils.NS_PER_SECOND / fs))
+    pre_ns = int(round(cut_cfg['pre_seconds'] * time_utils.NS_PER_SECOND))
+    post_ns = int(round(cut_cfg['post_seconds'] * time_utils.NS_PER_SECOND))
+    n_samples = (pre_ns + post_ns) // delta_ns
+    channel = cut_cfg.get('channel') or config['seismic_data']['phase_component']
+
+    print("\n--- Event Waveform Kesme Başlatılıyor ---")
+    wall_start = time.perf_counter()
+    event_ids, event_times_ns, sources = collect_events(config, station_names, cut_cfg.get('sources', ["catalog", "hdf5"]))
+    stations, plan = plan_cuts(config['seismic_data']['mseed_folder'], channel, event_times_ns, pre_ns, post_ns,
+                               cut_cfg.get('stations') or None)
+    n_windows = sum(len(hits) for _, hits in plan.values())
+    print(f"  {len(event_ids)} event, {len(stations)} istasyon, {len(plan)} dosyada {n_windows} pencere ({n_samples} örnek, {fs:g} Hz).")
+
+    waveforms = np.full((len(event_ids), len(stations), n_samples), np.nan, dtype=np.float32)
+    paths = list(plan)
+    workers = cut_cfg.get('workers') or os.cpu_count() or 1
+    window_starts = [event_times_ns[plan[p][1]] - pre_ns for p in paths]
+    if paths:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            results = pool.map(cut_file, paths, window_starts, [n_samples] * len(paths), [delta_ns] * len(paths))
+            for path, result in zip(paths, results):
+                if 'error' in result:
+                    print(f"  Uyarı: {os.path.basename(path)}: {result['error']}")
+                station_idx, hits = plan[path]
+                block = waveforms[hits, station_idx]
+                waveforms[hits, station_idx] = np.where(np.isnan(block), result['snippets'], block)
+
+    coverage = 1.0 - np.isnan(waveforms).mean(axis=2) if n_samples else np.zeros(waveforms.shape[:2])
+    if cut_cfg.get('drop_empty', True):
+        keep = coverage.max(axis=1) > 0 if len(stations) else np.zeros(len(event_ids), dtype=bool)
+        waveforms, coverage = waveforms[keep], coverage[keep]
+        event_ids, event_times_ns, sources = event_ids[keep], event_times_ns[keep], sources[keep]
+    np.nan_to_num(waveforms, copy=False, nan=0.0)
+    units = "count"
+    response_cfg = config.get('response_settings') or {}
+    if response_cfg.get('enable') and waveforms.size:
+        units = response_utils.UNITS[response_cfg.get('output', "VEL")]
+        _remove_station_responses(waveforms, coverage, stations, channel, event_times_ns - pre_ns, fs, response_cfg)
+
+    result = {
+        'waveforms': waveforms, 'coverage': coverage.astype(np.float32), 'event_ids': event_ids,
+        'event_times_ns': event_times_ns, 'sources': sources, 'stations': np.asarray(stations, dtype=str),
+    }
+    output_path = cut_cfg.get('output_path')
+    if output_path:
+        _write_output(output_path, result, {'sampling_rate': fs, 'pre_seconds': cut_cfg['pre_seconds'],
+                                            'post_seconds': cut_cfg['post_seconds'], 'channel': channel, 'units': units})
+        print(f"  Tensör yazıldı: {output_path} {waveforms.shape}")
+    print(f"--- Event Waveform Kesme Tamamlandı ({time.perf_counter() - wall_start:.2f} s) ---\n")
+    return result
@@ -0,0 +1,239 @@
+# seismic_analysis/utils/event_match_utils.py
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from utils import catalog_utils
+from utils import hdf5_dataset_utils
+from utils import log_utils
+from utils import spatial_utils
+from utils import time_utils
+
+logger = log_utils.get_logger(__name__)
+
+# Katalog (referans) ve HDF5 'srcs' (aday) event'lerinin origin zamanı ve konuma göre eşlenmesi.
+# İki liste zamana göre sıralanır; her referans için zaman toleransı içindeki aday aralığı
+# np.searchsorted ile bulunur (sıralı süpürme), böylece sadece zamanca yakın çiftlerin mesafesi
+# hesaplanır. Bire bir eşleme, maliyeti (normalize zaman + mesafe farkı) en düşük çiftten başlayarak
+# açgözlü olarak ve vektörel turlar hâlinde yapılır.
+
+_SUMMARY_PERCENTILES = (50, 90, 95)
+_PAIR_COLUMNS = ['ref_id', 'cand_id', 'ref_time', 'cand_time', 'dt_s', 'distance_km']
+
+
+def candidate_pairs(ref_times_ns, cand_times_ns, max_dt_ns):
+    """
+    Zamana göre sıralı iki listede |t_aday - t_ref| <= max_dt olan tüm (ref, aday) indeks çiftleri.
+
+    Her referans için aday aralığı [lo, hi) iki searchsorted ile bulunur; çiftler döngü olmadan
+    np.repeat ile açılır. Maliyet O((n + m) log m + çift sayısı).
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): Referans ve aday indeksleri (sıralı dizilerdeki konumlar).
+    """
+    lo = np.searchsorted(cand_times_ns, ref_times_ns - max_dt_ns, side='left')
+    hi = np.searchsorted(cand_times_ns, ref_times_ns + max_dt_ns, side='right')
+    counts = hi - lo
+    ref_idx = np.repeat(np.arange(len(ref_times_ns)), counts)
+    # Her referansın aday aralığı içindeki sıra: toplam konum - referansın ilk çiftinin konumu
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    cand_idx = np.repeat(lo, counts) + (np.arange(len(ref_idx)) - starts)
+    return ref_idx, cand_idx
+
+
+def greedy_one_to_one(ref_idx, cand_idx, cost):
+    """
+    Aday çiftlerden bire bir eşleme: en düşük maliyetli çift önce.
+
+    Her turda maliyete göre sıralı çiftlerden hem referansı hem adayı için ilk sırada olanlar kabul
+    edilir ve kullanılan event'lerin diğer çiftleri elenir; tur sayısı çakışma derinliği kadardır.
+
+    Returns:
+        np.ndarray: Kabul edilen çiftlerin (girdi dizilerindeki) konumları.
+    """
+    order = np.argsort(cost, kind='stable')
+    remaining = order
+    accepted = []
+    while len(remaining):
+        r = ref_idx[remaining]
+        c = cand_idx[remaining]
+        # remaining maliyete göre sıralı olduğundan np.unique'in ilk konumu en ucuz çifttir
+        _, first_r = np.unique(r, return_index=True)
+        _, first_c = np.unique(c, return_index=True)
+        best_r = np.zeros(len(remaining), dtype=bool)
+        best_r[first_r] = True
+        best_c = np.zeros(len(remaining), dtype=bool)
+        best_c[first_c] = True
+        take = best_r & best_c
+        accepted.append(remaining[take])
+        used_r = np.isin(r, r[take])
+        used_c = np.isin(c, c[take])
+        remaining = remaining[~(used_r | used_c)]
+    return np.concatenate(accepted) if accepted else np.empty(0, dtype=np.int64)
+
+
+def match_events(ref, cand, max_dt_seconds, max_distance_km):
+    """
+    İki event listesini origin zamanı ve episantr konumuna göre bire bir eşler.
+
+    Args:
+        ref, cand (dict): 'ids', 'times_ns' (int64), 'lats', 'lons' dizileri.
+        max_dt_seconds (float): Origin zamanı toleransı (s).
+        max_distance_km (float): Episantr mesafesi toleransı (km).
+
+    Returns:
+        dict: 'pairs' (DataFrame), 'missed' (eşlenmemiş referans kimlikleri), 'false' (eşlenmemiş aday
+        kimlikleri), 'precision', 'recall', 'n_ref', 'n_cand'. Hiç çift yoksa 'pairs' boştur; kesinlik ve
+        duyarlılık aday/referans varsa 0, yoksa NaN olur.
+    """
+    max_dt_ns = int(round(max_dt_seconds * time_utils.NS_PER_SECOND))
+    ref_order = np.argsort(ref['times_ns'], kind='stable')
+    cand_order = np.argsort(cand['times_ns'], kind='stable')
+    ref_t = np.asarray(ref['times_ns'], dtype=np.int64)[ref_order]
+    cand_t = np.asarray(cand['times_ns'], dtype=np.int64)[cand_order]
+
+    ri, ci = candidate_pairs(ref_t, cand_t, max_dt_ns)
+    ri, ci = ref_order[ri], cand_order[ci]
+    dt_s = (np.asarray(cand['times_ns'], dtype=np.int64)[ci] - np.asarray(ref['times_ns'], dtype=np.int64)[ri]) / time_utils.NS_PER_SECOND
+    dist_km = spatial_utils.haversine_km(np.asarray(ref['lats'])[ri], np.asarray(ref['lons'])[ri],
+                                         np.asarray(cand['lats'])[ci], np.asarray(cand['lons'])[ci])
+    within = dist_km <= max_distance_km
+    ri, ci, dt_s, dist_km = ri[within], ci[within], dt_s[within], dist_km[within]
+    # Zaman ve mesafe toleranslarına göre normalize toplam maliyet
+    cost = np.abs(dt_s) / max(max_dt_seconds, 1e-9) + dist_km / max(max_distance_km, 1e-9)
+    keep = greedy_one_to_one(ri, ci, cost)
+    ri, ci, dt_s, dist_km = ri[keep], ci[keep], dt_s[keep], dist_km[keep]
+
+    order = np.argsort(np.asarray(ref['times_ns'])[ri], kind='stable')
+    ri, ci, dt_s, dist_km = ri[order], ci[order], dt_s[order], dist_km[order]
+    ref_ids = np.asarray(ref['ids'], dtype=str)
+    cand_ids = np.asarray(cand['ids'], dtype=str)
+    if len(ri) == 0:
+        # Tolerans içinde çift yok (ayrık dönemler, dar toleranslar): boş tablo, tüm event'ler eşlenmemiş
+        pairs = pd.DataFrame(columns=_PAIR_COLUMNS)
+    else:
+        pairs = pd.DataFrame({
+            'ref_id': ref_ids[ri],
+            'cand_id': cand_ids[ci],
+            'ref_time': time_utils.format_datetime64(np.asarray(ref['times_ns'], dtype=np.int64)[ri].view('datetime64[ns]')),
+            'cand_time': time_utils.format_datetime64(np.asarray(cand['times_ns'], dtype=np.int64)[ci].view('datetime64[ns]')),
+            'dt_s': np.round(dt_s, 3),
+            'distance_km': np.round(dist_km, 3),
+        }, columns=_PAIR_COLUMNS)
+    matched_ref = np.zeros(len(ref_ids), dtype=bool)
+    matched_ref[ri] = True
+    matched_cand = np.zeros(len(cand_ids), dtype=bool)
+    matched_cand[ci] = True
+    return {
+        'pairs': pairs,
+        'missed': ref_ids[~matched_ref],
+        'false': cand_ids[~matched_cand],
+        'precision': len(pairs) / len(cand_ids) if len(cand_ids) else float('nan'),
+        'recall': len(pairs) / len(ref_ids) if len(ref_ids) else float('nan'),
+        'n_ref': len(ref_ids),
+        'n_cand': len(cand_ids),
+    }
+
+
+def error_summary(values):
+    """Hata dağılımı özeti: ortalama, standart sapma, medyan mutlak sapma ve |hata| yüzdelikleri."""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return {}
+    summary = {
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'mad': float(np.median(np.abs(values - np.median(values)))),
+    }
+    for q, v in zip(_SUMMARY_PERCENTILES, np.percentile(np.abs(values), _SUMMARY_PERCENTILES)):
+        summary[f'abs_p{q}'] = float(v)
+    return summary
+
+
+def plot_match_errors(result):
+    """Eşlenen çiftlerin origin zamanı ve episantr hatası histogramları."""
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("Origin Zamanı Farkı (HDF5 - Katalog, s)", "Episantr Mesafesi (km)"))
+    fig.add_trace(go.Histogram(x=result['pairs']['dt_s'], nbinsx=50, name='dt', marker_color='steelblue'), row=1, col=1)
+    fig.add_trace(go.Histogram(x=result['pairs']['distance_km'], nbinsx=50, name='mesafe', marker_color='indianred'), row=1, col=2)
+    fig.update_layout(
+        title=f"Event Eşleme: {len(result['pairs'])} çift, kesinlik {result['precision']:.3f}, duyarlılık {result['recall']:.3f}",
+        showlegend=False, template="plotly_white", height=400)
+    return fig
+
+
+def _catalog_events(config):
+    """Katalog event'lerini match_events biçiminde döndürür (konumu veya zamanı olmayanlar hariç)."""
+    cat_cfg = config['catalog_data']
+    parsed = catalog_utils.load_configured_catalog(cat_cfg)
+    if parsed is None:
+        return None
+    rows = [(eid, e['event_time'], e['event_lat'], e['event_lon']) for eid, e in parsed['events'].items()
+            if e.get('event_time') is not None and e.get('event_lat') is not None and e.get('event_lon') is not None]
+    ids, times, lats, lons = zip(*rows) if rows else ((), (), (), ())
+    return {'ids': np.asarray(ids, dtype=str), 'times_ns': time_utils.to_ns(np.asarray(times, dtype='datetime64[ns]')),
+            'lats': np.asarray(lats, dtype=float), 'lons': np.asarray(lons, dtype=float)}
+
+
+def run_event_matching(config, station_names):
+    """
+    Katalog (referans) ve HDF5 'srcs' (aday) event'lerini eşler; özet, çiftler ve eşlenmeyenleri yazar.
+
+    Args:
+        config (dict): 'config.py' dosyasından okunan CONFIG sözlüğü.
+        station_names (list): HDF5 istasyon isimleri.
+
+    Returns:
+        dict or None: match_events çıktısı ve 'dt_summary', 'distance_summary'.
+    """
+    match_cfg = config.get('event_match_settings')
+    if not match_cfg:
+        logger.error("Yapılandırmada 'event_match_settings' bölümü bulunamadı.")
+        return None
+    logger.info("\n--- Katalog-HDF5 Event Eşleme Başlatılıyor ---")
+    ref = _catalog_events(config)
+    results = hdf5_dataset_utils.load_configured_results(config['hdf5_data'], station_names, config['seismic_data']['date'])
+    if ref is None or results is None:
+        logger.error("  Hata: Katalog veya HDF5 event'leri okunamadı.")
+        return None
+    cand = {'ids': np.asarray(results['event_ids'], dtype=str), 'times_ns': time_utils.to_ns(results['event_times']),
+            'lats': results['event_lats'], 'lons': results['event_lons']}
+
+    max_dt = match_cfg['max_time_diff_seconds']
+    if match_cfg.get('restrict_to_overlap', True) and len(ref['ids']) and len(cand['ids']):
+        # Sadece iki listenin ortak zaman aralığı (tolerans kadar genişletilmiş) değerlendirilir
+        pad = int(round(max_dt * time_utils.NS_PER_SECOND))
+        t0 = max(ref['times_ns'].min(), cand['times_ns'].min()) - pad
+        t1 = min(ref['times_ns'].max(), cand['times_ns'].max()) + pad
+        ref = {k: v[(ref['times_ns'] >= t0) & (ref['times_ns'] <= t1)] for k, v in ref.items()}
+        cand = {k: v[(cand['times_ns'] >= t0) & (cand['times_ns'] <= t1)] for k, v in cand.items()}
+
+    match_start = time.perf_counter()
+    result = match_events(ref, cand, max_dt, match_cfg['max_distance_km'])
+    match_seconds = time.perf_counter() - match_start
+    result['dt_summary'] = error_summary(result['pairs']['dt_s'])
+    result['distance_summary'] = error_summary(result['pairs']['distance_km'])
+
+    logger.info("  Katalog: %d, HDF5: %d, eşlenen: %d (%.1f ms)", result['n_ref'], result['n_cand'], len(result['pairs']), match_seconds * 1e3)
+    logger.info("  Kesinlik (precision): %.3f, Duyarlılık (recall): %.3f", result['precision'], result['recall'])
+    for label, summary, unit in (("Origin zamanı farkı", result['dt_summary'], "s"), ("Episantr hatası", result['distance_summary'], "km")):
+        if summary:
+            logger.info("  %s: ortalama %.3f %s, std %.3f, MAD %.3f, |hata| p50/p90/p95 %.3f/%.3f/%.3f", label,
+                        summary['mean'], unit, summary['std'], summary['mad'], summary['abs_p50'], summary['abs_p90'], summary['abs_p95'])
+    logger.info("  Eşlenmeyen katalog event'i: %d, eşlenmeyen HDF5 event'i: %d", len(result['missed']), len(result['false']))
+
+    output_folder = match_cfg.get('output_folder')
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+        result['pairs'].to_csv(os.path.join(output_folder, "matched_pairs.csv"), index=False)
+        pd.DataFrame({'source': ['catalog'] * len(result['missed']) + ['hdf5'] * len(result['false']),
+                      'event_id': np.concatenate([result['missed'], result['false']])}).to_csv(
+            os.path.join(output_folder, "unmatched_events.csv"), index=False)
+        plot_match_errors(result).write_html(os.path.join(output_folder, "match_errors.html"), include_plotlyjs='cdn')
+        logger.info("  Sonuçlar yazıldı: %s", output_folder)
+    logger.info("--- Katalog-HDF5 Event Eşleme Tamamlandı ---\n")
+    return result
@@ -0,0 +1,302 @@
+# seismic_analysis/utils/hdf5_dataset_utils.py
+
+import os
+import re
+import glob
+import json
+import threading
+from collections import OrderedDict
+
+import h5py
+import numpy as np
+
+from utils import hdf5_utils
+from utils import time_utils
+
+# Günlük HDF5 sonuç dosyalarından oluşan bir klasörü tek, zamana göre sıralı bir veri kümesi gibi açar.
+# Dosya başına zaman aralığı (index) klasördeki '.hdf5_index.json' dosyasında tutulur ve
+# yalnızca boyutu/mtime'ı değişen dosyalar için yeniden hesaplanır.
+
+_INDEX_FILENAME = ".hdf5_index.json"
+# Dosya adında tarih: ..._2023_12_4_... veya ..._2023-12-04...
+_FILENAME_DATE_PATTERN = re.compile(r'(\d{4})[_-](\d{1,2})[_-](\d{1,2})')
+
+
+class HDF5HandlePool:
+    """
+    Açık h5py.File nesneleri için sınırlı boyutlu LRU havuzu.
+
+    En son kullanılan max_open_files adet dosya açık tutulur; sınır aşıldığında en uzun
+    süredir kullanılmayan dosya kapatılır.
+    """
+
+    def __init__(self, max_open_files=8):
+        self.max_open_files = max(int(max_open_files), 1)
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            hf = self._handles.get(path)
+            if hf is not None and hf.id.valid:
+                self._handles.move_to_end(path)
+                return hf
+            hf = h5py.File(path, 'r')
+            self._handles[path] = hf
+            while len(self._handles) > self.max_open_files:
+                _, old = self._handles.popitem(last=False)
+                old.close()
+            return hf
+
+    def close_all(self):
+        with self._lock:
+            for hf in self._handles.values():
+                if hf.id.valid:
+                    hf.close()
+            self._handles.clear()
+
+    def __len__(self):
+        return len(self._handles)
+
+
+def _file_date(path, hf):
+    """Dosyanın ait olduğu günü 'date' datasetinden (Y, A, G, ...) veya dosya adından çıkarır."""
+    if 'date' in hf and hf['date'].shape and hf['date'].shape[0] >= 3:
+        y, m, d = (int(v) for v in hf['date'][:3])
+        return f"{y:04d}-{m:02d}-{d:02d}"
+    match = _FILENAME_DATE_PATTERN.search(os.path.basename(path))
+    if match:
+        y, m, d = (int(v) for v in match.groups())
+        return f"{y:04d}-{m:02d}-{d:02d}"
+    return None
+
+
+def single_file_date(path):
+    """Tek HDF5 sonuç dosyasının gününü ('date' dataseti veya dosya adı) döndürür; dosya yoksa/belirlenemezse None."""
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        with h5py.File(path, 'r') as hf:
+            return _file_date(path, hf)
+    except OSError:
+        return None
+
+
+def _file_extent_seconds(hf):
+    """Dosyanın kapsadığı zaman aralığını gün başından saniye olarak döndürür (tsteps_abs > srcs/Picks > tam gün)."""
+    if 'tsteps_abs' in hf and hf['tsteps_abs'].shape and hf['tsteps_abs'].shape[0] > 0:
+        tsteps = hf['tsteps_abs']
+        return float(tsteps[0]), float(tsteps[-1])
+    lows = []; highs = []
+    if 'srcs' in hf and hf['srcs'].ndim == 2 and hf['srcs'].shape[0] > 0 and hf['srcs'].shape[1] > 3:
+        ev_secs = hf['srcs'][:, 3]
+        lows.append(ev_secs.min()); highs.append(ev_secs.max())
+    if 'Picks' in hf:
+        for name in hf['Picks']:
+            ds = hf['Picks'][name]
+            if ds.ndim == 2 and ds.shape[0] > 0:
+                col = ds[:, 0]
+                lows.append(col.min()); highs.append(col.max())
+    if lows:
+        return float(min(lows)), float(max(highs))
+    return 0.0, 86400.0
+
+
+class HDF5Dataset:
+    """
+    Günlük HDF5 sonuç dosyalarından oluşan bir klasörü tek bir mantıksal koleksiyon olarak açar.
+
+    Her dosyanın günü ve zaman aralığı index'te tutulur; bir [t0, t1) sorgusu yalnızca bu
+    aralıkla kesişen dosyaları okur. Dosya tutamaçları HDF5HandlePool ile sınırlandırılır.
+
+    Args:
+        folder (str): HDF5 dosyalarının bulunduğu klasör.
+        station_names (list): İstasyon isimleri listesi (data/station_names.py'den).
+        max_open_files (int): Aynı anda açık tutulacak en fazla dosya sayısı.
+        pattern (str): Klasörde aranacak dosya deseni.
+    """
+
+    def __init__(self, folder, station_names, max_open_files=8, pattern="*.hdf5"):
+        self.folder = folder
+        self.station_names = station_names
+        self.pool = HDF5HandlePool(max_open_files)
+        self.files = self._load_index(pattern)
+        self._starts = np.array([f['start_ns'] for f in self.files], dtype=np.int64)
+        self._ends = np.array([f['end_ns'] for f in self.files], dtype=np.int64)
+        # Dosyalar başlangıca göre sıralı; bitişlerin kümülatif maksimumu ikili aramaya izin verir
+        self._max_ends = np.maximum.accumulate(self._ends) if len(self._ends) else self._ends
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.close_all()
+
+    def _load_index(self, pattern):
+        index_path = os.path.join(self.folder, _INDEX_FILENAME)
+        old_index = {}
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    old_index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"  Uyarı: HDF5 index okunamadı, yeniden oluşturulacak: {e}")
+
+        index = {}
+        changed = False
+        for path in sorted(glob.glob(os.path.join(self.folder, pattern))):
+            name = os.path.basename(path)
+            stat = os.stat(path)
+            entry = old_index.get(name)
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+                index[name] = entry
+                continue
+            changed = True
+            try:
+                hf = self.pool.get(path)
+                date = _file_date(path, hf)
+                if date is None:
+                    print(f"  Uyarı: {name} için tarih belirlenemedi (date dataseti veya dosya adı), atlanıyor.")
+                    continue
+                lo, hi = _file_extent_seconds(hf)
+            except OSError as e:
+                print(f"  Uyarı: {name} açılamadı, atlanıyor: {e}")
+                continue
+            day_ns = time_utils.date_start_ns(date)
+            index[name] = {
+                'size': stat.st_size, 'mtime': stat.st_mtime, 'date': date,
+                'start_ns': day_ns + int(round(lo * time_utils.NS_PER_SECOND)),
+                'end_ns': day_ns + int(round(hi * time_utils.NS_PER_SECOND)),
+            }
+
+        if changed or set(index) != set(old_index):
+            try:
+                with open(index_path, 'w', encoding='utf-8') as f:
+                    json.dump(index, f, indent=1)
+            except OSError as e:
+                print(f"  Uyarı: HDF5 index yazılamadı: {e}")
+
+        files = [dict(entry, path=os.path.join(self.folder, name)) for name, entry in index.items()]
+        return sorted(files, key=lambda f: (f['start_ns'], f['path']))
+
+    def files_for_range(self, t0_ns, t1_ns):
+        """[t0, t1) aralığıyla kesişen dosyaları başlangıç zamanına göre sıralı döndürür."""
+        if not self.files:
+            return []
+        last = np.searchsorted(self._starts, t1_ns, side='left')
+        first = np.searchsorted(self._max_ends, t0_ns, side='right')
+        return [f for f in self.files[first:last] if f['end_ns'] > t0_ns]
+
+    def read_range(self, t0_ns, t1_ns):
+        """
+        [t0, t1) aralığındaki pickleri ve event merkezlerini tüm ilgili dosyalardan okur.
+
+        Event kimlikleri günler arasında çakışmasın diye 'YYYY-MM-DD/<id>' biçiminde önekle döndürülür.
+
+        Returns:
+            dict: hdf5_utils.read_hdf5_results ile aynı anahtarlar (aralığa göre filtrelenmiş ve birleştirilmiş).
+        """
+        merged = {'pick_groups': {}, 'event_ids': [], 'event_times': [], 'event_lats': [], 'event_lons': [], 'event_depths': [], 'event_texts': []}
+        t0 = np.datetime64(int(t0_ns), 'ns')
+        t1 = np.datetime64(int(t1_ns), 'ns')
+        for entry in self.files_for_range(t0_ns, t1_ns):
+            results = hdf5_utils.read_hdf5_results(self.pool.get(entry['path']), self.station_names, entry['date'])
+            if results is None:
+                print(f"  Uyarı: {os.path.basename(entry['path'])} okunamadı, atlanıyor.")
+                continue
+
+            for eq_id, types in results['pick_groups'].items():
+                kept = {}
+                for pick_type, picks in types.items():
+                    mask = (picks['time'] >= t0) & (picks['time'] < t1)
+                    if mask.any():
+                        kept[pick_type] = {k: (v[mask] if isinstance(v, np.ndarray) else v) for k, v in picks.items()}
+                if kept:
+                    merged['pick_groups'][f"{entry['date']}/{eq_id}"] = kept
+
+            mask = (results['event_times'] >= t0) & (results['event_times'] < t1)
+            for key in ('event_times', 'event_lats', 'event_lons', 'event_depths'):
+                merged[key].append(results[key][mask])
+            merged['event_texts'].extend(np.asarray(results['event_texts'], dtype=object)[mask].tolist())
+            merged['event_ids'].extend(f"{entry['date']}/{eq_id}" for eq_id in np.asarray(results['event_ids'], dtype=object)[mask])
+
+        for key, dtype in (('event_times', 'datetime64[ns]'), ('event_lats', float), ('event_lons', float), ('event_depths', float)):
+            merged[key] = np.concatenate(merged[key]) if merged[key] else np.empty(0, dtype=dtype)
+        order = np.argsort(merged['event_times'], kind='stable')
+        for key in ('event_times', 'event_lats', 'event_lons', 'event_depths'):
+            merged[key] = merged[key][order]
+        merged['event_texts'] = [merged['event_texts'][i] for i in order]
+        merged['event_ids'] = [merged['event_ids'][i] for i in order]
+        return merged
+
+
+def load_configured_results(hdf5_cfg, station_names, date, full_range=False):
+    """
+    hdf5_data bölümüne göre sonuçları okur: hdf5_folder verilmişse klasör [start, end) aralığında
+    (full_range=True ise klasördeki tüm günler), değilse tek hdf5_file_path dosyası.
+
+    Args:
+        hdf5_cfg (dict): CONFIG['hdf5_data'] bölümü.
+        station_names (list): HDF5 istasyon isimleri.
+        date (str): Tek dosya modunda srcs zamanlarının günü (YYYY-MM-DD).
+        full_range (bool): Klasör modunda start/end yerine tüm dosyaları oku.
+
+    Returns:
+        dict or None: hdf5_utils.read_hdf5_results ile aynı anahtarlar; dosya yoksa None.
+    """
+    if hdf5_cfg.get('hdf5_folder'):
+        with HDF5Dataset(hdf5_cfg['hdf5_folder'], station_names, hdf5_cfg.get('max_open_files', 8)) as dataset:
+            if full_range:
+                t0_ns = min((f['start_ns'] for f in dataset.files), default=0)
+                t1_ns = max((f['end_ns'] for f in dataset.files), default=0) + 1
+            else:
+                t0_ns = time_utils.to_ns(np.datetime64(hdf5_cfg['start'])).item()
+                t1_ns = time_utils.to_ns(np.datetime64(hdf5_cfg['end'])).item()
+            return dataset.read_range(t0_ns, t1_ns)
+    path = hdf5_cfg.get('hdf5_file_path')
+    if not path:
+        return None  # Bu gün için HDF5 dosyası yok (örn. zamanlayıcıda dosyanın kendi günü dışındaki günler)
+    if not os.path.isfile(path):
+        print(f"  Uyarı: HDF5 dosyası bulunamadı: {path}")
+        return None
+    with h5py.File(path, 'r') as hf:
+        return hdf5_utils.read_hdf5_results(hf, station_names, date)
+
+
+def plot_hdf5_dataset_picks(hdf5_folder, station_names, start_str, end_str, max_open_files=8, max_markers=None, density_bins=None):
+    """
+    Günlük HDF5 dosyalarından oluşan klasör için [start, end) aralığında zaman-BOYLAM grafiği oluşturur.
+
+    Args:
+        hdf5_folder (str): Günlük HDF5 dosyalarının bulunduğu klasör.
+        station_names (list): İstasyon isimleri listesi.
+        start_str (str): Başlangıç zamanı (ISO, örn. '2023-12-04T00:00:00').
+        end_str (str): Bitiş zamanı (ISO, dahil değil).
+        max_open_files (int): Tutamaç havuzu boyutu.
+        max_markers (int, optional): Bu sayıdan fazla pick yoğunluk haritası olarak çizilir.
+        density_bins (list, optional): Yoğunluk haritası [zaman bin, boylam bin] sayıları.
+
+    Returns:
+        plotly.graph_objects.Figure or None: Oluşturulan Plotly figürü veya hata.
+    """
+    try:
+        t0_ns = time_utils.to_ns(np.datetime64(start_str)).item()
+        t1_ns = time_utils.to_ns(np.datetime64(end_str)).item()
+    except ValueError:
+        print(f"Hata: Geçersiz HDF5 zaman aralığı: {start_str} - {end_str}")
+        return None
+    if not os.path.isdir(hdf5_folder):
+        print(f"Hata: HDF5 klasörü bulunamadı: {hdf5_folder}")
+        return None
+
+    with HDF5Dataset(hdf5_folder, station_names, max_open_files=max_open_files) as dataset:
+        files = dataset.files_for_range(t0_ns, t1_ns)
+        print(f"  HDF5 veri kümesi: {len(dataset.files)} dosya, aralıkla kesişen: {len(files)} ({start_str} - {end_str})")
+        results = dataset.read_range(t0_ns, t1_ns)
+    fig = hdf5_utils.build_hdf5_figure(results['pick_groups'], results['event_times'], results['event_lons'], results['event_texts'],
+                                       max_markers=max_markers, density_bins=density_bins)
+    fig.update_layout(title=f"HDF5 Verisi: Pickler ve Eventler ({start_str} - {end_str}, {len(files)} dosya)")
+    return fig
@@ -3,9 +3,403 @@ import numpy as np
 import datetime
 import plotly.graph_objects as go
 import pytz # Zaman dilimi için
-import traceback # Detaylı hata loglama için
 
-def plot_hdf5_picks(hdf5_file_path, station_names, analysis_date_str):
+from utils import time_utils
+from utils import spatial_utils
+from utils import log_utils
+
+logger = log_utils.get_logger(__name__)
+
+
+def _log_head_tail(label, rows, n=5):
+    """İlk ve son n satırı DEBUG seviyesinde yazar (seviye kapalıysa hiçbir şey biçimlenmez)."""
+    if not logger.isEnabledFor(log_utils.logging.DEBUG) or len(rows) == 0:
+        return
+    shown = min(n, len(rows))
+    logger.debug("  İlk %d %s verisi:", shown, label)
+    for i in range(shown):
+        logger.debug("    #%d: %s", i, rows[i])
+    if len(rows) > 2 * n:
+        logger.debug("  Son %d %s verisi:", shown, label)
+        for i in range(len(rows) - shown, len(rows)):
+            logger.debug("    #%d: %s", i, rows[i])
+
+
+def read_hdf5_results(hf, station_names, analysis_date_str):
+    """
+    Açık bir HDF5 dosyasından pickleri ve event merkezlerini ('srcs') okur.
+    Zamanlar analysis_date_str gününün başlangıcından itibaren saniye olarak yorumlanır.
+
+    Args:
+        hf (h5py.File): Açık HDF5 dosyası.
+        station_names (list): İstasyon isimleri listesi (data/station_names.py'den).
+        analysis_date_str (str): HDF5 verilerinin ait olduğu gün (YYYY-MM-DD).
+
+    Returns:
+        dict or None: 'pick_groups' ({event_id: {'P'/'S': dizi sözlüğü}}), 'event_ids', 'event_times',
+        'event_lats', 'event_lons', 'event_depths', 'event_texts' anahtarları; format hatasında None.
+        Event'i 'srcs' içinde bulunan pick dizilerinde episantral mesafe ('distance_km') de bulunur.
+    """
+    # 'locs' Verisini Kontrol Et
+    locs = None
+    if 'locs' in hf:
+        locs = np.array(hf['locs'])
+        logger.debug("  HDF5 'locs' verisi bulundu. Boyut: %s", locs.shape)
+        if locs.ndim != 2 or locs.shape[1] < 2:
+             logger.error("Hata: HDF5 'locs' boyutu uygun değil (Nx2+ bekleniyor).")
+             return None
+    else:
+        logger.error("Hata: HDF5 'locs' datasetyi bulunamadı.")
+        return None
+
+    if 'Picks' not in hf: 
+        logger.error("Hata: HDF5 'Picks' grubu bulunamadı.")
+        return None
+
+    # 'srcs' (Event Merkezleri) Oku
+    event_sources = None
+    hdf5_event_times = []
+    hdf5_event_lats = []
+    hdf5_event_lons = []
+    hdf5_event_depths = []
+    hdf5_event_texts = []
+    hdf5_event_ids = []
+
+    if 'srcs' in hf:
+        event_sources = np.array(hf['srcs'])
+        logger.debug("  HDF5 'srcs' veri şekli: %s", event_sources.shape)
+
+        # İlk 5 ve son 5 event verileri (sadece DEBUG seviyesinde)
+        if event_sources.ndim == 2:
+            _log_head_tail("event", event_sources)
+
+        if event_sources.ndim == 2 and event_sources.shape[1] >= 5:
+            ev_lats = event_sources[:, 0]
+            ev_lons = event_sources[:, 1]
+            ev_secs = event_sources[:, 3]  # Saniye varsayıyoruz
+
+            # Saniye cinsinden zaman kontrolü (24*60*60 saniye)
+            valid = (ev_secs >= 0) & (ev_secs <= 86400)
+            event_counter = log_utils.StageCounter(logger, "HDF5 event ayrıştırma")
+            event_counter.add(int(valid.sum()))
+            event_counter.skip("zaman 0-86400 s dışında", int((~valid).sum()))
+            event_counter.emit()
+
+            # Gün başlangıcına tam sayı nanosaniye olarak ekle (toplu dönüşüm)
+            ev_times = time_utils.seconds_of_day_to_datetime64(ev_secs, analysis_date_str)
+            if logger.isEnabledFor(log_utils.logging.DEBUG):
+                for row_idx in sorted(set(range(min(5, len(ev_secs)))) | set(range(max(0, len(ev_secs) - 5), len(ev_secs)))):
+                    logger.debug("    Event #%d ham zaman: %s saniye -> %s", row_idx + 1, ev_secs[row_idx], ev_times[row_idx])
+
+            event_rows = np.flatnonzero(valid)
+            hdf5_event_times = ev_times[event_rows]
+            hdf5_event_lats = ev_lats[event_rows]
+            hdf5_event_lons = ev_lons[event_rows]
+            hdf5_event_depths = event_sources[event_rows, 2]  # Varsayım: 2. sütun derinlik (m)
+            hdf5_event_ids = [str(row_idx) for row_idx in event_rows]  # Picks/{id}_Picks_{P|S} ile eşleşir
+            time_texts = time_utils.format_datetime64(hdf5_event_times)
+            hdf5_event_texts = [
+                f"HDF5 Event Merkezi #{row_idx+1}<br>"
+                f"Zaman: {t}<br>"
+                f"Lat: {lat:.4f}<br>"
+                f"Lon: {lon:.4f}"
+                for row_idx, t, lat, lon in zip(event_rows, time_texts, hdf5_event_lats, hdf5_event_lons)
+            ]
+        else:
+            logger.warning("    Uyarı: HDF5 'srcs' formatı uygun değil.")
+            event_sources = None
+    else:
+        logger.warning("  Uyarı: HDF5 'srcs' datasetyi bulunamadı.")
+
+    # --- Pick Ayrıştırma (Zaman ve Konum Düzeltmesi) ---
+    pick_groups = {}
+    counter = log_utils.StageCounter(logger, "HDF5 pick ayrıştırma")
+    station_names_arr = np.asarray(station_names)
+    # Pick -> event mesafesi için event kimliğinden geçerli event dizisi konumuna
+    event_position = {eq_id: i for i, eq_id in enumerate(hdf5_event_ids)}
+
+    dataset_names = list(hf['Picks'].keys())
+    logger.debug("  HDF5 'Picks' altında %d veri seti", len(dataset_names))
+
+    for dataset_name in dataset_names:
+        parts = dataset_name.split('_')
+        if len(parts) < 2:
+            continue
+
+        earthquake_id = "_".join(parts[:-1])
+        pick_type = parts[-1].upper()
+
+        if pick_type not in ['P', 'S']:
+            continue
+
+        if earthquake_id not in pick_groups:
+            pick_groups[earthquake_id] = {}
+
+        pick_data = np.array(hf['Picks'][dataset_name])
+        _log_head_tail(f"'{dataset_name}' pick", pick_data)
+
+        if pick_data.ndim == 1:
+            pick_data = pick_data.reshape(1, -1)
+
+        if pick_data.shape[1] < 2:
+            counter.skip("sütun sayısı < 2", len(pick_data))
+            continue
+
+        pick_time_sec = pick_data[:, 0]  # Varsayım: Gün başından saniye
+        station_index = pick_data[:, 1].astype(np.int64)
+
+        # Geçersiz satırları toplu olarak ele (neden başına tek uyarı)
+        bad_time = (pick_time_sec < 0) | (pick_time_sec > 86400)  # 24*60*60 saniye
+        bad_index = ~bad_time & ~((station_index >= 0) & (station_index < min(len(station_names), len(locs))))
+        safe_index = np.where(bad_time | bad_index, 0, station_index)
+        # Lat/Lon doğrudan locs'tan
+        # DİKKAT: HDF5 dosyanızda sütun sırası farklıysa (örn. 0=Lat, 1=Lon) bu indeksleri değiştirin!
+        longitude = locs[safe_index, 1]  # Varsayım: 1. sütun Boylam
+        latitude = locs[safe_index, 0]   # Varsayım: 0. sütun Enlem
+        bad_loc = ~bad_time & ~bad_index & (np.isnan(longitude) | np.isnan(latitude))
+        counter.skip("zaman 0-86400 s dışında", int(bad_time.sum()))
+        counter.skip("geçersiz istasyon index", int(bad_index.sum()))
+        counter.skip("NaN konum", int(bad_loc.sum()))
+        keep = ~(bad_time | bad_index | bad_loc)
+        counter.add(int(keep.sum()))
+
+        # Pick Zamanını Hesapla - tam sayı nanosaniye olarak (toplu dönüşüm)
+        pick_times = time_utils.seconds_of_day_to_datetime64(pick_time_sec[keep], analysis_date_str)
+        pick_groups[earthquake_id][pick_type] = {
+            'time': pick_times,
+            'probability': pick_data[keep, 3] if pick_data.shape[1] > 3 else np.full(int(keep.sum()), np.nan),  # Varsayım: 3. sütun olasılık
+            'longitude': longitude[keep],
+            'latitude': latitude[keep],
+            'station': station_names_arr[station_index[keep]],
+            'source': "HDF5 locs",
+        }
+        ev = event_position.get(earthquake_id.split('_')[0])  # '12_Picks' -> srcs satırı 12
+        if ev is not None:
+            pick_groups[earthquake_id][pick_type]['distance_km'] = spatial_utils.haversine_km(
+                hdf5_event_lats[ev], hdf5_event_lons[ev], latitude[keep], longitude[keep])
+
+    counter.emit()
+
+    return {
+        'pick_groups': pick_groups,
+        'event_ids': list(hdf5_event_ids),
+        'event_times': np.asarray(hdf5_event_times, dtype='datetime64[ns]'),
+        'event_lats': np.asarray(hdf5_event_lats, dtype=float),
+        'event_lons': np.asarray(hdf5_event_lons, dtype=float),
+        'event_depths': np.asarray(hdf5_event_depths, dtype=float),
+        'event_texts': list(hdf5_event_texts),
+    }
+
+
+def flatten_pick_groups(pick_groups):
+    """
+    pick_groups ({event_id: {'P'/'S': dizi sözlüğü}}) yapısını pick başına düz dizilere çevirir.
+
+    Returns:
+        dict: 'event_id', 'phase' ve pick dizilerindeki tüm ortak anahtarlar ('time', 'latitude',
+        'longitude', 'station', 'probability', ...) için birleştirilmiş diziler.
+    """
+    parts = {}
+    for eq_id, types in pick_groups.items():
+        for pick_type, picks in types.items():
+            n = len(picks['time'])
+            parts.setdefault('event_id', []).append(np.full(n, eq_id, dtype=object))
+            parts.setdefault('phase', []).append(np.full(n, pick_type))
+            for key, values in picks.items():
+                if isinstance(values, np.ndarray):
+                    parts.setdefault(key, []).append(values)
+    n_groups = len(parts.get('event_id', []))
+    # Sadece tüm gruplarda bulunan diziler birleştirilir (örn. distance_km yalnızca event'i bilinen gruplarda var)
+    flat = {key: np.concatenate(values) for key, values in parts.items() if len(values) == n_groups and n_groups}
+    if not flat:
+        flat = {'event_id': np.empty(0, dtype=object), 'phase': np.empty(0, dtype=str), 'time': np.empty(0, dtype='datetime64[ns]'),
+                'latitude': np.empty(0), 'longitude': np.empty(0), 'station': np.empty(0, dtype=str), 'probability': np.empty(0)}
+    return flat
+
+
+def pick_density(times_ns, values, n_time_bins, n_value_bins, time_range=None, value_range=None):
+    """
+    Pickleri zaman x değer ızgarasında sayar (yoğunluk haritası için).
+
+    Sayısal değerler (örn. boylam) np.histogram2d ile n_value_bins aralığa bölünür; sayısal olmayan
+    değerlerde (örn. istasyon adı) her kategori bir satırdır ve sayım np.bincount ile yapılır.
+    Çıktı boyutu pick sayısından bağımsızdır.
+
+    Args:
+        times_ns (np.ndarray): Pick zamanları (int64 ns).
+        values (np.ndarray): Y ekseni değerleri.
+        n_time_bins, n_value_bins (int): Bin sayıları.
+        time_range (tuple, optional): [t0, t1) ns aralığı (varsayılan verinin kapsamı).
+        value_range (tuple, optional): Sayısal değerler için (min, max) aralığı.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray, np.ndarray): Zaman bin merkezleri (int64 ns), y bin merkezleri
+        (veya kategori isimleri) ve (y, zaman) boyutlu sayım matrisi (Plotly heatmap 'z' düzeni).
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    values = np.asarray(values)
+    if time_range is None:
+        time_range = (int(times_ns.min()), int(times_ns.max()) + 1) if len(times_ns) else (0, 1)
+    t0, t1 = int(time_range[0]), int(time_range[1])
+    in_range = (times_ns >= t0) & (times_ns < t1)
+    # Bin genişliği (ns); float64 hassasiyeti için zamanlar t0'a göre göreli kullanılır
+    width = max(1, -(-(t1 - t0) // n_time_bins))
+    t_centers = t0 + np.arange(n_time_bins, dtype=np.int64) * width + width // 2
+
+    if values.dtype.kind in 'fiu':
+        values = values.astype(float)
+        keep = in_range & np.isfinite(values)
+        if value_range is None:
+            value_range = (float(values[keep].min()), float(values[keep].max())) if keep.any() else (0.0, 1.0)
+        lo, hi = value_range
+        if hi <= lo:
+            lo, hi = lo - 0.5, hi + 0.5
+        counts, _, v_edges = np.histogram2d(
+            (times_ns[keep] - t0).astype(float), values[keep], bins=(n_time_bins, n_value_bins),
+            range=((0, n_time_bins * width), (lo, hi)))
+        return t_centers, (v_edges[:-1] + v_edges[1:]) / 2, counts.T.astype(np.int64)
+
+    labels, codes = np.unique(values[in_range].astype(str), return_inverse=True)
+    t_bins = (times_ns[in_range] - t0) // width
+    counts = np.bincount(codes * n_time_bins + t_bins, minlength=len(labels) * n_time_bins)
+    return t_centers, labels, counts.reshape(len(labels), n_time_bins)
+
+
+def build_hdf5_figure(pick_groups, hdf5_event_times, hdf5_event_lons, hdf5_event_texts, max_markers=None, density_bins=None):
+    """
+    read_hdf5_results çıktısından zaman-BOYLAM grafiği oluşturur.
+
+    Pick sayısı max_markers'ı aşarsa pickler tek tek işaretlenmez; zaman x boylam yoğunluk haritası
+    (density_bins = [zaman bin, boylam bin]) çizilir. Event merkezleri her iki durumda da işaretlenir.
+
+    Returns:
+        plotly.graph_objects.Figure: Oluşturulan Plotly figürü.
+    """
+    # ---- Grafik Oluşturma (Y Ekseni Boylam) ----
+    fig = go.Figure()
+    n_picks = sum(len(picks['time']) for types in pick_groups.values() for picks in types.values())
+    density_mode = max_markers is not None and n_picks > max_markers
+    if density_mode:
+        n_time_bins, n_lon_bins = density_bins or (360, 40)
+        flat = flatten_pick_groups(pick_groups)
+        t_centers, lon_centers, counts = pick_density(
+            time_utils.to_ns(flat['time']), flat['longitude'], n_time_bins, n_lon_bins)
+        logger.info("  HDF5 grafiği: %d pick > %d, %dx%d yoğunluk haritası çiziliyor.", n_picks, max_markers, n_time_bins, n_lon_bins)
+        fig.add_trace(go.Heatmap(
+            x=t_centers.astype('datetime64[ns]'),
+            y=lon_centers,
+            z=np.where(counts > 0, counts, np.nan).astype(np.float32),  # Boş hücreler saydam
+            colorscale='YlOrRd',
+            showscale=False,
+            name='HDF5 Pick Yoğunluğu',
+            hovertemplate='Zaman: %{x}<br>Boylam: %{y:.3f}<br>Pick sayısı: %{z}<extra></extra>',
+        ))
+        pick_groups = {}
+    p_marker = dict(color='blue', symbol='circle', size=8, line=dict(color='black', width=1))
+    s_marker = dict(color='red', symbol='x', size=8, line=dict(color='black', width=1))
+    event_marker_hdf5 = dict(color='magenta', size=10, symbol='diamond', line=dict(color='black', width=1))
+    line_style = dict(color='rgba(0,0,0,0.5)', width=1, dash='dot')
+    has_data = False
+    plotted_p_count = 0
+    plotted_s_count = 0
+
+    # Pickleri Çiz (Y ekseni Boylam)
+    for earthquake_id, pick_types in pick_groups.items():
+        for pick_type, marker in (('P', p_marker), ('S', s_marker)):
+            picks = pick_types.get(pick_type)
+            if picks is None or len(picks['time']) == 0:
+                continue
+            has_data = True
+            if pick_type == 'P':
+                plotted_p_count += len(picks['time'])
+            else:
+                plotted_s_count += len(picks['time'])
+            time_texts = time_utils.format_datetime64(picks['time'])
+            hover_texts = [
+                f"Faz: {pick_type}<br>"
+                f"İstasyon: {st}<br>"
+                f"Zaman: {t}<br>"
+                f"Lon: {lon:.4f}<br>"
+                f"Lat: {lat:.4f}"
+                for st, t, lon, lat in zip(picks['station'], time_texts, picks['longitude'], picks['latitude'])
+            ]
+            # Y Ekseni: longitude
+            fig.add_trace(go.Scatter(
+                x=picks['time'],
+                y=picks['longitude'],
+                mode='markers',
+                marker=marker,
+                name=f'{pick_type} Picks ({earthquake_id})',
+                text=hover_texts,
+                hoverinfo='text',
+                showlegend=False
+            ))
+
+        # Pickleri birleştiren çizgiler (Y ekseni Boylam)
+        present = [pick_types[k] for k in ('P', 'S') if k in pick_types]
+        line_times = np.concatenate([p['time'] for p in present]) if present else np.empty(0, dtype='datetime64[ns]')
+        if len(line_times) > 1:
+            has_data = True
+            line_lons = np.concatenate([p['longitude'] for p in present])
+            order = np.argsort(line_times, kind='stable')
+            # Y Ekseni: longitude
+            fig.add_trace(go.Scatter(
+                x=line_times[order],
+                y=line_lons[order],
+                mode='lines',
+                line=line_style,
+                hoverinfo='none',
+                showlegend=False
+            ))
+
+    if density_mode:
+        has_data = True
+    else:
+        logger.info("  HDF5 grafiğine eklendi: %d P pick, %d S pick.", plotted_p_count, plotted_s_count)
+
+    # HDF5 Event Merkezlerini Çiz (Y ekseni Boylam)
+    if len(hdf5_event_times):
+        has_data = True
+        logger.info("  HDF5 grafiğine %d adet event merkezi ekleniyor.", len(hdf5_event_times))
+        fig.add_trace(go.Scatter(
+            x=hdf5_event_times,
+            y=hdf5_event_lons,  # Y Ekseni: longitude
+            mode='markers',
+            marker=event_marker_hdf5,
+            name='HDF5 Event Merkezleri',
+            hoverinfo='text',
+            text=hdf5_event_texts,
+            showlegend=True
+        ))
+
+    # Grafik Başlığı ve Düzeni
+    if not has_data:
+        logger.warning("  Uyarı: HDF5'te grafiklenecek veri bulunamadı.")
+        fig.add_annotation(
+            text="Veri bulunamadı!",
+            xref="paper", yref="paper",
+            x=0.5, y=0.5,
+            showarrow=False,
+            font=dict(size=20)
+        )
+
+    fig.update_layout(
+        title='HDF5 Verisi: Pickler ve Eventler (Konum: HDF5 \'locs\')',
+        xaxis_title='Zaman (UTC)',
+        yaxis_title='Boylam (°)',  # Y Ekseni Etiketi: Boylam
+        showlegend=True,
+        height=300,
+        template="plotly_white",
+        hovermode='closest',
+        margin=dict(l=50, r=40, t=80, b=40)
+    )
+    # Zaman formatını milisaniye detayına kadar göster
+    fig.update_xaxes(tickformat='%Y-%m-%d\n%H:%M:%S')
+    fig.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    return fig
+
+
+def plot_hdf5_picks(hdf5_file_path, station_names, analysis_date_str, max_markers=None, density_bins=None):
     """
     HDF5'ten pickleri ve event merkezlerini ('srcs') okur.
     Konumları DOĞRUDAN HDF5 içerisindeki 'locs' verisinden alır.
@@ -16,347 +410,41 @@ def plot_hdf5_picks(hdf5_file_path, station_names, analysis_date_str):
         hdf5_file_path (str): HDF5 dosyasının yolu.
         station_names (list): İstasyon isimleri listesi (data/station_names.py'den).
         analysis_date_str (str): HDF5 verilerinin ait olduğu gün (YYYY-MM-DD).
+        max_markers (int, optional): Bu sayıdan fazla pick yoğunluk haritası olarak çizilir.
+        density_bins (list, optional): Yoğunluk haritası [zaman bin, boylam bin] sayıları.
 
     Returns:
         plotly.graph_objects.Figure or None: Oluşturulan Plotly figürü veya hata.
     """
-    print(f"  HDF5 verisi işleniyor. Analiz tarihi: {analysis_date_str}")
-    print(f"  UYARI: Konumlar doğrudan HDF5 'locs' verisinden alınacak.")
-    print(f"  VARSAYIM: HDF5 Event zamanları (srcs), {analysis_date_str} 00:00:00 UTC'den itibaren geçen SANİYE cinsindendir.")
-    print(f"  VARSAYIM: HDF5 Pick zamanları, {analysis_date_str} 00:00:00 UTC'den itibaren geçen SANİYE cinsindendir.")
+    if not hdf5_file_path:
+        logger.warning("Uyarı: %s için HDF5 dosyası yok (hdf5_file_path boş).", analysis_date_str)
+        return None
+    logger.info("  HDF5 verisi işleniyor. Analiz tarihi: %s", analysis_date_str)
+    logger.debug("  UYARI: Konumlar doğrudan HDF5 'locs' verisinden alınacak.")
+    logger.debug("  VARSAYIM: HDF5 Event zamanları (srcs), %s 00:00:00 UTC'den itibaren geçen SANİYE cinsindendir.", analysis_date_str)
+    logger.debug("  VARSAYIM: HDF5 Pick zamanları, %s 00:00:00 UTC'den itibaren geçen SANİYE cinsindendir.", analysis_date_str)
 
     # Analiz tarihini işle (Event ve Pick zamanları için gerekli)
     try:
         analysis_date = datetime.datetime.strptime(analysis_date_str, '%Y-%m-%d').date()
         day_start_utc = datetime.datetime.combine(analysis_date, datetime.time.min, tzinfo=pytz.UTC)
-        print(f"  HDF5 zamanları için gün başlangıcı (UTC): {day_start_utc}")
+        logger.debug("  HDF5 zamanları için gün başlangıcı (UTC): %s", day_start_utc)
     except ValueError:
-        print(f"Hata: Geçersiz analiz tarihi formatı: {analysis_date_str}. YYYY-MM-DD bekleniyor.")
+        logger.error("Hata: Geçersiz analiz tarihi formatı: %s. YYYY-MM-DD bekleniyor.", analysis_date_str)
         return None
 
     try:
         with h5py.File(hdf5_file_path, 'r') as hf:
-            # 'locs' Verisini Kontrol Et
-            locs = None
-            if 'locs' in hf:
-                locs = np.array(hf['locs'])
-                print(f"  HDF5 'locs' verisi bulundu. Boyut: {locs.shape}")
-                if locs.ndim != 2 or locs.shape[1] < 2:
-                     print(f"Hata: HDF5 'locs' boyutu uygun değil (Nx2+ bekleniyor).")
-                     return None
-            else:
-                print(f"Hata: HDF5 'locs' datasetyi bulunamadı.")
+            results = read_hdf5_results(hf, station_names, analysis_date_str)
+            if results is None:
                 return None
-
-            if 'Picks' not in hf: 
-                print(f"Hata: HDF5 'Picks' grubu bulunamadı.")
-                return None
-
-            # 'srcs' (Event Merkezleri) Oku
-            event_sources = None
-            hdf5_event_times = []
-            hdf5_event_lats = []
-            hdf5_event_lons = []
-            hdf5_event_texts = []
-            
-            if 'srcs' in hf:
-                event_sources = np.array(hf['srcs'])
-                print(f"  HDF5 'srcs' veri şekli: {event_sources.shape}")
-                
-                # İlk 5 ve son 5 event verilerini yazdır
-                if event_sources.ndim == 2 and len(event_sources) > 0:
-                    max_to_show = min(5, len(event_sources))
-                    print(f"  İlk {max_to_show} event verisi:")
-                    for i in range(max_to_show):
-                        print(f"    Event #{i}: {event_sources[i]}")
-                    
-                    if len(event_sources) > 10:
-                        print(f"  Son {max_to_show} event verisi:")
-                        for i in range(-max_to_show, 0):
-                            print(f"    Event #{len(event_sources)+i}: {event_sources[i]}")
-                
-                if event_sources.ndim == 2 and event_sources.shape[1] >= 5:
-                    for row_idx, row in enumerate(event_sources):
-                        try:
-                            ev_lat = row[0]
-                            ev_lon = row[1]
-                            ev_time_sec_of_day = row[3]  # Saniye varsayıyoruz
-                            
-                            # Event zamanı kontrolü ve yazdırma
-                            if row_idx < 5 or row_idx >= len(event_sources) - 5:
-                                print(f"    Event #{row_idx+1} ham zaman: {ev_time_sec_of_day} saniye")
-                            
-                            # Saniye cinsinden zaman kontrolü
-                            if ev_time_sec_of_day < 0 or ev_time_sec_of_day > 86400:  # 24*60*60 saniye
-                                print(f"    Uyarı: Event zamanı mantıksız: {ev_time_sec_of_day} saniye. Atlanıyor.")
-                                continue
-                                
-                            # Saniye cinsinden zaman (kayan nokta değerini doğrudan kullan)
-                            time_delta = datetime.timedelta(seconds=ev_time_sec_of_day)
-                            ev_time_dt = day_start_utc + time_delta  # Gün başlangıcına ekle
-                            
-                            # Dönüştürülmüş zamanı yazdır
-                            if row_idx < 5 or row_idx >= len(event_sources) - 5:
-                                print(f"    Event #{row_idx+1} dönüştürülmüş zaman: {ev_time_dt}")
-                            
-                            hdf5_event_times.append(ev_time_dt)
-                            hdf5_event_lats.append(ev_lat)
-                            hdf5_event_lons.append(ev_lon)
-                            
-                            # Formatlı metin oluşturma
-                            hdf5_event_texts.append(
-                                f"HDF5 Event Merkezi #{row_idx+1}<br>"
-                                f"Zaman: {ev_time_dt.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}<br>"
-                                f"Lat: {ev_lat:.4f}<br>"
-                                f"Lon: {ev_lon:.4f}"
-                            )
-                        except (IndexError, ValueError) as e:
-                            print(f"    Uyarı: HDF5 'srcs' satırı {row_idx} işlenemedi: {row} - Hata: {e}")
-                else:
-                    print(f"    Uyarı: HDF5 'srcs' formatı uygun değil.")
-                    event_sources = None
-            else:
-                print("  Uyarı: HDF5 'srcs' datasetyi bulunamadı.")
-
-            # --- Pick Ayrıştırma (Zaman ve Konum Düzeltmesi) ---
-            pick_groups = {}
-            processed_pick_count = 0
-            skipped_pick_count = 0
-            pick_dataset_counts = {}
-            
-            # Tüm Pick datasetlerini kontrol et ve sayıları yazdır
-            print(f"  HDF5 'Picks' altındaki veri setleri:")
-            for dataset_name in hf['Picks'].keys():
-                pick_data = np.array(hf['Picks'][dataset_name])
-                pick_dataset_counts[dataset_name] = len(pick_data)
-                print(f"    {dataset_name}: {len(pick_data)} veri")
-            
-            for dataset_name in hf['Picks'].keys():
-                parts = dataset_name.split('_')
-                if len(parts) < 2:
-                    continue
-                    
-                earthquake_id = "_".join(parts[:-1])
-                pick_type = parts[-1].upper()
-                
-                if pick_type not in ['P', 'S']:
-                    continue
-                    
-                if earthquake_id not in pick_groups:
-                    pick_groups[earthquake_id] = {'P': [], 'S': []}
-                    
-                pick_data = np.array(hf['Picks'][dataset_name])
-                
-                # İlk 5 ve son 5 pick verilerini yazdır
-                if len(pick_data) > 0:
-                    max_picks_to_show = min(5, len(pick_data))
-                    print(f"  İlk {max_picks_to_show} '{dataset_name}' pick verisi:")
-                    for i in range(max_picks_to_show):
-                        print(f"    Pick #{i}: {pick_data[i]}")
-                    
-                    if len(pick_data) > 10:
-                        print(f"  Son {max_picks_to_show} '{dataset_name}' pick verisi:")
-                        for i in range(-max_picks_to_show, 0):
-                            print(f"    Pick #{len(pick_data)+i}: {pick_data[i]}")
-                
-                if pick_data.ndim == 1:
-                    pick_data = pick_data.reshape(1, -1)
-                    
-                if pick_data.shape[1] < 2:
-                    continue
-
-                for pick_idx, pick_row in enumerate(pick_data):
-                    processed_pick_count += 1
-                    try:
-                        pick_time_sec = pick_row[0]  # Varsayım: Gün başından saniye
-                        station_index = int(pick_row[1])
-                        
-                        # Ham verileri yazdır
-                        if pick_idx < 5 or pick_idx >= len(pick_data) - 5:
-                            print(f"    {dataset_name} #{pick_idx+1} ham zaman: {pick_time_sec} saniye, istasyon: {station_index}")
-                        
-                        # Pick zamanı kontrolü
-                        if pick_time_sec < 0 or pick_time_sec > 86400:  # 24*60*60 saniye
-                            print(f"    Uyarı: Pick zamanı mantıksız: {pick_time_sec} saniye. Atlanıyor.")
-                            skipped_pick_count += 1
-                            continue
-
-                        if not (0 <= station_index < len(station_names)):
-                            print(f"    Uyarı: Geçersiz istasyon index ({station_index}), names sınırı. Atlanıyor.")
-                            skipped_pick_count += 1
-                            continue
-                            
-                        if not (0 <= station_index < len(locs)):
-                            print(f"    Uyarı: Geçersiz istasyon index ({station_index}), locs sınırı. Atlanıyor.")
-                            skipped_pick_count += 1
-                            continue
-
-                        # Pick Zamanını Hesapla - Tam saniye ve mikrosaniye olarak ayır
-                        seconds = int(pick_time_sec)
-                        microseconds = int((pick_time_sec - seconds) * 1000000)
-                        pick_time_delta = datetime.timedelta(seconds=seconds, microseconds=microseconds)
-                        pick_datetime_obj = day_start_utc + pick_time_delta
-                        
-                        # Dönüştürülmüş zamanı yazdır
-                        if pick_idx < 5 or pick_idx >= len(pick_data) - 5:
-                            print(f"    {dataset_name} #{pick_idx+1} dönüştürülmüş zaman: {pick_datetime_obj}")
-
-                        station_name = station_names[station_index]
-
-                        # Lat/Lon doğrudan locs'tan
-                        # DİKKAT: HDF5 dosyanızda sütun sırası farklıysa (örn. 0=Lat, 1=Lon) bu indeksleri değiştirin!
-                        longitude = locs[station_index, 1]  # Varsayım: 1. sütun Boylam
-                        latitude = locs[station_index, 0]   # Varsayım: 0. sütun Enlem
-                        source = "HDF5 locs"
-                        
-                        if np.isnan(longitude) or np.isnan(latitude):
-                            print(f"    Uyarı: NaN konum (İstasyon: {station_name}). Atlanıyor.")
-                            skipped_pick_count += 1
-                            continue
-
-                        pick_groups[earthquake_id][pick_type].append({
-                            'time': pick_datetime_obj,
-                            'longitude': longitude,
-                            'latitude': latitude,
-                            'station': station_name,
-                            'source': source
-                        })
-
-                    except (IndexError, ValueError) as e:
-                        print(f"    Hata: Pick satırı işlenirken hata (Satır: {pick_row}) - {e}. Atlanıyor.")
-                        skipped_pick_count += 1
-                        continue
-                    except Exception as e_gen:
-                        print(f"    Hata: Pick satırı beklenmedik hata (Satır: {pick_row}) - {e_gen}. Atlanıyor.")
-                        traceback.print_exc()
-                        skipped_pick_count += 1
-                        continue
-                        
-            print(f"  HDF5 pick ayrıştırma özeti: İşlenen={processed_pick_count}, Atlanan={skipped_pick_count}")
-
-            # ---- Grafik Oluşturma (Y Ekseni Boylam) ----
-            fig = go.Figure()
-            p_marker = dict(color='blue', symbol='circle', size=8, line=dict(color='black', width=1))
-            s_marker = dict(color='red', symbol='x', size=8, line=dict(color='black', width=1))
-            event_marker_hdf5 = dict(color='magenta', size=10, symbol='diamond', line=dict(color='black', width=1))
-            line_style = dict(color='rgba(0,0,0,0.5)', width=1, dash='dot')
-            has_data = False
-            plotted_p_count = 0
-            plotted_s_count = 0
-
-            # Pickleri Çiz (Y ekseni Boylam)
-            for earthquake_id, pick_types in pick_groups.items():
-                p_picks = pick_types.get('P', [])
-                s_picks = pick_types.get('S', [])
-                
-                if p_picks:
-                    has_data = True
-                    plotted_p_count += len(p_picks)
-                    hover_texts_p = [
-                        f"Faz: P<br>"
-                        f"İstasyon: {p['station']}<br>"
-                        f"Zaman: {p['time'].strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}<br>"
-                        f"Lon: {p['longitude']:.4f}<br>"
-                        f"Lat: {p['latitude']:.4f}"
-                        for p in p_picks
-                    ]
-                    # Y Ekseni: longitude
-                    fig.add_trace(go.Scatter(
-                        x=[p['time'] for p in p_picks],
-                        y=[p['longitude'] for p in p_picks],
-                        mode='markers',
-                        marker=p_marker,
-                        name=f'P Picks ({earthquake_id})',
-                        text=hover_texts_p,
-                        hoverinfo='text',
-                        showlegend=False
-                    ))
-                    
-                if s_picks:
-                    has_data = True
-                    plotted_s_count += len(s_picks)
-                    hover_texts_s = [
-                        f"Faz: S<br>"
-                        f"İstasyon: {s['station']}<br>"
-                        f"Zaman: {s['time'].strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}<br>"
-                        f"Lon: {s['longitude']:.4f}<br>"
-                        f"Lat: {s['latitude']:.4f}"
-                        for s in s_picks
-                    ]
-                    # Y Ekseni: longitude
-                    fig.add_trace(go.Scatter(
-                        x=[s['time'] for s in s_picks],
-                        y=[s['longitude'] for s in s_picks],
-                        mode='markers',
-                        marker=s_marker,
-                        name=f'S Picks ({earthquake_id})',
-                        text=hover_texts_s,
-                        hoverinfo='text',
-                        showlegend=False
-                    ))
-                    
-                # Pickleri birleştiren çizgiler (Y ekseni Boylam)
-                all_picks = sorted(p_picks + s_picks, key=lambda x: x['time'])
-                if len(all_picks) > 1:
-                    has_data = True
-                    # Y Ekseni: longitude
-                    fig.add_trace(go.Scatter(
-                        x=[p['time'] for p in all_picks],
-                        y=[p['longitude'] for p in all_picks],
-                        mode='lines',
-                        line=line_style,
-                        hoverinfo='none',
-                        showlegend=False
-                    ))
-                    
-            print(f"  HDF5 grafiğine eklendi: {plotted_p_count} P pick, {plotted_s_count} S pick.")
-
-            # HDF5 Event Merkezlerini Çiz (Y ekseni Boylam)
-            if hdf5_event_times:
-                has_data = True
-                print(f"  HDF5 grafiğine {len(hdf5_event_times)} adet event merkezi ekleniyor.")
-                fig.add_trace(go.Scatter(
-                    x=hdf5_event_times,
-                    y=hdf5_event_lons,  # Y Ekseni: longitude
-                    mode='markers',
-                    marker=event_marker_hdf5,
-                    name='HDF5 Event Merkezleri',
-                    hoverinfo='text',
-                    text=hdf5_event_texts,
-                    showlegend=True
-                ))
-
-            # Grafik Başlığı ve Düzeni
-            if not has_data:
-                print("  Uyarı: HDF5'te grafiklenecek veri bulunamadı.")
-                fig.add_annotation(
-                    text="Veri bulunamadı!",
-                    xref="paper", yref="paper",
-                    x=0.5, y=0.5,
-                    showarrow=False,
-                    font=dict(size=20)
-                )
-                
-            fig.update_layout(
-                title='HDF5 Verisi: Pickler ve Eventler (Konum: HDF5 \'locs\')',
-                xaxis_title='Zaman (UTC)',
-                yaxis_title='Boylam (°)',  # Y Ekseni Etiketi: Boylam
-                showlegend=True,
-                height=300,
-                template="plotly_white",
-                hovermode='closest',
-                margin=dict(l=50, r=40, t=80, b=40)
-            )
-            # Zaman formatını milisaniye detayına kadar göster
-            fig.update_xaxes(tickformat='%Y-%m-%d\n%H:%M:%S')
-            fig.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-            return fig
+            return build_hdf5_figure(results['pick_groups'], results['event_times'], results['event_lons'], results['event_texts'],
+                                     max_markers=max_markers, density_bins=density_bins)
 
     # Hata Yakalama
     except FileNotFoundError:
-        print(f"Hata: HDF5 dosyası bulunamadı: {hdf5_file_path}")
+        logger.error("Hata: HDF5 dosyası bulunamadı: %s", hdf5_file_path)
         return None
     except Exception as e:
-        print(f'HDF5 verisi işlenirken beklenmedik bir hata oluştu: {str(e)}')
-        traceback.print_exc()
+        logger.exception("HDF5 verisi işlenirken beklenmedik bir hata oluştu: %s", e)
         return None
\ No newline at end of file
@@ -0,0 +1,232 @@
+# seismic_analysis/utils/hdf5_writer_utils.py
+
+import os
+
+import h5py
+import numpy as np
+import pandas as pd
+
+from utils import log_utils
+from utils import time_utils
+
+try:
+    import hdf5plugin  # İsteğe bağlı; varsa Blosc/LZ4 kullanılır (okuyan tarafta da import edilmesi gerekir)
+except ImportError:
+    hdf5plugin = None
+
+logger = log_utils.get_logger(__name__)
+
+# İşlenmiş ürünler için HDF5 çıktı katmanı (girdi dosyasındaki locs/srcs/Picks düzeninin yanında).
+# Dosya düzeni:
+#   /traces/{ürün}/{seed_id}   -> 1-B float32, sınırsız uzunluk; attrs: starttime_ns, sampling_rate
+#   /tables/{tablo}/{sütun}    -> sütun başına 1-B veri seti, sınırsız uzunluk; grup attrs: time_column
+# Tüm veri setleri parçalı (chunked) ve sıkıştırılmıştır; parça boyu zaman penceresi okumalarına göre
+# seçilir, böylece bir pencere okumak sadece kesişen parçaları açar. Yazıcı 'a' kipinde açılır ve
+# işlem ilerledikçe parçalar veri setlerinin sonuna eklenir.
+
+COMPRESSIONS = ("auto", "blosc-lz4", "gzip", "lzf", None)
+_MIN_TRACE_CHUNK = 1024
+_DATETIME_KIND = 'datetime64[ns]'
+
+
+def compression_kwargs(compression="auto", level=4):
+    """
+    create_dataset için sıkıştırma argümanları.
+
+    "auto": hdf5plugin kuruluysa Blosc/LZ4 (byte shuffle), değilse gzip. Her durumda shuffle filtresi açıktır.
+
+    Raises:
+        ValueError: "blosc-lz4" istenip hdf5plugin kurulu değilse veya sıkıştırma tipi bilinmiyorsa.
+    """
+    if compression == "auto":
+        compression = "blosc-lz4" if hdf5plugin is not None else "gzip"
+    if compression == "blosc-lz4":
+        if hdf5plugin is None:
+            raise ValueError("blosc-lz4 sıkıştırma için 'hdf5plugin' paketi kurulu olmalı (pip install hdf5plugin).")
+        return dict(hdf5plugin.Blosc(cname='lz4', clevel=level, shuffle=hdf5plugin.Blosc.SHUFFLE))
+    if compression == "gzip":
+        return {'compression': 'gzip', 'compression_opts': level, 'shuffle': True}
+    if compression == "lzf":
+        return {'compression': 'lzf', 'shuffle': True}
+    if compression is None:
+        return {}
+    raise ValueError(f"Geçersiz sıkıştırma '{compression}' (seçenekler: {COMPRESSIONS}).")
+
+
+def _append(dataset, values):
+    """Sınırsız uzunluklu 1-B veri setinin sonuna ekler."""
+    n = dataset.shape[0]
+    dataset.resize((n + len(values),))
+    dataset[n:] = values
+
+
+class HDF5ResultWriter:
+    """
+    İşlenmiş izleri (filtrelenmiş trace, zarf) ve tabloları (pick, rezidüel) ekleme kipinde yazar.
+
+    'with' bloğu olarak kullanılır; dosya çıkışta kapatılır.
+
+    Args:
+        path (str): Çıktı HDF5 dosyası (yoksa oluşturulur, varsa sonuna eklenir).
+        compression (str, optional): COMPRESSIONS içinden biri.
+        level (int): Sıkıştırma seviyesi (gzip 1-9, blosc 0-9).
+        chunk_seconds (float): Trace parçalarının süresi (s).
+        table_chunk_rows (int): Tablo parçalarının satır sayısı.
+    """
+
+    def __init__(self, path, compression="auto", level=4, chunk_seconds=300, table_chunk_rows=16384):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.filters = compression_kwargs(compression, level)
+        self.chunk_seconds = chunk_seconds
+        self.table_chunk_rows = table_chunk_rows
+        self.hf = h5py.File(path, 'a')
+
+    @classmethod
+    def from_config(cls, path, settings=None):
+        """'hdf5_output_settings' bölümüyle yazıcı oluşturur."""
+        settings = settings or {}
+        return cls(path, compression=settings.get('compression', "auto"), level=settings.get('compression_level', 4),
+                   chunk_seconds=settings.get('chunk_seconds', 300), table_chunk_rows=settings.get('table_chunk_rows', 16384))
+
+    def close(self):
+        if self.hf:
+            self.hf.close()
+            self.hf = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def remove(self, name):
+        """'traces/{ürün}' veya 'tables/{tablo}' grubunu siler (yeniden çalıştırmada eski sonuçlar karışmasın)."""
+        if name in self.hf:
+            del self.hf[name]
+
+    def append_trace(self, product, seed_id, data, starttime_ns, sampling_rate):
+        """
+        Bir trace parçasını '/traces/{product}/{seed_id}' veri setinin sonuna ekler.
+
+        Parça mevcut verinin bitişinden sonra başlıyorsa aradaki boşluk NaN ile doldurulur.
+
+        Raises:
+            ValueError: Örnekleme frekansı farklıysa veya parça mevcut veriyle çakışıyorsa.
+        """
+        data = np.asarray(data, dtype=np.float32)
+        delta_ns = time_utils.NS_PER_SECOND / sampling_rate
+        name = f"traces/{product}/{seed_id}"
+        if name not in self.hf:
+            chunk = max(_MIN_TRACE_CHUNK, int(round(self.chunk_seconds * sampling_rate)))
+            dataset = self.hf.create_dataset(name, shape=(0,), maxshape=(None,), dtype=np.float32,
+                                             chunks=(chunk,), fillvalue=np.nan, **self.filters)
+            dataset.attrs['starttime_ns'] = int(starttime_ns)
+            dataset.attrs['sampling_rate'] = float(sampling_rate)
+            _append(dataset, data)
+            return
+        dataset = self.hf[name]
+        if not np.isclose(dataset.attrs['sampling_rate'], sampling_rate):
+            raise ValueError(f"{name}: örnekleme frekansı {dataset.attrs['sampling_rate']} Hz, eklenen {sampling_rate} Hz.")
+        gap = int(round((int(starttime_ns) - int(dataset.attrs['starttime_ns'])) / delta_ns)) - dataset.shape[0]
+        if gap < 0:
+            raise ValueError(f"{name}: eklenen parça mevcut veriyle {-gap} örnek çakışıyor.")
+        if gap:
+            _append(dataset, np.full(gap, np.nan, dtype=np.float32))
+        _append(dataset, data)
+
+    def append_table(self, name, frame, time_column=None):
+        """
+        DataFrame satırlarını '/tables/{name}' altındaki sütun veri setlerinin sonuna ekler.
+
+        Metin sütunları değişken uzunluklu UTF-8, datetime64 sütunları int64 ns (attrs kind) olarak saklanır.
+        İlk eklemede sütunlar belirlenir; sonraki eklemeler aynı sütunları içermelidir.
+
+        Raises:
+            ValueError: Sütunlar ilk eklemedekilerle uyuşmuyorsa.
+        """
+        group = self.hf.require_group(f"tables/{name}")
+        columns = list(group.attrs.get('columns', []))
+        if not columns:
+            columns = [str(c) for c in frame.columns]
+            group.attrs['columns'] = columns
+            if time_column:
+                group.attrs['time_column'] = time_column
+        elif sorted(columns) != sorted(str(c) for c in frame.columns):
+            raise ValueError(f"tables/{name}: sütunlar {columns}, eklenen {list(frame.columns)}.")
+        for column in columns:
+            values, kind = _column_values(frame[column])
+            if column not in group:
+                dtype = h5py.string_dtype() if kind == 'str' else values.dtype
+                dataset = group.create_dataset(column, shape=(0,), maxshape=(None,), dtype=dtype,
+                                               chunks=(self.table_chunk_rows,), **self.filters)
+                dataset.attrs['kind'] = kind
+            _append(group[column], values)
+
+
+def _column_values(series):
+    """pandas sütununu HDF5'e yazılacak diziye ve tür etiketine çevirir."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return time_utils.to_ns(series.to_numpy(dtype='datetime64[ns]')), _DATETIME_KIND
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(), str(series.dtype)
+    return series.astype(str).to_numpy(dtype=object), 'str'
+
+
+def read_trace_window(path, product, seed_id, t0_ns=None, t1_ns=None):
+    """
+    '/traces/{product}/{seed_id}' veri setinden [t0, t1) aralığını okur (sadece kesişen parçalar açılır).
+
+    Returns:
+        tuple(int, float, np.ndarray) or None: İlk okunan örneğin zamanı (ns), örnekleme frekansı ve float32 dizi;
+        veri seti yoksa None.
+    """
+    with h5py.File(path, 'r') as hf:
+        name = f"traces/{product}/{seed_id}"
+        if name not in hf:
+            return None
+        dataset = hf[name]
+        start_ns = int(dataset.attrs['starttime_ns'])
+        fs = float(dataset.attrs['sampling_rate'])
+        delta_ns = time_utils.NS_PER_SECOND / fs
+        i0 = 0 if t0_ns is None else max(0, int(np.ceil((t0_ns - start_ns) / delta_ns)))
+        i1 = dataset.shape[0] if t1_ns is None else min(dataset.shape[0], max(0, int(np.ceil((t1_ns - start_ns) / delta_ns))))
+        i1 = max(i0, i1)
+        return start_ns + int(round(i0 * delta_ns)), fs, dataset[i0:i1]
+
+
+def read_table_window(path, name, t0_ns=None, t1_ns=None):
+    """
+    '/tables/{name}' tablosunu DataFrame olarak okur; zaman sütunu varsa [t0, t1) aralığıyla süzer.
+
+    Önce sadece zaman sütunu okunur; diğer sütunlardan yalnızca eşleşen satırları kapsayan dilim okunur.
+    """
+    with h5py.File(path, 'r') as hf:
+        group_name = f"tables/{name}"
+        if group_name not in hf:
+            return pd.DataFrame()
+        group = hf[group_name]
+        columns = list(group.attrs.get('columns', []))
+        time_column = group.attrs.get('time_column')
+        rows = slice(None)
+        mask = None
+        if time_column and (t0_ns is not None or t1_ns is not None):
+            times = group[time_column][:]
+            mask = np.ones(len(times), dtype=bool)
+            if t0_ns is not None:
+                mask &= times >= t0_ns
+            if t1_ns is not None:
+                mask &= times < t1_ns
+            hits = np.flatnonzero(mask)
+            rows = slice(int(hits[0]), int(hits[-1]) + 1) if len(hits) else slice(0, 0)
+            mask = mask[rows]
+        data = {}
+        for column in columns:
+            dataset = group[column]
+            kind = dataset.attrs.get('kind')
+            values = dataset.asstr()[rows] if kind == 'str' else dataset[rows]
+            if mask is not None:
+                values = values[mask]
+            data[column] = values.view('datetime64[ns]') if kind == _DATETIME_KIND else values
+        return pd.DataFrame(data, columns=columns)
@@ -0,0 +1,105 @@
+# seismic_analysis/utils/log_utils.py
+
+import logging
+import sys
+from collections import Counter
+
+# Tanılama katmanı: modüller print yerine logging.getLogger(__name__) kullanır ('utils.*' hiyerarşisi).
+# Mesajlar tembel biçimlenir (logger.debug("... %s", x)); seviye kapalıysa metin hiç oluşturulmaz.
+# Satır başına uyarılar yerine StageCounter ile sayılar (işlenen, atlanan, neden) toplanır ve
+# aşama sonunda tek satır olarak yazılır.
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_ROOT_LOGGER = "utils"
+_HANDLER_NAME = "seismic_analysis"
+
+
+def get_logger(name):
+    """Modül logger'ı (örn. get_logger(__name__) -> 'utils.hdf5_utils')."""
+    return logging.getLogger(name)
+
+
+def parse_module_levels(entries):
+    """
+    ["utils.hdf5_utils=DEBUG", ...] girdilerini {modül: seviye} sözlüğüne çevirir.
+
+    Raises:
+        ValueError: Girdi 'modül=SEVİYE' biçiminde değilse veya seviye bilinmiyorsa.
+    """
+    levels = {}
+    for entry in entries or []:
+        name, sep, level = str(entry).partition('=')
+        level = level.strip().upper()
+        if not sep or not name.strip() or level not in LEVELS:
+            raise ValueError(f"'{entry}' (beklenen: modül=SEVİYE, SEVİYE: {', '.join(LEVELS)})")
+        levels[name.strip()] = level
+    return levels
+
+
+def configure_logging(settings=None):
+    """
+    'utils' logger hiyerarşisini yapılandırmadaki 'logging_settings' bölümüne göre ayarlar.
+
+    Tekrar çağrılırsa önceki işleyici değiştirilir (işleyici çoğalmaz).
+
+    Args:
+        settings (dict, optional): 'level', 'module_levels' (["modül=SEVİYE", ...]) ve 'format' anahtarları.
+    """
+    settings = settings or {}
+    root = logging.getLogger(_ROOT_LOGGER)
+    for handler in [h for h in root.handlers if h.get_name() == _HANDLER_NAME]:
+        root.removeHandler(handler)
+    # print çıktılarıyla aynı akışa yazılır, böylece mesaj sırası korunur
+    handler = logging.StreamHandler(sys.stdout)
+    handler.set_name(_HANDLER_NAME)
+    handler.setFormatter(logging.Formatter(settings.get('format') or "%(message)s"))
+    root.addHandler(handler)
+    root.setLevel(settings.get('level') or "INFO")
+    root.propagate = False
+    for name, level in parse_module_levels(settings.get('module_levels')).items():
+        logging.getLogger(name).setLevel(level)
+
+
+class StageCounter:
+    """
+    Bir işleme aşamasında işlenen/atlanan kayıt sayılarını (atlama nedenine göre) toplar.
+
+    Aşama sonunda emit() tek bir satır yazar; atlanan kayıt varsa WARNING, yoksa INFO seviyesinde.
+    'with' bloğu olarak kullanıldığında çıkışta otomatik yazılır.
+
+    Args:
+        logger (logging.Logger): Özetin yazılacağı logger.
+        stage (str): Aşama adı (örn. "HDF5 pick ayrıştırma").
+    """
+
+    def __init__(self, logger, stage):
+        self.logger = logger
+        self.stage = stage
+        self.processed = 0
+        self.skipped = Counter()
+
+    def add(self, n=1):
+        self.processed += int(n)
+
+    def skip(self, reason, n=1):
+        if n:
+            self.skipped[reason] += int(n)
+
+    @property
+    def n_skipped(self):
+        return sum(self.skipped.values())
+
+    def emit(self):
+        if self.skipped:
+            reasons = ", ".join(f"{reason}: {n}" for reason, n in self.skipped.most_common())
+            self.logger.warning("  %s özeti: İşlenen=%d, Atlanan=%d (%s)", self.stage, self.processed, self.n_skipped, reasons)
+        else:
+            self.logger.info("  %s özeti: İşlenen=%d, Atlanan=0", self.stage, self.processed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.emit()
+        return False
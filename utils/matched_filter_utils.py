@@ -0,0 +1,339 @@
+# seismic_analysis/utils/matched_filter_utils.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from obspy import Stream, read
+from scipy import fft as sp_fft
+from scipy.signal import find_peaks
+
+from utils import catalog_utils
+from utils import detector_utils
+from utils import log_utils
+from utils import mseed_index_utils
+from utils import shared_waveform_utils
+from utils import time_utils
+
+logger = log_utils.get_logger(__name__)
+
+# Eşleştirilmiş filtre (template matching).
+# Katalog event'lerinin P/S picklerinin etrafından kesilen şablonlar sürekli kayıtla normalize çapraz
+# korelasyon (NCC) ile karşılaştırılır. Pay FFT ile (sürekli verinin spektrumu işçi başına bir kez
+# hesaplanır), payda kayan pencere enerjisi kümülatif toplamlarla (running norm) bulunur. Her şablonun
+# kanal korelasyonları pick zaman farklarına göre hizalanıp istasyonlar üzerinden ortalanır; ortalama
+# korelasyonun MAD katını aşan tepeleri tespittir. Şablonlar işçi süreçlere dağıtılır; filtrelenmiş
+# sürekli veri ızgaraları işçilere paylaşımlı bellek tanımlayıcıları olarak verilir (kopyalanmaz).
+
+# İşçi süreç durumu: sürekli veri ızgarası ve istasyon başına önbellekler (_init_worker doldurur)
+_WORKER = {}
+
+
+def load_continuous(mseed_folder, channel, t0_ns, t1_ns, params, workers=1):
+    """
+    [t0, t1) aralığındaki tüm istasyonların sürekli kaydını ortak bir zaman ızgarasına yerleştirir.
+
+    Dosyalar mseed dizininden bulunur; istasyon başına birleştirilir, ortalaması alınır ve
+    dedektörle aynı ön filtreden geçirilir (workers > 1 ise trace'ler paylaşımlı bellek üzerinden
+    işçi süreçlerde filtrelenir). Boşluklar ve kapsanmayan aralıklar 0'dır.
+
+    Returns:
+        tuple(int, int, dict): Izgara başlangıcı (ns), örnek aralığı (ns) ve {istasyon: float32 dizi}.
+    """
+    delta_ns = int(round(time_utils.NS_PER_SECOND / params['sampling_rate']))
+    extents = mseed_index_utils.get_mseed_index(mseed_folder).query_extents(None, channel, t0_ns, t1_ns)
+    by_station = {}
+    for path, station, start_ns, end_ns in extents:
+        by_station.setdefault(station, []).append(path)
+    if not extents:
+        return t0_ns, delta_ns, {}
+    grid_start = max(t0_ns, min(e[2] for e in extents))
+    grid_end = min(t1_ns, max(e[3] for e in extents))
+    n_grid = max(0, (grid_end - grid_start) // delta_ns)
+
+    merged = Stream()
+    for station, paths in by_station.items():
+        stream = Stream()
+        for path in paths:
+            stream += read(path)
+        stream = Stream([tr for tr in stream if int(round(tr.stats.delta * 1e9)) == delta_ns])
+        if not stream:
+            logger.warning("  Uyarı: %s örnekleme frekansı %g Hz değil, atlandı.", station, params['sampling_rate'])
+            continue
+        merged += stream.merge(method=1, fill_value=0)
+
+    data = {}
+    filter_params = {key: params.get(key) for key in ('filter_type', 'freqmin', 'freqmax', 'corners', 'zerophase')}
+    for tr in shared_waveform_utils.process_stream(merged, filter_params, workers):
+        grid = data.setdefault(tr.stats.station, np.zeros(n_grid, dtype=np.float32))
+        i0 = int(round((tr.stats.starttime.ns - grid_start) / delta_ns))
+        src0 = max(0, -i0)
+        dst0 = max(0, i0)
+        n = min(len(tr.data) - src0, n_grid - dst0)
+        if n > 0:
+            grid[dst0:dst0 + n] = tr.data[src0:src0 + n]
+    return grid_start, delta_ns, data
+
+
+def build_templates(events, continuous, grid_start, delta_ns, params):
+    """
+    Katalog event'lerinin P/S picklerinin etrafından şablon kanalları keser.
+
+    Her pick bir kanaldır: (istasyon, faz, pencere başlangıcının ızgara indeksi, dalga formu).
+    Penceresi sürekli veride tam kapsanmayan veya enerjisi sıfır olan kanallar atlanır; min_stations
+    sayısından az istasyonu kalan event'ler şablon olarak kullanılmaz.
+
+    Returns:
+        list: {'template_id', 'event_time_ns', 'channels': [{'station', 'phase', 'start_idx', 'pick_offset', 'data'}]}
+    """
+    pre = int(round(params['template_pre_seconds'] * time_utils.NS_PER_SECOND / delta_ns))
+    n_template = pre + int(round(params['template_post_seconds'] * time_utils.NS_PER_SECOND / delta_ns))
+    phases = set(params.get('phases') or ("P", "S"))
+    templates = []
+    counter = log_utils.StageCounter(logger, "Şablon kanalları")
+    for event_id, event in events.items():
+        picks = event.get('picks')
+        if not picks or event.get('event_time') is None:
+            continue
+        channels = []
+        pick_ns = time_utils.to_ns(picks['time'])
+        for station, phase, t_ns in zip(picks['station'], picks['phase'], pick_ns):
+            if phase not in phases:
+                continue
+            grid = continuous.get(station)
+            if grid is None:
+                counter.skip("istasyonun sürekli verisi yok")
+                continue
+            start_idx = int(round((t_ns - grid_start) / delta_ns)) - pre
+            if start_idx < 0 or start_idx + n_template > len(grid):
+                counter.skip("pencere veri dışında")
+                continue
+            data = grid[start_idx:start_idx + n_template].astype(np.float64)
+            data -= data.mean()
+            if not np.any(data):
+                counter.skip("sıfır enerji (boşluk)")
+                continue
+            channels.append({'station': str(station), 'phase': str(phase), 'start_idx': start_idx, 'pick_offset': pre, 'data': data})
+            counter.add()
+        if len({c['station'] for c in channels}) < params.get('min_stations', 3):
+            counter.skip("event'te yetersiz istasyon (kanal)", len(channels))
+            continue
+        templates.append({'template_id': str(event_id), 'event_time_ns': int(time_utils.to_ns(event['event_time'])), 'channels': channels})
+        max_templates = params.get('max_templates')
+        if max_templates and len(templates) >= max_templates:
+            break
+    counter.emit()
+    return templates
+
+
+def _init_worker(grid_descs, grid_start, delta_ns):
+    """
+    İşçi süreçte ana sürecin paylaşımlı bellekteki ızgaralarına bağlanır (veri kopyalanmaz).
+
+    Spektrum ve kümülatif toplamlar ilk kullanımda önbelleğe alınır. Bloklar ana süreç tarafından silinir.
+    """
+    blocks, continuous = [], {}
+    for station, desc in grid_descs.items():
+        shm, view = shared_waveform_utils.attach(desc)
+        view.flags.writeable = False
+        blocks.append(shm)
+        continuous[station] = view
+    _WORKER.clear()
+    _WORKER.update({'grid_start': grid_start, 'delta_ns': delta_ns, 'continuous': continuous, 'blocks': blocks,
+                    'spectra': {}, 'norms': {}})
+
+
+def _station_cache(station, n_template):
+    """İstasyonun rFFT spektrumu ve n_template uzunluklu kayan pencere (toplam, kare toplamı)."""
+    x = _WORKER['continuous'][station]
+    nfft = sp_fft.next_fast_len(len(x) + n_template - 1, real=True)
+    key = (station, nfft)
+    if key not in _WORKER['spectra']:
+        _WORKER['spectra'][key] = sp_fft.rfft(x, nfft)
+    norm_key = (station, n_template)
+    if norm_key not in _WORKER['norms']:
+        xd = x.astype(np.float64)
+        cs = np.concatenate(([0.0], np.cumsum(xd)))
+        cs2 = np.concatenate(([0.0], np.cumsum(xd * xd)))
+        window_sum = cs[n_template:] - cs[:-n_template]
+        window_var = (cs2[n_template:] - cs2[:-n_template]) - window_sum * window_sum / n_template
+        _WORKER['norms'][norm_key] = np.sqrt(np.maximum(window_var, 0.0))
+    return _WORKER['spectra'][key], nfft, _WORKER['norms'][norm_key]
+
+
+def normalized_cross_correlation(template, x_spectrum, nfft, window_norm):
+    """
+    Ortalaması çıkarılmış şablonun sürekli veriyle kayan NCC'si (sadece 'valid' gecikmeler).
+
+    Pay = irfft(X · conj(T)); payda = ||T|| · pencere standart sapması x sqrt(M) (running norm).
+    Enerjisi sıfır (boşluk) pencerelerde korelasyon 0'dır.
+    """
+    n_valid = len(window_norm)
+    numerator = sp_fft.irfft(x_spectrum * np.conj(sp_fft.rfft(template, nfft)), nfft)[:n_valid]
+    denominator = window_norm * np.sqrt(np.dot(template, template))
+    cc = np.zeros(n_valid, dtype=np.float64)
+    # Sayısal gürültü seviyesindeki (neredeyse sıfır enerjili) pencereler korelasyona katılmaz
+    np.divide(numerator, denominator, out=cc, where=denominator > 1e-6 * denominator.max())
+    return np.clip(cc, -1.0, 1.0)
+
+
+def match_template(template, params):
+    """
+    Bir şablonu işçi süreçteki sürekli veriyle karşılaştırır ve tespitleri döndürür.
+
+    Kanal korelasyonları şablon pencere başlangıçlarına göre hizalanır: g ızgara kaydırması için kanal c,
+    cc_c[g + start_c - start_ref] değerini verir. Izgarada kalan kanalların ortalaması yığılmış
+    korelasyondur; eşik, threshold_mad x MAD(yığın) değeridir.
+
+    Returns:
+        dict: 'template_id', 'detections' (satır sözlükleri), 'n_channels', 'hours', 'cpu_seconds'.
+    """
+    cpu_start = time.process_time()
+    delta_ns = _WORKER['delta_ns']
+    channels = template['channels']
+    n_template = len(channels[0]['data'])
+    ref = min(c['start_idx'] for c in channels)
+    n_grid = len(next(iter(_WORKER['continuous'].values())))
+    n_valid = n_grid - n_template + 1
+
+    stack = np.zeros(n_valid, dtype=np.float64)
+    count = np.zeros(n_valid, dtype=np.int32)
+    channel_cc = []
+    for c in channels:
+        spectrum, nfft, window_norm = _station_cache(c['station'], n_template)
+        cc = normalized_cross_correlation(c['data'], spectrum, nfft, window_norm)
+        rel = c['start_idx'] - ref
+        # Kaydırma g için kanal değeri cc[g + rel]; g + rel ızgara dışına taşarsa kanal katkı vermez
+        stack[:n_valid - rel] += cc[rel:]
+        count[:n_valid - rel] += 1
+        channel_cc.append((cc, rel))
+    np.divide(stack, count, out=stack, where=count > 0)
+    enough = count >= params.get('min_stations', 3)
+    stack[~enough] = 0.0
+
+    mad = float(np.median(np.abs(stack[enough] - np.median(stack[enough])))) if enough.any() else 0.0
+    threshold = params['threshold_mad'] * mad
+    detections = []
+    if mad > 0:
+        distance = max(1, int(round(params.get('min_separation_seconds', 2.0) * time_utils.NS_PER_SECOND / delta_ns)))
+        peaks, _ = find_peaks(stack, height=threshold, distance=distance)
+        for g in peaks:
+            shift_ns = (g - ref) * delta_ns  # Şablon event'ine göre zaman kayması
+            for c, (cc, rel) in zip(channels, channel_cc):
+                if g + rel >= n_valid:
+                    continue
+                detections.append({
+                    'pick_time_ns': _WORKER['grid_start'] + (c['start_idx'] + c['pick_offset']) * delta_ns + shift_ns,
+                    'station_id': c['station'],
+                    'phase_type': c['phase'],
+                    'pick_probability': max(0.0, float(cc[g + rel])),
+                    'snr': float(stack[g] / mad),
+                    'template_id': template['template_id'],
+                    'detect_time_ns': template['event_time_ns'] + shift_ns,
+                    'stack_cc': float(stack[g]),
+                })
+    return {
+        'template_id': template['template_id'],
+        'detections': detections,
+        'n_peaks': len({d['detect_time_ns'] for d in detections}),
+        'n_channels': len(channels),
+        'hours': n_grid * delta_ns / (3600 * time_utils.NS_PER_SECOND),
+        'cpu_seconds': time.process_time() - cpu_start,
+    }
+
+
+def detections_to_picks(results):
+    """İşçi sonuçlarını pick tablosu biçiminde (detector_utils.PICK_COLUMNS + şablon sütunları) birleştirir."""
+    rows = [d for r in results for d in r['detections']]
+    extra = ['template_id', 'detect_time', 'stack_cc']
+    if not rows:
+        return pd.DataFrame(columns=detector_utils.PICK_COLUMNS + extra)
+    frame = pd.DataFrame(rows).sort_values(['pick_time_ns', 'station_id'], kind='stable')
+    return pd.DataFrame({
+        'pick_time': time_utils.format_datetime64(frame['pick_time_ns'].to_numpy(np.int64).view('datetime64[ns]')),
+        'station_id': frame['station_id'].to_numpy(),
+        'phase_type': frame['phase_type'].to_numpy(),
+        'pick_probability': frame['pick_probability'].round(3).to_numpy(),  # Kanal korelasyonu
+        'snr': frame['snr'].round(2).to_numpy(),                            # Yığılmış korelasyon / MAD
+        'template_id': frame['template_id'].to_numpy(),
+        'detect_time': time_utils.format_datetime64(frame['detect_time_ns'].to_numpy(np.int64).view('datetime64[ns]')),
+        'stack_cc': frame['stack_cc'].round(3).to_numpy(),
+    }, columns=detector_utils.PICK_COLUMNS + extra)
+
+
+def run_matched_filter(config):
+    """
+    Katalog şablonlarıyla mseed arşivinde eşleştirilmiş filtre taraması yapar.
+
+    Tespitler pick tablosu biçiminde (EQT summary.csv sütunları + şablon bilgisi) yazılır; işlem hızı
+    şablon-saat/s (şablon sayısı x taranan saat / duvar saati) olarak raporlanır.
+
+    Args:
+        config (dict): 'config.py' dosyasından okunan CONFIG sözlüğü.
+
+    Returns:
+        pandas.DataFrame or None: Tespit pick tablosu.
+    """
+    params = config.get('matched_filter_settings')
+    if not params:
+        logger.error("Yapılandırmada 'matched_filter_settings' bölümü bulunamadı.")
+        return None
+    seismic_cfg = config['seismic_data']
+    channel = params.get('channel') or seismic_cfg['phase_component']
+    day = np.datetime64(params.get('date') or seismic_cfg['date'], 'D')
+    t0_ns = int(time_utils.to_ns(day.astype('datetime64[ns]')))
+    t1_ns = t0_ns + 86400 * time_utils.NS_PER_SECOND
+
+    logger.info("\n--- Eşleştirilmiş Filtre Başlatılıyor (%s, %s) ---", day, channel)
+    wall_start = time.perf_counter()
+    workers = params.get('workers') or os.cpu_count() or 1
+    grid_start, delta_ns, continuous = load_continuous(seismic_cfg['mseed_folder'], channel, t0_ns, t1_ns, params, workers)
+    if not continuous:
+        logger.warning("  Uyarı: %s için %s kanalında sürekli veri bulunamadı.", day, channel)
+        return None
+    cat_cfg = config['catalog_data']
+    parsed = catalog_utils.load_configured_catalog(cat_cfg)
+    if parsed is None:
+        return None
+    templates = build_templates(parsed['events'], continuous, grid_start, delta_ns, params)
+    n_grid = len(next(iter(continuous.values())))
+    logger.info("  %d şablon, %d istasyon, %.2f saat sürekli veri.", len(templates), len(continuous),
+                n_grid * delta_ns / (3600 * time_utils.NS_PER_SECOND))
+    if not templates:
+        return None
+
+    workers = min(workers, len(templates))
+    match_start = time.perf_counter()
+    blocks = []
+    try:
+        # Izgaralar bir kez paylaşımlı belleğe konur; işçilere sadece tanımlayıcılar gider
+        grid_descs = {}
+        for station, grid in continuous.items():
+            shm, grid_descs[station] = shared_waveform_utils.share_array(grid)
+            blocks.append(shm)
+        del continuous
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(grid_descs, grid_start, delta_ns)) as pool:
+            results = list(pool.map(match_template, templates, [params] * len(templates)))
+    finally:
+        shared_waveform_utils.release_blocks(blocks)
+    match_seconds = time.perf_counter() - match_start
+
+    picks = detections_to_picks(results)
+    output_csv = params.get('output_csv')
+    if output_csv:
+        os.makedirs(os.path.dirname(output_csv) or '.', exist_ok=True)
+        picks.to_csv(output_csv, index=False)
+        logger.info("  %d tespit (%d pick) yazıldı: %s", sum(r['n_peaks'] for r in results), len(picks), output_csv)
+
+    template_hours = sum(r['hours'] for r in results)
+    channel_hours = sum(r['hours'] * r['n_channels'] for r in results)
+    cpu_seconds = sum(r['cpu_seconds'] for r in results)
+    logger.info("  Tarama: %.2f s duvar saati (%d işçi), %.2f s CPU", match_seconds, workers, cpu_seconds)
+    logger.info("  Hız: %.1f şablon-saat/s (%.1f kanal-saat/s), şablon-saat başına %.3f s CPU",
+                template_hours / match_seconds, channel_hours / match_seconds,
+                cpu_seconds / template_hours if template_hours else float('nan'))
+    logger.info("--- Eşleştirilmiş Filtre Tamamlandı (%.2f s) ---\n", time.perf_counter() - wall_start)
+    return picks
@@ -0,0 +1,217 @@
+# seismic_analysis/utils/mseed_index_utils.py
+
+import os
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+from obspy import read
+
+# mseed arşivi için kalıcı dizin: (istasyon, kanal, ağ, başlangıç, bitiş) -> dosya.
+# Dizin klasördeki '.mseed_index.sqlite' dosyasında tutulur. Klasörün mtime değeri değişmediyse
+# (dosya eklenip silinmediyse) klasör hiç taranmaz; değiştiyse tek bir os.scandir ile sadece yeni veya
+# (mtime/boyut) değişmiş dosyaların başlıkları okunur. Pencere sorguları (istasyon, kanal, başlangıç)
+# indeksi üzerinden yapılır ve [t0, t1) aralığını kesen dosyaları tam olarak döndürür.
+# Klasör yazılamıyorsa (salt okunur arşiv) dizin geçici klasörde, o da olmazsa bellekte tutulur.
+
+_INDEX_FILENAME = ".mseed_index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY, station TEXT, channel TEXT, network TEXT,
+    start_ns INTEGER, end_ns INTEGER, mtime_ns INTEGER, size INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_window ON files (station, channel, start_ns);
+CREATE INDEX IF NOT EXISTS files_channel_window ON files (channel, start_ns);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+"""
+
+
+def _read_header(path):
+    """
+    Dosyanın başlıklarından (veri okunmadan) istasyon, kanal, ağ ve [başlangıç, bitiş) ns aralığını çıkarır.
+
+    Bitiş, son örnekten bir örnek aralığı sonrasıdır (yarı açık aralık).
+    """
+    stream = read(path, headonly=True)
+    if not stream:
+        return None
+    stats = stream[0].stats
+    start_ns = min(tr.stats.starttime.ns for tr in stream)
+    end_ns = max(tr.stats.endtime.ns + int(round(tr.stats.delta * 1e9)) for tr in stream)
+    return stats.station, stats.channel, stats.network, start_ns, end_ns
+
+
+def _writable(db_path):
+    """Dizin dosyası (varsa) ve klasörü yazılabilir mi."""
+    if os.path.exists(db_path):
+        return os.access(db_path, os.W_OK)
+    return os.access(os.path.dirname(db_path) or '.', os.W_OK)
+
+
+def _fallback_db_path(mseed_folder):
+    """Yazılamayan arşivler için klasör yoluna göre adlandırılmış geçici dizin dosyası; o da olmazsa ':memory:'."""
+    folder_key = hashlib.sha1(os.path.abspath(mseed_folder).encode('utf-8')).hexdigest()[:16]
+    cache_dir = os.path.join(tempfile.gettempdir(), "seismic_analysis_mseed_index")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return ":memory:"
+    path = os.path.join(cache_dir, f"{folder_key}.sqlite")
+    return path if _writable(path) else ":memory:"
+
+
+class MseedIndex:
+    """
+    Bir mseed klasörünün SQLite dizini.
+
+    Args:
+        mseed_folder (str): mseed klasörü.
+        db_path (str, optional): Dizin dosyası (varsayılan klasördeki '.mseed_index.sqlite').
+    """
+
+    def __init__(self, mseed_folder, db_path=None):
+        self.folder = mseed_folder
+        self.db_path = db_path or os.path.join(mseed_folder, _INDEX_FILENAME)
+        # Sunucu iş parçacıkları aynı bağlantıyı kilit altında paylaşır
+        self._lock = threading.Lock()
+        if not _writable(self.db_path):
+            self._use_fallback("yazma izni yok")
+        try:
+            self._conn = self._connect()
+        except sqlite3.OperationalError as e:
+            # Dosya açılamıyor (olmayan klasör, izin): arşiv olduğu gibi okunur, dizin başka yerde tutulur
+            self._use_fallback(e)
+            self._conn = self._connect()
+        except sqlite3.DatabaseError as e:
+            # Dizin sadece bir önbellektir: bozuksa silinip klasörden yeniden oluşturulur
+            print(f"  Uyarı: mseed dizini okunamadı, yeniden oluşturulacak ({self.db_path}): {e}")
+            if os.path.exists(self.db_path):
+                os.remove(self.db_path)
+            self._conn = self._connect()
+
+    def _use_fallback(self, reason):
+        fallback = _fallback_db_path(self.folder)
+        print(f"  Uyarı: mseed dizini {self.db_path} konumunda tutulamıyor ({reason}), {fallback} kullanılacak.")
+        self.db_path = fallback
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # Geri alma günlüğü bellekte tutulur: her yazımda klasöre '-journal' dosyası eklenip silinmez,
+        # böylece dizinin kendi yazımları klasörün mtime değerini değiştirmez.
+        conn.execute("PRAGMA journal_mode=MEMORY")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def refresh(self, force=False):
+        """
+        Dizini klasörle eşitler.
+
+        Returns:
+            int: Eklenen, güncellenen veya silinen dosya sayısı (klasör değişmediyse 0).
+        """
+        try:
+            folder_mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return 0
+        with self._lock:
+            if not force and self._meta('folder_mtime_ns') == folder_mtime:
+                return 0
+            known = {name: (mtime, size) for name, mtime, size in self._conn.execute("SELECT name, mtime_ns, size FROM files")}
+            seen = set()
+            rows = []
+            for entry in os.scandir(self.folder):
+                if not entry.name.endswith(".mseed") or not entry.is_file():
+                    continue
+                seen.add(entry.name)
+                st = entry.stat()
+                if known.get(entry.name) == (st.st_mtime_ns, st.st_size):
+                    continue
+                try:
+                    header = _read_header(entry.path)
+                except Exception as e:
+                    print(f"  Uyarı: {entry.path} başlığı okunamadı, dizine eklenmedi: {e}")
+                    continue
+                if header:
+                    rows.append((entry.name, *header, st.st_mtime_ns, st.st_size))
+            removed = [(name,) for name in known if name not in seen]
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._conn.executemany("DELETE FROM files WHERE name = ?", removed)
+                span = self._conn.execute("SELECT MAX(end_ns - start_ns) FROM files").fetchone()[0] or 0
+                self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                       [('folder_mtime_ns', folder_mtime), ('max_span_ns', span)])
+            return len(rows) + len(removed)
+
+    def query_extents(self, station, channel, t0_ns, t1_ns):
+        """
+        [t0, t1) aralığını kesen dosyaları (istasyon, başlangıç) sırasıyla döndürür.
+
+        Args:
+            station (str or None): İstasyon kodu (None: tüm istasyonlar).
+            channel (str): Kanal kodu.
+            t0_ns, t1_ns (int): Pencere sınırları (epoch nanosaniye).
+
+        Returns:
+            list: (yol, istasyon, başlangıç_ns, bitiş_ns) demetleri.
+        """
+        self.refresh()
+        with self._lock:
+            # Başlangıç alt sınırı en uzun dosya süresiyle kısıtlanır, böylece sorgu indeks aralığında kalır
+            earliest = int(t0_ns) - int(self._meta('max_span_ns', 0))
+            sql = "SELECT name, station, start_ns, end_ns FROM files WHERE channel = ? AND start_ns >= ? AND start_ns < ? AND end_ns > ?"
+            params = [channel, earliest, int(t1_ns), int(t0_ns)]
+            if station is not None:
+                sql += " AND station = ?"
+                params.append(station)
+            rows = self._conn.execute(sql + " ORDER BY station, start_ns", params)
+            return [(os.path.join(self.folder, name), sta, start, end) for name, sta, start, end in rows]
+
+    def query(self, station, channel, t0_ns, t1_ns):
+        """[t0, t1) aralığını kesen dosya yolları (bkz. query_extents)."""
+        return [path for path, _, _, _ in self.query_extents(station, channel, t0_ns, t1_ns)]
+
+    def channel_days(self):
+        """Dizindeki (istasyon, kanal, YYYY-MM-DD) üçlüleri (dosya başlangıç gününe göre)."""
+        self.refresh()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT station, channel, date(start_ns / 1000000000, 'unixepoch') FROM files ORDER BY 1, 2, 3")
+            return [tuple(row) for row in rows]
+
+
+# Klasör başına tek dizin nesnesi (bağlantı ve sorgular paylaşılır)
+_INDEX_CACHE = OrderedDict()
+_INDEX_CACHE_SIZE = 8
+_INDEX_LOCK = threading.Lock()
+
+
+def get_mseed_index(mseed_folder):
+    """Klasör için önbellekteki MseedIndex'i döndürür, yoksa oluşturur."""
+    key = os.path.abspath(mseed_folder)
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE.get(key)
+        if index is None:
+            index = MseedIndex(mseed_folder)
+            _INDEX_CACHE[key] = index
+        _INDEX_CACHE.move_to_end(key)
+        while len(_INDEX_CACHE) > _INDEX_CACHE_SIZE:
+            _INDEX_CACHE.popitem(last=False)[1].close()
+    return index
+
+
+def find_files(mseed_folder, station, channel, t0_ns, t1_ns):
+    """mseed klasöründe [t0, t1) aralığını kesen dosyalar (bkz. MseedIndex.query)."""
+    if not os.path.isdir(mseed_folder):
+        return []
+    return get_mseed_index(mseed_folder).query(station, channel, t0_ns, t1_ns)
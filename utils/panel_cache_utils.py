@@ -0,0 +1,203 @@
+# seismic_analysis/utils/panel_cache_utils.py
+
+import os
+import io
+import json
+import glob
+import types
+import hashlib
+import threading
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+
+from utils import log_utils
+
+logger = log_utils.get_logger(__name__)
+
+# Ana figürün alt grafikleri (paneller) için diskte önbellek.
+# Her panelin çıktısı (trace dizileri + layout) panel adı ve bir anahtarla saklanır. Anahtar; panelin girdi
+# dosyalarının (yol, mtime, boyut) bilgisi, panelin yapılandırma bölümü ve paneli üreten modüllerin (ve aynı
+# paketten içe aktardıkları yardımcı modüllerin, örn. time_utils) kaynak dosyalarının parmak izinden SHA1 özetidir. Tek bir ayar değiştiğinde sadece o ayarı okuyan panelin
+# anahtarı değişir; diğer paneller dosyaları hiç açılmadan önbellekten gelir.
+# Dosya biçimi: {panel}_{anahtar}.npz -> '__figure__' (JSON metni) + JSON'dan ayrılmış NumPy dizileri
+# (datetime64 zaman eksenleri vb.). Plotly'nin sayısal dizileri zaten base64 (bdata) olarak JSON'dadır.
+
+_CACHE_VERSION = 1
+_JSON_KEY = '__figure__'
+_REF_KEY = '__npz__'
+
+
+def _file_stats(paths):
+    """Var olan dosyalar için {yol: [mtime_ns, boyut]} sözlüğü."""
+    stats = {}
+    for path in sorted(set(p for p in paths if p)):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stats[os.path.abspath(path)] = [st.st_mtime_ns, st.st_size]
+    return stats
+
+
+def _module_files(modules):
+    """
+    Modüllerin ve aynı paketten (doğrudan veya dolaylı) içe aktardıkları modüllerin kaynak dosyaları.
+
+    Örn. seismic_utils -> time_utils, mseed_index_utils, ...; yardımcı bir modül değişince de anahtar değişir.
+    """
+    seen = {}
+    stack = list(modules)
+    while stack:
+        module = stack.pop()
+        if module.__name__ in seen:
+            continue
+        seen[module.__name__] = getattr(module, '__file__', None)
+        package = module.__name__.rpartition('.')[0]
+        for value in vars(module).values():
+            if (isinstance(value, types.ModuleType) and value.__name__ not in seen
+                    and value.__name__.rpartition('.')[0] == package and package):
+                stack.append(value)
+    return [path for path in seen.values() if path]
+
+
+def panel_key(name, inputs=(), params=None, modules=()):
+    """
+    Panel anahtarı: girdi dosyaları, parametreler ve üretici modüllerin kaynak dosyalarından SHA1 özeti.
+
+    Args:
+        name (str): Panel adı.
+        inputs (list): Panelin okuduğu dosyalar (olmayanlar yok sayılır).
+        params (dict): Panelin yapılandırma bölümü/değerleri (JSON'a çevrilebilir olmalı).
+        modules (list): Paneli üreten modüller; kendi kodları veya aynı paketten içe aktardıkları yardımcı
+            modüllerin kodu değişince önbellek geçersiz olur.
+    """
+    payload = json.dumps({
+        'version': _CACHE_VERSION, 'panel': name, 'params': params or {},
+        'inputs': _file_stats(inputs), 'code': _file_stats(_module_files(modules)),
+    }, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _extract_arrays(obj, arrays):
+    """Sözlük/liste ağacındaki NumPy dizilerini arrays'e taşır, yerlerine {'__npz__': anahtar} koyar."""
+    if isinstance(obj, np.ndarray) and obj.dtype.kind != 'O':
+        key = f"a{len(arrays)}"
+        arrays[key] = obj
+        return {_REF_KEY: key}
+    if isinstance(obj, dict):
+        return {k: _extract_arrays(v, arrays) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_extract_arrays(v, arrays) for v in obj]
+    return obj
+
+
+def _restore_arrays(obj, arrays):
+    if isinstance(obj, dict):
+        if set(obj) == {_REF_KEY}:
+            return arrays[obj[_REF_KEY]]
+        return {k: _restore_arrays(v, arrays) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_restore_arrays(v, arrays) for v in obj]
+    return obj
+
+
+class PanelCache:
+    """
+    Panel figürlerini bir klasörde saklar; en çok max_entries dosya tutulur (en eski kullanılan silinir).
+
+    Args:
+        folder (str): Önbellek klasörü.
+        max_entries (int): Tutulacak en fazla panel dosyası.
+    """
+
+    def __init__(self, folder, max_entries=64):
+        self.folder = folder
+        self.max_entries = max(int(max_entries), 1)
+        self._lock = threading.Lock()
+
+    def _path(self, name, key):
+        return os.path.join(self.folder, f"{name}_{key[:20]}.npz")
+
+    def get(self, name, key):
+        """Önbellekteki paneli go.Figure olarak döndürür; yoksa veya okunamazsa None."""
+        path = self._path(name, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                arrays = {k: npz[k] for k in npz.files if k != _JSON_KEY}
+                spec = json.loads(str(npz[_JSON_KEY]))
+            # Yazılan figür zaten doğrulanmıştı; yeniden doğrulama büyük panellerde okumanın çoğunu alır
+            fig = go.Figure(_restore_arrays(spec, arrays), _validate=False)
+        except Exception as e:
+            logger.warning("Uyarı: Panel önbelleği okunamadı, yeniden hesaplanacak (%s): %s", path, e)
+            return None
+        os.utime(path)  # En son kullanım zamanı (temizlikte korunur)
+        return fig
+
+    def put(self, name, key, fig):
+        """Figürü geçici dosya + os.replace ile atomik yazar ve klasörü sınırda tutar."""
+        os.makedirs(self.folder, exist_ok=True)
+        arrays = {}
+        spec = _extract_arrays(fig.to_plotly_json(), arrays)
+        text = json.dumps(spec, cls=PlotlyJSONEncoder)
+        path = self._path(name, key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        buffer = io.BytesIO()
+        np.savez(buffer, **{_JSON_KEY: np.array(text)}, **arrays)
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getbuffer())
+        os.replace(tmp_path, path)
+        self._prune()
+
+    def _prune(self):
+        with self._lock:
+            paths = glob.glob(os.path.join(self.folder, "*.npz"))
+            if len(paths) <= self.max_entries:
+                return
+            paths.sort(key=lambda p: os.stat(p).st_mtime_ns)
+            for path in paths[:len(paths) - self.max_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def from_config(cache_cfg):
+    """'panel_cache_settings' bölümünden PanelCache; bölüm yoksa veya kapalıysa None."""
+    if not cache_cfg or not cache_cfg.get('enable'):
+        return None
+    return PanelCache(cache_cfg['cache_folder'], cache_cfg.get('max_entries', 64))
+
+
+def cached_panel(cache, name, build, inputs=(), params=None, modules=()):
+    """
+    Paneli önbellekten döndürür; yoksa build() ile üretip önbelleğe yazar.
+
+    build() None döndürürse (veri yok/hata) sonuç önbelleğe yazılmaz, sonraki çalıştırmada yeniden denenir.
+
+    Args:
+        cache (PanelCache or None): None ise doğrudan build() çağrılır.
+        name (str): Panel adı.
+        build (callable): Argümansız, go.Figure veya None döndüren fonksiyon.
+        inputs, params, modules: panel_key argümanları.
+
+    Returns:
+        go.Figure or None
+    """
+    if cache is None:
+        return build()
+    key = panel_key(name, inputs, params, modules)
+    fig = cache.get(name, key)
+    if fig is not None:
+        logger.info("Panel '%s' önbellekten yüklendi.", name)
+        return fig
+    fig = build()
+    if fig is not None:
+        try:
+            cache.put(name, key, fig)
+        except Exception as e:
+            logger.warning("Uyarı: Panel '%s' önbelleğe yazılamadı: %s", name, e)
+    return fig
@@ -0,0 +1,338 @@
+# seismic_analysis/utils/pick_store_utils.py
+
+import os
+import json
+import shutil
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils import catalog_utils
+from utils import hdf5_utils
+from utils import hdf5_dataset_utils
+from utils import eqt_utils
+from utils import traveltime_utils
+from utils import time_utils
+
+# Üç pick kaynağı (katalog, HDF5, EQT) için ortak, kalıcı, sütun bazlı pick deposu.
+# Dizin yapısı:
+#   {store}/stations.json                      -> istasyon sözlüğü (station_idx -> isim), sadece eklenir
+#   {store}/ingest_log.json                    -> kaynak başına son ingest edilen girdi dosyalarının parmak izi
+#   {store}/date=YYYY-MM-DD/{kaynak}/meta.json -> satır sayısı, şema, oluşturma zamanı
+#   {store}/date=YYYY-MM-DD/{kaynak}/{sütun}.npy
+# Her bölüm time_ns'e göre sıralıdır; okumalar np.load(mmap_mode='r') ve searchsorted ile
+# sadece istenen zaman dilimini diskten çeker. Bir (gün, kaynak) bölümü yeniden ingest
+# edildiğinde tamamen değiştirilir.
+
+SOURCES = ('catalog', 'hdf5', 'eqt')
+# Sabit şema: sütun -> dtype ('source' bölüm dizininden gelir, dosyada tutulmaz)
+SCHEMA = {
+    'event_id': 'U',          # Değişken uzunluklu metin, yazılırken sabit genişliğe çevrilir
+    'station_idx': 'int32',
+    'phase': 'U1',
+    'time_ns': 'int64',
+    'probability': 'float32',
+    'snr': 'float32',
+    'residual': 'float32',
+}
+_NS_PER_DAY = 86400 * time_utils.NS_PER_SECOND
+
+
+class PickStore:
+    """
+    Tarihe göre bölümlenmiş, sütun bazlı (npy) pick deposu.
+
+    Args:
+        root (str): Depo klasörü (yoksa oluşturulur).
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stations_path = os.path.join(root, "stations.json")
+        self.stations = self._read_json(self._stations_path, [])
+        self._station_position = {name: i for i, name in enumerate(self.stations)}
+
+    @staticmethod
+    def _read_json(path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(path, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, path)
+
+    # --- İstasyon sözlüğü ---
+    def station_ids(self, names):
+        """İstasyon isimlerini station_idx değerlerine çevirir; yeni isimler sözlüğe eklenir."""
+        names = np.asarray(names, dtype=str)
+        unique, inverse = np.unique(names, return_inverse=True)
+        with self._lock:
+            new = [n for n in unique.tolist() if n not in self._station_position]
+            if new:
+                for name in new:
+                    self._station_position[name] = len(self.stations)
+                    self.stations.append(name)
+                self._write_json(self._stations_path, self.stations)
+            ids = np.array([self._station_position[n] for n in unique.tolist()], dtype=np.int32)
+        return ids[inverse].reshape(names.shape)
+
+    # --- Yazma ---
+    def _partition_dir(self, date, source):
+        return os.path.join(self.root, f"date={date}", source)
+
+    def write(self, source, columns):
+        """
+        Bir kaynağın tüm picklerini güne göre bölümleyip yazar.
+
+        Yeni veride bulunan günlerin bölümleri değiştirilir; kaynağın yeni veride olmayan günlere ait eski
+        bölümleri (düzeltilmiş bülten, farklı HDF5 dosyası) silinir.
+
+        Args:
+            source (str): 'catalog', 'hdf5' veya 'eqt'.
+            columns (dict): SCHEMA sütunları; 'station_idx' yerine 'station' (isim) verilebilir.
+                Eksik probability/snr/residual sütunları NaN ile doldurulur.
+
+        Returns:
+            dict: Gün -> yazılan satır sayısı.
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Bilinmeyen pick kaynağı: {source} (beklenen: {SOURCES})")
+        time_ns = np.asarray(columns['time_ns'], dtype=np.int64)
+        n = len(time_ns)
+        data = {'time_ns': time_ns}
+        data['station_idx'] = (np.asarray(columns['station_idx'], dtype=np.int32) if 'station_idx' in columns
+                               else self.station_ids(columns['station']))
+        data['event_id'] = np.asarray(columns.get('event_id', np.full(n, '')), dtype=str)
+        data['phase'] = np.char.upper(np.asarray(columns['phase'], dtype=str)).astype('U1')
+        for name in ('probability', 'snr', 'residual'):
+            data[name] = np.asarray(columns[name], dtype=np.float32) if name in columns else np.full(n, np.nan, dtype=np.float32)
+        for name, values in data.items():
+            if len(values) != n:
+                raise ValueError(f"'{name}' sütunu uzunluğu ({len(values)}) time_ns uzunluğundan ({n}) farklı.")
+
+        written = {}
+        days = time_ns // _NS_PER_DAY
+        order = np.lexsort((time_ns, days))
+        sorted_days = days[order]
+        boundaries = np.flatnonzero(sorted_days[1:] != sorted_days[:-1]) + 1
+        new_dates = {str(np.datetime64(int(d), 'D')) for d in np.unique(days)}
+        for date, _, part_dir in self.partitions(sources=[source]):
+            if date not in new_dates:
+                self._remove_partition(part_dir)
+        for idx in np.split(order, boundaries) if n else []:
+            date = str(np.datetime64(int(days[idx[0]]), 'D'))
+            self._write_partition(date, source, {name: values[idx] for name, values in data.items()})
+            written[date] = len(idx)
+        return written
+
+    def _write_partition(self, date, source, data):
+        out_dir = self._partition_dir(date, source)
+        tmp_dir = f"{out_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name, values in data.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), values)
+        meta = {
+            'date': date, 'source': source, 'rows': len(data['time_ns']),
+            'schema': {name: str(values.dtype) for name, values in data.items()},
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        self._write_json(os.path.join(tmp_dir, "meta.json"), meta)
+        # Okuyucular yarım yazılmış bölüm görmesin diye tamamlanan klasör tek adımda yerine konur
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.replace(tmp_dir, out_dir)
+
+    def _remove_partition(self, part_dir):
+        shutil.rmtree(part_dir, ignore_errors=True)
+        day_dir = os.path.dirname(part_dir)
+        if os.path.isdir(day_dir) and not os.listdir(day_dir):
+            os.rmdir(day_dir)
+
+    # --- Okuma ---
+    def partitions(self, start_date=None, end_date=None, sources=None):
+        """[start_date, end_date] (dahil) aralığındaki (gün, kaynak, klasör) bölümlerini tarih sırasıyla listeler."""
+        found = []
+        for entry in sorted(os.listdir(self.root)):
+            if not entry.startswith("date="):
+                continue
+            date = entry[len("date="):]
+            if (start_date and date < start_date) or (end_date and date > end_date):
+                continue
+            for source in sources or SOURCES:
+                part_dir = os.path.join(self.root, entry, source)
+                if os.path.exists(os.path.join(part_dir, "meta.json")):
+                    found.append((date, source, part_dir))
+        return found
+
+    def read(self, t0_ns=None, t1_ns=None, sources=None, columns=None):
+        """
+        [t0, t1) aralığındaki pickleri mmap ile okur.
+
+        Args:
+            t0_ns, t1_ns (int, optional): Epoch nanosaniye sınırları (None = sınırsız).
+            sources (list, optional): Okunacak kaynaklar.
+            columns (list, optional): Okunacak sütunlar (varsayılan tüm şema).
+
+        Returns:
+            dict: Sütun -> dizi; ek olarak 'source' dizisi.
+        """
+        columns = list(columns or SCHEMA)
+        start_date = str(np.datetime64(int(t0_ns), 'ns').astype('datetime64[D]')) if t0_ns is not None else None
+        end_date = str(np.datetime64(int(t1_ns) - 1, 'ns').astype('datetime64[D]')) if t1_ns is not None else None
+        parts = {name: [] for name in columns}
+        parts['source'] = []
+        for _, source, part_dir in self.partitions(start_date, end_date, sources):
+            times = np.load(os.path.join(part_dir, "time_ns.npy"), mmap_mode='r')
+            i0 = int(np.searchsorted(times, t0_ns, side='left')) if t0_ns is not None else 0
+            i1 = int(np.searchsorted(times, t1_ns, side='left')) if t1_ns is not None else len(times)
+            if i1 <= i0:
+                continue
+            for name in columns:
+                values = np.load(os.path.join(part_dir, f"{name}.npy"), mmap_mode='r')
+                parts[name].append(np.asarray(values[i0:i1]))
+            parts['source'].append(np.full(i1 - i0, source))
+        return {name: np.concatenate(values) if values else np.empty(0, dtype=SCHEMA.get(name, 'U'))
+                for name, values in parts.items()}
+
+    def read_frame(self, t0_ns=None, t1_ns=None, sources=None):
+        """read() sonucunu istasyon isimleri ve datetime64 zaman sütunuyla pandas DataFrame olarak döndürür."""
+        data = self.read(t0_ns, t1_ns, sources)
+        data['station'] = np.asarray(self.stations, dtype=str)[data['station_idx']] if self.stations else np.empty(0, dtype=str)
+        data['time'] = data['time_ns'].view('datetime64[ns]')
+        return pd.DataFrame(data)
+
+
+# --- Ingest Adaptörleri ---
+def _attach_residuals(frame, residuals):
+    """
+    Rezidüel tablosunu (event_id, station, phase, pick_time) anahtarıyla pick tablosuna ekler.
+
+    event_id anahtarda olmalı: aynı istasyon/faz/zamandaki pick farklı event'lere atanmış olabilir ve
+    her event'in origin'ine göre rezidüeli farklıdır.
+    """
+    if residuals is None or residuals.empty:
+        frame['residual'] = np.nan
+        return frame
+    keys = ['event_id', 'station', 'phase', 'pick_time']
+    res = residuals[keys + ['residual']].drop_duplicates(keys)
+    res = res.assign(event_id=res['event_id'].astype(str), time_ns=time_utils.to_ns(res['pick_time'].to_numpy())).drop(columns='pick_time')
+    frame = frame.assign(event_id=frame['event_id'].astype(str))
+    return frame.merge(res, on=['event_id', 'station', 'phase', 'time_ns'], how='left')
+
+
+def ingest_catalog(store, parsed, table=None):
+    """catalog_utils.parse_catalog_data çıktısını depoya yazar (table verilirse rezidüellerle)."""
+    picks = parsed['picks']
+    frame = pd.DataFrame({
+        'event_id': picks['event_id'], 'station': picks['station'], 'phase': picks['phase'],
+        'time_ns': time_utils.to_ns(picks['time']),
+    })
+    residuals = traveltime_utils.catalog_residuals(parsed, table) if table is not None else None
+    frame = _attach_residuals(frame, residuals)
+    return store.write('catalog', {name: frame[name].to_numpy() for name in frame.columns})
+
+
+def ingest_hdf5(store, results, table=None):
+    """hdf5_utils.read_hdf5_results (veya HDF5Dataset.read_range) çıktısını depoya yazar."""
+    flat = hdf5_utils.flatten_pick_groups(results['pick_groups'])
+    event_ids = np.asarray([eq_id[:-len('_Picks')] if eq_id.endswith('_Picks') else eq_id for eq_id in flat['event_id']], dtype=str)
+    frame = pd.DataFrame({
+        'event_id': event_ids, 'station': np.asarray(flat['station'], dtype=str), 'phase': flat['phase'],
+        'time_ns': time_utils.to_ns(flat['time']), 'probability': flat.get('probability', np.full(len(event_ids), np.nan)),
+    })
+    residuals = traveltime_utils.hdf5_residuals(results, table) if table is not None else None
+    frame = _attach_residuals(frame, residuals)
+    return store.write('hdf5', {name: frame[name].to_numpy() for name in frame.columns})
+
+
+def ingest_eqt(store, df):
+    """eqt_utils.read_eqt_summary çıktısını depoya yazar (EQT picklerinin event kimliği yoktur)."""
+    times = df['pick_time'].dt.tz_convert('UTC').dt.tz_localize(None).to_numpy().astype('datetime64[ns]')
+    return store.write('eqt', {
+        'station': df['station_id'].astype(str).to_numpy(), 'phase': df['phase_type'].astype(str).to_numpy(),
+        'time_ns': time_utils.to_ns(times), 'probability': df['pick_probability'].to_numpy(), 'snr': df['snr'].to_numpy(),
+    })
+
+
+def _fingerprint(paths):
+    """Girdi dosyalarının (yol, boyut, mtime) parmak izi; dosya yoksa None."""
+    prints = []
+    for path in paths:
+        if not path or not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        prints.append([os.path.abspath(path), stat.st_size, stat.st_mtime])
+    return prints
+
+
+def ingest_sources(config, station_names, force=False):
+    """
+    Yapılandırmadaki katalog, HDF5 ve EQT girdilerini depoya aktarır.
+
+    Girdi dosyaları (ve ilgili ayarlar) son ingest'ten beri değişmediyse kaynak yeniden ayrıştırılmaz.
+
+    Args:
+        config (dict): CONFIG sözlüğü.
+        station_names (list): HDF5 istasyon isimleri.
+        force (bool): True ise parmak izine bakmadan yeniden aktarır.
+    """
+    store_cfg = config['pick_store_settings']
+    store = PickStore(store_cfg['store_folder'])
+    log_path = os.path.join(store.root, "ingest_log.json")
+    log = PickStore._read_json(log_path, {})
+    table = traveltime_utils.get_travel_time_table(config['traveltime_settings']) if store_cfg.get('with_residuals', True) else None
+    model_key = config['traveltime_settings']['velocity_model'] if table is not None else None
+
+    print(f"\n--- Pick Deposuna Aktarım ({store.root}) ---")
+    for source in store_cfg.get('sources', list(SOURCES)):
+        if source == 'catalog':
+            cat_cfg = config['catalog_data']
+            inputs = catalog_utils.resolve_catalog_paths(cat_cfg['catalog_file_path']) + [cat_cfg['station_data_path']]
+        elif source == 'hdf5':
+            hdf5_cfg = config['hdf5_data']
+            inputs = ([os.path.join(hdf5_cfg['hdf5_folder'], f) for f in sorted(os.listdir(hdf5_cfg['hdf5_folder'])) if f.endswith('.hdf5')]
+                      if hdf5_cfg.get('hdf5_folder') else [hdf5_cfg['hdf5_file_path']])
+        elif source == 'eqt':
+            inputs = [config['eqt_data']['summary_csv_path']]
+        else:
+            print(f"  Uyarı: Bilinmeyen kaynak '{source}', atlanıyor.")
+            continue
+
+        fingerprint = _fingerprint(inputs)
+        if fingerprint is None:
+            print(f"  {source}: girdi dosyası bulunamadı, atlanıyor.")
+            continue
+        key = {'inputs': fingerprint, 'model': model_key if source != 'eqt' else None}
+        if not force and log.get(source) == key:
+            print(f"  {source}: girdiler değişmedi, atlanıyor.")
+            continue
+
+        if source == 'catalog':
+            parsed = catalog_utils.load_configured_catalog(cat_cfg)
+            written = ingest_catalog(store, parsed, table) if parsed is not None else None
+        elif source == 'hdf5':
+            # Klasör modunda tüm günler okunur (start/end sadece grafik aralığıdır)
+            results = hdf5_dataset_utils.load_configured_results(config['hdf5_data'], station_names,
+                                                                 config['seismic_data']['date'], full_range=True)
+            written = ingest_hdf5(store, results, table) if results is not None else None
+        else:
+            df = eqt_utils.read_eqt_summary(inputs[0])
+            written = ingest_eqt(store, df) if df is not None else None
+
+        if written is None:
+            print(f"  {source}: girdi okunamadı.")
+            continue
+        log[source] = key
+        PickStore._write_json(log_path, log)
+        print(f"  {source}: {sum(written.values())} pick, {len(written)} gün bölümü yazıldı.")
+    print("--- Pick Deposu Güncel ---\n")
+    return store
@@ -0,0 +1,258 @@
+# seismic_analysis/utils/pyramid_utils.py
+
+import os
+import re
+import glob
+import json
+import datetime
+
+import numpy as np
+from obspy import read, UTCDateTime
+
+from utils import seismic_utils
+
+# Piramit dizin yapısı:
+#   {pyramid_folder}/{station}_{channel}_{YYYY-MM-DD}/meta.json
+#   {pyramid_folder}/{station}_{channel}_{YYYY-MM-DD}/L{faktör}.npy   -> (n_bin, 2) float32 [min, max]
+# Her seviye günün başlangıcından (00:00 UTC) itibaren eşit aralıklı binlerden oluşur,
+# veri olmayan binler NaN'dır. L{faktör} dosyaları mmap ile açılır, sadece istenen dilim okunur.
+
+_NS_PER_DAY = 86400 * 10**9
+# seismic_utils / download_utils dosya adı düzeni: {station}_{channel}_{network}_{YYYY-MM-DD}_{HHMM}.mseed
+_FILENAME_PATTERN = re.compile(r'^(?P<station>[^_]+)_(?P<channel>[^_]+)_(?P<network>[^_]+)_(?P<date>\d{4}-\d{2}-\d{2})_(?P<hhmm>\d{4})')
+
+
+def day_dir(pyramid_folder, station, channel, date):
+    """Bir istasyon/kanal gününün piramit klasörü (meta.json ve L{faktör}.npy seviyeleri burada)."""
+    return os.path.join(pyramid_folder, f"{station}_{channel}_{date}")
+
+
+def _reduce_envelope(env, factor):
+    """(n, 2) [min, max] zarfını faktör kadar kabalaştırır (min'lerin min'i, max'ların max'ı)."""
+    n_out = len(env) // factor
+    blocks = env[:n_out * factor].reshape(n_out, factor, 2)
+    # Tümü NaN olan bloklar uyarı üretmesin diye nanmin/nanmax yerine inf ile doldurulur
+    lo = np.where(np.isnan(blocks[:, :, 0]), np.inf, blocks[:, :, 0]).min(axis=1)
+    hi = np.where(np.isnan(blocks[:, :, 1]), -np.inf, blocks[:, :, 1]).max(axis=1)
+    out = np.empty((n_out, 2), dtype=np.float32)
+    out[:, 0] = np.where(np.isinf(lo), np.nan, lo)
+    out[:, 1] = np.where(np.isinf(hi), np.nan, hi)
+    return out
+
+
+def list_channel_days(mseed_folder):
+    """mseed klasöründeki dosya adlarından (istasyon, kanal, tarih) üçlülerini çıkarır."""
+    channel_days = set()
+    for path in glob.glob(os.path.join(mseed_folder, "*.mseed")):
+        match = _FILENAME_PATTERN.match(os.path.basename(path))
+        if match:
+            channel_days.add((match.group('station'), match.group('channel'), match.group('date')))
+    return sorted(channel_days)
+
+
+def build_pyramid_for_day(mseed_folder, station, channel, date, pyramid_folder, levels=(10, 100, 1000), filter_cfg=None, force=False):
+    """
+    Bir istasyon-kanal-gün için min/max zarf piramidini oluşturur.
+
+    Saatlik mseed dosyaları tek bir gün ızgarasına yerleştirilir, ilk seviye ham örneklerden,
+    sonraki seviyeler bir önceki seviyeden hesaplanır. Kaynak dosyalar değişmediyse
+    (mtime/boyut) piramit yeniden oluşturulmaz.
+
+    Args:
+        mseed_folder (str): mseed dosyalarının bulunduğu klasör.
+        station (str): İstasyon kodu.
+        channel (str): Kanal kodu (örn. "HHZ").
+        date (str): Gün (YYYY-MM-DD).
+        pyramid_folder (str): Piramit çıktılarının yazılacağı klasör.
+        levels (tuple): Artan sırada indirgeme faktörleri (her biri bir öncekine tam bölünmeli).
+        filter_cfg (dict, optional): Zarflardan önce uygulanacak filtre (seismic_data bölümündeki
+            filter_type, freqmin, freqmax, corners, zerophase anahtarları). Filtre değişirse piramit yenilenir.
+        force (bool): True ise güncel olsa bile yeniden oluşturur.
+
+    Returns:
+        str or None: Oluşturulan (veya güncel olan) gün klasörünün yolu, veri yoksa None.
+    """
+    levels = sorted(int(f) for f in levels)
+    for coarse, fine in zip(levels[1:], levels[:-1]):
+        if coarse % fine != 0:
+            print(f"Hata: Piramit seviyeleri birbirine tam bölünmeli ({levels}).")
+            return None
+
+    paths = sorted(glob.glob(os.path.join(mseed_folder, f"{station}_{channel}_*_{date}_*.mseed")))
+    if not paths:
+        return None
+    sources = {os.path.basename(p): [os.path.getmtime(p), os.path.getsize(p)] for p in paths}
+    filter_keys = ('filter_type', 'freqmin', 'freqmax', 'corners', 'zerophase')
+    filter_meta = {k: (filter_cfg or {}).get(k) for k in filter_keys}
+
+    out_dir = day_dir(pyramid_folder, station, channel, date)
+    meta_path = os.path.join(out_dir, "meta.json")
+    if not force and os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            old_meta = json.load(f)
+        if old_meta.get('sources') == sources and old_meta.get('levels') == levels and old_meta.get('filter') == filter_meta:
+            return out_dir
+
+    day_start_ns = UTCDateTime(f"{date}T00:00:00").ns
+    grid = None
+    delta_ns = None
+    network = None
+    for path in paths:
+        try:
+            stream = read(path)
+        except Exception as e:
+            print(f"  Uyarı: {path} okunamadı, piramide eklenmedi: {e}")
+            continue
+        if filter_meta['filter_type']:
+            try:
+                seismic_utils.apply_filter(stream, *(filter_meta[k] for k in filter_keys))
+            except Exception as e:
+                print(f"  Uyarı: {path} filtrelenemedi, ham veri kullanılacak: {e}")
+        for tr in stream:
+            tr_delta_ns = int(round(tr.stats.delta * 1e9))
+            if delta_ns is None:
+                delta_ns = tr_delta_ns
+                network = tr.stats.network
+                grid = np.full(_NS_PER_DAY // delta_ns, np.nan, dtype=np.float32)
+            elif tr_delta_ns != delta_ns:
+                print(f"  Uyarı: {path} farklı örnekleme aralığına sahip ({tr.stats.delta} s), atlanıyor.")
+                continue
+            # Örnekleri gün ızgarasındaki konumlarına yerleştir, gün dışına taşanları kes
+            i0 = int(round((tr.stats.starttime.ns - day_start_ns) / delta_ns))
+            src0 = max(0, -i0)
+            dst0 = max(0, i0)
+            n = min(tr.stats.npts - src0, len(grid) - dst0)
+            if n > 0:
+                grid[dst0:dst0 + n] = tr.data[src0:src0 + n]
+
+    if grid is None:
+        return None
+
+    os.makedirs(out_dir, exist_ok=True)
+    env = np.empty((len(grid), 2), dtype=np.float32)
+    env[:, 0] = grid
+    env[:, 1] = grid
+    previous = 1
+    for factor in levels:
+        env = _reduce_envelope(env, factor // previous)
+        np.save(os.path.join(out_dir, f"L{factor}.npy"), env)
+        previous = factor
+
+    meta = {
+        'station': station, 'channel': channel, 'network': network, 'date': date,
+        'start_ns': day_start_ns, 'delta_ns': delta_ns, 'npts': len(grid),
+        'levels': levels, 'filter': filter_meta, 'sources': sources,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+    return out_dir
+
+
+def build_pyramids(config):
+    """
+    mseed klasöründeki tüm istasyon-kanal-günler için piramitleri oluşturur/günceller.
+
+    Args:
+        config (dict): 'config.py' dosyasından okunan CONFIG sözlüğü.
+    """
+    pyramid_cfg = config.get('pyramid_settings', {})
+    mseed_folder = config['seismic_data']['mseed_folder']
+    pyramid_folder = pyramid_cfg.get('pyramid_folder')
+    levels = pyramid_cfg.get('levels', [10, 100, 1000])
+    if not pyramid_folder:
+        print("Hata: 'pyramid_settings.pyramid_folder' tanımlı değil.")
+        return
+
+    channel_days = list_channel_days(mseed_folder)
+    print(f"\n--- Waveform Piramidi Oluşturuluyor ({len(channel_days)} istasyon-kanal-gün, seviyeler: {levels}) ---")
+    built = 0
+    for station, channel, date in channel_days:
+        try:
+            if build_pyramid_for_day(mseed_folder, station, channel, date, pyramid_folder, levels, filter_cfg=config['seismic_data']):
+                built += 1
+        except Exception as e:
+            print(f"  Hata: {station} {channel} {date} piramidi oluşturulamadı: {e}")
+    print(f"--- Piramit İşlemi Tamamlandı: {built}/{len(channel_days)} hazır ({pyramid_folder}) ---\n")
+
+
+def _load_meta(day_path):
+    meta_path = os.path.join(day_path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def choose_level(levels, delta_ns, t0_ns, t1_ns, width_px):
+    """
+    İstenen piksel genişliğini hâlâ çözebilen (piksel başına en az bir bin) en kaba seviyeyi seçer.
+
+    Returns:
+        int or None: Seçilen faktör; ham veri gerekiyorsa None.
+    """
+    n_raw = (t1_ns - t0_ns) / delta_ns
+    usable = [f for f in sorted(levels) if n_raw / f >= width_px]
+    return usable[-1] if usable else None
+
+
+def read_envelope(pyramid_folder, station, channel, t0_ns, t1_ns, width_px):
+    """
+    [t0, t1) aralığı için piramitten min/max zarfı okur.
+
+    Gün sınırlarını aşan pencereler için ilgili tüm günlerin piramitleri birleştirilir.
+    Dönen diziler seismic_utils.minmax_decimate çıktısıyla aynı biçimdedir (min/max sırayla).
+
+    Args:
+        pyramid_folder (str): Piramit klasörü.
+        station (str): İstasyon kodu.
+        channel (str): Kanal kodu.
+        t0_ns, t1_ns (int): Pencere sınırları (epoch nanosaniye).
+        width_px (int): İstemcinin piksel genişliği.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray) or None: int64 ns zaman ve değer dizileri;
+        piramit yoksa veya pencere ham veri gerektirecek kadar darsa None.
+    """
+    day_ns = (t0_ns // _NS_PER_DAY) * _NS_PER_DAY
+    times_parts = []
+    env_parts = []
+    while day_ns < t1_ns:
+        date = UTCDateTime(ns=int(day_ns)).strftime('%Y-%m-%d')
+        day_path = day_dir(pyramid_folder, station, channel, date)
+        meta = _load_meta(day_path)
+        day_ns += _NS_PER_DAY
+        if meta is None:
+            continue
+        factor = choose_level(meta['levels'], meta['delta_ns'], t0_ns, t1_ns, width_px)
+        if factor is None:
+            return None
+        bin_ns = meta['delta_ns'] * factor
+        env = np.load(os.path.join(day_path, f"L{factor}.npy"), mmap_mode='r')
+        i0 = max(0, int((t0_ns - meta['start_ns']) // bin_ns))
+        i1 = min(len(env), int(-(-(t1_ns - meta['start_ns']) // bin_ns)))
+        if i1 <= i0:
+            continue
+        env_parts.append(np.asarray(env[i0:i1]))
+        times_parts.append(meta['start_ns'] + np.arange(i0, i1, dtype=np.int64) * bin_ns)
+        bin_width_ns = bin_ns
+
+    if not env_parts:
+        return None
+    env = np.concatenate(env_parts)
+    times_ns = np.concatenate(times_parts)
+
+    # Seçilen seviye piksel sayısından fazla bin içeriyorsa son bir min/max indirgemesi yap
+    factor = len(env) // width_px
+    if factor > 1:
+        env = _reduce_envelope(env, factor)
+        times_ns = times_ns[:len(env) * factor:factor]
+        bin_width_ns = bin_width_ns * factor
+
+    out_t = np.empty(2 * len(env), dtype=np.int64)
+    out_y = np.empty(2 * len(env), dtype=np.float64)
+    out_t[0::2] = times_ns
+    out_t[1::2] = times_ns + bin_width_ns // 2
+    out_y[0::2] = env[:, 0]
+    out_y[1::2] = env[:, 1]
+    return out_t, out_y
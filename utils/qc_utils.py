@@ -0,0 +1,409 @@
+# seismic_analysis/utils/qc_utils.py
+
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils import log_utils
+from utils import time_utils
+
+logger = log_utils.get_logger(__name__)
+
+# mseed arşivi için kanal-saat kalite kontrol (QC) metrikleri.
+# Her dosya bir kez okunur; örnekler saat sınırlarında dilimlenir ve her (dosya, saat) parçası için
+# metrikler tek bir vektörel NumPy geçişiyle hesaplanır (toplam, kareler toplamı, yüzdelikler, kırpılma,
+# sıçrama, sabit örnek sayısı, iç boşluklar). Dosyalar işçi süreçlerde paralel işlenir. Sonuçlar SQLite
+# veritabanına yazılır:
+#   qc_file_hours -> (dosya, kanal, saat) ham parçalar; dosya değişince (mtime/boyut) yalnızca o dosya yeniden işlenir
+#   qc_hourly     -> (ağ, istasyon, konum, kanal, saat) başına birleşik metrikler; gösterge panelleri bu tabloyu sorgular
+# Bir saat birden çok dosyaya bölünmüşse toplam/adet metrikleri tam, yüzdelikler örnek sayısıyla ağırlıklı yaklaşıktır.
+
+_PERCENTILES = (1, 5, 50, 95, 99)
+_PCT_COLUMNS = tuple(f"p{p:02d}" for p in _PERCENTILES)
+_HOUR_NS = 3600 * time_utils.NS_PER_SECOND
+_KEY = ('network', 'station', 'location', 'channel', 'hour_ns')
+_DEAD_MIN_SECONDS = 60   # Ölü kanal kararı için saatte gereken en az veri (dosya sınırındaki tek örnekler sayılmaz)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS qc_files (name TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, error TEXT);
+CREATE TABLE IF NOT EXISTS qc_file_hours (
+    name TEXT, network TEXT, station TEXT, location TEXT, channel TEXT, hour_ns INTEGER,
+    sampling_rate REAL, n INTEGER, first_ns INTEGER, end_ns INTEGER, gaps INTEGER,
+    sum REAL, sumsq REAL, min REAL, max REAL, {", ".join(f"{c} REAL" for c in _PCT_COLUMNS)},
+    clipped INTEGER, spikes INTEGER, flat INTEGER,
+    PRIMARY KEY (name, network, station, location, channel, hour_ns)
+);
+CREATE TABLE IF NOT EXISTS qc_hourly (
+    network TEXT, station TEXT, location TEXT, channel TEXT, hour_ns INTEGER, hour TEXT,
+    sampling_rate REAL, n_files INTEGER, samples INTEGER, completeness REAL, gaps INTEGER, gap_seconds REAL,
+    mean REAL, rms REAL, min REAL, max REAL, {", ".join(f"{c} REAL" for c in _PCT_COLUMNS)},
+    clipped INTEGER, clip_fraction REAL, spikes INTEGER, flat_fraction REAL, dead INTEGER,
+    PRIMARY KEY (network, station, location, channel, hour_ns)
+);
+CREATE INDEX IF NOT EXISTS qc_hourly_station ON qc_hourly (station, channel, hour_ns);
+CREATE INDEX IF NOT EXISTS qc_hourly_hour ON qc_hourly (hour_ns);
+"""
+
+
+# --- Dosya Geçişi (İşçi Süreç) ---
+def _hour_metrics(data, params):
+    """Bir (dosya, saat) parçasının vektörel metrikleri (data: float64, boş değil)."""
+    pct = np.percentile(data, _PERCENTILES)
+    median = pct[_PERCENTILES.index(50)]
+    deviation = np.abs(data - median)
+    sigma = 1.4826 * np.median(deviation)
+    spikes = 0
+    if sigma > 0 and len(data) > 2:
+        # Sıçrama: eşiği aşan ve iki komşusu eşiğin yarısının altında kalan tek örnek (deprem dalga
+        # treni komşu örnekleri de yükselttiği için sayılmaz)
+        threshold = params['spike_mad'] * sigma
+        spikes = int(np.count_nonzero((deviation[1:-1] > threshold) & (deviation[:-2] < threshold / 2) & (deviation[2:] < threshold / 2)))
+    lo, hi = float(data.min()), float(data.max())
+    clip_counts = params.get('clip_counts')
+    if clip_counts:
+        clipped = int(np.count_nonzero(np.abs(data) >= clip_counts))
+    else:
+        # Tam ölçek bilinmiyorsa: en az üç ardışık örnek boyunca saatin uç değerinde kalan örnekler (düz tepe)
+        at_edge = (data == lo) | (data == hi)
+        clipped = int(np.count_nonzero(at_edge[1:-1] & at_edge[:-2] & at_edge[2:])) if hi > lo else 0
+    return {
+        'n': len(data), 'sum': float(data.sum()), 'sumsq': float(np.dot(data, data)), 'min': lo, 'max': hi,
+        **{c: float(v) for c, v in zip(_PCT_COLUMNS, pct)},
+        'clipped': clipped, 'spikes': spikes, 'flat': int(np.count_nonzero(np.diff(data) == 0)),
+    }
+
+
+def compute_file_metrics(path, params):
+    """
+    Bir mseed dosyasını bir kez okuyup (kanal, saat) parçaları için metrikleri hesaplar (işçi süreçte çalışır).
+
+    Args:
+        path (str): mseed dosyası.
+        params (dict): 'qc_settings' bölümü (spike_mad, clip_counts).
+
+    Returns:
+        dict: 'rows' (qc_file_hours satırları) ve varsa 'error'.
+    """
+    from obspy import read
+    try:
+        stream = read(path)
+    except Exception as e:
+        return {'rows': [], 'error': str(e)}
+    name = os.path.basename(path)
+    pieces = {}   # (ağ, istasyon, konum, kanal, saat) -> [(başlangıç_ns, bitiş_ns, veri)]
+    rates = {}
+    for tr in sorted(stream, key=lambda t: (t.id, t.stats.starttime.ns)):
+        if tr.stats.npts == 0:
+            continue
+        fs = float(tr.stats.sampling_rate)
+        delta_ns = time_utils.NS_PER_SECOND / fs
+        start_ns = tr.stats.starttime.ns
+        data = np.asarray(tr.data, dtype=np.float64)
+        # Saat sınırlarındaki örnek indeksleri: trace tek geçişte saat dilimlerine ayrılır
+        first_hour = start_ns // _HOUR_NS
+        last_hour = (start_ns + int(round((len(data) - 1) * delta_ns))) // _HOUR_NS
+        hours = np.arange(first_hour, last_hour + 1, dtype=np.int64)
+        bounds = np.clip(np.ceil((hours[1:] * _HOUR_NS - start_ns) / delta_ns).astype(np.int64), 0, len(data))
+        edges = np.concatenate(([0], bounds, [len(data)]))
+        if len(hours) > 1 and edges[-1] - edges[-2] == 1:
+            # Günlük/saatlik dosyalar çoğunlukla sonraki dilimin ilk örneğini (örn. ertesi gün 00:00:00) de içerir;
+            # bu tek örnek ayrı bir (neredeyse boş, boşluklu) saat satırı üretmesin diye atılır
+            hours, edges = hours[:-1], edges[:-1]
+        stats = tr.stats
+        for hour, i0, i1 in zip(hours, edges[:-1], edges[1:]):
+            if i1 <= i0:
+                continue
+            key = (stats.network, stats.station, stats.location, stats.channel, int(hour) * _HOUR_NS)
+            pieces.setdefault(key, []).append((start_ns + int(round(i0 * delta_ns)), start_ns + int(round(i1 * delta_ns)), data[i0:i1]))
+            rates[key] = fs
+
+    rows = []
+    for key, parts in pieces.items():
+        fs = rates[key]
+        tolerance = 1.5 * time_utils.NS_PER_SECOND / fs
+        gaps = sum(1 for (_, end, _), (start, _, _) in zip(parts[:-1], parts[1:]) if start - end > tolerance)
+        data = parts[0][2] if len(parts) == 1 else np.concatenate([p[2] for p in parts])
+        row = dict(zip(_KEY, key), name=name, sampling_rate=fs, first_ns=parts[0][0], end_ns=parts[-1][1], gaps=gaps)
+        row.update(_hour_metrics(data, params))
+        rows.append(row)
+    return {'rows': rows}
+
+
+# --- Birleştirme ---
+def combine_hours(frame, params):
+    """
+    qc_file_hours satırlarını (ağ, istasyon, konum, kanal, saat) başına birleştirir.
+
+    Saat başı/sonu ve dosyalar arasındaki boşluklar da sayılır (1.5 örnek aralığından uzun kesintiler).
+
+    Returns:
+        pd.DataFrame: qc_hourly satırları.
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=list(_KEY))
+    out = []
+    for key, group in frame.sort_values('first_ns').groupby(list(_KEY), sort=False):
+        hour_ns = key[-1]
+        fs = float(group['sampling_rate'].iloc[0])
+        tolerance = 1.5 * time_utils.NS_PER_SECOND / fs
+        first, end = group['first_ns'].to_numpy(), group['end_ns'].to_numpy()
+        gaps = int(group['gaps'].sum()) + int(first[0] - hour_ns > tolerance) + int(hour_ns + _HOUR_NS - end.max() > tolerance)
+        gaps += int(np.count_nonzero(first[1:] - np.maximum.accumulate(end)[:-1] > tolerance))
+        n = int(group['n'].sum())
+        expected = int(round(3600 * fs))
+        mean = group['sum'].sum() / n
+        variance = max(group['sumsq'].sum() / n - mean * mean, 0.0)
+        weights = group['n'].to_numpy() / n
+        row = dict(zip(_KEY, key))
+        row.update({
+            'hour': str(np.datetime64(int(hour_ns), 'ns').astype('datetime64[s]')), 'sampling_rate': fs,
+            'n_files': int(group['name'].nunique()), 'samples': n, 'completeness': min(n / expected, 1.0),
+            'gaps': gaps, 'gap_seconds': max(expected - n, 0) / fs, 'mean': mean, 'rms': float(np.sqrt(variance)),
+            'min': float(group['min'].min()), 'max': float(group['max'].max()),
+            **{c: float(np.dot(weights, group[c].to_numpy())) for c in _PCT_COLUMNS},
+            'clipped': int(group['clipped'].sum()), 'clip_fraction': group['clipped'].sum() / n,
+            'spikes': int(group['spikes'].sum()), 'flat_fraction': group['flat'].sum() / max(n - len(group), 1),
+        })
+        row['dead'] = int(n >= _DEAD_MIN_SECONDS * fs
+                          and ((row['max'] - row['min']) <= params.get('dead_range_counts', 0)
+                               or row['flat_fraction'] >= params.get('dead_flat_fraction', 0.95)))
+        out.append(row)
+    return pd.DataFrame(out)
+
+
+# --- Veritabanı ---
+def _connect(db_path):
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _insert(conn, table, frame):
+    columns = list(frame.columns)
+    sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    conn.executemany(sql, frame.itertuples(index=False, name=None))
+
+
+def update_qc(mseed_folder, qc_cfg, force=False):
+    """
+    Klasördeki yeni/değişmiş mseed dosyalarının metriklerini hesaplar ve veritabanını günceller.
+
+    Silinen dosyaların satırları kaldırılır; etkilenen kanal-saatler qc_hourly'de yeniden birleştirilir.
+
+    Args:
+        mseed_folder (str): mseed klasörü.
+        qc_cfg (dict): CONFIG['qc_settings'] bölümü.
+        force (bool): True ise tüm dosyalar yeniden işlenir.
+
+    Returns:
+        int: İşlenen dosya sayısı.
+    """
+    conn = _connect(qc_cfg['db_path'])
+    channel = qc_cfg.get('channel')
+    try:
+        known = {name: (mtime, size) for name, mtime, size in conn.execute("SELECT name, mtime_ns, size FROM qc_files")}
+        todo, seen = [], set()
+        for entry in sorted(os.scandir(mseed_folder), key=lambda e: e.name) if os.path.isdir(mseed_folder) else []:
+            if not entry.name.endswith(".mseed") or not entry.is_file():
+                continue
+            if channel and f"_{channel}_" not in entry.name:
+                continue
+            seen.add(entry.name)
+            st = entry.stat()
+            if force or known.get(entry.name) != (st.st_mtime_ns, st.st_size):
+                todo.append((entry.path, st.st_mtime_ns, st.st_size))
+        stale = [name for name in known if name not in seen] + [os.path.basename(p) for p, _, _ in todo]
+
+        counter = log_utils.StageCounter(logger, "QC metrikleri")
+        rows = []
+        if todo:
+            workers = min(qc_cfg.get('workers') or os.cpu_count() or 1, len(todo))
+            paths = [p for p, _, _ in todo]
+            if workers <= 1:
+                results = [compute_file_metrics(p, qc_cfg) for p in paths]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(compute_file_metrics, paths, [qc_cfg] * len(paths)))
+            files = []
+            for (path, mtime, size), result in zip(todo, results):
+                if result.get('error'):
+                    counter.skip("okunamadı")
+                    logger.warning("Uyarı: %s okunamadı: %s", path, result['error'])
+                else:
+                    counter.add()
+                rows.extend(result['rows'])
+                files.append((os.path.basename(path), mtime, size, result.get('error')))
+
+        with conn:
+            # Etkilenen kanal-saatler: silinen/değişen dosyaların eski satırları ve yeni satırlar
+            placeholders = ", ".join("?" * len(stale))
+            affected = set()
+            if stale:
+                affected.update(conn.execute(f"SELECT {', '.join(_KEY)} FROM qc_file_hours WHERE name IN ({placeholders})", stale))
+                conn.execute(f"DELETE FROM qc_file_hours WHERE name IN ({placeholders})", stale)
+                conn.execute(f"DELETE FROM qc_files WHERE name IN ({placeholders})", stale)
+            if todo:
+                new = pd.DataFrame(rows)
+                if not new.empty:
+                    _insert(conn, 'qc_file_hours', new)
+                    affected.update(new[list(_KEY)].itertuples(index=False, name=None))
+                conn.executemany("INSERT OR REPLACE INTO qc_files VALUES (?, ?, ?, ?)", files)
+            for key in affected:
+                conn.execute(f"DELETE FROM qc_hourly WHERE {' AND '.join(f'{k} = ?' for k in _KEY)}", key)
+            if affected:
+                keys = pd.DataFrame(sorted(affected), columns=list(_KEY))
+                hourly = pd.read_sql_query("SELECT * FROM qc_file_hours", conn).merge(keys, on=list(_KEY))
+                combined = combine_hours(hourly, qc_cfg)
+                if not combined.empty:
+                    _insert(conn, 'qc_hourly', combined)
+        if todo:
+            counter.emit()
+        return len(todo)
+    finally:
+        conn.close()
+
+
+def load_metrics(db_path, t0_ns=None, t1_ns=None, stations=None, channel=None):
+    """
+    qc_hourly tablosundan [t0, t1) aralığındaki saatleri okur.
+
+    Returns:
+        pd.DataFrame: Kanal-saat metrikleri (veritabanı yoksa boş).
+    """
+    if not os.path.exists(db_path):
+        return pd.DataFrame()
+    sql, params = "SELECT * FROM qc_hourly WHERE 1 = 1", []
+    if t0_ns is not None:
+        sql += " AND hour_ns >= ?"
+        params.append(int(t0_ns) // _HOUR_NS * _HOUR_NS)
+    if t1_ns is not None:
+        sql += " AND hour_ns < ?"
+        params.append(int(t1_ns))
+    if channel:
+        sql += " AND channel = ?"
+        params.append(channel)
+    if stations:
+        sql += f" AND station IN ({', '.join('?' * len(stations))})"
+        params.extend(stations)
+    with sqlite3.connect(db_path) as conn:
+        return pd.read_sql_query(sql + " ORDER BY station, channel, hour_ns", conn, params=params)
+
+
+def _n_hours(t0_ns, t1_ns):
+    """[t0, t1) aralığının kestiği saat sayısı."""
+    first = int(t0_ns) // _HOUR_NS
+    return max(1, -(-int(t1_ns) // _HOUR_NS) - first)
+
+
+def station_summary(db_path, t0_ns, t1_ns, stations=None, channel=None):
+    """
+    [t0, t1) aralığı için istasyon-kanal başına özet; hiç verisi olmayan saatler tamlığı düşürür.
+
+    Returns:
+        pd.DataFrame: station, channel, hours, completeness, gaps, dead_hours, clip_fraction, spikes, rms_median.
+    """
+    metrics = load_metrics(db_path, t0_ns, t1_ns, stations, channel)
+    n_hours = _n_hours(t0_ns, t1_ns)
+    columns = ['station', 'channel', 'hours', 'completeness', 'gaps', 'dead_hours', 'clip_fraction', 'spikes', 'rms_median']
+    if metrics.empty:
+        return pd.DataFrame(columns=columns)
+    grouped = metrics.groupby(['station', 'channel'])
+    summary = pd.DataFrame({
+        'hours': grouped.size(),
+        'completeness': grouped['completeness'].sum() / n_hours,
+        'gaps': grouped['gaps'].sum(),
+        'dead_hours': grouped['dead'].sum(),
+        'clip_fraction': grouped['clipped'].sum() / grouped['samples'].sum(),
+        'spikes': grouped['spikes'].sum(),
+        'rms_median': grouped['rms'].median(),
+    }).reset_index()
+    return summary[columns]
+
+
+def bad_stations(qc_cfg, t0_ns, t1_ns, stations, channel):
+    """
+    Aralıkta kalite eşiklerini geçemeyen istasyonlar ve nedenleri.
+
+    Eşikler: min_completeness, max_clip_fraction, max_spikes_per_hour ve ölü (dead) saat. Veritabanı
+    yoksa veya aralık hiç işlenmemişse boş sözlük döner (istasyonlar dışlanmaz).
+
+    Returns:
+        dict: istasyon -> neden listesi.
+    """
+    summary = station_summary(qc_cfg['db_path'], t0_ns, t1_ns, stations, channel)
+    if summary.empty:
+        return {}
+    n_hours = _n_hours(t0_ns, t1_ns)
+    summary = summary.set_index('station')
+    bad = {}
+    for station in stations:
+        if station not in summary.index:
+            bad[station] = ["veri yok"]
+            continue
+        row = summary.loc[station]
+        reasons = []
+        if row['completeness'] < qc_cfg.get('min_completeness', 0.0):
+            reasons.append(f"tamlık %{100 * row['completeness']:.1f}")
+        if row['dead_hours'] > 0:
+            reasons.append(f"ölü kanal ({int(row['dead_hours'])} saat)")
+        if qc_cfg.get('max_clip_fraction') is not None and row['clip_fraction'] > qc_cfg['max_clip_fraction']:
+            reasons.append(f"kırpılma %{100 * row['clip_fraction']:.3f}")
+        if qc_cfg.get('max_spikes_per_hour') is not None and row['spikes'] / n_hours > qc_cfg['max_spikes_per_hour']:
+            reasons.append(f"sıçrama {int(row['spikes'])}")
+        if reasons:
+            bad[station] = reasons
+    return bad
+
+
+def filter_stations(config, stations, t0_ns, t1_ns, channel=None):
+    """
+    qc_settings.exclude_bad açıksa kalite eşiklerini geçemeyen istasyonları listeden çıkarır.
+
+    Returns:
+        list: Kalan istasyonlar (sıra korunur).
+    """
+    qc_cfg = config.get('qc_settings') or {}
+    if not qc_cfg.get('exclude_bad') or not stations:
+        return list(stations)
+    channel = channel or qc_cfg.get('channel') or config['seismic_data']['phase_component']
+    bad = bad_stations(qc_cfg, t0_ns, t1_ns, stations, channel)
+    for station, reasons in bad.items():
+        logger.warning("  QC: %s dışlandı (%s)", station, ', '.join(reasons))
+    return [s for s in stations if s not in bad]
+
+
+def run_qc(config, force=False):
+    """
+    mseed arşivinin QC metriklerini günceller ve seismic_data.date günü için istasyon özetini yazdırır.
+
+    Args:
+        config (dict): 'config.py' dosyasından okunan CONFIG sözlüğü.
+        force (bool): Tüm dosyaları yeniden işle.
+
+    Returns:
+        pd.DataFrame or None: Gün özeti.
+    """
+    qc_cfg = config.get('qc_settings')
+    if not qc_cfg:
+        logger.error("Yapılandırmada 'qc_settings' bölümü bulunamadı.")
+        return None
+    logger.info("\n--- QC Metrikleri Hesaplanıyor ---")
+    wall_start = time.perf_counter()
+    n_files = update_qc(config['seismic_data']['mseed_folder'], qc_cfg, force=force)
+    logger.info("  %d dosya işlendi (%.2f s), veritabanı: %s", n_files, time.perf_counter() - wall_start, qc_cfg['db_path'])
+
+    day_ns = time_utils.to_ns(np.datetime64(config['seismic_data']['date'], 'ns'))
+    channel = qc_cfg.get('channel') or config['seismic_data']['phase_component']
+    summary = station_summary(qc_cfg['db_path'], day_ns, day_ns + 24 * _HOUR_NS, channel=channel)
+    if summary.empty:
+        logger.warning("  Bu gün için QC satırı yok.")
+    else:
+        with pd.option_context('display.width', 160, 'display.max_rows', None):
+            logger.info("%s", summary.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    logger.info("--- QC Tamamlandı ---\n")
+    return summary
@@ -0,0 +1,265 @@
+# seismic_analysis/utils/report_utils.py
+
+import base64
+import datetime
+import json
+import os
+import shutil
+
+import numpy as np
+import plotly.offline
+from plotly.utils import PlotlyJSONEncoder
+
+# Statik rapor dışa aktarımı. fig.write_html her dosyaya plotly.js'i ve tüm veri dizilerini gömer;
+# burada ise çalıştırma başına tek bir HTML yazılır:
+#   {klasör}/plotly-{sürüm}.min.js        -> klasördeki tüm raporların paylaştığı tek kopya
+#   {klasör}/{rapor}.html                 -> sadece layout ve küçük bir yükleyici betik
+#   {klasör}/{rapor}_data/{fig}_{alt}.js  -> alt grafik (eksen çifti) başına trace'ler
+# Sayısal diziler plotly.js'in doğrudan çözdüğü base64 tipli dizi ({dtype, bdata}) olarak saklanır;
+# datetime64 dizileri 'date' eksende epoch milisaniyeye (f8) çevrilir, ISO metinleri yazılmaz; eşit aralıklı
+# zaman dizileri (waveform) hiç yazılmaz, x0/dx ile verilir. x dışındaki f8 diziler görüntüleme için f4'e indirilir.
+# Yan dosyalar <script> ile yüklenir (file:// üzerinden de çalışır); bir figür ekrana girince
+# alt grafikleri bağımsız olarak yüklenir ve her biri geldiği anda çizilir.
+
+# plotly.js'in base64 olarak çözebildiği tipler; diğerleri f8'e çevrilir
+_BDATA_NAMES = {np.dtype(t): t.lstrip('<|') for t in ('<f8', '<f4', '<i4', '<u4', '<i2', '<u2', '|i1', '|u1')}
+_DATE_KEYS = {'x': 'xaxis', 'y': 'yaxis'}
+_UNIFORM_X_TYPES = ('scatter', 'scattergl', 'bar')
+_MAP_TYPES = ('scattermap', 'scattermapbox', 'densitymap', 'densitymapbox', 'choroplethmap', 'choroplethmapbox')
+
+
+def _typed_array(values):
+    """Sayısal diziyi plotly.js tipli dizi tanımına ({dtype, bdata[, shape]}) çevirir."""
+    values = np.asarray(values)
+    if values.dtype == bool:
+        values = values.astype(np.uint8)
+    dtype = values.dtype.newbyteorder('<') if values.dtype.byteorder == '>' else values.dtype
+    if dtype not in _BDATA_NAMES:
+        dtype = np.dtype('<f8')  # int64/uint64 vb. plotly.js tarafından desteklenmez
+    values = np.ascontiguousarray(values, dtype=dtype)
+    spec = {'dtype': _BDATA_NAMES[dtype], 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+    if values.ndim > 1:
+        spec['shape'] = ",".join(str(n) for n in values.shape)
+    return spec
+
+
+def _as_datetime64(values):
+    """datetime benzeri dizi/listeyi datetime64[ns]'e çevirir; değilse None."""
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]')
+    if isinstance(values, (list, tuple)) and values and isinstance(values[0], (datetime.datetime, np.datetime64)):
+        try:
+            return np.asarray(values, dtype='datetime64[ns]')
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def _pack(value, min_length, float32, key=None):
+    """Trace sözlüğündeki büyük sayısal dizileri tipli diziye çevirir (iç içe sözlükler dahil)."""
+    if isinstance(value, dict):
+        return {k: _pack(v, min_length, float32, k) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)) and len(value) >= min_length:
+        array = value if isinstance(value, np.ndarray) else np.asarray(value)
+        if array.dtype.kind in 'biuf':
+            if float32 and key != 'x' and array.dtype == np.float64:
+                array = array.astype(np.float32)  # x epoch ms olabilir, f4 hassasiyeti yetmez
+            return _typed_array(array)
+    return value
+
+
+def _uniform_step(times_ns):
+    """Dizi eşit aralıklıysa adımı (ns), değilse None döndürür."""
+    if len(times_ns) < 3 or np.isnat(times_ns).any():
+        return None
+    steps = np.diff(times_ns.astype(np.int64))
+    return int(steps[0]) if steps[0] > 0 and np.all(steps == steps[0]) else None
+
+
+def pack_trace(trace, min_length=32, float32=True):
+    """
+    plotly trace'ini yan dosyaya yazılacak sözlüğe çevirir.
+
+    x/y datetime dizileri epoch milisaniyeye çevrilir; bu eksenlerin 'date' tipine ayarlanması gerekir.
+    Eşit aralıklı x zaman dizisi (çizgi/çubuk trace'lerinde) x0 ve dx (ms) ile değiştirilir.
+
+    Returns:
+        tuple(dict, set): Paketlenmiş trace sözlüğü ve 'date' tipine ayarlanacak eksen adları (örn. {'xaxis2'}).
+    """
+    data = trace.to_plotly_json() if hasattr(trace, 'to_plotly_json') else dict(trace)
+    date_axes = set()
+    for key, axis_attr in _DATE_KEYS.items():
+        times = _as_datetime64(data.get(key))
+        if times is None:
+            continue
+        ref = data.get(axis_attr, key)  # 'x2' -> 'xaxis2'
+        date_axes.add(f"{axis_attr}{ref[1:]}")
+        step_ns = _uniform_step(times) if key == 'x' and data.get('type', 'scatter') in _UNIFORM_X_TYPES else None
+        if step_ns is not None and len(times) >= min_length:
+            del data['x']
+            data['x0'] = str(np.datetime_as_string(times[0], unit='us')).replace('T', ' ')
+            data['dx'] = step_ns / 1e6
+            continue
+        ms = times.astype(np.int64) / 1e6
+        ms[np.isnat(times)] = np.nan
+        data[key] = ms
+    return _pack(data, min_length, float32), date_axes
+
+
+def subplot_key(trace_dict):
+    """Trace'in çizildiği alt grafik anahtarı (kartezyen için 'x2y2', coğrafi/harita için alt grafik adı)."""
+    trace_type = trace_dict.get('type', 'scatter')
+    if trace_type.endswith('geo'):
+        return trace_dict.get('geo', 'geo')
+    if trace_type in _MAP_TYPES:
+        return trace_dict.get('subplot', 'map' if 'mapbox' not in trace_type else 'mapbox')
+    return f"{trace_dict.get('xaxis', 'x')}{trace_dict.get('yaxis', 'y')}"
+
+
+def _write_text(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _plotlyjs_file(output_folder):
+    """Klasördeki paylaşılan plotly.js dosyasını (yoksa) yazar ve adını döndürür."""
+    name = f"plotly-{plotly.offline.get_plotlyjs_version()}.min.js"
+    path = os.path.join(output_folder, name)
+    if not os.path.exists(path):
+        _write_text(path, plotly.offline.get_plotlyjs())
+    return name
+
+
+_LOADER = """
+window.seismicReport = window.seismicReport || {pending: {}, load: function (key, payload) {
+  var resolve = this.pending[key]; delete this.pending[key]; if (resolve) { resolve(payload); }
+}};
+(function () {
+  function loadPart(fig, part) {
+    return new Promise(function (resolve, reject) {
+      window.seismicReport.pending[fig.div + "/" + part] = resolve;
+      var s = document.createElement("script");
+      s.src = fig.src + part + ".js"; s.onerror = reject;
+      document.head.appendChild(s);
+    });
+  }
+  function render(fig) {
+    var status = document.getElementById(fig.div + "-status");
+    var remaining = fig.parts.length;
+    Plotly.newPlot(fig.div, [], fig.layout, fig.config).then(function () {
+      fig.parts.forEach(function (part) {
+        loadPart(fig, part).then(function (payload) {
+          return Plotly.addTraces(fig.div, payload.data);
+        }).catch(function () {
+          status.textContent = "Veri dosyası yüklenemedi: " + fig.src + part + ".js";
+        }).then(function () {
+          remaining -= 1;
+          if (remaining <= 0 && !status.textContent.startsWith("Veri")) { status.remove(); }
+        });
+      });
+    });
+  }
+  var figures = JSON.parse(document.getElementById("report-figures").textContent);
+  if (!("IntersectionObserver" in window)) { figures.forEach(render); return; }
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (!entry.isIntersecting) { return; }
+      observer.unobserve(entry.target);
+      render(figures.filter(function (f) { return f.div === entry.target.id; })[0]);
+    });
+  }, {rootMargin: "200px"});
+  figures.forEach(function (f) { observer.observe(document.getElementById(f.div)); });
+})();
+"""
+
+
+def export_report(figures, output_folder, report_name, plotlyjs="local", min_array_length=32, float32=True):
+    """
+    Figürleri tek bir HTML raporu ve alt grafik başına yan veri dosyaları olarak yazar.
+
+    Args:
+        figures (dict): {başlık: plotly Figure}; sırayla alt alta yerleştirilir.
+        output_folder (str): Rapor klasörü (plotly.js burada bir kez tutulur).
+        report_name (str): HTML dosyasının adı (uzantısız, örn. iş kimliği).
+        plotlyjs (str): "local" (klasörde paylaşılan dosya) veya "cdn".
+        min_array_length (int): Bu uzunluktan kısa diziler JSON listesi olarak kalır.
+        float32 (bool): x dışındaki float64 dizileri float32 olarak yaz (boyut yarıya iner).
+
+    Returns:
+        str: Yazılan HTML dosyasının yolu.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    data_dirname = f"{report_name}_data"
+    data_dir = os.path.join(output_folder, data_dirname)
+    tmp_dir = f"{data_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    specs = []
+    blocks = []
+    for i, (title, fig) in enumerate(figures.items()):
+        div = f"fig{i}"
+        parts = {}
+        date_axes = set()
+        for trace in fig.data:
+            packed, axes = pack_trace(trace, min_array_length, float32)
+            date_axes |= axes
+            parts.setdefault(subplot_key(packed), []).append(packed)
+        for part, traces in parts.items():
+            payload = json.dumps({'data': traces}, cls=PlotlyJSONEncoder, separators=(',', ':'))
+            _write_text(os.path.join(tmp_dir, f"{div}_{part}.js"),
+                        f"window.seismicReport.load({json.dumps(f'{div}/{part}')}, {payload});\n")
+        layout = fig.layout.to_plotly_json()
+        for axis in date_axes:
+            layout.setdefault(axis, {})['type'] = 'date'
+        height = layout.get('height') or 450
+        specs.append({'div': div, 'layout': layout, 'config': {'responsive': True},
+                      'src': f"{data_dirname}/{div}_", 'parts': list(parts)})
+        blocks.append(f'<h2>{_escape(title)}</h2>\n<p id="{div}-status">Yükleniyor...</p>\n'
+                      f'<div id="{div}" style="height:{int(height)}px"></div>')
+
+    shutil.rmtree(data_dir, ignore_errors=True)
+    os.replace(tmp_dir, data_dir)
+
+    if plotlyjs == "cdn":
+        script_src = f"https://cdn.plot.ly/plotly-{plotly.offline.get_plotlyjs_version()}.min.js"
+    else:
+        script_src = _plotlyjs_file(output_folder)
+    # JSON <script> içinde: '</' kaçışı betiğin erken kapanmasını önler
+    figure_json = json.dumps(specs, cls=PlotlyJSONEncoder, separators=(',', ':')).replace('</', '<\\/')
+    html = (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{_escape(report_name)}</title>\n<script src=\"{script_src}\"></script>\n</head>\n<body>\n"
+        + "\n".join(blocks)
+        + f"\n<script type=\"application/json\" id=\"report-figures\">{figure_json}</script>\n"
+        + f"<script>{_LOADER}</script>\n</body>\n</html>\n"
+    )
+    html_path = os.path.join(output_folder, f"{report_name}.html")
+    _write_text(html_path, html)
+    return html_path
+
+
+def export_configured(figures, report_cfg, report_name=None, output_folder=None):
+    """
+    'report_settings' bölümüyle export_report çağırır.
+
+    Args:
+        figures (dict): {başlık: plotly Figure}.
+        report_cfg (dict): 'output_folder', 'plotlyjs', 'min_array_length', 'float32' anahtarları.
+        report_name (str, optional): Verilmezse 'rapor_YYYYMMDD_HHMMSS' (çalıştırma başına bir dosya).
+        output_folder (str, optional): report_cfg['output_folder'] yerine kullanılacak klasör.
+
+    Returns:
+        str: Yazılan HTML dosyasının yolu.
+    """
+    report_cfg = report_cfg or {}
+    report_name = report_name or datetime.datetime.now().strftime("rapor_%Y%m%d_%H%M%S")
+    return export_report(figures, output_folder or report_cfg['output_folder'], report_name,
+                         plotlyjs=report_cfg.get('plotlyjs', "local"), min_array_length=report_cfg.get('min_array_length', 32),
+                         float32=report_cfg.get('float32', True))
+
+
+def _escape(text):
+    return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
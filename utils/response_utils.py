@@ -0,0 +1,295 @@
+# seismic_analysis/utils/response_utils.py
+
+import glob
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from obspy import read_inventory
+from obspy.signal.invsim import cosine_sac_taper, cosine_taper, invert_spectrum
+from scipy import fft as sp_fft
+
+from utils import log_utils
+
+logger = log_utils.get_logger(__name__)
+
+# Yerel StationXML dosyalarından alet tepkisi giderme (canlı servis gerekmez).
+# Klasördeki StationXML dosyaları bir kez ayrıştırılır ve (yol, mtime, boyut) ile önbellekte tutulur;
+# dosya değişirse yalnızca o dosya yeniden okunur. Kanal epoch'u, örnekleme frekansı ve örnek sayısı
+# başına hesaplanan ters tepki spektrumu (ön filtre konisi ve su seviyesi dahil) LRU önbellekte tutulur.
+# Ters evrişim, aynı (örnekleme frekansı, örnek sayısı) grubundaki tüm trace'ler tek bir 2-B dizi
+# olarak tek rfft/irfft çağrısıyla yapılır. Ön işleme ve spektral işlemler ObsPy Trace.remove_response
+# ile aynıdır (ortalama çıkarma, SAC kosinüs konisi, cosine_sac_taper, invert_spectrum).
+
+OUTPUTS = ("DISP", "VEL", "ACC")
+UNITS = {'DISP': "m", 'VEL': "m/s", 'ACC': "m/s²"}
+_XML_PATTERNS = ("*.xml", "*.XML", "*.stationxml")
+
+
+class ResponseCache:
+    """
+    StationXML envanterlerini ve hesaplanmış ters tepki spektrumlarını önbellekte tutar.
+
+    Args:
+        folder (str): StationXML dosyalarının klasörü (tek dosya da verilebilir).
+        output (str): "DISP", "VEL" veya "ACC".
+        water_level (float, optional): Su seviyesi (dB); None ise tepki doğrudan ters çevrilir.
+        pre_filt (list, optional): Frekans alanı ön filtre köşeleri [f1, f2, f3, f4] (Hz).
+        max_spectra (int): Önbellekte tutulacak en fazla spektrum sayısı.
+    """
+
+    def __init__(self, folder, output="VEL", water_level=60.0, pre_filt=None, max_spectra=256):
+        if output not in OUTPUTS:
+            raise ValueError(f"Geçersiz çıktı '{output}' (seçenekler: {OUTPUTS}).")
+        self.folder = folder
+        self.output = output
+        self.water_level = water_level
+        self.pre_filt = tuple(pre_filt) if pre_filt else None
+        self.max_spectra = max(int(max_spectra), 1)
+        self._files = {}                # yol -> ((mtime_ns, boyut), Inventory)
+        self._channels = None           # (istasyon, kanal) -> [(ağ, konum, başlangıç_ns, bitiş_ns, kanal nesnesi)]
+        self._spectra = OrderedDict()   # (seed_id, epoch başlangıcı, fs, npts) -> (nfft, spektrum)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, response_cfg):
+        """'response_settings' bölümüyle önbellek oluşturur."""
+        return cls(response_cfg['stationxml_folder'], output=response_cfg.get('output', "VEL"),
+                   water_level=response_cfg.get('water_level', 60.0), pre_filt=response_cfg.get('pre_filt'),
+                   max_spectra=response_cfg.get('max_cached_spectra', 256))
+
+    # --- Envanter ---
+    def files(self):
+        """Klasördeki StationXML dosyaları (sıralı)."""
+        if os.path.isfile(self.folder):
+            return [self.folder]
+        return sorted({p for pattern in _XML_PATTERNS for p in glob.glob(os.path.join(self.folder, pattern))})
+
+    def refresh(self):
+        """Değişen/yeni dosyaları ayrıştırır, silinenleri bırakır; kanal tablosunu gerekirse yeniden kurar."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        paths = self.files()
+        changed = set(self._files) != set(paths)
+        for path in paths:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached = self._files.get(path)
+            if cached and cached[0] == stamp:
+                continue
+            try:
+                self._files[path] = (stamp, read_inventory(path))
+            except Exception as e:
+                logger.warning("Uyarı: %s StationXML olarak okunamadı: %s", path, e)
+                self._files[path] = (stamp, None)
+            changed = True
+        for path in set(self._files) - set(paths):
+            del self._files[path]
+        if changed or self._channels is None:
+            self._channels = self._index_channels()
+            self._spectra.clear()
+
+    def _index_channels(self):
+        channels = {}
+        for _, inventory in self._files.values():
+            if inventory is None:
+                continue
+            for net in inventory:
+                for sta in net:
+                    for cha in sta:
+                        if cha.response is None:
+                            continue
+                        start = cha.start_date.ns if cha.start_date is not None else np.iinfo(np.int64).min
+                        end = cha.end_date.ns if cha.end_date is not None else np.iinfo(np.int64).max
+                        channels.setdefault((sta.code, cha.code), []).append((net.code, cha.location_code, start, end, cha))
+        logger.info("Tepki envanteri: %d dosya, %d kanal (%s).", len(self._files), len(channels), self.folder)
+        return channels
+
+    def find_channel(self, station, channel, time_ns, network=None, location=None):
+        """
+        İstasyon/kanal ve zaman için tepkisi olan kanal epoch'unu bulur.
+
+        network/location None ise herhangi biri kabul edilir (mseed dosya adlarında sadece istasyon ve kanal var).
+        Klasör sadece ilk çağrıda taranır; dosya değişikliklerini görmek için önce refresh() çağrılmalı.
+
+        Returns:
+            tuple(str, int, obspy Channel) or None: seed id, epoch başlangıcı (ns) ve kanal; bulunamazsa None.
+        """
+        with self._lock:
+            if self._channels is None:
+                self._refresh()
+            for net, loc, start, end, obj in self._channels.get((station, channel), ()):
+                if (network is not None and net != network) or (location is not None and loc != location):
+                    continue
+                if start <= time_ns < end:
+                    return f"{net}.{station}.{loc}.{channel}", start, obj
+        return None
+
+    # --- Spektrumlar ---
+    def inverse_spectrum(self, seed_id, epoch_start, channel, sampling_rate, npts):
+        """
+        Ters tepki spektrumunu döndürür (ön filtre konisiyle çarpılmış, su seviyesi uygulanmış).
+
+        Returns:
+            tuple(int, np.ndarray): FFT uzunluğu ve rfft frekanslarındaki karmaşık spektrum.
+        """
+        key = (seed_id, epoch_start, float(sampling_rate), int(npts))
+        with self._lock:
+            cached = self._spectra.get(key)
+            if cached is not None:
+                self._spectra.move_to_end(key)
+                return cached
+        nfft = sp_fft.next_fast_len(2 * int(npts), real=True)  # Dairesel evrişim sarmasını önlemek için >= 2*npts
+        spectrum, freqs = channel.response.get_evalresp_response(1.0 / sampling_rate, nfft, output=self.output)
+        if self.water_level is None:
+            spectrum[0] = 0.0
+            spectrum[1:] = 1.0 / spectrum[1:]
+        else:
+            invert_spectrum(spectrum, self.water_level)
+        if self.pre_filt:
+            spectrum *= cosine_sac_taper(freqs, flimit=self.pre_filt)
+        spectrum.flags.writeable = False
+        with self._lock:
+            self._spectra[key] = (nfft, spectrum)
+            while len(self._spectra) > self.max_spectra:
+                self._spectra.popitem(last=False)
+        return nfft, spectrum
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache(response_cfg):
+    """Aynı ayarlar için süreç boyunca tek ResponseCache döndürür (sunucu/zamanlayıcı tekrar ayrıştırmaz)."""
+    key = (os.path.abspath(response_cfg['stationxml_folder']), response_cfg.get('output', "VEL"),
+           response_cfg.get('water_level', 60.0), tuple(response_cfg.get('pre_filt') or ()),
+           response_cfg.get('max_cached_spectra', 256))
+    with _CACHES_LOCK:
+        if key not in _CACHES:
+            _CACHES[key] = ResponseCache.from_config(response_cfg)
+        return _CACHES[key]
+
+
+def deconvolve_batch(data, spectra, nfft, taper_fraction=0.05):
+    """
+    (n_trace, npts) dizisindeki tüm trace'lerin tepkisini tek rfft/irfft çağrısıyla giderir.
+
+    Args:
+        data (np.ndarray): (n_trace, npts) float dizi (değiştirilmez).
+        spectra (np.ndarray): (n_freq,) ortak veya (n_trace, n_freq) satır başına ters tepki spektrumu.
+        nfft (int): FFT uzunluğu (spektrumlarla aynı).
+        taper_fraction (float): Zaman alanı kosinüs konisi oranı (0: koni yok).
+
+    Returns:
+        np.ndarray: (n_trace, npts) float64 yer hareketi.
+    """
+    data = np.array(data, dtype=np.float64, ndmin=2)
+    npts = data.shape[1]
+    data -= data.mean(axis=1, keepdims=True)
+    if taper_fraction:
+        data *= cosine_taper(npts, taper_fraction, sactaper=True, halfcosine=False)
+    spec = sp_fft.rfft(data, n=nfft, axis=1, workers=-1)
+    spec *= spectra
+    spec[:, -1] = np.abs(spec[:, -1])  # Nyquist bileşeni gerçel (ObsPy ile aynı)
+    return sp_fft.irfft(spec, n=nfft, axis=1, workers=-1)[:, :npts]
+
+
+def remove_response(stream, response_cfg, cache=None):
+    """
+    Stream'deki trace'lerin alet tepkisini yerinde giderir.
+
+    Trace'ler (örnekleme frekansı, örnek sayısı) gruplarına ayrılır; her grup tek bir 2-B FFT ile işlenir.
+    Tepkisi bulunamayan trace'ler birimler karışmasın diye stream'den çıkarılır.
+
+    Args:
+        stream (obspy.Stream): İşlenecek trace'ler (boşluksuz; gerekirse önce merge edilmeli).
+        response_cfg (dict): CONFIG['response_settings'] bölümü.
+        cache (ResponseCache, optional): Verilmezse get_cache(response_cfg) kullanılır.
+
+    Returns:
+        obspy.Stream: Aynı stream (birimi response_cfg['output']).
+    """
+    cache = cache or get_cache(response_cfg)
+    cache.refresh()
+    counter = log_utils.StageCounter(logger, "Tepki giderme")
+    groups = {}
+    for tr in list(stream):
+        found = cache.find_channel(tr.stats.station, tr.stats.channel, tr.stats.starttime.ns,
+                                   network=tr.stats.network or None, location=tr.stats.location or None)
+        if found is None:
+            found = cache.find_channel(tr.stats.station, tr.stats.channel, tr.stats.starttime.ns)
+        if found is None:
+            counter.skip(f"{tr.id} için tepki bulunamadı")
+            stream.remove(tr)
+            continue
+        groups.setdefault((float(tr.stats.sampling_rate), tr.stats.npts), []).append((tr, found))
+
+    taper_fraction = response_cfg.get('taper_fraction', 0.05)
+    for (fs, npts), members in groups.items():
+        rows = [cache.inverse_spectrum(seed_id, start, cha, fs, npts) for _, (seed_id, start, cha) in members]
+        nfft = rows[0][0]
+        unique = {id(spectrum): spectrum for _, spectrum in rows}
+        spectra = rows[0][1] if len(unique) == 1 else np.stack([spectrum for _, spectrum in rows])
+        corrected = deconvolve_batch(np.stack([tr.data for tr, _ in members]), spectra, nfft, taper_fraction)
+        for (tr, _), data in zip(members, corrected):
+            tr.data = data
+            counter.add()
+    counter.emit()
+    return stream
+
+
+def remove_response_windows(windows, station, channel, times_ns, sampling_rate, response_cfg, cache=None):
+    """
+    Bir istasyonun eşit uzunluklu pencerelerinin (event kesitleri) tepkisini toplu giderir.
+
+    Her pencere başlangıç zamanındaki kanal epoch'unun tepkisiyle düzeltilir; aynı epoch'a düşen
+    pencereler tek FFT çağrısında işlenir.
+
+    Args:
+        windows (np.ndarray): (n_pencere, npts) dizi.
+        station, channel (str): İstasyon ve kanal kodu.
+        times_ns (np.ndarray): Pencere başlangıç zamanları (int64 ns).
+        sampling_rate (float): Örnekleme frekansı (Hz).
+        response_cfg (dict): CONFIG['response_settings'] bölümü.
+        cache (ResponseCache, optional): Verilmezse get_cache(response_cfg) kullanılır.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): Düzeltilmiş (n_pencere, npts) float64 dizi ve tepkisi bulunan
+        pencerelerin maskesi (bulunmayan satırlar değiştirilmeden döner).
+    """
+    cache = cache or get_cache(response_cfg)
+    cache.refresh()
+    windows = np.asarray(windows)
+    out = np.array(windows, dtype=np.float64)
+    ok = np.zeros(len(windows), dtype=bool)
+    by_epoch = {}
+    for i, t in enumerate(np.asarray(times_ns, dtype=np.int64)):
+        found = cache.find_channel(station, channel, int(t))
+        if found is not None:
+            by_epoch.setdefault((found[0], found[1]), (found[2], []))[1].append(i)
+    for (seed_id, start), (cha, rows) in by_epoch.items():
+        nfft, spectrum = cache.inverse_spectrum(seed_id, start, cha, sampling_rate, windows.shape[1])
+        out[rows] = deconvolve_batch(windows[rows], spectrum, nfft, response_cfg.get('taper_fraction', 0.05))
+        ok[rows] = True
+    return out, ok
+
+
+def unit_label(response_cfg):
+    """Grafik ekseni için birim etiketi ("Hız (m/s)" gibi); tepki giderme kapalıysa None."""
+    if not (response_cfg and response_cfg.get('enable')):
+        return None
+    output = response_cfg.get('output', "VEL")
+    name = {'DISP': "Yer Değiştirme", 'VEL': "Hız", 'ACC': "İvme"}[output]
+    return f"{name} ({UNITS[output]})"
+
+
+def describe(response_cfg):
+    """Tepki giderme ayarlarının kısa özeti (başlık/log için)."""
+    pre_filt = response_cfg.get('pre_filt')
+    pre = "-".join(f"{f:g}" for f in pre_filt) if pre_filt else "yok"
+    return f"{response_cfg.get('output', 'VEL')}, su seviyesi {response_cfg.get('water_level')} dB, ön filtre {pre} Hz"
+
@@ -0,0 +1,461 @@
+# seismic_analysis/utils/scheduler_utils.py
+
+import os
+import glob
+import json
+import time
+import hashlib
+import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+from obspy import UTCDateTime
+
+from config import config_loader
+from utils import catalog_utils
+from utils import download_utils
+from utils import detector_utils
+from utils import hdf5_dataset_utils
+from utils import pyramid_utils
+from utils import report_utils
+from utils import traveltime_utils
+
+# Günlük işleme için yerel bağımlılık grafiği (DAG).
+# Her aşama tarih (ve gerekiyorsa istasyon) ile anahtarlanmış bir görevdir:
+#   download/{tarih}/{istasyon} -> detect/{tarih}, pyramid/{tarih}/{istasyon}
+#   eqt/{tarih}, hdf5/{tarih} -> residuals/{tarih}
+#   download + eqt + hdf5 + residuals (+ detect, eqt_source="detector") -> render/{iş kimliği}
+# EQTransformer ve HDF5 ilişkilendirme bu ağacın dışında üretilir; eqt/hdf5 görevleri o günün sonuç
+# dosyalarını girdi/çıktı olarak izler: dosya yoksa görev başarısız olur ve grafik atlanır, dosya
+# değişince parmak izi değişir ve bağımlı görevler yeniden çalışır.
+# Görev parmak izi = parametreler + girdi dosyalarının (yol, mtime, boyut) bilgisi + bağımlılıkların
+# parmak izleri. Parmak izi ve çıktılar durum dosyasındaki kayıtla aynıysa görev atlanır; böylece
+# değişmeyen bir günü yeniden çalıştırmak sadece birkaç stat() çağrısına mal olur.
+
+STAGES = ("download", "eqt", "hdf5", "detect", "pyramid", "residuals", "render")
+
+
+class Task:
+    """
+    Tek bir DAG görevi.
+
+    Args:
+        task_id (str): Benzersiz kimlik (örn. "detect/2023-12-04").
+        action (callable): Görevi çalıştıran argümansız fonksiyon.
+        inputs (callable): Girdi dosya yollarını döndüren fonksiyon (bağımlılıklar bittikten sonra çağrılır).
+        outputs (callable): Çıktı dosya yollarını döndüren fonksiyon.
+        params (dict): Parmak izine giren parametreler (JSON'a çevrilebilir olmalı).
+        deps (list): Bağımlı olunan görev kimlikleri.
+    """
+
+    def __init__(self, task_id, action, inputs=None, outputs=None, params=None, deps=()):
+        self.task_id = task_id
+        self.action = action
+        self.inputs = inputs or (lambda: [])
+        self.outputs = outputs or (lambda: [])
+        self.params = params or {}
+        self.deps = list(deps)
+
+    def __repr__(self):
+        return f"Task({self.task_id!r}, deps={self.deps})"
+
+
+# --- Parmak İzi ve Durum ---
+def _file_stats(paths):
+    """Var olan dosyalar için {yol: [mtime_ns, boyut]} sözlüğü."""
+    stats = {}
+    for path in sorted(set(paths)):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stats[path] = [st.st_mtime_ns, st.st_size]
+    return stats
+
+
+def task_fingerprint(task, dep_fingerprints):
+    """Parametreler, girdi dosyası bilgileri ve bağımlılık parmak izlerinden SHA1 özeti üretir."""
+    payload = json.dumps({
+        'params': task.params,
+        'inputs': _file_stats(task.inputs()),
+        'deps': [dep_fingerprints.get(d) for d in task.deps],
+    }, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_state(state_path):
+    """Durum dosyasını okur (yoksa veya bozuksa boş sözlük)."""
+    if not state_path or not os.path.exists(state_path):
+        return {}
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"  Uyarı: Zamanlayıcı durum dosyası okunamadı, tüm görevler yeniden çalışacak ({state_path}): {e}")
+        return {}
+
+
+def save_state(state_path, state):
+    """Durum dosyasını geçici dosya + os.replace ile atomik yazar."""
+    os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def is_stale(task, fingerprint, record):
+    """Görev kaydı yoksa, başarısızsa, parmak izi değiştiyse veya çıktılar silinmiş/değişmişse True."""
+    if not record or record.get('status') != 'ok' or record.get('fingerprint') != fingerprint:
+        return True
+    return _file_stats(task.outputs()) != record.get('outputs', {})
+
+
+# --- Çalıştırıcı ---
+def run_tasks(tasks, state_path, workers=4, force=False, dry_run=False):
+    """
+    Görevleri bağımlılık sırasına göre, bağımsız olanları paralel çalıştırır; sadece eskimiş görevler çalışır.
+
+    Args:
+        tasks (list): Task listesi.
+        state_path (str): JSON durum dosyası.
+        workers (int): Eşzamanlı görev sayısı (iş parçacığı).
+        force (bool): True ise tüm görevler eskimiş kabul edilir.
+        dry_run (bool): True ise sadece çalışacak görevler listelenir.
+
+    Returns:
+        dict: Görev kimliği -> durum ('fresh', 'ok', 'empty', 'failed', 'skipped', 'pending').
+    """
+    by_id = {t.task_id: t for t in tasks}
+    for t in tasks:
+        missing = [d for d in t.deps if d not in by_id]
+        if missing:
+            raise ValueError(f"{t.task_id} bilinmeyen görevlere bağlı: {missing}")
+
+    state = load_state(state_path)
+    statuses = {}
+    fingerprints = {}
+    remaining = {t.task_id: set(t.deps) for t in tasks}
+    dependents = {t.task_id: [] for t in tasks}
+    for t in tasks:
+        for d in t.deps:
+            dependents[d].append(t.task_id)
+
+    def execute(task, fingerprint):
+        start = time.perf_counter()
+        try:
+            task.action()
+        except Exception as e:
+            return 'failed', {'fingerprint': fingerprint, 'status': 'failed', 'error': str(e)}
+        outputs = _file_stats(task.outputs())
+        status = 'ok' if outputs or not task.outputs() else 'empty'
+        return status, {
+            'fingerprint': fingerprint, 'status': status, 'outputs': outputs,
+            'seconds': round(time.perf_counter() - start, 3),
+            'finished': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+
+    def finish(task_id, status):
+        statuses[task_id] = status
+        ready = []
+        for child in dependents[task_id]:
+            if status in ('failed', 'skipped'):
+                if child not in statuses:
+                    finish(child, 'skipped')
+                continue
+            remaining[child].discard(task_id)
+            if not remaining[child] and child not in statuses:
+                ready.append(child)
+        return ready
+
+    # ready listesi döngü içinde genişletilir: atlanan görevlerin çocukları aynı turda değerlendirilir
+    ready = [tid for tid, deps in remaining.items() if not deps]
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+        while ready or futures:
+            for task_id in ready:
+                task = by_id[task_id]
+                fingerprint = task_fingerprint(task, fingerprints)
+                fingerprints[task_id] = fingerprint
+                if dry_run and any(statuses.get(d) == 'pending' for d in task.deps):
+                    # Eskimiş bir görevin çocukları da çalışacak sayılır (parmak izleri henüz bilinmiyor)
+                    print(f"  [çalışacak] {task_id}")
+                    ready.extend(finish(task_id, 'pending'))
+                    continue
+                if not force and not is_stale(task, fingerprint, state.get(task_id)):
+                    ready.extend(finish(task_id, 'fresh'))
+                    continue
+                if dry_run:
+                    print(f"  [çalışacak] {task_id}")
+                    ready.extend(finish(task_id, 'pending'))
+                    continue
+                print(f"  [başlıyor] {task_id}")
+                futures[pool.submit(execute, task, fingerprint)] = task_id
+            ready = []
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                task_id = futures.pop(future)
+                status, record = future.result()
+                # Durum sadece bu (ana) iş parçacığında güncellenir; her görevden sonra kaydedilir
+                state[task_id] = record
+                if state_path:
+                    save_state(state_path, state)
+                if status == 'failed':
+                    print(f"  [HATA] {task_id}: {record.get('error')}")
+                else:
+                    print(f"  [{status}] {task_id} ({record['seconds']:.2f} s)")
+                ready.extend(finish(task_id, status))
+    return statuses
+
+
+# --- Günlük İşleme Grafiği ---
+def date_range(start_date, end_date):
+    """[start_date, end_date] aralığındaki günleri YYYY-MM-DD olarak döndürür (iki uç dahil)."""
+    days = np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1)
+    return [str(d) for d in days]
+
+
+def _mseed_glob(mseed_folder, station, channel, date, hour=None):
+    hour_part = '*' if hour is None else f"{hour:02d}00"
+    return os.path.join(mseed_folder, f"{station}_{channel}_*_{date}_{hour_part}*.mseed")
+
+
+def _globber(*patterns):
+    return lambda: sorted(p for pattern in patterns for p in glob.glob(pattern))
+
+
+def _day_config(config, date):
+    """Bir günün tamamı (00-24) için türetilmiş yapılandırma."""
+    station = config['seismic_data']['selected_station']
+    return config_loader.derive_job_configs(config, [date], [(0, 24)], [station])[0][1]
+
+
+def _dated_path(path, date):
+    """'klasör/ad.uzantı' -> 'klasör/ad_{tarih}.uzantı'."""
+    base, ext = os.path.splitext(path)
+    return f"{base}_{date}{ext}"
+
+
+def _require_files(paths, what):
+    """Dışarıda üretilen sonuç dosyaları için kapı: hiçbiri yoksa görev başarısız olur."""
+    existing = [p for p in paths if os.path.isfile(p)]
+    if not existing:
+        raise FileNotFoundError(f"{what} bulunamadı: {', '.join(paths) or '(yapılandırılmamış)'}")
+    print(f"  {what}: {len(existing)} dosya")
+
+
+def _hdf5_day_files(hdf5_cfg, station_names, date):
+    """Günün HDF5 sonuç dosyalarını döndüren fonksiyon (klasör modunda sadece o günle kesişen dosyalar)."""
+    if hdf5_cfg.get('hdf5_folder'):
+        def files():
+            if not os.path.isdir(hdf5_cfg['hdf5_folder']):
+                return []
+            t0_ns = UTCDateTime(f"{date}T00:00:00").ns
+            with hdf5_dataset_utils.HDF5Dataset(hdf5_cfg['hdf5_folder'], station_names, hdf5_cfg.get('max_open_files', 8)) as dataset:
+                return [f['path'] for f in dataset.files_for_range(t0_ns, t0_ns + 86400 * 10**9)]
+        return files
+    path = hdf5_cfg.get('hdf5_file_path')
+    return lambda: [path] if path else []
+
+
+def _hdf5_for_date(config, hdf5_date, date):
+    """
+    Tek dosya modunda HDF5 dosyası sadece kendi gününe aittir (srcs/Picks zamanları o günün saniyesidir).
+    Diğer günlerde dosya başka günün saniyeleri olarak yorumlanmasın diye hdf5_file_path boşaltılır.
+    """
+    hdf5_cfg = config.get('hdf5_data')
+    if not hdf5_cfg or hdf5_cfg.get('hdf5_folder') or not hdf5_cfg.get('hdf5_file_path') or date == hdf5_date:
+        return config
+    return config_loader.with_section(config, 'hdf5_data', hdf5_file_path=None)
+
+
+def build_daily_tasks(config, station_names, dates, render=None):
+    """
+    Verilen günler için indirme -> EQT/HDF5 sonuçları, tespit/piramit -> rezidüel -> grafik görevlerini oluşturur.
+
+    Args:
+        config (dict): Doğrulanmış yapılandırma.
+        station_names (list): HDF5 istasyon isimleri.
+        dates (list): Günler (YYYY-MM-DD).
+        render (callable, optional): config -> plotly Figure (main.build_figure). Verilmezse grafik aşaması eklenmez.
+
+    Returns:
+        list: Task listesi.
+    """
+    sched_cfg = config.get('scheduler_settings', {})
+    stages = set(sched_cfg.get('stages', STAGES))
+    report_folder = sched_cfg.get('report_folder')
+    mseed_folder = config['seismic_data']['mseed_folder']
+    download_cfg = config.get('download_settings', {})
+    downloading = 'download' in stages and download_cfg.get('enable_download', False)
+    det_cfg = config.get('detector_settings', {})
+    det_channel = det_cfg.get('channel') or '*'
+    phase_component = config['seismic_data']['phase_component']
+    catalog_files = catalog_utils.resolve_catalog_paths(config['catalog_data']['catalog_file_path']) + [config['catalog_data']['station_data_path']]
+    use_detector = sched_cfg.get('eqt_source', 'summary') == 'detector'
+    # Tek dosya modunda HDF5 dosyasının günü: 'date' dataseti/dosya adı, yoksa yapılandırmadaki gün
+    hdf5_cfg = config.get('hdf5_data') or {}
+    hdf5_date = None
+    if hdf5_cfg.get('hdf5_file_path') and not hdf5_cfg.get('hdf5_folder'):
+        hdf5_date = hdf5_dataset_utils.single_file_date(hdf5_cfg['hdf5_file_path']) or config['seismic_data']['date']
+
+    tasks = []
+    for date in dates:
+        day_cfg = _hdf5_for_date(_day_config(config, date), hdf5_date, date)
+        day_hdf5_files = _hdf5_day_files(day_cfg.get('hdf5_data') or {}, station_names, date)
+        download_ids = {}
+
+        if downloading:
+            channel = download_cfg['channel']
+            start_hour, end_hour = download_cfg['start_hour'], download_cfg['end_hour']
+            t0 = UTCDateTime(f"{date}T00:00:00") + 3600 * start_hour
+            t1 = UTCDateTime(f"{date}T00:00:00") + 3600 * end_hour
+            for station in download_cfg.get('stations_to_download', []):
+                task_id = f"download/{date}/{station}"
+                download_ids[station] = task_id
+                tasks.append(Task(
+                    task_id,
+                    action=(lambda s=station, c=channel, a=t0, b=t1: download_utils.download_waveforms_for_station(
+                        download_cfg['client_name'], s, c, a, b, mseed_folder)),
+                    outputs=_globber(_mseed_glob(mseed_folder, station, channel, date, start_hour)),
+                    params={'client': download_cfg['client_name'], 'channel': channel, 'start': str(t0), 'end': str(t1)},
+                ))
+
+        eqt_id = None
+        if 'eqt' in stages and not use_detector and config.get('eqt_data'):
+            eqt_id = f"eqt/{date}"
+            eqt_files = (lambda p=config['eqt_data']['summary_csv_path']: [p])
+            tasks.append(Task(
+                eqt_id,
+                action=lambda f=eqt_files: _require_files(f(), "EQTransformer sonucu"),
+                inputs=eqt_files, outputs=eqt_files,
+                params={'summary_csv_path': config['eqt_data']['summary_csv_path']},
+            ))
+
+        hdf5_id = None
+        day_hdf5_cfg = day_cfg.get('hdf5_data') or {}
+        if 'hdf5' in stages and (day_hdf5_cfg.get('hdf5_folder') or day_hdf5_cfg.get('hdf5_file_path')):
+            hdf5_id = f"hdf5/{date}"
+            tasks.append(Task(
+                hdf5_id,
+                action=lambda f=day_hdf5_files: _require_files(f(), "HDF5 ilişkilendirme sonucu"),
+                inputs=day_hdf5_files, outputs=day_hdf5_files,
+                params={'hdf5_folder': day_hdf5_cfg.get('hdf5_folder'), 'hdf5_file_path': day_hdf5_cfg.get('hdf5_file_path')},
+            ))
+
+        if 'detect' in stages and det_cfg:
+            det_output = _dated_path(det_cfg['output_csv'], date)
+            det_inputs = _globber(_mseed_glob(mseed_folder, '*', det_channel, date))
+            # Günlük görevler paralel çalıştığı için HDF5 sonuç dosyası da güne göre ayrılır
+            det_job = config_loader.with_section(day_cfg, 'detector_settings', output_csv=det_output,
+                                                  output_hdf5=det_cfg.get('output_hdf5') and _dated_path(det_cfg['output_hdf5'], date))
+            tasks.append(Task(
+                f"detect/{date}",
+                action=lambda job=det_job, inputs=det_inputs: detector_utils.run_detector(job, paths=inputs()),
+                inputs=det_inputs, outputs=lambda p=det_output: [p],
+                params={k: v for k, v in det_cfg.items() if k != 'output_csv'},
+                deps=download_ids.values(),
+            ))
+
+        if 'pyramid' in stages and config.get('pyramid_settings'):
+            pyr_cfg = config['pyramid_settings']
+            if downloading:
+                pyr_stations = list(download_ids)
+            else:
+                pyr_stations = [s for s, c, d in pyramid_utils.list_channel_days(mseed_folder) if c == phase_component and d == date]
+            for station in pyr_stations:
+                day_dir = pyramid_utils.day_dir(pyr_cfg['pyramid_folder'], station, phase_component, date)
+                tasks.append(Task(
+                    f"pyramid/{date}/{station}",
+                    action=lambda s=station, d=date: pyramid_utils.build_pyramid_for_day(
+                        mseed_folder, s, phase_component, d, pyr_cfg['pyramid_folder'], pyr_cfg['levels'],
+                        filter_cfg=config['seismic_data'], force=True),
+                    inputs=_globber(_mseed_glob(mseed_folder, station, phase_component, date)),
+                    outputs=lambda d=day_dir: [os.path.join(d, "meta.json")],
+                    params={'levels': pyr_cfg['levels'], 'filter': {k: config['seismic_data'][k] for k in ('filter_type', 'freqmin', 'freqmax', 'corners', 'zerophase')}},
+                    deps=[download_ids[station]] if station in download_ids else [],
+                ))
+
+        residual_output = None
+        if 'residuals' in stages and config.get('traveltime_settings'):
+            tt_cfg = config['traveltime_settings']
+            residual_output = _dated_path(tt_cfg.get('output_csv') or os.path.join(report_folder, "residuals.csv"), date)
+            res_job = config_loader.with_section(day_cfg, 'traveltime_settings', output_csv=residual_output,
+                                                  output_hdf5=tt_cfg.get('output_hdf5') and _dated_path(tt_cfg['output_hdf5'], date))
+            catalog_inputs = _globber(*catalog_files)
+            tasks.append(Task(
+                f"residuals/{date}",
+                # Katalogdan sadece bu günün event'leri; HDF5 day_cfg ile zaten bu güne sınırlı
+                action=lambda job=res_job, d=date: traveltime_utils.run_residuals(job, station_names, show_plot=False, date=d),
+                inputs=lambda c=catalog_inputs, h=day_hdf5_files: c() + h(),
+                outputs=lambda p=residual_output: [p],
+                params={'traveltime': {k: v for k, v in tt_cfg.items() if k != 'output_csv'}, 'hdf5': day_hdf5_cfg, 'date': date},
+                deps=[hdf5_id] if hdf5_id else [],
+            ))
+
+        if 'render' in stages and render is not None and report_folder:
+            has_detect = any(t.task_id == f"detect/{date}" for t in tasks)
+            deps = [f"detect/{date}"] if use_detector and has_detect else []
+            deps += [tid for tid in (eqt_id, hdf5_id) if tid]
+            deps += [f"residuals/{date}"] if residual_output else []
+            response_cfg = config.get('response_settings') or {}
+            response_files = [os.path.join(response_cfg['stationxml_folder'], "*.xml")] if response_cfg.get('enable') else []
+            for job_id, job in config_loader.derive_job_configs(config, dates=[date]):
+                job = _hdf5_for_date(job, hdf5_date, date)
+                if use_detector and has_detect:
+                    # EQT paneli bu günün STA/LTA çıktısından (EQT summary.csv biçiminde) beslenir
+                    job = config_loader.with_section(job, 'eqt_data', summary_csv_path=_dated_path(det_cfg['output_csv'], date))
+                seismic = job['seismic_data']
+                html_path = os.path.join(report_folder, f"{job_id}.html")
+                station = seismic['selected_station']
+                tasks.append(Task(
+                    f"render/{job_id}",
+                    action=lambda j=job, p=html_path: _write_figure(render(j), p, config.get('report_settings')),
+                    inputs=lambda g=_globber(_mseed_glob(mseed_folder, station, seismic['phase_component'], date, seismic['start_hour']),
+                                             *catalog_files, job['eqt_data']['summary_csv_path'], *response_files),
+                                  h=day_hdf5_files: g() + h(),
+                    outputs=lambda p=html_path: [p],
+                    params={k: job[k] for k in ('seismic_data', 'response_settings', 'eqt_data', 'hdf5_data', 'plot_settings', 'spectral_settings') if k in job},
+                    deps=deps + ([download_ids[station]] if station in download_ids else []),
+                ))
+    return tasks
+
+
+def _write_figure(fig, html_path, report_cfg=None):
+    """
+    Figürü rapor olarak yazar: plotly.js rapor klasöründe tüm günler için tek kopya, veriler yan dosyalarda.
+    """
+    folder, name = os.path.split(html_path)
+    report_name = os.path.splitext(name)[0]
+    report_utils.export_configured({report_name: fig}, report_cfg, report_name, output_folder=folder)
+
+
+def run_schedule(config, station_names, dates=None, render=None, force=False, dry_run=False):
+    """
+    Günlük işleme grafiğini (geriye dönük doldurma dahil) çalıştırır.
+
+    Args:
+        config (dict): Doğrulanmış yapılandırma.
+        station_names (list): HDF5 istasyon isimleri.
+        dates (list, optional): Günler; varsayılan job_settings.dates veya seismic_data.date.
+        render (callable, optional): config -> plotly Figure.
+        force (bool): Tüm görevleri yeniden çalıştır.
+        dry_run (bool): Sadece çalışacak görevleri listele.
+
+    Returns:
+        dict: Görev kimliği -> durum.
+    """
+    sched_cfg = config.get('scheduler_settings', {})
+    dates = list(dates or config.get('job_settings', {}).get('dates') or [config['seismic_data']['date']])
+    tasks = build_daily_tasks(config, station_names, dates, render)
+    print(f"\n--- Zamanlayıcı: {len(dates)} gün, {len(tasks)} görev ({dates[0]} .. {dates[-1]}) ---")
+    wall_start = time.perf_counter()
+    statuses = run_tasks(tasks, sched_cfg.get('state_file'), sched_cfg.get('workers', 4), force, dry_run)
+    counts = {}
+    for status in statuses.values():
+        counts[status] = counts.get(status, 0) + 1
+    summary = ", ".join(f"{k}: {v}" for k, v in sorted(counts.items()))
+    print(f"--- Zamanlayıcı Tamamlandı ({time.perf_counter() - wall_start:.2f} s; {summary}) ---\n")
+    return statuses
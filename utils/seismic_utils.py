@@ -1,89 +1,142 @@
-import glob
-import datetime
 import plotly.graph_objects as go
-from obspy import read
-import pandas as pd # <<< Pandas'ı import et
+from obspy import read, UTCDateTime
 import numpy as np
 
-def plot_seismic_data(output_folder, selected_station, date, start_hour, filter_type, freqmin, freqmax, corners, zerophase, phase_component):
-    """
-    Seismic veriyi okur, filtreler ve Plotly ile grafiklendirir.
+from utils import time_utils
+from utils import mseed_index_utils
+from utils import log_utils
+from utils import response_utils
+
+logger = log_utils.get_logger(__name__)
+
+def minmax_decimate(times_ns, data, n_bins):
     """
-    # Dosya adındaki saat formatını ve jolly karakterini kontrol et
-    # İndirilen format: GELI_HHZ_KO_2023-12-04_0600.mseed
-    # Aranan glob: {station}_{phase_component}_*_{date}_*{start_hour:02d}00*.mseed
-    # Bu desen eşleşmeli.
-    file_pattern = f"{output_folder}/{selected_station}_{phase_component}_*_{date}_*{start_hour:02d}00*.mseed"
-
-    print(f"Aranan dosya deseni: {file_pattern}") # Hata ayıklama için
-    file_path_list = glob.glob(file_pattern)
-
-    if not file_path_list:
-        print(f"Uyarı: Dosya bulunamadı: {file_pattern}")
-        # Başka bir saat formatını dene? Veya sadece istasyon/kanal/tarih ile ara?
-        # Alternatif daha genel desen:
-        alt_file_pattern = f"{output_folder}/{selected_station}_{phase_component}_*_{date}*.mseed"
-        print(f"Alternatif desen deneniyor: {alt_file_pattern}")
-        file_path_list = glob.glob(alt_file_pattern)
-        # Sadece ilk eşleşeni al (eğer birden fazla saat varsa)
-        if file_path_list:
-             # Belirli saate en yakın olanı seçmek daha iyi olabilir ama şimdilik ilkini alalım
-             file_path = sorted(file_path_list)[0] # İsme göre sıralayıp ilkini al
-             print(f"Alternatif desenle dosya bulundu: {file_path}")
-        else:
-            print(f"Uyarı: Alternatif desenle de dosya bulunamadı: {alt_file_pattern}")
-            return None # Dosya bulunamazsa None dön
+    Waveform'u min/max zarfına indirger (her piksel sütunu için bir min ve bir max).
 
+    Örnek sayısı n_bins'in iki katından azsa veri olduğu gibi döndürülür.
+    Dönen diziler sırayla (min, max) çiftlerini içerir, böylece çizgi grafiği
+    her binde sinyalin tüm genliğini gösterir.
 
-    # Eğer ilk desen başarılıysa, ilkini al
-    if len(file_path_list) > 0 and 'file_path' not in locals():
-         file_path = file_path_list[0]
+    Args:
+        times_ns (np.ndarray): int64 nanosaniye zaman dizisi (epoch).
+        data (np.ndarray): Örnek değerleri (times_ns ile aynı uzunlukta).
+        n_bins (int): Hedef bin (piksel) sayısı.
 
-    if 'file_path' not in locals() or not file_path:
-         print(f"Uyarı: {selected_station} için uygun mseed dosyası bulunamadı.")
-         return None
+    Returns:
+        tuple(np.ndarray, np.ndarray): İndirgenmiş zaman (int64 ns) ve değer dizileri.
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    data = np.asarray(data, dtype=np.float64)
+    n_bins = max(int(n_bins), 1)
+    if len(data) <= 2 * n_bins:
+        return times_ns, data
+
+    # Diziyi eşit boyutlu bloklara böl, kalan kuyruk son bine eklenmez (en fazla bin_size-1 örnek)
+    bin_size = len(data) // n_bins
+    usable = bin_size * n_bins
+    blocks = data[:usable].reshape(n_bins, bin_size)
+    t_blocks = times_ns[:usable].reshape(n_bins, bin_size)
+
+    # Boşluklar (NaN) uç değer seçiminde yok sayılır; tamamen boş binler NaN kalır (çizgide kopukluk)
+    if np.isnan(blocks).any():
+        lo = np.where(np.isnan(blocks), np.inf, blocks)
+        hi = np.where(np.isnan(blocks), -np.inf, blocks)
+    else:
+        lo = hi = blocks
+    idx_min = np.argmin(lo, axis=1)
+    idx_max = np.argmax(hi, axis=1)
+    rows = np.arange(n_bins)
+
+    # Zaman sırasını korumak için her binde önce gelen uç değeri önce yaz
+    first = np.minimum(idx_min, idx_max)
+    second = np.maximum(idx_min, idx_max)
+    out_t = np.empty(2 * n_bins, dtype=np.int64)
+    out_y = np.empty(2 * n_bins, dtype=np.float64)
+    out_t[0::2] = t_blocks[rows, first]
+    out_t[1::2] = t_blocks[rows, second]
+    out_y[0::2] = blocks[rows, first]
+    out_y[1::2] = blocks[rows, second]
+    return out_t, out_y
+
+
+def apply_filter(stream, filter_type, freqmin, freqmax, corners, zerophase):
+    """
+    config'deki filtre ayarlarını (seismic_data bölümü) bir ObsPy Stream'ine yerinde uygular.
 
-    print(f"Okunan dosya: {file_path}") # Hata ayıklama için
+    Raises:
+        ValueError: Filtre tipi geçersizse veya bant filtreleri için frekanslar eksikse.
+    """
+    if not filter_type:
+        return stream
+    if filter_type == 'highpass':
+        stream.filter(type=filter_type, freq=freqmin, corners=corners, zerophase=zerophase)
+    elif filter_type == 'lowpass':
+        stream.filter(type=filter_type, freq=freqmax, corners=corners, zerophase=zerophase)
+    elif filter_type in ['bandpass', 'bandstop']:
+        if freqmin is None or freqmax is None:
+            raise ValueError(f"{filter_type} için freqmin ve freqmax tanımlanmalı.")
+        stream.filter(type=filter_type, freqmin=freqmin, freqmax=freqmax, corners=corners, zerophase=zerophase)
+    else:
+        raise ValueError(f"Geçersiz filtre tipi '{filter_type}'.")
+    return stream
+
+
+def plot_seismic_data(output_folder, selected_station, date, start_hour, filter_type, freqmin, freqmax, corners, zerophase, phase_component, response_cfg=None):
+    """
+    Seismic veriyi okur, filtreler ve Plotly ile grafiklendirir.
+
+    response_cfg (CONFIG['response_settings']) etkinse filtreden önce alet tepkisi giderilir ve
+    filtreli sinyal yer hareketi biriminde (örn. m/s) çizilir; ham sinyal count olarak kalır.
+    """
+    # Dosyalar mseed dizininden (mseed_index_utils) seçilir: [start_hour, start_hour + 1) saatini
+    # kesen dosyalar tam olarak bulunur (dosya adındaki saat farklı olsa bile, örn. 2 saatlik dosyalar).
+    t0_ns = UTCDateTime(f"{date}T{start_hour:02d}:00:00").ns
+    file_paths = mseed_index_utils.find_files(output_folder, selected_station, phase_component, t0_ns, t0_ns + 3600 * 10**9)
+    if not file_paths:
+        logger.warning("Uyarı: %s %s için %s %02d:00 saatini kapsayan mseed dosyası bulunamadı (%s).", selected_station, phase_component, date, start_hour, output_folder)
+        return None
+    file_path = ", ".join(file_paths)
+    logger.debug("Okunan dosya: %s", file_path) # Hata ayıklama için
 
     try:
-        stream = read(file_path)
+        stream = read(file_paths[0])
+        for extra_path in file_paths[1:]:
+            stream += read(extra_path)
+        if len(file_paths) > 1:
+            stream.merge(method=1, fill_value=0)
         if not stream:
-             print(f"Uyarı: {file_path} dosyası boş veya okunamadı.")
+             logger.warning("Uyarı: %s dosyası boş veya okunamadı.", file_path)
              return None
         raw_data = stream.copy()
 
-        # Filtreleme
-        # ... (Filtreleme kodu aynı kalır) ...
-        if filter_type: # Filtre tipi belirtilmişse uygula
-            try:
-                if filter_type == 'highpass':
-                    stream.filter(type=filter_type, freq=freqmin, corners=corners, zerophase=zerophase)
-                elif filter_type in ['lowpass', 'bandpass', 'bandstop']:
-                    if filter_type == 'lowpass':
-                        stream.filter(type=filter_type, freq=freqmax, corners=corners, zerophase=zerophase)
-                    else:
-                         if freqmin is None or freqmax is None: print(f"Uyarı: {filter_type} için freqmin ve freqmax tanımlanmalı."); return None
-                         stream.filter(type=filter_type, freqmin=freqmin, freqmax=freqmax, corners=corners, zerophase=zerophase)
-                else: print(f"Uyarı: Geçersiz filtre tipi '{filter_type}'. Filtre uygulanmadı.")
-            except Exception as e: print(f"Filtreleme hatası: {str(e)}")
-
+        # Alet tepkisi giderme (filtreden önce; tepkisi bulunamazsa grafik count olarak çizilir)
+        y_label = "Amplitüd"
+        if response_cfg and response_cfg.get('enable'):
+            corrected = response_utils.remove_response(stream.copy(), response_cfg)
+            if corrected:
+                stream = corrected
+                y_label = response_utils.unit_label(response_cfg)
+            else:
+                logger.warning("Uyarı: %s %s için tepki bulunamadı (%s); count çizilecek.", selected_station, phase_component, response_cfg['stationxml_folder'])
+
+        # Filtreleme: sunucu, piramit ve dedektörle aynı fonksiyon ve aynı hata politikası
+        # (geçersiz filtre ayarı veriyi filtresiz çizmek yerine paneli üretmez)
+        try:
+            apply_filter(stream, filter_type, freqmin, freqmax, corners, zerophase)
+        except ValueError as e:
+            logger.error("Filtreleme hatası: %s", e)
+            return None
 
         if not stream: # Filtreleme sonrası stream boşalırsa (çok nadir)
-             print(f"Uyarı: Filtreleme sonrası veri kalmadı: {file_path}")
+             logger.warning("Uyarı: Filtreleme sonrası veri kalmadı: %s", file_path)
              return None
 
         trace = stream[0]
         raw_trace = raw_data[0]
 
-        # === ZAMAN EKSENİ DEĞİŞİKLİĞİ ===
-        # trace.times("datetime") yerine Pandas Timestamp kullanalım
-        start_time_ns = trace.stats.starttime.ns # Nanosecond precision start time
-        delta_s = trace.stats.delta             # Sampling interval in seconds
-        times_rel_ns = np.arange(trace.stats.npts) * delta_s * 1e9 # Relative time in ns
-        # Başlangıç zamanına göre mutlak zamanı ns cinsinden hesapla
-        times_abs_ns = start_time_ns + times_rel_ns
-        # Pandas Timestamp serisine çevir (UTC varsayalım, Obspy genelde UTC kullanır)
-        time_series_pd = pd.to_datetime(times_abs_ns, unit='ns', utc=True)
+        # === ZAMAN EKSENİ ===
+        # Örnek zamanları int64 nanosaniye olarak üretilir (float ns mutlak zamanda hassasiyet kaybeder)
+        time_series_pd = time_utils.trace_times_datetime64(trace.stats.starttime, trace.stats.delta, trace.stats.npts)
         # ================================
 
 
@@ -118,11 +171,13 @@ def plot_seismic_data(output_folder, selected_station, date, start_hour, filter_
             title_text += f"<br><sup>Filtre: {filter_type} {freqmin or ''}-{freqmax or ''} Hz, Corners: {corners}, Zerophase: {zerophase}</sup>"
         else:
              title_text += "<br><sup>Filtre Uygulanmadı</sup>"
+        if y_label != "Amplitüd":
+            title_text += f"<br><sup>Tepki giderildi: {response_utils.describe(response_cfg)}</sup>"
 
         fig.update_layout(
             title=title_text,
             xaxis_title="Zaman (UTC)",
-            yaxis_title="Amplitüd",
+            yaxis_title=y_label,
             hovermode="x unified",
             template="plotly_white",
             showlegend=True,
@@ -145,14 +200,13 @@ def plot_seismic_data(output_folder, selected_station, date, start_hour, filter_
 
     # Hata yakalamayı spesifikleştirelim
     except FileNotFoundError:
-        print(f"Hata: {file_path} dosyası okunamadı veya bulunamadı.")
+        logger.error("Hata: %s dosyası okunamadı veya bulunamadı.", file_path)
         return None
     except IndexError:
-         print(f"Hata: {file_path} dosyasında beklenen trace bulunamadı.")
+         logger.error("Hata: %s dosyasında beklenen trace bulunamadı.", file_path)
          return None
     except Exception as e:
-        # Hatayı ve traceback'i yazdırabiliriz (daha detaylı hata ayıklama için)
-        import traceback
-        print(f"Sismik veri işlenirken beklenmedik bir hata oluştu: {str(e)}")
-        # traceback.print_exc() # Bunu etkinleştirirseniz tam hata izini görürsünüz
+        logger.error("Sismik veri işlenirken beklenmedik bir hata oluştu: %s", e)
+        # Tam hata izi DEBUG seviyesinde (logging_settings.module_levels: "utils.seismic_utils=DEBUG")
+        logger.debug("Hata izi:", exc_info=True)
         return None
\ No newline at end of file
@@ -0,0 +1,518 @@
+# seismic_analysis/utils/server_utils.py
+
+import os
+import json
+import socket
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+from obspy import read, UTCDateTime
+
+from utils import seismic_utils
+from utils import pyramid_utils
+from utils import catalog_utils
+from utils import hdf5_utils
+from utils import hdf5_dataset_utils
+from utils import eqt_utils
+from utils import mseed_index_utils
+from utils import qc_utils
+from utils import response_utils
+
+# Sunucu yalnızca yerel makineden erişilebilir olmalı
+_LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+_NS_PER_MS = 10**6
+_MAX_PICK_DAYS = 7        # Bir pencerede HDF5/EQT picklerinin yükleneceği en fazla gün
+_PICK_DAY_CACHE = 16      # Bellekte tutulan gün panelleri
+
+
+class _IPv6HTTPServer(ThreadingHTTPServer):
+    """'::1' gibi IPv6 adresleri için (ThreadingHTTPServer yalnızca IPv4 soketi açar)."""
+    address_family = socket.AF_INET6
+
+
+# --- Waveform Önbelleği (Dosya Bazında, LRU) ---
+class _TraceCache:
+    """Okunmuş ve filtrelenmiş mseed dosyalarını (path, mtime) anahtarıyla bellekte tutar."""
+
+    def __init__(self, max_items):
+        self.max_items = max(int(max_items), 1)
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+def _find_window_files(mseed_folder, station, component, t0_ns, t1_ns):
+    """[t0, t1) aralığını kesen mseed dosyalarını klasör dizininden (mseed_index_utils) bulur."""
+    return mseed_index_utils.find_files(mseed_folder, station, component, t0_ns, t1_ns)
+
+
+def _load_filtered_file(path, seismic_cfg, cache, response_cfg=None):
+    """
+    Bir mseed dosyasını okur, config'deki filtreyi uygular ve (başlangıç_ns, delta_ns, veri) listesi döndürür.
+
+    response_cfg etkinse filtreden önce alet tepkisi giderilir (tepkisi olmayan trace'ler atlanır).
+    """
+    remove_response = bool(response_cfg and response_cfg.get('enable'))
+    key = (path, os.path.getmtime(path), remove_response)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    stream = read(path)
+    if remove_response:
+        response_utils.remove_response(stream, response_cfg)
+    try:
+        seismic_utils.apply_filter(stream, seismic_cfg.get('filter_type'), seismic_cfg.get('freqmin'), seismic_cfg.get('freqmax'),
+                                   seismic_cfg.get('corners', 4), seismic_cfg.get('zerophase', True))
+    except Exception as e:
+        print(f"  Uyarı: {path} filtrelenemedi, ham veri kullanılacak: {e}")
+
+    segments = []
+    for tr in stream:
+        delta_ns = int(round(tr.stats.delta * 1e9))
+        segments.append((tr.stats.starttime.ns, delta_ns, tr.data.astype(np.float32)))
+    cache.put(key, segments)
+    return segments
+
+
+def load_waveform_window(seismic_cfg, station, t0_ns, t1_ns, n_bins, cache, pyramid_folder=None, response_cfg=None):
+    """
+    Bir istasyon için [t0, t1) aralığındaki waveform'u okur ve min/max zarfına indirger.
+
+    Args:
+        seismic_cfg (dict): CONFIG['seismic_data'] bölümü (klasör, bileşen ve filtre ayarları).
+        station (str): İstasyon kodu.
+        t0_ns, t1_ns (int): Pencere sınırları (epoch nanosaniye).
+        n_bins (int): İstemcinin piksel genişliği (hedef bin sayısı).
+        cache (_TraceCache): Dosya önbelleği.
+        pyramid_folder (str, optional): Önceden hesaplanmış min/max piramidi klasörü. Pencere
+            yeterince genişse zarf buradan okunur, mseed dosyaları hiç açılmaz.
+        response_cfg (dict, optional): CONFIG['response_settings']; etkinse piramit (count) kullanılmaz.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): int64 ns zaman ve değer dizileri (veri yoksa boş diziler).
+    """
+    if pyramid_folder and not (response_cfg and response_cfg.get('enable')):
+        envelope = pyramid_utils.read_envelope(pyramid_folder, station, seismic_cfg['phase_component'], t0_ns, t1_ns, n_bins)
+        if envelope is not None:
+            return envelope
+
+    paths = _find_window_files(seismic_cfg['mseed_folder'], station, seismic_cfg['phase_component'], t0_ns, t1_ns)
+    times_parts = []
+    data_parts = []
+    for path in paths:
+        try:
+            segments = _load_filtered_file(path, seismic_cfg, cache, response_cfg)
+        except Exception as e:
+            print(f"  Uyarı: {path} okunamadı: {e}")
+            continue
+        for start_ns, delta_ns, data in segments:
+            # Pencereye düşen örnek indekslerini doğrudan hesapla (zaman dizisi üretmeden)
+            i0 = max(0, int(np.ceil((t0_ns - start_ns) / delta_ns)))
+            i1 = min(len(data), int(np.ceil((t1_ns - start_ns) / delta_ns)))
+            if i1 <= i0:
+                continue
+            times_parts.append(start_ns + np.arange(i0, i1, dtype=np.int64) * delta_ns)
+            data_parts.append(data[i0:i1])
+
+    if not times_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    times_ns = np.concatenate(times_parts)
+    data = np.concatenate(data_parts)
+    order = np.argsort(times_ns, kind='stable')
+    return seismic_utils.minmax_decimate(times_ns[order], data[order], n_bins)
+
+
+# --- Pick Panelleri (Mevcut Okuyucular Üzerinden) ---
+def _figure_to_panel(fig):
+    """Mevcut plot_* fonksiyonlarının figüründeki trace'leri zaman dizisi ns olan sözlüklere çevirir."""
+    panel = []
+    if fig is None:
+        return panel
+    for trace in fig.data:
+        if trace.x is None or len(trace.x) == 0:
+            continue
+        x_ns = pd.to_datetime(pd.Series(trace.x), utc=True).values.astype('datetime64[ns]').astype(np.int64)
+        text = trace.text if trace.text is not None and not isinstance(trace.text, str) else trace.hovertext
+        panel.append({
+            'name': trace.name,
+            'mode': trace.mode,
+            'marker': trace.marker.to_plotly_json() if trace.marker is not None else None,
+            'line': trace.line.to_plotly_json() if trace.line is not None else None,
+            'x_ns': x_ns,
+            'y': np.asarray(trace.y),
+            'text': np.asarray(text, dtype=object) if text is not None and not isinstance(text, str) else None,
+        })
+    return panel
+
+
+def load_catalog_panel(config):
+    """Katalog pick figürünü mevcut okuyucuyla bir kez üretir (katalog tüm günleri kapsar)."""
+    catalog_cfg = config['catalog_data']
+    try:
+        return _figure_to_panel(catalog_utils.plot_catalog_data(
+            catalog_file_path=catalog_cfg['catalog_file_path'],
+            station_data_path=catalog_cfg['station_data_path'],
+            workers=catalog_cfg.get('workers'), split_mb=catalog_cfg.get('split_mb')))
+    except Exception as e:
+        print(f"  Uyarı: Katalog paneli hazırlanamadı: {e}")
+        return []
+
+
+def load_day_pick_panels(config, station_names, date, hdf5_date=None):
+    """
+    Bir UTC günü için HDF5 ve EQT pick panellerini mevcut okuyucularla üretir.
+
+    Klasör modunda HDF5 veri kümesi o günün [00:00, 24:00) aralığında okunur. Tek dosya modunda dosya
+    yalnızca kendi gününe (hdf5_date) aittir; diğer günler için HDF5 paneli boştur.
+    """
+    hdf5_cfg = config['hdf5_data']
+    eqt_cfg = config['eqt_data']
+    panels = {}
+    try:
+        if hdf5_cfg.get('hdf5_folder'):
+            day = np.datetime64(date, 's')
+            fig = hdf5_dataset_utils.plot_hdf5_dataset_picks(
+                hdf5_cfg['hdf5_folder'], station_names, str(day), str(day + np.timedelta64(1, 'D')),
+                max_open_files=hdf5_cfg.get('max_open_files', 8))
+        elif hdf5_cfg.get('hdf5_file_path') and date == hdf5_date:
+            fig = hdf5_utils.plot_hdf5_picks(
+                hdf5_file_path=hdf5_cfg['hdf5_file_path'],
+                station_names=station_names,
+                analysis_date_str=date)
+        else:
+            fig = None
+        panels['hdf5'] = _figure_to_panel(fig)
+    except Exception as e:
+        print(f"  Uyarı: {date} HDF5 paneli hazırlanamadı: {e}"); panels['hdf5'] = []
+    try:
+        panels['eqt'] = _figure_to_panel(eqt_utils.plot_eqtransformer_picks(
+            csv_file_path=eqt_cfg['summary_csv_path'],
+            eqt_start_hour=0,
+            eqt_end_hour=24,
+            eqt_date=date))
+    except Exception as e:
+        print(f"  Uyarı: {date} EQT paneli hazırlanamadı: {e}"); panels['eqt'] = []
+    return panels
+
+
+class _PickPanels:
+    """
+    Görünen pencere için pick panelleri: katalog bir kez, HDF5/EQT gün gün okunur ve LRU'da tutulur.
+
+    Kaydırma/yakınlaştırma başka bir güne geçtiğinde o günün pickleri ilk istekte yüklenir.
+    Bir pencere en fazla max_days gün için pick gösterir (uzaklaştırınca tüm arşiv okunmasın diye).
+    """
+
+    def __init__(self, config, station_names, max_days=_MAX_PICK_DAYS, cache_days=_PICK_DAY_CACHE):
+        self.config = config
+        self.station_names = station_names
+        self.max_days = max_days
+        hdf5_cfg = config['hdf5_data']
+        # Tek dosya modunda dosyanın günü: 'date' dataseti/dosya adı, yoksa seismic_data.date
+        self.hdf5_date = None
+        if hdf5_cfg.get('hdf5_file_path') and not hdf5_cfg.get('hdf5_folder'):
+            self.hdf5_date = hdf5_dataset_utils.single_file_date(hdf5_cfg['hdf5_file_path']) or config['seismic_data']['date']
+        print("  Pick panelleri sunucu için hazırlanıyor...")
+        self.catalog = load_catalog_panel(config)
+        self._days = _TraceCache(cache_days)
+
+    def _day(self, date):
+        panels = self._days.get(date)
+        if panels is None:
+            panels = load_day_pick_panels(self.config, self.station_names, date, self.hdf5_date)
+            self._days.put(date, panels)
+        return panels
+
+    def window(self, t0_ns, t1_ns):
+        """
+        [t0, t1) ile kesişen günlerin panellerini birleştirir.
+
+        Returns:
+            tuple(dict, str or None): Panel adı -> trace listesi ve gün sınırı aşıldıysa açıklama.
+        """
+        first = np.datetime64(int(t0_ns), 'ns').astype('datetime64[D]')
+        last = np.datetime64(int(t1_ns) - 1, 'ns').astype('datetime64[D]')
+        days = [str(d) for d in np.arange(first, last + 1)]
+        note = None
+        if len(days) > self.max_days:
+            note = f"HDF5/EQT pickleri ilk {self.max_days} gün için gösteriliyor ({len(days)} gün görünüyor)"
+            days = days[:self.max_days]
+        panels = {'catalog': self.catalog, 'hdf5': [], 'eqt': []}
+        for date in days:
+            for name, panel in self._day(date).items():
+                panels[name] = panels[name] + panel
+        return panels, note
+
+
+def _density_in_view(panel, masks, t0_ns, t1_ns, n_time_bins, n_value_bins):
+    """Görünen işaretçi (marker) noktalarını tek bir yoğunluk haritası trace'inde toplar."""
+    markers = [(trace, mask) for trace, mask in zip(panel, masks) if trace['mode'] != 'lines' and mask.any()]
+    times_ns = np.concatenate([trace['x_ns'][mask] for trace, mask in markers])
+    values = np.concatenate([trace['y'][mask] for trace, mask in markers])
+    t_centers, y_centers, counts = hdf5_utils.pick_density(times_ns, values, n_time_bins, n_value_bins, time_range=(t0_ns, t1_ns))
+    return {
+        'type': 'heatmap',
+        'name': 'Pick yoğunluğu',
+        'x': (t_centers // _NS_PER_MS).tolist(),
+        'y': y_centers.tolist(),
+        'z': np.where(counts > 0, counts, None).tolist(),  # Boş hücreler saydam
+        'colorscale': 'YlOrRd',
+        'showscale': False,
+        'hovertemplate': 'Pick sayısı: %{z}<extra>%{y}</extra>',
+    }
+
+
+def _style_in_view(style, mask):
+    """marker/line sözlüğündeki nokta başına dizileri (örn. SNR'a göre boyut) görünen noktalara indirger."""
+    out = {}
+    for key, value in style.items():
+        if isinstance(value, dict):
+            out[key] = _style_in_view(value, mask)
+        elif isinstance(value, (np.ndarray, list, tuple)) and len(value) == len(mask):
+            out[key] = np.asarray(value)[mask].tolist()
+        elif isinstance(value, np.ndarray):
+            out[key] = value.tolist()
+        else:
+            out[key] = value
+    return out
+
+
+def picks_in_view(panel, t0_ns, t1_ns, max_picks=None, density_bins=(300, 40)):
+    """
+    Bir paneldeki trace'lerden yalnızca [t0, t1) aralığına düşen noktaları JSON'a uygun biçimde döndürür.
+
+    Aralıktaki pick sayısı max_picks'i aşarsa tek tek noktalar yerine sabit boyutlu (density_bins)
+    zaman x y yoğunluk haritası döndürülür; yakınlaştırıldıkça pick sayısı eşiğin altına inince
+    yeniden tekil işaretçilere geçilir. Böylece yanıt boyutu pick sayısından bağımsız kalır.
+    """
+    masks = [(trace['x_ns'] >= t0_ns) & (trace['x_ns'] < t1_ns) for trace in panel]
+    if max_picks is not None:
+        n_view = sum(int(mask.sum()) for trace, mask in zip(panel, masks) if trace['mode'] != 'lines')
+        if n_view > max_picks:
+            return [_density_in_view(panel, masks, t0_ns, t1_ns, *density_bins)]
+    out = []
+    for trace, mask in zip(panel, masks):
+        if trace['mode'] == 'lines':
+            # Event bağlantı çizgileri: en az bir noktası görünüyorsa tümüyle gönder (çizgi kopmasın)
+            if not mask.any():
+                continue
+            mask = np.ones_like(mask)
+        elif not mask.any():
+            continue
+        item = {
+            'name': trace['name'],
+            'mode': trace['mode'],
+            'x': (trace['x_ns'][mask] // _NS_PER_MS).tolist(),
+            'y': trace['y'][mask].tolist(),
+        }
+        if trace['marker']: item['marker'] = _style_in_view(trace['marker'], mask)
+        if trace['line']: item['line'] = _style_in_view(trace['line'], mask)
+        if trace['text'] is not None:
+            item['text'] = trace['text'][mask].tolist()
+            item['hoverinfo'] = 'text'
+        else:
+            item['hoverinfo'] = 'none'
+        out.append(item)
+    return out
+
+
+# --- HTTP Sunucusu ---
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>__TITLE__</title>
+<script src="/plotly.min.js"></script>
+<style>body{margin:0;font-family:sans-serif}#status{position:fixed;top:4px;left:8px;font-size:12px;color:#555;z-index:10}</style>
+</head><body>
+<div id="status"></div>
+<div id="plot" style="width:100%;height:__HEIGHT__px"></div>
+<script>
+const INIT = __INIT__;
+const plotDiv = document.getElementById('plot');
+const statusDiv = document.getElementById('status');
+const layout = {
+  title: {text: INIT.title, x: 0.5}, template: 'plotly_white', showlegend: false, uirevision: 'keep',
+  hovermode: 'closest', margin: {l: 70, r: 30, t: 60, b: 40},
+  xaxis: {type: 'date', range: [INIT.t0, INIT.t1], title: 'Zaman (UTC)'},
+  yaxis: {domain: [0.55, 1.0], title: 'İstasyon', tickvals: INIT.stations.map((s, i) => i), ticktext: INIT.stations, zeroline: false},
+  yaxis2: {domain: [0.37, 0.51], title: 'Katalog Boylam (°)'},
+  yaxis3: {domain: [0.19, 0.33], title: 'HDF5 Boylam (°)'},
+  yaxis4: {domain: [0.0, 0.15], title: 'EQT İstasyon', type: 'category'}
+};
+const axisFor = {catalog: 'y2', hdf5: 'y3', eqt: 'y4'};
+let pending = null;
+function toMs(v) { return (typeof v === 'number') ? v : new Date(String(v).replace(' ', 'T') + 'Z').getTime(); }
+async function loadWindow(t0, t1) {
+  statusDiv.textContent = 'Yükleniyor...';
+  const width = Math.max(200, Math.round(plotDiv.clientWidth));
+  const url = `/api/window?t0=${Math.floor(t0)}&t1=${Math.ceil(t1)}&width=${width}`;
+  const resp = await fetch(url);
+  const payload = await resp.json();
+  const traces = [];
+  payload.waveforms.forEach(w => traces.push({x: w.x, y: w.y, mode: 'lines', name: w.station,
+      line: {width: 1, color: 'blue'}, xaxis: 'x', yaxis: 'y', hoverinfo: 'name'}));
+  for (const [panel, items] of Object.entries(payload.picks)) {
+    items.forEach(it => { it.xaxis = 'x'; it.yaxis = axisFor[panel]; traces.push(it); });
+  }
+  layout.xaxis.range = [t0, t1];
+  await Plotly.react(plotDiv, traces, layout);
+  statusDiv.textContent = `${payload.n_points} nokta, ${payload.n_picks} pick` + (payload.note ? ` (${payload.note})` : '');
+}
+loadWindow(INIT.t0, INIT.t1).then(() => {
+  plotDiv.on('plotly_relayout', ev => {
+    let r0 = ev['xaxis.range[0]'], r1 = ev['xaxis.range[1]'];
+    if (ev['xaxis.range']) { [r0, r1] = ev['xaxis.range']; }
+    if (r0 === undefined || r1 === undefined) return;
+    clearTimeout(pending);
+    pending = setTimeout(() => loadWindow(toMs(r0), toMs(r1)), 200);
+  });
+});
+</script></body></html>
+"""
+
+
+def _count_picks(item):
+    """picks_in_view öğesindeki pick sayısı (çizgiler sayılmaz, yoğunluk haritasında hücre toplamı)."""
+    if item.get('type') == 'heatmap':
+        return sum(v for row in item['z'] for v in row if v is not None)
+    return len(item['x']) if item['mode'] != 'lines' else 0
+
+
+def _make_handler(state):
+    """Sunucu durumunu (config, önbellek, paneller) kapatan istek işleyici sınıfı üretir."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass  # Her istek için terminal çıktısı üretme
+
+        def _send(self, body, content_type, status=200):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                if url.path == '/':
+                    self._send(state['page'], 'text/html; charset=utf-8')
+                elif url.path == '/plotly.min.js':
+                    self._send(state['plotly_js'], 'application/javascript')
+                elif url.path == '/api/window':
+                    self._send(json.dumps(self._window(parse_qs(url.query))).encode('utf-8'), 'application/json')
+                else:
+                    self._send(b'Not Found', 'text/plain', status=404)
+            except Exception as e:
+                print(f"  Hata: İstek işlenemedi ({self.path}): {e}")
+                self._send(json.dumps({'error': str(e)}).encode('utf-8'), 'application/json', status=500)
+
+        def _window(self, query):
+            t0_ns = int(float(query['t0'][0])) * _NS_PER_MS
+            t1_ns = int(float(query['t1'][0])) * _NS_PER_MS
+            width = int(query.get('width', [state['max_points']])[0])
+            width = max(50, min(width, state['max_points']))
+            if t1_ns <= t0_ns:
+                raise ValueError("t1, t0'dan büyük olmalı.")
+
+            waveforms = []
+            n_points = 0
+            for i, station in enumerate(state['stations']):
+                times_ns, data = load_waveform_window(state['seismic_cfg'], station, t0_ns, t1_ns, width, state['cache'], state['pyramid_folder'],
+                                                       state['response_cfg'])
+                if len(data) == 0:
+                    continue
+                # Her istasyonu kendi satırına ölçekle (record section benzeri görünüm)
+                peak = np.nanmax(np.abs(data)) if np.isfinite(data).any() else 0.0
+                y = data / peak * 0.45 + i if peak > 0 else np.full(len(data), float(i))
+                y = np.where(np.isfinite(y), y, None)
+                waveforms.append({'station': station, 'x': (times_ns // _NS_PER_MS).tolist(), 'y': y.tolist(), 'peak': float(peak)})
+                n_points += len(data)
+
+            # Zaman binleri istemci genişliğini aşmaz (piksel başına en fazla bir bin)
+            density_bins = (min(state['density_bins'][0], width), state['density_bins'][1])
+            panels, note = state['panels'].window(t0_ns, t1_ns)
+            picks = {name: picks_in_view(panel, t0_ns, t1_ns, state['max_view_picks'], density_bins)
+                     for name, panel in panels.items()}
+            n_picks = sum(_count_picks(t) for items in picks.values() for t in items)
+            return {'waveforms': waveforms, 'picks': picks, 'n_points': n_points, 'n_picks': n_picks, 'note': note}
+
+    return _Handler
+
+
+def run_server(config, station_names):
+    """
+    Yerel (localhost) etkileşimli sunucuyu başlatır.
+
+    Tarayıcı mevcut x-aralığı için /api/window uç noktasından veri ister; sunucu yalnızca
+    bu aralıktaki min/max indirgenmiş waveform'ları ve görünen pickleri döndürür. HDF5/EQT pickleri
+    pencerenin kapsadığı günler için istek anında yüklenir; başka bir güne kaydırınca o günün pickleri gelir.
+
+    Args:
+        config (dict): 'config.py' dosyasından okunan CONFIG sözlüğü.
+        station_names (list): HDF5 istasyon isimleri (data/station_names.py).
+    """
+    server_cfg = config.get('server_settings', {})
+    seismic_cfg = config['seismic_data']
+    host = server_cfg.get('host', '127.0.0.1')
+    port = int(server_cfg.get('port', 8050))
+    if host not in _LOCAL_HOSTS:
+        print(f"Hata: Sunucu yalnızca yerel adreslerde çalıştırılabilir {_LOCAL_HOSTS}. Verilen: {host}")
+        return
+
+    t0 = UTCDateTime(f"{seismic_cfg['date']}T{seismic_cfg['start_hour']:02d}:00:00")
+    # qc_settings.exclude_bad: ilk pencerede kalite eşiklerini geçemeyen istasyonlar çizilmez
+    stations = qc_utils.filter_stations(config, server_cfg.get('stations') or [seismic_cfg['selected_station']],
+                                        t0.ns, (t0 + 3600).ns, seismic_cfg['phase_component'])
+    init = {
+        'title': config.get('plot_settings', {}).get('figure_title', ''),
+        'stations': stations,
+        't0': t0.ns // _NS_PER_MS,
+        't1': (t0 + 3600).ns // _NS_PER_MS,
+    }
+
+    from plotly.offline import get_plotlyjs
+    page = (_PAGE_TEMPLATE
+            .replace('__TITLE__', init['title'])
+            .replace('__HEIGHT__', str(config.get('plot_settings', {}).get('figure_height', 1500)))
+            .replace('__INIT__', json.dumps(init)))
+    state = {
+        'page': page.encode('utf-8'),
+        'plotly_js': get_plotlyjs().encode('utf-8'),
+        'seismic_cfg': seismic_cfg,
+        'response_cfg': config.get('response_settings'),
+        'stations': stations,
+        'max_points': int(server_cfg.get('max_points', 4000)),
+        'cache': _TraceCache(server_cfg.get('trace_cache_size', 128)),
+        'pyramid_folder': config.get('pyramid_settings', {}).get('pyramid_folder') if server_cfg.get('use_pyramid', True) else None,
+        'panels': _PickPanels(config, station_names),
+        'max_view_picks': server_cfg.get('max_view_picks'),
+        'density_bins': tuple(server_cfg.get('density_bins') or (300, 40)),
+    }
+
+    server_class = _IPv6HTTPServer if ':' in host else ThreadingHTTPServer
+    httpd = server_class((host, port), _make_handler(state))
+    url_host = f"[{host}]" if ':' in host else host
+    print(f"\n--- Etkileşimli sunucu çalışıyor: http://{url_host}:{port}/ (durdurmak için Ctrl+C) ---")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nSunucu durduruluyor...")
+    finally:
+        httpd.server_close()
@@ -0,0 +1,182 @@
+# seismic_analysis/utils/shared_waveform_utils.py
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from obspy import Stream, Trace
+from obspy.signal import filter as obspy_filter
+
+# Süreçler arası waveform aktarımı için paylaşımlı bellek (multiprocessing.shared_memory).
+# Çözülmüş (decode edilmiş) örnek dizileri ana süreçte paylaşımlı bloklara kopyalanır; işçilere
+# sadece küçük bir tanımlayıcı (blok adı, dtype, boyut, başlangıç zamanı, örnek aralığı) gönderilir.
+# İşçiler bloğa bağlanıp filtreleme ve seyreltmeyi yerinde yapar, böylece örnekler hiç pickle edilmez.
+# Blokları oluşturan taraf (ana süreç) hata olsa da 'finally' içinde hepsini siler.
+
+
+def share_array(array, **meta):
+    """
+    Diziyi yeni bir paylaşımlı bellek bloğuna kopyalar.
+
+    Args:
+        array (np.ndarray): Kopyalanacak dizi.
+        **meta: Tanımlayıcıya eklenecek bilgiler (örn. starttime_ns, delta, seed_id).
+
+    Returns:
+        tuple(SharedMemory, dict): Blok (ana süreçte tutulur, release_blocks ile silinir) ve tanımlayıcı.
+    """
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    try:
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        view[...] = array
+        del view  # Blok kapatılabilsin diye tampon referansı bırakılır
+    except BaseException:
+        release_blocks([shm])
+        raise
+    desc = {'name': shm.name, 'dtype': array.dtype.str, 'shape': tuple(array.shape)}
+    desc.update(meta)
+    return shm, desc
+
+
+def attach(desc):
+    """
+    Tanımlayıcıdaki bloğa bağlanır (işçi süreçte).
+
+    Returns:
+        tuple(SharedMemory, np.ndarray): Blok (iş bitince close() çağrılmalı) ve bloğun dizi görünümü.
+    """
+    try:
+        # Python 3.13+: bağlanan taraf bloğu resource_tracker'a kaydetmez (silme sorumluluğu oluşturanda)
+        shm = shared_memory.SharedMemory(name=desc['name'], track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=desc['name'])
+    return shm, np.ndarray(desc['shape'], dtype=np.dtype(desc['dtype']), buffer=shm.buf)
+
+
+def release_blocks(blocks):
+    """Blokları kapatır ve siler; zaten silinmiş bloklar sessizce atlanır."""
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # Hâlâ bir görünüm varsa kapatma atlanır, blok yine de silinir
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def share_trace(tr, dtype=np.float64):
+    """Trace örneklerini paylaşımlı bloğa koyar; tanımlayıcı seed id, başlangıç (ns) ve örnek aralığını içerir."""
+    return share_array(np.asarray(tr.data, dtype=dtype), seed_id=tr.id,
+                       starttime_ns=tr.stats.starttime.ns, delta=float(tr.stats.delta))
+
+
+def filter_decimate_inplace(data, sampling_rate, params):
+    """
+    Örnek dizisini yerinde ortalamadan arındırır, filtreler ve seyreltir.
+
+    Filtreler ObsPy Stream.filter ile aynı fonksiyonlardır (seismic_utils.apply_filter). Seyreltme
+    Trace.decimate gibi önce Chebyshev II alçak geçiren uygular, sonra her 'decimate'. örneği dizinin
+    başına yazar.
+
+    Args:
+        data (np.ndarray): Yerinde değiştirilecek float dizi.
+        sampling_rate (float): Örnekleme frekansı (Hz).
+        params (dict): 'filter_type', 'freqmin', 'freqmax', 'corners', 'zerophase', 'decimate' (tam sayı).
+
+    Returns:
+        int: Seyreltme sonrası geçerli örnek sayısı (data[:n]).
+
+    Raises:
+        ValueError: Filtre tipi geçersizse veya bant filtreleri için frekanslar eksikse.
+    """
+    if len(data) == 0:
+        return 0
+    data -= data.mean()
+    filter_type = params.get('filter_type')
+    corners = params.get('corners', 4)
+    zerophase = params.get('zerophase', False)
+    freqmin, freqmax = params.get('freqmin'), params.get('freqmax')
+    if filter_type == 'highpass':
+        data[:] = obspy_filter.highpass(data, freqmin, sampling_rate, corners=corners, zerophase=zerophase)
+    elif filter_type == 'lowpass':
+        data[:] = obspy_filter.lowpass(data, freqmax, sampling_rate, corners=corners, zerophase=zerophase)
+    elif filter_type in ('bandpass', 'bandstop'):
+        if freqmin is None or freqmax is None:
+            raise ValueError(f"{filter_type} için freqmin ve freqmax tanımlanmalı.")
+        func = obspy_filter.bandpass if filter_type == 'bandpass' else obspy_filter.bandstop
+        data[:] = func(data, freqmin, freqmax, sampling_rate, corners=corners, zerophase=zerophase)
+    elif filter_type:
+        raise ValueError(f"Geçersiz filtre tipi '{filter_type}'.")
+
+    factor = int(params.get('decimate') or 1)
+    if factor <= 1:
+        return len(data)
+    data[:] = obspy_filter.lowpass_cheby_2(data, 0.5 * sampling_rate / factor, sampling_rate, maxorder=12)
+    n = math.ceil(len(data) / factor)
+    data[:n] = data[::factor]  # NumPy çakışan okuma/yazmayı geçici kopya ile güvenle yapar
+    return n
+
+
+def _process_shared(desc, params):
+    """İşçi: bloğa bağlanır, yerinde işler ve güncellenmiş tanımlayıcıyı döndürür (örnekler dönmez)."""
+    shm, data = attach(desc)
+    try:
+        n = filter_decimate_inplace(data, 1.0 / desc['delta'], params)
+    finally:
+        del data
+        shm.close()
+    factor = int(params.get('decimate') or 1)
+    return dict(desc, shape=(n,), delta=desc['delta'] * max(factor, 1))
+
+
+def process_stream(stream, params, workers=None):
+    """
+    Stream'deki trace'leri paylaşımlı bellek üzerinden işçi süreçlerde filtreler/seyreltir.
+
+    Tek işçi veya tek trace varsa süreç havuzu kurulmaz, aynı işlem ana süreçte yapılır.
+
+    Args:
+        stream (obspy.Stream): Çözülmüş trace'ler (değiştirilmez).
+        params (dict): filter_decimate_inplace parametreleri.
+        workers (int, optional): İşçi süreç sayısı (None = CPU sayısı).
+
+    Returns:
+        obspy.Stream: İşlenmiş trace'ler (aynı sırada, float64).
+    """
+    workers = min(workers or os.cpu_count() or 1, len(stream))
+    if workers <= 1:
+        out = Stream()
+        for tr in stream:
+            data = np.array(tr.data, dtype=np.float64)
+            n = filter_decimate_inplace(data, tr.stats.sampling_rate, params)
+            out += _make_trace(tr, data[:n], tr.stats.delta * max(int(params.get('decimate') or 1), 1))
+        return out
+
+    blocks = []
+    try:
+        descs = []
+        for tr in stream:
+            shm, desc = share_trace(tr)
+            blocks.append(shm)
+            descs.append(desc)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_process_shared, descs, [params] * len(descs)))
+        out = Stream()
+        for tr, shm, desc in zip(stream, blocks, results):
+            view = np.ndarray(desc['shape'], dtype=np.dtype(desc['dtype']), buffer=shm.buf)
+            out += _make_trace(tr, view.copy(), desc['delta'])
+            del view
+        return out
+    finally:
+        release_blocks(blocks)
+
+
+def _make_trace(template, data, delta):
+    stats = template.stats.copy()
+    stats.delta = delta
+    return Trace(data=data, header=stats)
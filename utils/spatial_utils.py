@@ -0,0 +1,184 @@
+# seismic_analysis/utils/spatial_utils.py
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# İstasyon-event mesafe sorguları.
+# İstasyon koordinatları bir kez diziye çevrilir; birim küre üzerindeki 3B vektörleri için bir
+# KD-ağacı kurulur. Büyük daire mesafesi ile kiriş (chord) uzunluğu birbirine monoton bağlı
+# olduğundan "R km içindeki istasyonlar" ve mesafeye göre sıralama ağaç üzerinde yapılabilir.
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    İki nokta (veya nokta dizileri) arasındaki büyük daire mesafesini km olarak hesaplar.
+
+    Girdiler NumPy yayınlama (broadcasting) kurallarına uyar; örn. event'ler için (n, 1),
+    istasyonlar için (1, m) verildiğinde (n, m) mesafe matrisi döner.
+    """
+    lat1 = np.radians(lat1); lon1 = np.radians(lon1)
+    lat2 = np.radians(lat2); lon2 = np.radians(lon2)
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def unit_vectors(lats, lons):
+    """Enlem/boylam dizilerini birim küre üzerindeki (n, 3) kartezyen vektörlere çevirir."""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def km_to_chord(distance_km):
+    """Büyük daire mesafesini (km) birim küre üzerindeki kiriş uzunluğuna çevirir."""
+    return 2.0 * np.sin(np.asarray(distance_km, dtype=np.float64) / (2.0 * EARTH_RADIUS_KM))
+
+
+def chord_to_km(chord):
+    """Birim küre kiriş uzunluğunu büyük daire mesafesine (km) çevirir."""
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord, dtype=np.float64) / 2.0, 0.0, 1.0))
+
+
+def station_arrays(station_locations, station_names=None):
+    """
+    catalog_utils.parse_station_data çıktısını (isim -> {'lat', 'lon'}) dizilere çevirir.
+
+    Args:
+        station_locations (dict): İstasyon konum sözlüğü.
+        station_names (list, optional): Sıra/alt küme; verilmezse sözlükteki tüm istasyonlar
+            isim sırasına göre alınır. Konumu bilinmeyen isimler atlanır.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray, np.ndarray): İsimler, enlemler, boylamlar.
+    """
+    names = sorted(station_locations) if station_names is None else [n for n in station_names if n in station_locations]
+    lats = np.array([station_locations[n]['lat'] for n in names], dtype=np.float64)
+    lons = np.array([station_locations[n]['lon'] for n in names], dtype=np.float64)
+    return np.asarray(names, dtype=str), lats, lons
+
+
+class StationIndex:
+    """
+    Sabit bir istasyon kümesi için mesafe sorguları.
+
+    Args:
+        names (array-like): İstasyon isimleri.
+        lats, lons (array-like): İstasyon enlem/boylamları (derece).
+    """
+
+    def __init__(self, names, lats, lons):
+        self.names = np.asarray(names, dtype=str)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        if not (len(self.names) == len(self.lats) == len(self.lons)):
+            raise ValueError("İstasyon isim/enlem/boylam dizilerinin uzunlukları farklı.")
+        self.tree = cKDTree(unit_vectors(self.lats, self.lons)) if len(self.names) else None
+        self._position = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def indices(self, station_names):
+        """İstasyon isimlerini bu indeksteki konumlarına çevirir (bilinmeyenler -1)."""
+        return np.array([self._position.get(str(n), -1) for n in np.asarray(station_names).ravel()], dtype=np.int64)
+
+    def distance_matrix(self, event_lats, event_lons):
+        """(event sayısı, istasyon sayısı) boyutlu episantral mesafe matrisi (km)."""
+        ev_lats = np.asarray(event_lats, dtype=np.float64).reshape(-1, 1)
+        ev_lons = np.asarray(event_lons, dtype=np.float64).reshape(-1, 1)
+        return haversine_km(ev_lats, ev_lons, self.lats[np.newaxis, :], self.lons[np.newaxis, :])
+
+    def pick_distances(self, event_lats, event_lons, station_names):
+        """
+        Pick başına episantral mesafe: her pick için kendi event'i ile istasyonu arasındaki mesafe (km).
+
+        event_lats/event_lons pick dizisiyle aynı uzunlukta olmalıdır. Konumu bilinmeyen istasyonlar NaN döner.
+        """
+        idx = self.indices(station_names)
+        known = idx >= 0
+        safe = np.where(known, idx, 0)
+        dist = haversine_km(np.asarray(event_lats, dtype=np.float64), np.asarray(event_lons, dtype=np.float64),
+                            self.lats[safe], self.lons[safe]) if len(self) else np.full(len(idx), np.nan)
+        return np.where(known, dist, np.nan)
+
+    def within_radius(self, event_lat, event_lon, radius_km):
+        """
+        Bir event'e radius_km içindeki istasyonları mesafeye göre sıralı döndürür.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): İstasyon indeksleri ve mesafeler (km).
+        """
+        if self.tree is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        idx = np.asarray(self.tree.query_ball_point(unit_vectors(event_lat, event_lon), km_to_chord(radius_km)), dtype=np.int64)
+        dist = haversine_km(event_lat, event_lon, self.lats[idx], self.lons[idx])
+        order = np.argsort(dist, kind='stable')
+        return idx[order], dist[order]
+
+    def nearest(self, event_lats, event_lons, k=1):
+        """
+        Her event için en yakın k istasyonu bulur (toplu sorgu).
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): (event sayısı, k) indeks ve mesafe (km) dizileri.
+        """
+        k = min(int(k), len(self))
+        n_events = np.atleast_1d(event_lats).size
+        if self.tree is None or k <= 0:
+            return np.empty((n_events, 0), dtype=np.int64), np.empty((n_events, 0))
+        chords, idx = self.tree.query(unit_vectors(np.atleast_1d(event_lats), np.atleast_1d(event_lons)), k=k)
+        return np.asarray(idx).reshape(-1, k), chord_to_km(chords).reshape(-1, k)
+
+    def record_section_order(self, event_lat, event_lon, max_distance_km=None):
+        """Kayıt kesiti için istasyonları episantral mesafeye göre sıralar (isimler, mesafeler)."""
+        if max_distance_km is None:
+            idx, dist = self.nearest(event_lat, event_lon, k=len(self))
+            idx, dist = idx[0], dist[0]
+        else:
+            idx, dist = self.within_radius(event_lat, event_lon, max_distance_km)
+        return self.names[idx], dist
+
+
+# İstasyon kümesi başına tek indeks (ağaç ve koordinat dizileri tekrar kurulmaz)
+_INDEX_CACHE = OrderedDict()
+_INDEX_CACHE_SIZE = 16
+_INDEX_LOCK = threading.Lock()
+
+
+def get_station_index(names, lats, lons):
+    """
+    Aynı istasyon kümesi (isim + koordinat) için önbellekteki StationIndex'i döndürür, yoksa oluşturur.
+    """
+    names = np.asarray(names, dtype=str)
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    key = (tuple(names.tolist()), lats.tobytes(), lons.tobytes())
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE.get(key)
+        if index is not None:
+            _INDEX_CACHE.move_to_end(key)
+            return index
+    index = StationIndex(names, lats, lons)
+    with _INDEX_LOCK:
+        _INDEX_CACHE[key] = index
+        while len(_INDEX_CACHE) > _INDEX_CACHE_SIZE:
+            _INDEX_CACHE.popitem(last=False)
+    return index
+
+
+def station_index_from_locations(station_locations, station_names=None):
+    """catalog_utils.parse_station_data çıktısından (önbellekli) StationIndex oluşturur."""
+    return get_station_index(*station_arrays(station_locations, station_names))
+
+
+def station_index_from_locs(locs, station_names):
+    """HDF5 'locs' dizisinden (0. sütun enlem, 1. sütun boylam) StationIndex oluşturur."""
+    locs = np.asarray(locs, dtype=np.float64)
+    n = min(len(locs), len(station_names))
+    return get_station_index(np.asarray(station_names[:n], dtype=str), locs[:n, 0], locs[:n, 1])
@@ -0,0 +1,268 @@
+# seismic_analysis/utils/spectral_utils.py
+
+import os
+import json
+import hashlib
+
+import numpy as np
+import plotly.graph_objects as go
+from obspy import read, UTCDateTime
+
+from utils import time_utils
+from utils import mseed_index_utils
+
+# Spektral hesaplar pencere başına Python döngüsü olmadan yapılır: sinyal
+# sliding_window_view ile (kopyasız) çerçevelere bölünür, tüm çerçeveler (ve aynı
+# uzunluktaki tüm kanallar) tek bir numpy.fft.rfft çağrısıyla dönüştürülür.
+
+
+def frame_view(data, nperseg, step):
+    """
+    Son eksen boyunca üst üste binen çerçeveleri kopyasız (strided) görünüm olarak döndürür.
+
+    Args:
+        data (np.ndarray): (..., n) boyutlu dizi.
+        nperseg (int): Çerçeve uzunluğu (örnek).
+        step (int): Çerçeveler arası kaydırma (örnek).
+
+    Returns:
+        np.ndarray: (..., n_frame, nperseg) boyutlu salt okunur görünüm.
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(data, nperseg, axis=-1)
+    return windows[..., ::step, :]
+
+
+def stft_psd(data, fs, nperseg=1024, noverlap=None, window='hann'):
+    """
+    Çerçeve başına tek taraflı güç spektral yoğunluğu (Welch ölçeklemesiyle STFT).
+
+    data (n,) veya (kanal, n) olabilir; tüm kanallar ve çerçeveler tek rfft çağrısıyla işlenir.
+
+    Args:
+        data (np.ndarray): Örnekler, son eksen zaman.
+        fs (float): Örnekleme frekansı (Hz).
+        nperseg (int): Çerçeve uzunluğu.
+        noverlap (int, optional): Çakışma (varsayılan nperseg // 2).
+        window (str): 'hann' veya 'boxcar'.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray, np.ndarray): Frekanslar (Hz), çerçeve merkez ofsetleri (s),
+        PSD dizisi (..., n_frame, n_freq) [birim²/Hz].
+    """
+    data = np.asarray(data, dtype=np.float64)
+    noverlap = nperseg // 2 if noverlap is None else noverlap
+    step = nperseg - noverlap
+    if data.shape[-1] < nperseg:
+        raise ValueError(f"Veri uzunluğu ({data.shape[-1]}) çerçeve uzunluğundan ({nperseg}) kısa.")
+
+    win = np.hanning(nperseg + 1)[:-1] if window == 'hann' else np.ones(nperseg)  # periyodik Hann
+    frames = frame_view(data, nperseg, step)
+    # Çerçeve başına ortalama çıkarma ve pencereleme tek ifadede (yeni dizi üretir, görünüm bozulmaz)
+    tapered = (frames - frames.mean(axis=-1, keepdims=True)) * win
+    spectrum = np.fft.rfft(tapered, axis=-1)
+    psd = (spectrum.real ** 2 + spectrum.imag ** 2) / (fs * np.sum(win ** 2))
+    # Tek taraflı spektrum: DC ve (varsa) Nyquist hariç iki katı
+    if nperseg % 2 == 0:
+        psd[..., 1:-1] *= 2.0
+    else:
+        psd[..., 1:] *= 2.0
+
+    freqs = np.fft.rfftfreq(nperseg, d=1.0 / fs)
+    centers = (np.arange(frames.shape[-2]) * step + nperseg / 2.0) / fs
+    return freqs, centers, psd
+
+
+def welch_psd(data, fs, nperseg=1024, noverlap=None, window='hann'):
+    """Welch ortalama PSD'si (stft_psd çerçevelerinin ortalaması). data (n,) veya (kanal, n) olabilir."""
+    freqs, _, psd = stft_psd(data, fs, nperseg, noverlap, window)
+    return freqs, psd.mean(axis=-2)
+
+
+def noise_percentiles_db(psd, percentiles=(5, 50, 95)):
+    """
+    PPSD benzeri gürültü seviyeleri: çerçeve PSD'lerinin dB cinsinden yüzdelikleri.
+
+    Args:
+        psd (np.ndarray): (..., n_frame, n_freq) PSD dizisi.
+        percentiles (tuple): Hesaplanacak yüzdelikler.
+
+    Returns:
+        np.ndarray: (len(percentiles), ..., n_freq) dB dizisi.
+    """
+    db = 10.0 * np.log10(np.maximum(psd, np.finfo(np.float64).tiny))
+    return np.percentile(db, percentiles, axis=-2)
+
+
+def _stack_by_shape(traces, nperseg):
+    """Aynı (npts, örnekleme frekansı) trace'lerini (kanal, n) dizilerinde toplar: (fs, trace listesi, dizi) üretir."""
+    groups = {}
+    for tr in traces:
+        if tr.stats.npts >= nperseg:
+            groups.setdefault((tr.stats.npts, tr.stats.sampling_rate), []).append(tr)
+    for (npts, fs), group in groups.items():
+        yield fs, group, np.vstack([tr.data.astype(np.float64) for tr in group])
+
+
+def batch_welch(traces, nperseg=1024, noverlap=None):
+    """
+    Birden çok trace için Welch PSD'lerini hesaplar.
+
+    Aynı (npts, örnekleme frekansı) değerine sahip trace'ler tek bir (kanal, n) dizisinde
+    birleştirilip tek rfft çağrısıyla işlenir.
+
+    Args:
+        traces (list): ObsPy Trace listesi.
+
+    Returns:
+        dict: trace.id -> (frekanslar, PSD).
+    """
+    results = {}
+    for fs, group, stacked in _stack_by_shape(traces, nperseg):
+        freqs, psd = welch_psd(stacked, fs, nperseg, noverlap)
+        for tr, row in zip(group, psd):
+            results[tr.id] = (freqs, row)
+    return results
+
+
+# --- Kanal-Saat Önbelleği ---
+def _cache_path(cache_folder, path, params):
+    """Kaynak dosya (yol, mtime, boyut) ve parametrelerden önbellek dosya adı üretir."""
+    stat = os.stat(path)
+    key = json.dumps([os.path.abspath(path), stat.st_mtime, stat.st_size, params], sort_keys=True, default=str)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_folder, f"{os.path.splitext(os.path.basename(path))[0]}_{digest}.npz")
+
+
+def spectrogram_for_file(path, nperseg=1024, noverlap=None, cache_folder=None, t0_ns=None, t1_ns=None):
+    """
+    Bir mseed dosyasının (kanal-saat) spektrogramını hesaplar; sonuç önbellekte varsa oradan okur.
+
+    t0_ns/t1_ns verilirse sadece [t0_ns, t1_ns) aralığındaki örnekler kullanılır (günlük dosyadan tek saat gibi).
+
+    Returns:
+        dict or None: 'times' (datetime64[ns] çerçeve merkezleri), 'freqs' (Hz), 'psd_db' (n_frame, n_freq) float32,
+        'station', 'channel', 'sampling_rate'. Veri yetersizse None.
+    """
+    params = {'nperseg': nperseg, 'noverlap': noverlap, 't0_ns': t0_ns, 't1_ns': t1_ns}
+    cache_file = _cache_path(cache_folder, path, params) if cache_folder else None
+    if cache_file and os.path.exists(cache_file):
+        with np.load(cache_file) as npz:
+            return {k: (npz[k].item() if npz[k].ndim == 0 else npz[k]) for k in npz.files}
+
+    stream = read(path)
+    stream.merge(method=1, fill_value=0)
+    if not stream:
+        return None
+    tr = stream[0]
+    fs = tr.stats.sampling_rate
+    start_ns = int(tr.stats.starttime.ns)
+    delta_ns = time_utils.NS_PER_SECOND / fs
+    data = tr.data
+    i0 = 0 if t0_ns is None else int(np.clip(np.ceil((t0_ns - start_ns) / delta_ns), 0, len(data)))
+    i1 = len(data) if t1_ns is None else int(np.clip(np.ceil((t1_ns - start_ns) / delta_ns), i0, len(data)))
+    if i1 - i0 < nperseg:
+        return None
+    data = data[i0:i1]
+    start_ns += int(round(i0 * delta_ns))
+    freqs, centers, psd = stft_psd(data, fs, nperseg, noverlap)
+    result = {
+        'times': (start_ns + np.rint(centers * time_utils.NS_PER_SECOND).astype(np.int64)).view('datetime64[ns]'),
+        'freqs': freqs,
+        'psd_db': (10.0 * np.log10(np.maximum(psd, np.finfo(np.float64).tiny))).astype(np.float32),
+        'station': tr.stats.station,
+        'channel': tr.stats.channel,
+        'sampling_rate': fs,
+    }
+    if cache_file:
+        os.makedirs(cache_folder, exist_ok=True)
+        np.savez(cache_file, **result)
+    return result
+
+
+# --- Grafikler ---
+def plot_spectrogram(output_folder, selected_station, date, start_hour, phase_component, nperseg=1024, noverlap=None, cache_folder=None):
+    """
+    Seçilen istasyon-saat için spektrogram (zaman-frekans, dB) grafiği oluşturur.
+
+    Args:
+        output_folder (str): mseed klasörü.
+        selected_station (str): İstasyon kodu.
+        date (str): Tarih (YYYY-MM-DD).
+        start_hour (int): Saat (UTC).
+        phase_component (str): Kanal (örn. "HHZ").
+        nperseg (int): STFT çerçeve uzunluğu.
+        noverlap (int, optional): Çerçeve çakışması.
+        cache_folder (str, optional): Kanal-saat önbellek klasörü.
+
+    Returns:
+        plotly.graph_objects.Figure or None: Oluşturulan Plotly figürü veya hata.
+    """
+    t0_ns = UTCDateTime(f"{date}T{start_hour:02d}:00:00").ns
+    t1_ns = t0_ns + 3600 * 10**9
+    paths = mseed_index_utils.find_files(output_folder, selected_station, phase_component, t0_ns, t1_ns)
+    if not paths:
+        print(f"Uyarı: Spektrogram için {selected_station} {phase_component} {date} {start_hour:02d}:00 dosyası bulunamadı.")
+        return None
+    try:
+        spec = spectrogram_for_file(paths[0], nperseg, noverlap, cache_folder, t0_ns, t1_ns)
+    except Exception as e:
+        print(f"Hata: Spektrogram hesaplanamadı ({paths[0]}): {e}")
+        return None
+    if spec is None:
+        print(f"Uyarı: {paths[0]} spektrogram için çok kısa.")
+        return None
+
+    # DC bileşeni log frekans ekseninde gösterilemez
+    freqs = spec['freqs'][1:]
+    fig = go.Figure(go.Heatmap(
+        x=spec['times'], y=freqs, z=spec['psd_db'][:, 1:].T,
+        colorscale='Viridis', showscale=False,
+        hovertemplate="Zaman: %{x}<br>Frekans: %{y:.2f} Hz<br>Güç: %{z:.1f} dB<extra></extra>",
+        name='Spektrogram'
+    ))
+    fig.update_layout(
+        title=f"{selected_station} {phase_component} Spektrogram - {date} {start_hour:02d}:00 UTC",
+        xaxis_title="Zaman (UTC)", yaxis_title="Frekans (Hz)",
+        template="plotly_white", height=300, margin=dict(l=50, r=40, t=80, b=40)
+    )
+    fig.update_yaxes(type='log')
+    return fig
+
+
+def plot_noise_levels(output_folder, date, start_hour, phase_component, nperseg=4096, percentile=50):
+    """
+    Klasördeki tüm istasyonlar için seçilen saatin gürültü seviyesi (PSD yüzdeliği, dB) eğrilerini çizer.
+
+    Aynı uzunluktaki kanallar tek rfft çağrısında işlenir (bkz. stft_psd).
+
+    Returns:
+        plotly.graph_objects.Figure or None: Oluşturulan Plotly figürü veya hata.
+    """
+    t0_ns = UTCDateTime(f"{date}T{start_hour:02d}:00:00").ns
+    paths = mseed_index_utils.find_files(output_folder, None, phase_component, t0_ns, t0_ns + 3600 * 10**9)
+    if not paths:
+        print(f"Uyarı: Gürültü seviyesi için dosya bulunamadı ({date} {start_hour:02d}:00, {phase_component}).")
+        return None
+    traces = []
+    for path in paths:
+        try:
+            st = read(path)
+            st.merge(method=1, fill_value=0)
+            traces.append(st[0])
+        except Exception as e:
+            print(f"  Uyarı: {path} okunamadı: {e}")
+
+    fig = go.Figure()
+    for fs, group, stacked in _stack_by_shape(traces, nperseg):
+        freqs, _, psd = stft_psd(stacked, fs, nperseg)
+        levels = noise_percentiles_db(psd, (percentile,))[0]
+        for tr, level in zip(group, levels):
+            fig.add_trace(go.Scatter(x=freqs[1:], y=level[1:], mode='lines', name=tr.stats.station, line=dict(width=1)))
+
+    fig.update_layout(
+        title=f"Gürültü Seviyeleri (PSD %{percentile} yüzdelik) - {date} {start_hour:02d}:00 UTC",
+        xaxis_title="Frekans (Hz)", yaxis_title="Güç (dB)",
+        template="plotly_white", height=300, margin=dict(l=50, r=40, t=80, b=40)
+    )
+    fig.update_xaxes(type='log')
+    return fig
@@ -0,0 +1,111 @@
+# seismic_analysis/utils/time_utils.py
+
+import numpy as np
+
+# Tüm okuyucular için ortak zaman dönüşümleri.
+# Zamanlar int64 nanosaniye tabanlı datetime64[ns] dizileri olarak tutulur (UTC, zaman dilimi bilgisi yok).
+# Eleman başına Python datetime nesnesi oluşturulmaz; dönüşümler NumPy üzerinde toplu yapılır.
+
+NS_PER_SECOND = 10**9
+
+
+def date_start_ns(date_str):
+    """'YYYY-MM-DD' gününün 00:00:00 UTC anını epoch nanosaniye (int) olarak döndürür."""
+    return int(np.datetime64(date_str, 'D').astype('datetime64[ns]').astype(np.int64))
+
+
+def seconds_of_day_to_datetime64(seconds, date_str):
+    """
+    Gün başlangıcından itibaren geçen saniye dizisini datetime64[ns] dizisine çevirir.
+
+    Saniyeler önce tam sayı nanosaniyeye yuvarlanır, ardından gün başlangıcına int64 olarak
+    eklenir; böylece büyük epoch değerlerinde float hassasiyet kaybı olmaz.
+
+    Args:
+        seconds (array-like): Gün başından saniye (float).
+        date_str (str): Gün (YYYY-MM-DD).
+
+    Returns:
+        np.ndarray: datetime64[ns] dizisi.
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    offsets_ns = np.rint(seconds * NS_PER_SECOND).astype(np.int64)
+    return (date_start_ns(date_str) + offsets_ns).view('datetime64[ns]')
+
+
+def catalog_strings_to_datetime64(time_strings):
+    """
+    Katalog zaman damgalarını ('YYYY/MM/DD HH:MM:SS[.f]') toplu olarak datetime64[ns]'e çevirir.
+
+    Tarih ile saat arasındaki boşluk sayısı önemli değildir. Ayrıştırılamayan değerler NaT olur.
+
+    Args:
+        time_strings (array-like): Katalog zaman metinleri.
+
+    Returns:
+        np.ndarray: datetime64[ns] dizisi.
+    """
+    arr = np.asarray(time_strings, dtype=str)
+    if arr.size == 0:
+        return np.empty(0, dtype='datetime64[ns]')
+    parts = np.char.partition(np.char.strip(arr), ' ')
+    date_part = np.char.replace(parts[..., 0], '/', '-')
+    time_part = np.char.strip(parts[..., 2])
+    iso = np.char.add(np.char.add(date_part, 'T'), time_part)
+    try:
+        return iso.astype('datetime64[ns]')
+    except ValueError:
+        # Hatalı satır varsa sadece onları NaT yap (nadir durum, eleman bazlı yol)
+        out = np.empty(iso.shape, dtype='datetime64[ns]')
+        for i, value in enumerate(iso):
+            try:
+                out[i] = np.datetime64(value, 'ns')
+            except ValueError:
+                out[i] = np.datetime64('NaT')
+        return out
+
+
+def trace_times_datetime64(starttime, delta, npts):
+    """
+    ObsPy trace başlangıç zamanı ve örnekleme aralığından örnek zamanlarını üretir.
+
+    Başlangıç zamanı UTCDateTime.ns ile tam sayı olarak alınır; göreli zamanlar tam sayı
+    nanosaniye adımlarla (delta tam sayı ns değilse yuvarlanarak) eklenir.
+
+    Args:
+        starttime (obspy.UTCDateTime): trace.stats.starttime.
+        delta (float): trace.stats.delta (saniye).
+        npts (int): Örnek sayısı.
+
+    Returns:
+        np.ndarray: datetime64[ns] dizisi.
+    """
+    delta_ns = delta * NS_PER_SECOND
+    if float(delta_ns).is_integer():
+        offsets_ns = np.arange(npts, dtype=np.int64) * int(delta_ns)
+    else:
+        offsets_ns = np.rint(np.arange(npts, dtype=np.float64) * delta_ns).astype(np.int64)
+    return (int(starttime.ns) + offsets_ns).view('datetime64[ns]')
+
+
+def to_ns(times):
+    """datetime64 dizisini (herhangi bir birim) int64 epoch nanosaniyeye çevirir."""
+    return np.asarray(times).astype('datetime64[ns]').astype(np.int64)
+
+
+def format_datetime64(times, unit='ms'):
+    """
+    datetime64 dizisini hover metinleri için 'YYYY-MM-DD HH:MM:SS.mmm' biçiminde toplu olarak yazar.
+
+    Args:
+        times (array-like): datetime64 dizisi.
+        unit (str): Gösterilecek en küçük birim ('s', 'ms', 'us').
+
+    Returns:
+        np.ndarray: str dizisi.
+    """
+    strings = np.datetime_as_string(np.asarray(times, dtype='datetime64[ns]'), unit=unit)
+    if strings.size == 0:
+        # numpy 2.x'te np.char.replace boş dizide hata verir
+        return strings.astype('U')
+    return np.char.replace(strings, 'T', ' ')
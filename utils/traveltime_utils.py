@@ -0,0 +1,365 @@
+# seismic_analysis/utils/traveltime_utils.py
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils import catalog_utils
+from utils import hdf5_utils
+from utils import hdf5_dataset_utils
+from utils import hdf5_writer_utils
+from utils import spatial_utils
+from utils import time_utils
+
+# 1-B tabakalı hız modeli için P/S seyahat süresi tablosu ve pick rezidüelleri.
+# Tablo (derinlik x episantral mesafe) ızgarasında ilk varışlardan oluşur: doğrudan dalga
+# (ışın parametresi örneklemesiyle) ve kaynağın altındaki her arayüzden kırılan (head) dalgalar.
+# Tahminler tablo üzerinde iki doğrusal (bilinear) interpolasyonla toplu olarak yapılır.
+# İstasyon yükseklikleri ve Dünya eğriliği ihmal edilir (yerel/bölgesel mesafeler için yeterli).
+
+RESIDUAL_COLUMNS = ['source', 'event_id', 'station', 'phase', 'distance_km', 'depth_km',
+                    'origin_time', 'pick_time', 'travel_time', 'predicted', 'residual']
+
+_N_RAY_PARAMETERS = 2000
+
+
+def layered_model(layers):
+    """
+    [[üst_derinlik_km, vp, vs], ...] listesini doğrulayıp (tops, vp, vs) dizilerine çevirir.
+
+    İlk tabaka 0 km'de başlamalı, tabaka üstleri artan sırada olmalıdır. Son tabaka yarı sonsuz kabul edilir.
+    """
+    arr = np.asarray(layers, dtype=np.float64)
+    if arr.ndim != 2 or arr.shape[1] != 3 or len(arr) == 0:
+        raise ValueError("Hız modeli [[üst_derinlik_km, vp, vs], ...] biçiminde olmalı.")
+    tops, vp, vs = arr[:, 0], arr[:, 1], arr[:, 2]
+    if tops[0] != 0.0 or np.any(np.diff(tops) <= 0):
+        raise ValueError("Hız modeli 0 km'den başlamalı ve tabaka üstleri artan sırada olmalı.")
+    if np.any(vp <= 0) or np.any(vs <= 0):
+        raise ValueError("Hız modelindeki hızlar pozitif olmalı.")
+    return tops, vp, vs
+
+
+def _first_arrivals(tops, velocities, depth_km, distances_km):
+    """
+    Tek bir kaynak derinliği için yüzeydeki mesafelerde ilk varış sürelerini (s) hesaplar.
+
+    Args:
+        tops (np.ndarray): Tabaka üst derinlikleri (km).
+        velocities (np.ndarray): Tabaka hızları (km/s).
+        depth_km (float): Kaynak derinliği.
+        distances_km (np.ndarray): Episantral mesafeler.
+
+    Returns:
+        np.ndarray: distances_km ile aynı boyutta süreler.
+    """
+    k = int(np.searchsorted(tops, depth_km, side='right') - 1)  # Kaynağın bulunduğu tabaka
+    # Kaynak ile yüzey arasındaki kalınlıklar (son eleman kaynak tabakasındaki kısmi kalınlık)
+    up_h = np.append(np.diff(tops[:k + 1]), depth_km - tops[k])
+    up_v = velocities[:k + 1]
+
+    # Doğrudan dalga: p, 0..1/v_max aralığında örneklenir; X(p) ve T(p) tüm p'ler için tek seferde
+    v_max = up_v.max()
+    if depth_km <= 0.0:
+        best = distances_km / up_v[0]
+    else:
+        # p'yi 1/v_max yakınında sıklaştır (X orada hızla büyür)
+        theta = np.linspace(0.0, np.pi / 2, _N_RAY_PARAMETERS, endpoint=False)
+        p = np.sin(theta)[:, np.newaxis] / v_max
+        cos_term = np.sqrt(1.0 - (p * up_v) ** 2)
+        x_p = np.sum(up_h * p * up_v / cos_term, axis=1)
+        t_p = np.sum(up_h / (up_v * cos_term), axis=1)
+        best = np.interp(distances_km, x_p, t_p)
+        # Son örneğin ötesinde yatay yavaşlıkla doğrusal devam
+        beyond = distances_km > x_p[-1]
+        best[beyond] = t_p[-1] + (distances_km[beyond] - x_p[-1]) * p[-1, 0]
+
+    # Kırılan dalgalar: kaynak tabakası ve altındaki her arayüz (j, j+1)
+    for j in range(k, len(tops) - 1):
+        v_ref = velocities[j + 1]
+        if v_ref <= velocities[:j + 1].max():
+            continue  # Düşük hız zonu: bu arayüzde kritik kırılma yok
+        p = 1.0 / v_ref
+        eta = np.sqrt(1.0 / velocities[:j + 1] ** 2 - p ** 2)
+        # Yukarı bacak: 0..j tabakalarının tamamı; aşağı bacak: kaynaktan arayüze (k kısmi, k+1..j tam)
+        full_h = np.diff(tops[:j + 2])
+        down_h = full_h.copy()
+        down_h[:k] = 0.0
+        down_h[k] = tops[k + 1] - depth_km
+        total_h = full_h + down_h
+        intercept = np.sum(total_h * eta)
+        crossover = np.sum(total_h * p / eta)  # h * tan(i), tan(i) = p v / cos(i) = p / eta
+        head = np.where(distances_km >= crossover, distances_km * p + intercept, np.inf)
+        best = np.minimum(best, head)
+    return best
+
+
+class TravelTimeTable:
+    """
+    Derinlik x mesafe ızgarasında P ve S ilk varış süreleri.
+
+    Args:
+        layers (list): [[üst_derinlik_km, vp, vs], ...] hız modeli.
+        max_distance_km, distance_step_km (float): Mesafe ızgarası.
+        max_depth_km, depth_step_km (float): Derinlik ızgarası.
+    """
+
+    def __init__(self, layers, max_distance_km=300.0, distance_step_km=1.0, max_depth_km=40.0, depth_step_km=1.0):
+        self.tops, vp, vs = layered_model(layers)
+        self.distances = np.arange(0.0, max_distance_km + distance_step_km / 2, distance_step_km)
+        self.depths = np.arange(0.0, max_depth_km + depth_step_km / 2, depth_step_km)
+        self.tables = {}
+        for phase, velocities in (('P', vp), ('S', vs)):
+            self.tables[phase] = np.vstack([_first_arrivals(self.tops, velocities, z, self.distances) for z in self.depths])
+
+    def predict(self, phase, distances_km, depths_km):
+        """
+        Tablodan iki doğrusal interpolasyonla seyahat süresi (s) tahmini.
+
+        Args:
+            phase (str or array-like): 'P'/'S' (tek değer veya pick başına dizi).
+            distances_km, depths_km (array-like): Mesafe ve derinlikler (aynı boyutta).
+
+        Returns:
+            np.ndarray: Süreler; ızgara dışındaki veya NaN girdiler için NaN.
+        """
+        dist = np.asarray(distances_km, dtype=np.float64)
+        depth = np.asarray(depths_km, dtype=np.float64)
+        phase = np.broadcast_to(np.asarray(phase, dtype=str), dist.shape)
+        out = np.full(dist.shape, np.nan)
+        inside = ((dist >= self.distances[0]) & (dist <= self.distances[-1]) &
+                  (depth >= self.depths[0]) & (depth <= self.depths[-1]))
+
+        # Eşit aralıklı ızgarada kesirli indeksler
+        fx = (np.where(inside, dist, 0.0) - self.distances[0]) / (self.distances[1] - self.distances[0])
+        fz = (np.where(inside, depth, 0.0) - self.depths[0]) / (self.depths[1] - self.depths[0]) if len(self.depths) > 1 else np.zeros(dist.shape)
+        ix = np.minimum(fx.astype(np.int64), len(self.distances) - 2)
+        iz = np.minimum(fz.astype(np.int64), max(len(self.depths) - 2, 0))
+        iz1 = np.minimum(iz + 1, len(self.depths) - 1)
+        wx = fx - ix
+        wz = fz - iz
+        for name, table in self.tables.items():
+            sel = inside & (phase == name)
+            if not sel.any():
+                continue
+            a, b, c, d = table[iz[sel], ix[sel]], table[iz[sel], ix[sel] + 1], table[iz1[sel], ix[sel]], table[iz1[sel], ix[sel] + 1]
+            top = a * (1 - wx[sel]) + b * wx[sel]
+            bottom = c * (1 - wx[sel]) + d * wx[sel]
+            out[sel] = top * (1 - wz[sel]) + bottom * wz[sel]
+        return out
+
+
+# Aynı model/ızgara için tablo bir kez hesaplanır
+_TABLE_CACHE = OrderedDict()
+_TABLE_CACHE_SIZE = 4
+_TABLE_LOCK = threading.Lock()
+
+
+def get_travel_time_table(tt_cfg):
+    """traveltime_settings bölümüne göre (önbellekli) TravelTimeTable döndürür."""
+    key = (tuple(map(tuple, tt_cfg['velocity_model'])), tt_cfg.get('max_distance_km', 300.0), tt_cfg.get('distance_step_km', 1.0),
+           tt_cfg.get('max_depth_km', 40.0), tt_cfg.get('depth_step_km', 1.0))
+    with _TABLE_LOCK:
+        if key in _TABLE_CACHE:
+            _TABLE_CACHE.move_to_end(key)
+            return _TABLE_CACHE[key]
+    table = TravelTimeTable(tt_cfg['velocity_model'], *key[1:])
+    with _TABLE_LOCK:
+        _TABLE_CACHE[key] = table
+        while len(_TABLE_CACHE) > _TABLE_CACHE_SIZE:
+            _TABLE_CACHE.popitem(last=False)
+    return table
+
+
+def compute_residuals(table, source, event_ids, origin_times, event_lats, event_lons, event_depths_km,
+                      pick_event_index, pick_stations, pick_phases, pick_times, pick_lats, pick_lons):
+    """
+    Tüm pickler için gözlenen - tahmin edilen seyahat süresini tek vektörel geçişte hesaplar.
+
+    Event dizileri event başına, pick dizileri pick başınadır; pick_event_index her pick'in
+    event dizisindeki konumudur.
+
+    Returns:
+        pd.DataFrame: RESIDUAL_COLUMNS sütunlu rezidüel tablosu (süreler saniye).
+    """
+    ev = np.asarray(pick_event_index, dtype=np.int64)
+    origin = np.asarray(origin_times, dtype='datetime64[ns]')[ev]
+    distance = spatial_utils.haversine_km(np.asarray(event_lats, dtype=np.float64)[ev], np.asarray(event_lons, dtype=np.float64)[ev],
+                                          np.asarray(pick_lats, dtype=np.float64), np.asarray(pick_lons, dtype=np.float64))
+    depth = np.asarray(event_depths_km, dtype=np.float64)[ev]
+    pick_times = np.asarray(pick_times, dtype='datetime64[ns]')
+    travel = (time_utils.to_ns(pick_times) - time_utils.to_ns(origin)) / time_utils.NS_PER_SECOND
+    predicted = table.predict(pick_phases, distance, depth)
+    return pd.DataFrame({
+        'source': source,
+        'event_id': np.asarray(event_ids, dtype=object)[ev],
+        'station': np.asarray(pick_stations, dtype=str),
+        'phase': np.asarray(pick_phases, dtype=str),
+        'distance_km': distance,
+        'depth_km': depth,
+        'origin_time': origin,
+        'pick_time': pick_times,
+        'travel_time': travel,
+        'predicted': predicted,
+        'residual': travel - predicted,
+    }, columns=RESIDUAL_COLUMNS)
+
+
+def catalog_residuals(parsed, table, default_depth_km=10.0, time_range=None):
+    """
+    catalog_utils.parse_catalog_data çıktısı için rezidüel tablosu (origin'i olmayan event'lerin pickleri atlanır).
+
+    time_range=(t0, t1) (datetime64) verilirse sadece origin zamanı [t0, t1) aralığındaki event'ler hesaplanır.
+    """
+    events = parsed['events']
+    event_ids = [eid for eid, e in events.items() if e.get('event_time') is not None and e.get('event_lat') is not None]
+    if time_range is not None:
+        t0, t1 = time_range
+        event_ids = [eid for eid in event_ids if t0 <= events[eid]['event_time'] < t1]
+    if not event_ids:
+        return pd.DataFrame(columns=RESIDUAL_COLUMNS)
+    position = {eid: i for i, eid in enumerate(event_ids)}
+    picks = parsed['picks']
+    pick_event_index = np.array([position.get(eid, -1) for eid in picks['event_id']], dtype=np.int64)
+    keep = pick_event_index >= 0
+    depths = [events[eid]['event_depth'] if events[eid].get('event_depth') is not None else default_depth_km for eid in event_ids]
+    return compute_residuals(
+        table, 'catalog', event_ids,
+        [events[eid]['event_time'] for eid in event_ids],
+        [events[eid]['event_lat'] for eid in event_ids],
+        [events[eid]['event_lon'] for eid in event_ids],
+        depths, pick_event_index[keep], picks['station'][keep], picks['phase'][keep],
+        picks['time'][keep], picks['lat'][keep], picks['lon'][keep])
+
+
+def hdf5_residuals(results, table):
+    """
+    hdf5_utils.read_hdf5_results (veya HDF5Dataset.read_range) çıktısı için rezidüel tablosu.
+
+    'srcs' derinlik sütunu yukarı pozitif metre olarak tutulduğundan derinlik = -değer / 1000 km alınır.
+    """
+    event_ids = list(results['event_ids'])
+    position = {eid: i for i, eid in enumerate(event_ids)}
+    flat = hdf5_utils.flatten_pick_groups(results['pick_groups'])
+    # '12_Picks' -> '12', veri kümesinde '2023-12-04/12_Picks' -> '2023-12-04/12'
+    pick_event_index = np.array([position.get(eq_id[:-len('_Picks')] if eq_id.endswith('_Picks') else eq_id, -1)
+                                 for eq_id in flat['event_id']], dtype=np.int64)
+    keep = pick_event_index >= 0
+    if not keep.any():
+        return pd.DataFrame(columns=RESIDUAL_COLUMNS)
+    depths_km = np.clip(-np.asarray(results['event_depths'], dtype=np.float64) / 1000.0, 0.0, None)
+    return compute_residuals(
+        table, 'hdf5', event_ids, results['event_times'], results['event_lats'], results['event_lons'], depths_km,
+        pick_event_index[keep], flat['station'][keep], flat['phase'][keep], flat['time'][keep],
+        flat['latitude'][keep], flat['longitude'][keep])
+
+
+def build_residual_table(config, station_names, date=None):
+    """
+    Yapılandırmadaki katalog ve HDF5 kaynakları için birleşik rezidüel tablosunu oluşturur.
+
+    Args:
+        date (str, optional): Verilirse katalogdan sadece o günün (YYYY-MM-DD, UTC) event'leri hesaplanır.
+            HDF5 tarafı zaten hdf5_data bölümüyle (klasör modunda start/end, tek dosya modunda dosya) sınırlıdır.
+
+    Returns:
+        pd.DataFrame: RESIDUAL_COLUMNS sütunlu tablo.
+    """
+    tt_cfg = config['traveltime_settings']
+    table = get_travel_time_table(tt_cfg)
+    frames = []
+    if 'catalog' in tt_cfg.get('sources', ['catalog', 'hdf5']):
+        cat_cfg = config['catalog_data']
+        parsed = catalog_utils.load_configured_catalog(cat_cfg)
+        if parsed is not None:
+            day = np.datetime64(date, 'D') if date else None
+            time_range = (day, day + np.timedelta64(1, 'D')) if day is not None else None
+            frames.append(catalog_residuals(parsed, table, tt_cfg.get('default_depth_km', 10.0), time_range))
+    if 'hdf5' in tt_cfg.get('sources', ['catalog', 'hdf5']):
+        # Çok günlü modda klasör tek veri kümesi olarak [start, end) aralığında okunur
+        results = hdf5_dataset_utils.load_configured_results(config['hdf5_data'], station_names, config['seismic_data']['date'])
+        if results is not None:
+            frames.append(hdf5_residuals(results, table))
+    frames = [f for f in frames if len(f)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RESIDUAL_COLUMNS)
+
+
+def plot_reduced_time(residuals, reduction_velocity=6.0, table=None, depth_km=10.0):
+    """
+    İndirgenmiş zaman (t - mesafe / v_red) - mesafe grafiği; isteğe bağlı olarak modelin P/S eğrileri.
+
+    Args:
+        residuals (pd.DataFrame): build_residual_table çıktısı.
+        reduction_velocity (float): İndirgeme hızı (km/s).
+        table (TravelTimeTable, optional): Verilirse depth_km için model eğrileri çizilir.
+
+    Returns:
+        plotly.graph_objects.Figure: Oluşturulan Plotly figürü.
+    """
+    fig = go.Figure()
+    styles = {'P': dict(color='blue', symbol='circle'), 'S': dict(color='red', symbol='x')}
+    for (source, phase), group in residuals.groupby(['source', 'phase'], sort=True):
+        reduced = group['travel_time'].to_numpy() - group['distance_km'].to_numpy() / reduction_velocity
+        hover = [f"Kaynak: {source}<br>Event: {eid}<br>İstasyon: {st}<br>Faz: {phase}<br>Mesafe: {d:.1f} km<br>Rezidüel: {r:+.2f} s"
+                 for eid, st, d, r in zip(group['event_id'], group['station'], group['distance_km'], group['residual'])]
+        fig.add_trace(go.Scattergl(
+            x=group['distance_km'], y=reduced, mode='markers', name=f"{source} {phase}",
+            marker=dict(size=5, opacity=0.6 if source == 'hdf5' else 0.9, **styles.get(phase, {})),
+            hoverinfo='text', text=hover
+        ))
+    if table is not None:
+        for phase, style in styles.items():
+            predicted = table.predict(phase, table.distances, np.full(len(table.distances), depth_km))
+            fig.add_trace(go.Scatter(
+                x=table.distances, y=predicted - table.distances / reduction_velocity, mode='lines',
+                name=f"Model {phase} ({depth_km:g} km)", line=dict(color=style['color'], width=1, dash='dash')
+            ))
+    fig.update_layout(
+        title=f"İndirgenmiş Seyahat Süreleri (v_red = {reduction_velocity:g} km/s)",
+        xaxis_title="Episantral Mesafe (km)", yaxis_title=f"t - x/{reduction_velocity:g} (s)",
+        template="plotly_white", height=500, hovermode="closest"
+    )
+    return fig
+
+
+def run_residuals(config, station_names, show_plot=True, date=None):
+    """
+    Rezidüel tablosunu oluşturur, CSV'ye yazar, özet istatistikleri yazdırır ve isteğe bağlı grafiği gösterir.
+
+    date verilirse (zamanlayıcının günlük görevi) sadece o günün event'leri hesaplanır.
+    """
+    tt_cfg = config['traveltime_settings']
+    print("\n--- Seyahat Süresi Rezidüelleri Hesaplanıyor ---")
+    residuals = build_residual_table(config, station_names, date)
+    if residuals.empty:
+        print("  Uyarı: Rezidüel hesaplanacak pick bulunamadı.")
+        return residuals
+
+    summary = residuals.groupby(['source', 'phase'])['residual'].agg(['count', 'mean', 'median', 'std'])
+    outside = int(residuals['predicted'].isna().sum())
+    print(f"  {len(residuals)} pick için rezidüel hesaplandı ({outside} pick tablo dışında).")
+    print(summary.round(3).to_string())
+
+    output_csv = tt_cfg.get('output_csv')
+    if output_csv:
+        os.makedirs(os.path.dirname(output_csv), exist_ok=True)
+        out = residuals.copy()
+        for col in ('origin_time', 'pick_time'):
+            out[col] = time_utils.format_datetime64(out[col].to_numpy())
+        out.to_csv(output_csv, index=False, float_format='%.3f')
+        print(f"  Rezidüel tablosu yazıldı: {output_csv}")
+    output_hdf5 = tt_cfg.get('output_hdf5')
+    if output_hdf5:
+        with hdf5_writer_utils.HDF5ResultWriter.from_config(output_hdf5, config.get('hdf5_output_settings')) as writer:
+            writer.remove("tables/residuals")
+            writer.append_table("residuals", residuals, time_column='pick_time')
+        print(f"  Rezidüel tablosu HDF5'e yazıldı: {output_hdf5}")
+
+    if show_plot:
+        plot_reduced_time(residuals, tt_cfg.get('reduction_velocity', 6.0), get_travel_time_table(tt_cfg),
+                          tt_cfg.get('default_depth_km', 10.0)).show()
+    return residuals